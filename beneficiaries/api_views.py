@@ -17,6 +17,7 @@ from .models import (
     TarafKehidupan, DataBantuan
 )
 from references.models import Penduduk
+from references.autocomplete import search_residents
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -1764,17 +1765,8 @@ def aids_dropdown(request):
 def penduduk_dropdown(request):
     """Get penduduk for dropdown"""
     try:
-        search = request.GET.get('search', '')
-        penduduk = Penduduk.objects.all().order_by('name')
-        
-        if search:
-            penduduk = penduduk.filter(
-                Q(name__icontains=search) |
-                Q(nik__icontains=search)
-            )
-        
         # Limit to 50 results
-        penduduk = penduduk[:50]
+        penduduk = search_residents(request, default_limit=50)
         
         data = []
         for person in penduduk:
@@ -1783,7 +1775,7 @@ def penduduk_dropdown(request):
                 'nama': person.name,
                 'nik': person.nik,
                 'tempat_lahir': person.birth_place,
-                'tanggal_lahir': person.birth_date.strftime('%Y-%m-%d'),
+                'tanggal_lahir': person.birth_date.strftime('%Y-%m-%d') if person.birth_date else None,
                 'jenis_kelamin': person.gender,
             })
         
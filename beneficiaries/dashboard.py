@@ -0,0 +1,9 @@
+from django.db.models import Count
+
+from core.aggregator import register
+from .models import Beneficiary
+
+
+@register('beneficiaries')
+def beneficiary_metrics():
+    return {'statistics': Beneficiary.objects.aggregate(total_beneficiaries=Count('pk'))}
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('beneficiaries', '0003_alter_aid_created_by_alter_beneficiary_registered_by_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aiddistribution',
+            index=models.Index(fields=['status'], name='benef_aiddist_status_idx'),
+        ),
+    ]
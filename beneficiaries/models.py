@@ -133,6 +133,9 @@ class AidDistribution(models.Model):
         verbose_name = 'Distribusi Bantuan'
         verbose_name_plural = 'Distribusi Bantuan'
         unique_together = ['aid', 'beneficiary']
+        indexes = [
+            models.Index(fields=['status'], name='benef_aiddist_status_idx'),
+        ]
 
 
 class BeneficiaryVerification(models.Model):
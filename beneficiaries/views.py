@@ -1027,7 +1027,7 @@ def beneficiaries_dropdown(request):
 def residents_dropdown(request):
     """Get residents for dropdown"""
     try:
-        residents = Penduduk.objects.values('id', 'nama', 'nik')
+        residents = Penduduk.objects.filter(is_active=True).order_by('name').values('id', 'name', 'nik')
         return JsonResponse({
             'residents': list(residents)
         })
@@ -9,6 +9,7 @@ from django.utils.dateparse import parse_date
 from decimal import Decimal
 from .models import Business, BusinessCategory, Koperasi, BUMG, UKM, Aset, LayananJasa, JenisKoperasi
 import json
+from core.media import media_pipeline
 
 @csrf_protect
 @require_http_methods(["GET"])
@@ -456,6 +457,7 @@ def api_aset_list(request):
         page_obj = paginator.get_page(page)
         
         results = []
+        images = media_pipeline.lookup(aset.foto for aset in page_obj)
         for aset in page_obj:
             results.append({
                 'id': aset.id,
@@ -473,6 +475,8 @@ def api_aset_list(request):
                 'penanggung_jawab': aset.penanggung_jawab,
                 'nomor_sertifikat': aset.nomor_sertifikat,
                 'keterangan': aset.keterangan,
+                'foto': aset.foto.url if aset.foto else None,
+                'foto_variants': media_pipeline.payload(aset.foto, images),
                 'created_at': aset.created_at.isoformat()
             })
         
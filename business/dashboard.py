@@ -0,0 +1,19 @@
+from django.db.models import Count, Q
+
+from core.aggregator import register, register_listing
+from .models import Business
+
+
+@register('business')
+def business_metrics():
+    return {'statistics': Business.objects.aggregate(
+        total_businesses=Count('pk'),
+        active_businesses=Count('pk', filter=Q(status='aktif')),
+    )}
+
+
+register_listing(
+    'business',
+    lambda: Business.objects.all(),
+    ('id', 'name', 'category__name', 'business_type', 'status', 'created_at'),
+)
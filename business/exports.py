@@ -0,0 +1,68 @@
+from core.excel import Column, ExcelExport
+from .models import BUMG, UKM, Aset, Koperasi, LayananJasa
+
+
+def ymd(value):
+    return value.strftime('%Y-%m-%d')
+
+
+EXPORTS = {
+    'koperasi': ExcelExport('Data Koperasi', lambda: Koperasi.objects.order_by('nama'), [
+        Column('Nama Koperasi', 'nama'),
+        Column('Alamat', 'alamat'),
+        Column('Telepon', 'telepon'),
+        Column('Email', 'email'),
+        Column('Jenis Koperasi', 'jenis_usaha'),
+        Column('Jumlah Anggota', 'jumlah_anggota'),
+        Column('Modal Awal', 'modal_awal'),
+        Column('Status', 'status'),
+        Column('Tanggal Dibuat', 'created_at', ymd),
+    ]),
+    'bumg': ExcelExport('Data BUMG', lambda: BUMG.objects.order_by('nama'), [
+        Column('Nama BUMG', 'nama'),
+        Column('Alamat', 'alamat'),
+        Column('Telepon', 'telepon'),
+        Column('Email', 'email'),
+        Column('Bidang Usaha', 'bidang_usaha'),
+        Column('Modal Dasar', 'modal_dasar'),
+        Column('Modal Disetor', 'modal_disetor'),
+        Column('Status', 'status'),
+        Column('Tanggal Dibuat', 'created_at', ymd),
+    ]),
+    'ukm': ExcelExport('Data UKM', lambda: UKM.objects.order_by('nama_usaha'), [
+        Column('Nama UKM', 'nama_usaha'),
+        Column('Pemilik', 'pemilik'),
+        Column('Alamat', 'alamat_usaha'),
+        Column('Telepon', 'telepon'),
+        Column('Email', 'email'),
+        Column('Jenis Usaha', 'jenis_usaha'),
+        Column('Modal Awal', 'modal_awal'),
+        Column('Jumlah Karyawan', 'jumlah_karyawan'),
+        Column('Status', 'status'),
+        Column('Tanggal Dibuat', 'created_at', ymd),
+    ]),
+    'aset': ExcelExport('Data Aset', lambda: Aset.objects.order_by('nama_aset'), [
+        Column('Kode Aset', 'kode_aset'),
+        Column('Nama Aset', 'nama_aset'),
+        Column('Kategori', 'kategori'),
+        Column('Lokasi', 'lokasi'),
+        Column('Kondisi', 'kondisi'),
+        Column('Nilai Perolehan', 'nilai_perolehan'),
+        Column('Nilai Buku', 'nilai_buku'),
+        Column('Keterangan', 'keterangan'),
+        Column('Tanggal Dibuat', 'created_at', ymd),
+    ]),
+    'jasa': ExcelExport('Data Layanan Jasa', lambda: LayananJasa.objects.order_by('nama'), [
+        Column('Nama Layanan', 'nama'),
+        Column('Penyedia Jasa', 'penyedia'),
+        Column('Alamat', 'alamat'),
+        Column('Telepon', 'telepon'),
+        Column('Email', 'email'),
+        Column('Kategori', 'kategori'),
+        Column('Harga Min', 'harga_min'),
+        Column('Harga Max', 'harga_max'),
+        Column('Satuan Harga', 'satuan_harga'),
+        Column('Status', 'status'),
+        Column('Tanggal Dibuat', 'created_at', ymd),
+    ]),
+}
@@ -0,0 +1,5 @@
+from core.media import register
+from .models import Aset, BusinessProduct
+
+register(BusinessProduct, 'image')
+register(Aset, 'foto')
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0004_jeniskoperasi_koperasi_jenis_koperasi'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['status'], name='business_status_idx'),
+        ),
+    ]
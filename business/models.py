@@ -58,6 +58,9 @@ class Business(models.Model):
     class Meta:
         verbose_name = 'Bisnis'
         verbose_name_plural = 'Bisnis'
+        indexes = [
+            models.Index(fields=['status'], name='business_status_idx'),
+        ]
 
 
 class BusinessOwner(models.Model):
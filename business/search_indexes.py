@@ -0,0 +1,16 @@
+from core.search import register
+from .models import Business, UKM
+
+register(
+    Business, 'business', 'business',
+    title='name',
+    fields=('description', 'address', 'license_number', 'category__name'),
+    subtitle='business_type',
+)
+
+register(
+    UKM, 'ukm', 'business',
+    title='nama_usaha',
+    fields=('pemilik', 'nik_pemilik', 'jenis_usaha', 'alamat_usaha', 'produk_utama'),
+    subtitle='jenis_usaha',
+)
@@ -11,13 +11,12 @@ from django.middleware.csrf import get_token
 import json
 from datetime import datetime, date
 from decimal import Decimal
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
 
+from .exports import EXPORTS
 from .models import (BusinessCategory, Business, BusinessOwner, BusinessProduct, 
                     BusinessFinance, Koperasi, BUMG, UKM, Aset, LayananJasa, JenisKoperasi)
 from references.models import Penduduk
+from core.media import media_pipeline
 
 
 @login_required
@@ -504,6 +503,7 @@ def aset_api(request):
         aset_page = paginator.get_page(page)
         
         data = []
+        images = media_pipeline.lookup(aset.foto for aset in aset_page)
         for aset in aset_page:
             data.append({
                 'id': aset.id,
@@ -521,6 +521,8 @@ def aset_api(request):
                 'penanggung_jawab': aset.penanggung_jawab,
                 'nomor_sertifikat': aset.nomor_sertifikat,
                 'keterangan': aset.keterangan,
+                'foto': aset.foto.url if aset.foto else None,
+                'foto_variants': media_pipeline.payload(aset.foto, images),
             })
         
         return JsonResponse({
@@ -1324,6 +1326,7 @@ def business_products_list(request):
     page_obj = paginator.get_page(page)
     
     data = []
+    images = media_pipeline.lookup(product.image for product in page_obj)
     for product in page_obj:
         data.append({
             'id': product.id,
@@ -1336,6 +1339,8 @@ def business_products_list(request):
             'min_stock': product.min_stock,
             'is_available': product.is_available,
             'stock_status': 'Stok Rendah' if product.stock_quantity <= product.min_stock else 'Normal',
+            'image': product.image.url if product.image else None,
+            'image_variants': media_pipeline.payload(product.image, images),
             'created_at': product.created_at.strftime('%Y-%m-%d %H:%M')
         })
     
@@ -1453,13 +1458,13 @@ def businesses_dropdown(request):
 @login_required
 def residents_dropdown(request):
     """Get residents for dropdown"""
-    residents = Penduduk.objects.filter(status_kependudukan='tetap').order_by('nama')
+    residents = Penduduk.objects.filter(is_active=True).order_by('name')
     
     data = []
     for resident in residents:
         data.append({
             'id': resident.id,
-            'name': resident.nama,
+            'name': resident.name,
             'nik': resident.nik
         })
     
@@ -1506,206 +1511,35 @@ def business_statistics(request):
     })
 
 
-# Export Functions
-def create_excel_response(filename, workbook):
-    """Helper function to create Excel HTTP response"""
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    workbook.save(response)
-    return response
-
-
-def style_header_row(worksheet, row_num, columns):
-    """Style header row with blue background and white text"""
-    header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-    header_font = Font(color='FFFFFF', bold=True)
-    
-    for col_num, _ in enumerate(columns, 1):
-        cell = worksheet.cell(row=row_num, column=col_num)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Auto-adjust column width
-        column_letter = get_column_letter(col_num)
-        worksheet.column_dimensions[column_letter].width = 15
-
-
+# Export Functions (kolom per model: business/exports.py)
 @login_required
 def export_koperasi(request):
     """Export Koperasi data to Excel"""
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Data Koperasi'
-    
-    # Headers
-    headers = ['No', 'Nama Koperasi', 'Alamat', 'Telepon', 'Email', 'Jenis Koperasi', 
-               'Jumlah Anggota', 'Modal Awal', 'Status', 'Tanggal Dibuat']
-    
-    # Write headers
-    for col_num, header in enumerate(headers, 1):
-        worksheet.cell(row=1, column=col_num, value=header)
-    
-    style_header_row(worksheet, 1, headers)
-    
-    # Write data
-    koperasi_list = Koperasi.objects.all().order_by('nama')
-    for row_num, koperasi in enumerate(koperasi_list, 2):
-        worksheet.cell(row=row_num, column=1, value=row_num - 1)
-        worksheet.cell(row=row_num, column=2, value=koperasi.nama)
-        worksheet.cell(row=row_num, column=3, value=koperasi.alamat)
-        worksheet.cell(row=row_num, column=4, value=koperasi.telepon)
-        worksheet.cell(row=row_num, column=5, value=koperasi.email)
-        worksheet.cell(row=row_num, column=6, value=koperasi.jenis_usaha)
-        worksheet.cell(row=row_num, column=7, value=koperasi.jumlah_anggota)
-        worksheet.cell(row=row_num, column=8, value=float(koperasi.modal_awal))
-        worksheet.cell(row=row_num, column=9, value=koperasi.status)
-        worksheet.cell(row=row_num, column=10, value=koperasi.created_at.strftime('%Y-%m-%d'))
-    
-    filename = f'Data_Koperasi_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    return create_excel_response(filename, workbook)
+    return EXPORTS['koperasi'].response()
 
 
 @login_required
 def export_bumg(request):
     """Export BUMG data to Excel"""
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Data BUMG'
-    
-    # Headers
-    headers = ['No', 'Nama BUMG', 'Alamat', 'Telepon', 'Email', 'Jenis Usaha', 
-               'Modal Awal', 'Jumlah Karyawan', 'Status', 'Tanggal Dibuat']
-    
-    # Write headers
-    for col_num, header in enumerate(headers, 1):
-        worksheet.cell(row=1, column=col_num, value=header)
-    
-    style_header_row(worksheet, 1, headers)
-    
-    # Write data
-    bumg_list = BUMG.objects.all().order_by('nama')
-    for row_num, bumg in enumerate(bumg_list, 2):
-        worksheet.cell(row=row_num, column=1, value=row_num - 1)
-        worksheet.cell(row=row_num, column=2, value=bumg.nama)
-        worksheet.cell(row=row_num, column=3, value=bumg.alamat)
-        worksheet.cell(row=row_num, column=4, value=bumg.telepon)
-        worksheet.cell(row=row_num, column=5, value=bumg.email)
-        worksheet.cell(row=row_num, column=6, value=bumg.jenis_usaha)
-        worksheet.cell(row=row_num, column=7, value=float(bumg.modal_awal))
-        worksheet.cell(row=row_num, column=8, value=bumg.jumlah_karyawan)
-        worksheet.cell(row=row_num, column=9, value=bumg.status)
-        worksheet.cell(row=row_num, column=10, value=bumg.created_at.strftime('%Y-%m-%d'))
-    
-    filename = f'Data_BUMG_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    return create_excel_response(filename, workbook)
+    return EXPORTS['bumg'].response()
 
 
 @login_required
 def export_ukm(request):
     """Export UKM data to Excel"""
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Data UKM'
-    
-    # Headers
-    headers = ['No', 'Nama UKM', 'Pemilik', 'Alamat', 'Telepon', 'Email', 
-               'Jenis Usaha', 'Modal Awal', 'Jumlah Karyawan', 'Status', 'Tanggal Dibuat']
-    
-    # Write headers
-    for col_num, header in enumerate(headers, 1):
-        worksheet.cell(row=1, column=col_num, value=header)
-    
-    style_header_row(worksheet, 1, headers)
-    
-    # Write data
-    ukm_list = UKM.objects.all().order_by('nama')
-    for row_num, ukm in enumerate(ukm_list, 2):
-        worksheet.cell(row=row_num, column=1, value=row_num - 1)
-        worksheet.cell(row=row_num, column=2, value=ukm.nama)
-        worksheet.cell(row=row_num, column=3, value=ukm.pemilik)
-        worksheet.cell(row=row_num, column=4, value=ukm.alamat)
-        worksheet.cell(row=row_num, column=5, value=ukm.telepon)
-        worksheet.cell(row=row_num, column=6, value=ukm.email)
-        worksheet.cell(row=row_num, column=7, value=ukm.jenis_usaha)
-        worksheet.cell(row=row_num, column=8, value=float(ukm.modal_awal))
-        worksheet.cell(row=row_num, column=9, value=ukm.jumlah_karyawan)
-        worksheet.cell(row=row_num, column=10, value=ukm.status)
-        worksheet.cell(row=row_num, column=11, value=ukm.created_at.strftime('%Y-%m-%d'))
-    
-    filename = f'Data_UKM_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    return create_excel_response(filename, workbook)
+    return EXPORTS['ukm'].response()
 
 
 @login_required
 def export_aset(request):
     """Export Aset data to Excel"""
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Data Aset'
-    
-    # Headers
-    headers = ['No', 'Nama Aset', 'Jenis Aset', 'Lokasi', 'Kondisi', 
-               'Nilai Aset', 'Keterangan', 'Status', 'Tanggal Dibuat']
-    
-    # Write headers
-    for col_num, header in enumerate(headers, 1):
-        worksheet.cell(row=1, column=col_num, value=header)
-    
-    style_header_row(worksheet, 1, headers)
-    
-    # Write data
-    aset_list = Aset.objects.all().order_by('nama')
-    for row_num, aset in enumerate(aset_list, 2):
-        worksheet.cell(row=row_num, column=1, value=row_num - 1)
-        worksheet.cell(row=row_num, column=2, value=aset.nama)
-        worksheet.cell(row=row_num, column=3, value=aset.jenis_aset)
-        worksheet.cell(row=row_num, column=4, value=aset.lokasi)
-        worksheet.cell(row=row_num, column=5, value=aset.kondisi)
-        worksheet.cell(row=row_num, column=6, value=float(aset.nilai_aset))
-        worksheet.cell(row=row_num, column=7, value=aset.keterangan)
-        worksheet.cell(row=row_num, column=8, value=aset.status)
-        worksheet.cell(row=row_num, column=9, value=aset.created_at.strftime('%Y-%m-%d'))
-    
-    filename = f'Data_Aset_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    return create_excel_response(filename, workbook)
+    return EXPORTS['aset'].response()
 
 
 @login_required
 def export_jasa(request):
     """Export Layanan Jasa data to Excel"""
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Data Layanan Jasa'
-    
-    # Headers
-    headers = ['No', 'Nama Layanan', 'Penyedia Jasa', 'Alamat', 'Telepon', 
-               'Email', 'Jenis Layanan', 'Tarif', 'Status', 'Tanggal Dibuat']
-    
-    # Write headers
-    for col_num, header in enumerate(headers, 1):
-        worksheet.cell(row=1, column=col_num, value=header)
-    
-    style_header_row(worksheet, 1, headers)
-    
-    # Write data
-    jasa_list = LayananJasa.objects.all().order_by('nama_layanan')
-    for row_num, jasa in enumerate(jasa_list, 2):
-        worksheet.cell(row=row_num, column=1, value=row_num - 1)
-        worksheet.cell(row=row_num, column=2, value=jasa.nama_layanan)
-        worksheet.cell(row=row_num, column=3, value=jasa.penyedia_jasa)
-        worksheet.cell(row=row_num, column=4, value=jasa.alamat)
-        worksheet.cell(row=row_num, column=5, value=jasa.telepon)
-        worksheet.cell(row=row_num, column=6, value=jasa.email)
-        worksheet.cell(row=row_num, column=7, value=jasa.jenis_layanan)
-        worksheet.cell(row=row_num, column=8, value=float(jasa.tarif))
-        worksheet.cell(row=row_num, column=9, value=jasa.status)
-        worksheet.cell(row=row_num, column=10, value=jasa.created_at.strftime('%Y-%m-%d'))
-    
-    filename = f'Data_Layanan_Jasa_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    return create_excel_response(filename, workbook)
+    return EXPORTS['jasa'].response()
 
 
 # Public API endpoints for statistics (no authentication required)
@@ -1827,7 +1661,7 @@ def ukm_statistics_api(request):
     if request.method == 'GET':
         total = UKM.objects.count()
         active = UKM.objects.filter(status='aktif').count()
-        total_workers = UKM.objects.aggregate(Sum('jumlah_pekerja'))['jumlah_pekerja__sum'] or 0
+        total_workers = UKM.objects.aggregate(Sum('jumlah_karyawan'))['jumlah_karyawan__sum'] or 0
         total_turnover = UKM.objects.aggregate(Sum('omzet_bulanan'))['omzet_bulanan__sum'] or 0
         
         return JsonResponse({
@@ -0,0 +1,170 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_WORKERS': 4,       # jumlah provider yang dijalankan bersamaan
+    'CACHE_TIMEOUT': 60,    # detik; 0 = tanpa cache
+}
+
+
+def week_ago():
+    """Batas awal metrik 'minggu ini' (7 hari terakhir)"""
+    return timezone.now() - timedelta(days=7)
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, dt_time.min))
+
+
+class MetricProvider:
+    """Satu penyedia metrik dashboard; return dict {section: {metric: value}}"""
+
+    def __init__(self, name, func, cache_timeout=None):
+        self.name = name
+        self.func = func
+        self.cache_timeout = cache_timeout
+
+    def cache_key(self):
+        return f'dashboard:metric:{self.name}'
+
+
+class ListingProvider:
+    """Penyedia daftar data modul untuk api_aggregator"""
+
+    def __init__(self, name, queryset, fields, date_field='created_at', ordering=('-created_at',)):
+        self.name = name
+        self.queryset = queryset
+        self.fields = fields
+        self.date_field = date_field
+        self.ordering = ordering
+
+    def fetch(self, offset=0, limit=10, date_from=None, date_to=None):
+        queryset = self.queryset()
+        # Rentang tanggal inklusif, dibandingkan sebagai datetime agar index tetap terpakai
+        if date_from:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': start_of_day(date_from)})
+        if date_to:
+            queryset = queryset.filter(**{f'{self.date_field}__lt': start_of_day(date_to + timedelta(days=1))})
+        return {
+            'total': queryset.count(),
+            'items': list(queryset.order_by(*self.ordering).values(*self.fields)[offset:offset + limit]),
+        }
+
+
+class DashboardRegistry:
+    """Registry provider metrik per aplikasi (didaftarkan di <app>/dashboard.py)"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._listings = {}
+
+    @property
+    def config(self):
+        return {**DEFAULTS, **getattr(settings, 'DASHBOARD_AGGREGATOR', {})}
+
+    def register(self, name, cache_timeout=None):
+        """Decorator untuk mendaftarkan fungsi provider metrik"""
+        def decorator(func):
+            self._metrics[name] = MetricProvider(name, func, cache_timeout)
+            return func
+        return decorator
+
+    def register_listing(self, name, queryset, fields, **options):
+        self._listings[name] = ListingProvider(name, queryset, fields, **options)
+
+    @property
+    def metric_names(self):
+        return list(self._metrics)
+
+    @property
+    def listing_names(self):
+        return list(self._listings)
+
+    def _run_metric(self, provider, use_cache):
+        timeout = self.config['CACHE_TIMEOUT'] if provider.cache_timeout is None else provider.cache_timeout
+        started = time.perf_counter()
+        if use_cache and timeout:
+            result = cache.get(provider.cache_key())
+            if result is not None:
+                return result, {'ms': round((time.perf_counter() - started) * 1000, 2), 'cached': True}
+        result = provider.func()
+        if timeout:
+            cache.set(provider.cache_key(), result, timeout)
+        return result, {'ms': round((time.perf_counter() - started) * 1000, 2), 'cached': False}
+
+    def _run_in_thread(self, func, *args):
+        try:
+            return func(*args)
+        finally:
+            # Setiap thread pool memakai koneksi database sendiri
+            connection.close()
+
+    def _map(self, func, items):
+        """Jalankan func untuk setiap item, paralel bila MAX_WORKERS > 1"""
+        items = list(items)
+        workers = min(self.config['MAX_WORKERS'], len(items))
+        if workers <= 1 or connection.in_atomic_block:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard') as executor:
+            return list(executor.map(lambda item: self._run_in_thread(func, item), items))
+
+    def _safe(self, func, name):
+        def wrapper(item):
+            try:
+                return func(item)
+            except Exception as e:
+                logger.error(f"Dashboard provider {name(item)} failed: {e}")
+                return e
+        return wrapper
+
+    def collect(self, names=None, use_cache=True):
+        """Gabungkan hasil semua provider metrik; return (data, timings, errors)"""
+        providers = [self._metrics[name] for name in (names or self._metrics) if name in self._metrics]
+        run = self._safe(lambda provider: self._run_metric(provider, use_cache), lambda provider: provider.name)
+        data, timings, errors = {}, {}, {}
+        for provider, outcome in zip(providers, self._map(run, providers)):
+            if isinstance(outcome, Exception):
+                errors[provider.name] = str(outcome)
+                continue
+            result, timing = outcome
+            timings[provider.name] = timing
+            for section, values in result.items():
+                if isinstance(values, dict):
+                    data.setdefault(section, {}).update(values)
+                else:
+                    data[section] = values
+        return data, timings, errors
+
+    def listings(self, names=None, **params):
+        """Ambil daftar data beberapa modul sekaligus; return (data, errors)"""
+        providers = [self._listings[name] for name in (names or self._listings) if name in self._listings]
+        run = self._safe(lambda provider: provider.fetch(**params), lambda provider: provider.name)
+        data, errors = {}, {}
+        for provider, outcome in zip(providers, self._map(run, providers)):
+            if isinstance(outcome, Exception):
+                errors[provider.name] = str(outcome)
+            else:
+                data[provider.name] = outcome
+        return data, errors
+
+    def clear_cache(self):
+        cache.delete_many([provider.cache_key() for provider in self._metrics.values()])
+
+
+registry = DashboardRegistry()
+register = registry.register
+register_listing = registry.register_listing
+
+
+def autodiscover():
+    autodiscover_modules('dashboard')
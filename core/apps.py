@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from .response_cache import connect_invalidation_signals
+        from .aggregator import autodiscover
+        from .search import autodiscover as autodiscover_search_indexes
+        from .media import autodiscover as autodiscover_image_variants
+        from .importer import autodiscover as autodiscover_importers
+        connect_invalidation_signals()
+        autodiscover()
+        autodiscover_search_indexes()
+        autodiscover_image_variants()
+        autodiscover_importers()
@@ -0,0 +1,325 @@
+import json
+import gc
+import math
+import time
+import tracemalloc
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, URLPattern, URLResolver, get_resolver, reverse
+from django.utils.html import format_html, format_html_join
+
+DEFAULTS = {
+    'BUDGET_FILE': 'benchmarks/budgets.json',      # relatif terhadap BASE_DIR, ikut di-commit
+    'REPORT_DIR': 'benchmarks/reports',
+    'SCALES': [1_000, 10_000],                      # jumlah penduduk dataset sintetis per putaran
+    'REPEAT': 20,                                   # request terukur per endpoint; < 20 membuat p95 = maksimum
+    'SEED': 0,
+    # Nama URL (pola fnmatch) yang tidak diukur: admin bawaan Django dan yang mengakhiri sesi
+    'EXCLUDE': ['admin:*', '*logout*'],
+    'PARAMS': {},                                   # nama url -> query string
+    'DEFAULT_BUDGET': {'max_queries': 50, 'p95_ms': 1000, 'peak_kb': 32768, 'max_query_growth': 0},
+    'HEADROOM': 2.0,                                # pengali latency/memori saat --update-budgets
+    'FLOOR': {'p95_ms': 50, 'peak_kb': 1024},       # batas bawah budget agar noise mesin tidak gagal
+}
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'BENCHMARK', {})}
+
+
+def project_path(value):
+    path = Path(value)
+    return path if path.is_absolute() else Path(settings.BASE_DIR) / path
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (nilai yang benar-benar terukur, bukan interpolasi)"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _walk(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            child = namespace
+            if pattern.namespace:
+                child = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            yield from _walk(pattern.url_patterns, child)
+        elif isinstance(pattern, URLPattern) and pattern.name and not pattern.pattern.regex.groups:
+            yield f'{namespace}:{pattern.name}' if namespace else pattern.name
+
+
+def discover(patterns=None):
+    """[(nama url, path)] untuk setiap URL bernama tanpa argumen, dikurangi EXCLUDE"""
+    options = config()
+    endpoints = {}
+    for name in _walk(get_resolver().url_patterns):
+        if name in endpoints or any(fnmatch(name, exclude) for exclude in options['EXCLUDE']):
+            continue
+        if patterns and not any(fnmatch(name, pattern) for pattern in patterns):
+            continue
+        try:
+            path = reverse(name)
+        except NoReverseMatch:
+            continue
+        params = options['PARAMS'].get(name)
+        endpoints[name] = f'{path}?{urlencode(params)}' if params else path
+    return sorted(endpoints.items())
+
+
+class EndpointBenchmark:
+    """Ukur latency, jumlah/waktu SQL dan memori puncak endpoint terhadap dataset sintetis beberapa ukuran
+
+    Setiap ukuran dataset dibuat dengan generator sintetis di dalam transaksi yang selalu di-rollback,
+    sehingga database yang dipakai tidak berubah. Request pertama (dengan tracemalloc dan pencatatan
+    query) menjadi pemanasan; latency diambil dari REPEAT request berikutnya tanpa instrumentasi.
+    """
+
+    def __init__(self, endpoints, repeat=None, seed=None, progress=None):
+        options = config()
+        self.endpoints = endpoints
+        self.repeat = repeat or options['REPEAT']
+        self.seed = options['SEED'] if seed is None else seed
+        self.progress = progress
+
+    @staticmethod
+    def _reset_caches():
+        # Yang diukur biaya menghitung respons, bukan cache hit
+        from references.autocomplete import resident_index
+        from .response_cache import DEPENDENCIES, invalidate
+
+        for namespace in DEPENDENCIES:
+            invalidate(namespace)
+        # Index picker hidup sepanjang proses; pembangunan ulang karena MAX_AGE habis di tengah run
+        # jangan sampai dibebankan ke endpoint yang kebetulan berikutnya
+        resident_index._ensure_built()
+
+    @staticmethod
+    def _consume(response):
+        if response.streaming:
+            return sum(len(chunk) for chunk in response.streaming_content)
+        return len(response.content)
+
+    def measure(self, client, name, path):
+        self._reset_caches()
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(path)
+                size = self._consume(response)
+                # Disalin di sini: request berikutnya memanggil reset_queries dan mengosongkan log
+                captured = list(queries.captured_queries)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        latencies = []
+        # Seperti timeit: jeda GC generasi tua setelah data sintetis dibuat tidak ikut terukur
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(self.repeat):
+                self._reset_caches()
+                started = time.perf_counter()
+                self._consume(client.get(path))
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            gc.enable()
+        return {
+            'path': path,
+            'status': response.status_code,
+            'size': size,
+            'queries': len(captured),
+            'sql_ms': round(sum(float(query['time']) for query in captured) * 1000, 2),
+            'peak_kb': round(peak / 1024),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+        }
+
+    def run(self, scales):
+        """{'scales': {penduduk: {nama url: hasil}}} untuk setiap ukuran dataset"""
+        from references.autocomplete import resident_index
+        from .datagen import GenerationContext, autodiscover, isolated_caches, run as generate
+        from .profiling import request_profiler
+
+        autodiscover()
+        results = {}
+        for residents in scales:
+            # Cache terpisah: sinyal data sintetis dan _reset_caches tidak menyentuh cache situs
+            with isolated_caches():
+                with transaction.atomic():
+                    # Dibuat/dinaikkan jadi superuser di dalam transaksi yang di-rollback
+                    user, _ = get_user_model().objects.get_or_create(
+                        username='benchmark', defaults={'email': 'benchmark@example.com'},
+                    )
+                    user.is_staff = user.is_superuser = user.is_active = True
+                    user.save()
+                    generate(GenerationContext(residents, seed=self.seed, user=user))
+                    # Halaman performa membaca buffer ini; tiap ukuran mulai dari buffer kosong
+                    request_profiler.clear()
+                    client = Client(raise_request_exception=False)
+                    client.force_login(user)
+                    measured = results[residents] = {}
+                    for name, path in self.endpoints:
+                        measured[name] = self.measure(client, name, path)
+                        if self.progress:
+                            self.progress(residents, name, measured[name])
+                    transaction.set_rollback(True)
+                # Index picker di memori proses masih berisi data yang sudah di-rollback
+                resident_index.invalidate()
+        return {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'repeat': self.repeat,
+            'seed': self.seed,
+            'database': connection.vendor,
+            'scales': results,
+        }
+
+
+def load_budgets(path=None):
+    path = project_path(path or config()['BUDGET_FILE'])
+    if not path.exists():
+        return {'version': 1, 'default': config()['DEFAULT_BUDGET'], 'endpoints': {}}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def check(report, budgets):
+    """[{'endpoint', 'scale', 'message'}] pelanggaran budget; pertumbuhan query antar ukuran = N+1
+
+    Endpoint di budgets['known_failures'] ({nama: alasan}) boleh 5xx; begitu sudah tidak error lagi
+    check() memintanya dihapus dari daftar supaya daftar itu tidak basi. Latency dan memori halaman
+    error tidak bermakna dan naik-turun, jadi untuk endpoint ini hanya jumlah query yang dicek.
+    """
+    default = {**config()['DEFAULT_BUDGET'], **budgets.get('default', {})}
+    known_failures = budgets.get('known_failures', {})
+    violations = []
+    scales = sorted(report['scales'], key=int)
+    names = sorted({name for scale in scales for name in report['scales'][scale]})
+    for name in names:
+        budget = {**default, **budgets.get('endpoints', {}).get(name, {})}
+        if budget.get('skip'):
+            continue
+        measured = [(scale, report['scales'][scale][name]) for scale in scales if name in report['scales'][scale]]
+        for scale, result in measured:
+            def violation(message):
+                violations.append({'endpoint': name, 'scale': int(scale), 'message': message})
+
+            if name in known_failures:
+                if result['status'] < 500:
+                    violation(f"status {result['status']}, remove from known_failures")
+            elif result['status'] >= 500:
+                violation(f"server error {result['status']}")
+            elif 'status' in budget and result['status'] != budget['status']:
+                violation(f"status {result['status']}, expected {budget['status']}")
+            if result['queries'] > budget['max_queries']:
+                violation(f"{result['queries']} queries > {budget['max_queries']}")
+            if name in known_failures:
+                continue
+            if result['p95_ms'] > budget['p95_ms']:
+                violation(f"p95 {result['p95_ms']} ms > {budget['p95_ms']} ms")
+            if result['peak_kb'] > budget['peak_kb']:
+                violation(f"peak memory {result['peak_kb']} KB > {budget['peak_kb']} KB")
+        if len(measured) > 1:
+            growth = measured[-1][1]['queries'] - measured[0][1]['queries']
+            if growth > budget['max_query_growth']:
+                violations.append({
+                    'endpoint': name, 'scale': int(measured[-1][0]),
+                    'message': f"queries grow with data: {measured[0][1]['queries']} -> {measured[-1][1]['queries']} "
+                               f"(allowed +{budget['max_query_growth']})",
+                })
+    return violations
+
+
+def budgets_from(report, headroom=None, known_failures=None):
+    """Budget baru dari hasil ukur: jumlah query persis, latency/memori dikali HEADROOM
+
+    Status 5xx tidak pernah dicatat sebagai status yang diharapkan; check() melaporkannya kecuali
+    endpoint tercantum di known_failures. Hanya entri known_failures yang masih 5xx yang dibawa.
+    """
+    options = config()
+    headroom = headroom or options['HEADROOM']
+    floor = options['FLOOR']
+    scales = sorted(report['scales'], key=int)
+    endpoints = {}
+    for name in sorted({name for scale in scales for name in report['scales'][scale]}):
+        measured = [report['scales'][scale][name] for scale in scales if name in report['scales'][scale]]
+        endpoints[name] = {
+            'max_queries': max(result['queries'] for result in measured),
+            'max_query_growth': max(0, measured[-1]['queries'] - measured[0]['queries']),
+            'p95_ms': max(floor['p95_ms'], math.ceil(max(result['p95_ms'] for result in measured) * headroom)),
+            'peak_kb': max(floor['peak_kb'], math.ceil(max(result['peak_kb'] for result in measured) * headroom)),
+        }
+        if measured[-1]['status'] < 500:
+            endpoints[name]['status'] = measured[-1]['status']
+    failing = {
+        name for scale in scales for name, result in report['scales'][scale].items() if result['status'] >= 500
+    }
+    return {
+        'version': 1,
+        'scales': [int(scale) for scale in scales],
+        'default': options['DEFAULT_BUDGET'],
+        'endpoints': endpoints,
+        'known_failures': {
+            name: reason for name, reason in (known_failures or {}).items() if name in failing
+        },
+    }
+
+
+def write_budgets(budgets, path=None):
+    path = project_path(path or config()['BUDGET_FILE'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump(budgets, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+    return path
+
+
+def render_html(report, violations):
+    failed = {(violation['endpoint'], violation['scale']) for violation in violations}
+    rows = []
+    for scale in sorted(report['scales'], key=int):
+        for name, result in sorted(report['scales'][scale].items()):
+            rows.append((
+                'fail' if (name, int(scale)) in failed else '', f'{int(scale):,}', name, result['status'],
+                result['queries'], result['sql_ms'], result['p50_ms'], result['p95_ms'], result['peak_kb'],
+                f"{result['size']:,}",
+            ))
+    return format_html(
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Endpoint benchmark {}</title><style>'
+        'body{{font-family:sans-serif;font-size:13px}}table{{border-collapse:collapse}}'
+        'td,th{{border:1px solid #ccc;padding:3px 6px;text-align:right}}td:nth-child(2){{text-align:left}}'
+        'tr.fail{{background:#fdd}}</style></head><body><h1>Endpoint benchmark {}</h1>'
+        '<p>{} violation(s), {} request(s) per endpoint, database {}</p><ul>{}</ul>'
+        '<table><tr><th>Residents</th><th>Endpoint</th><th>Status</th><th>Queries</th><th>SQL ms</th>'
+        '<th>p50 ms</th><th>p95 ms</th><th>Peak KB</th><th>Bytes</th></tr>{}</table></body></html>',
+        report['created_at'], report['created_at'], len(violations), report['repeat'], report['database'],
+        format_html_join('', '<li>{} @ {}: {}</li>', (
+            (violation['endpoint'], f"{violation['scale']:,}", violation['message']) for violation in violations
+        )),
+        format_html_join('', '<tr class="{}"><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td>'
+                             '<td>{}</td><td>{}</td><td>{}</td></tr>', rows),
+    )
+
+
+def write_reports(report, violations, directory=None):
+    """Tulis laporan JSON dan HTML; return (path json, path html)"""
+    directory = project_path(directory or config()['REPORT_DIR'])
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = report['created_at'].replace(':', '').replace('-', '')
+    json_path = directory / f'benchmark-{stamp}.json'
+    html_path = directory / f'benchmark-{stamp}.html'
+    with open(json_path, 'w') as handle:
+        json.dump({**report, 'violations': violations}, handle, indent=2, default=str)
+    html_path.write_text(render_html(report, violations), encoding='utf-8')
+    return json_path, html_path
@@ -0,0 +1,36 @@
+from django.db.models import Count, Q
+
+from .aggregator import register, week_ago
+from .models import CustomUser, UMKMBusiness, ModuleSettings
+
+
+@register('users')
+def user_metrics():
+    stats = CustomUser.objects.aggregate(
+        total_users=Count('pk'),
+        active_users=Count('pk', filter=Q(is_active=True)),
+        new_users_this_week=Count('pk', filter=Q(date_joined__gte=week_ago())),
+    )
+    return {
+        'statistics': {'total_users': stats['total_users'], 'active_users': stats['active_users']},
+        'recent_activities': {'new_users_this_week': stats['new_users_this_week']},
+    }
+
+
+@register('umkm')
+def umkm_metrics():
+    return {'statistics': UMKMBusiness.objects.aggregate(total_umkm=Count('pk'))}
+
+
+@register('modules')
+def module_metrics():
+    modules = list(ModuleSettings.objects.annotate(
+        endpoints_count=Count('api_endpoints', filter=Q(api_endpoints__is_active=True))
+    ).order_by('menu_order').values('module_name', 'display_name', 'is_active', 'api_enabled', 'endpoints_count'))
+    return {
+        'statistics': {
+            'active_modules': sum(1 for module in modules if module['is_active']),
+            'total_api_endpoints': sum(module['endpoints_count'] for module in modules),
+        },
+        'modules_status': modules,
+    }
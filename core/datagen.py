@@ -0,0 +1,170 @@
+import logging
+import random
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 5000,                 # baris per bulk_create/transaksi
+    'SCALES': {'1k': 1_000, '100k': 100_000, '1m': 1_000_000},   # jumlah penduduk per skala
+    'REGION_CODE': '110201',            # 6 digit awal NIK/No. KK data sintetis
+}
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'SYNTHETIC_DATA', {})}
+
+
+@contextmanager
+def isolated_caches():
+    """Ganti semua alias cache dengan locmem baru selama blok berjalan
+
+    Data sintetis di transaksi yang di-rollback tetap memicu sinyal invalidasi dan mengisi cache;
+    dengan ini versi namespace dan entri cache yang dipakai situs tidak tersentuh.
+    """
+    location = f'isolated-{uuid.uuid4().hex}'
+    with override_settings(CACHES={
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'{location}-{alias}'}
+        for alias in settings.CACHES
+    }):
+        try:
+            yield
+        finally:
+            for alias in settings.CACHES:
+                caches[alias].clear()
+
+
+def years_ago(today, years, days=0):
+    """Tanggal `years` tahun (plus `days` hari) sebelum today; 29 Februari digeser ke 28"""
+    try:
+        anchor = today.replace(year=today.year - years)
+    except ValueError:
+        anchor = today.replace(year=today.year - years, day=28)
+    return anchor - timedelta(days=days)
+
+
+def weighted(rng, choices):
+    """Pilih satu nilai dari [(nilai, bobot)]"""
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+class GenerationContext:
+    """State satu run generator: seed, skala, pengguna pencatat dan penulisan batch
+
+    Setiap generator memakai random.Random sendiri yang diturunkan dari seed dan namanya, sehingga hasil
+    satu generator tidak berubah bila generator lain dilewati (--only).
+    """
+
+    def __init__(self, residents, seed=0, user=None, batch_size=None, today=None, progress=None):
+        self.residents = residents
+        self.seed = seed
+        self.user = user
+        self.batch_size = batch_size or config()['BATCH_SIZE']
+        self.today = today or date.today()
+        self.progress = progress
+        self.counts = defaultdict(int)
+
+    def random(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def scaled(self, per_thousand, minimum=0):
+        """Jumlah baris sebanding jumlah penduduk"""
+        return max(minimum, round(self.residents * per_thousand / 1000))
+
+    def create(self, model, objects):
+        """Satu bulk_create (pk terisi di SQLite/PostgreSQL); tidak ada signal post_save yang dikirim"""
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        if created:
+            self.counts[model._meta.label] += len(created)
+            if self.progress:
+                self.progress(model._meta.label, self.counts[model._meta.label])
+        return created
+
+    def insert(self, model, objects):
+        """Tulis iterable objek per batch, satu transaksi per batch; return jumlah baris"""
+        total = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                with transaction.atomic():
+                    total += len(self.create(model, batch))
+                batch = []
+        if batch:
+            with transaction.atomic():
+                total += len(self.create(model, batch))
+        return total
+
+
+class DataGenerator:
+    """Dasar generator data sintetis (didaftarkan di <app>/datagen.py)
+
+    generate() menulis baris dengan bulk_create sehingga signal model tidak berjalan; data turunan yang
+    biasanya dijaga signal (rekap, index pencarian, cache) dibangun ulang sekali di finish().
+    """
+
+    name = ''
+    order = 100             # generator dengan order kecil berjalan lebih dulu (penduduk sebelum posyandu)
+    search_models = ()      # model yang index pencariannya dibangun ulang setelah generate
+
+    def generate(self, context):
+        raise NotImplementedError
+
+    def finish(self, context):
+        """Bangun ulang data turunan setelah semua generator selesai"""
+
+
+generators = {}
+
+
+def register(name, generator_class):
+    generator_class.name = name
+    generators[name] = generator_class
+    return generator_class
+
+
+def autodiscover():
+    autodiscover_modules('datagen')
+
+
+def run(context, names=None):
+    """Jalankan generator terpilih berurutan; return {nama: detik}"""
+    from .search import search_index
+
+    selected = sorted(
+        (generators[name]() for name in (names or generators)),
+        key=lambda generator: generator.order,
+    )
+    timings = {}
+    for generator in selected:
+        started = time.perf_counter()
+        generator.generate(context)
+        timings[generator.name] = time.perf_counter() - started
+
+    search_models = set()
+    for generator in selected:
+        started = time.perf_counter()
+        generator.finish(context)
+        timings[generator.name] += time.perf_counter() - started
+        search_models.update(generator.search_models)
+
+    doc_types = [search_index.document_for(model).doc_type for model in search_models
+                 if search_index.document_for(model)]
+    if doc_types and search_index.available():
+        try:
+            search_index.rebuild(doc_types)
+        except Exception as e:
+            # Index bisa dibangun ulang dengan rebuild_search_index
+            logger.error(f"Search index rebuild after synthetic data failed: {e}")
+    return timings
@@ -0,0 +1,211 @@
+import csv
+import io
+import logging
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 1000,     # baris per transaksi bulk_create
+    'MAX_ERRORS': 500,      # detail error per baris yang disimpan di hasil (jumlah tetap dihitung)
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y')
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'BULK_IMPORT', {})}
+
+
+def normalize_header(value):
+    """'No. KK' -> 'no_kk', 'Tanggal Lahir' -> 'tanggal_lahir'"""
+    return '_'.join(str(value or '').strip().lower().replace('.', ' ').replace('/', ' ').split())
+
+
+def clean_value(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def parse_date(value):
+    """Tanggal dari sel Excel (date/datetime) atau teks dengan format umum Indonesia"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value), fmt).date()
+        except ValueError:
+            continue
+    raise ValidationError(f'Format tanggal tidak dikenal: {value}')
+
+
+def error_message(error):
+    if isinstance(error, ValidationError):
+        if hasattr(error, 'error_dict'):
+            return '; '.join(f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items())
+        return '; '.join(error.messages)
+    return str(error)
+
+
+def choice_lookup(choices):
+    """{nilai/label huruf kecil: nilai} agar kolom pilihan boleh diisi kode maupun label"""
+    lookup = {}
+    for value, label in choices:
+        lookup[str(value).lower()] = value
+        lookup[str(label).lower()] = value
+    return lookup
+
+
+def read_rows(file_obj, name=None):
+    """Baca CSV/XLSX baris demi baris tanpa memuat seluruh file -> (nomor baris, {header: nilai})"""
+    name = (name or getattr(file_obj, 'name', '') or '').lower()
+    if name.endswith('.csv'):
+        rows = _csv_rows(file_obj)
+    elif name.endswith(('.xlsx', '.xlsm')):
+        rows = _xlsx_rows(file_obj)
+    else:
+        raise ValueError('Format file tidak didukung, gunakan CSV atau XLSX')
+
+    headers = None
+    for row_number, values in enumerate(rows, start=1):
+        if headers is None:
+            headers = [normalize_header(value) for value in values]
+            continue
+        values = [clean_value(value) for value in values]
+        if not any(value is not None for value in values):
+            continue
+        yield row_number, dict(zip(headers, values))
+
+
+def _csv_rows(file_obj):
+    raw = getattr(file_obj, 'file', file_obj)
+    if hasattr(raw, 'seek'):
+        raw.seek(0)
+    text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    finally:
+        # Jangan ikut menutup file upload milik Django
+        text.detach()
+
+
+def _xlsx_rows(file_obj):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(getattr(file_obj, 'file', file_obj), read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+class ImportResult:
+    """Ringkasan import: jumlah baris, tersimpan dan error per baris"""
+
+    def __init__(self, max_errors=None):
+        self.total = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.max_errors = max_errors or config()['MAX_ERRORS']
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_number, 'error': message})
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+class BulkImporter:
+    """Dasar importer massal (didaftarkan di <app>/importers.py)
+
+    Baris dibaca streaming, divalidasi per blok terhadap tabel lookup yang dimuat sekali di prepare(),
+    lalu ditulis dengan bulk_create satu transaksi per blok. Subclass mengisi `model` dan build();
+    efek samping yang biasanya dikerjakan signal post_save dijalankan di after_create()/finish().
+    """
+
+    model = None
+    label = ''
+
+    def __init__(self, user=None, batch_size=None, progress=None):
+        self.user = user
+        self.batch_size = batch_size or config()['BATCH_SIZE']
+        self.progress = progress
+
+    def prepare(self):
+        """Muat tabel lookup ke dict sebelum baris pertama dibaca"""
+
+    def build(self, values):
+        """Validasi satu baris dan return instance (belum disimpan); error -> ValidationError/ValueError"""
+        raise NotImplementedError
+
+    def before_create(self, objects):
+        """Lengkapi satu blok sebelum transaksi (mis. membuat kategori/tag yang belum ada)"""
+
+    def after_create(self, objects):
+        """Dijalankan dalam transaksi blok setelah bulk_create (relasi M2M, rekap, index)"""
+
+    def finish(self, result):
+        """Dijalankan sekali setelah semua blok"""
+
+    def run(self, file_obj, name=None):
+        result = ImportResult()
+        self.prepare()
+        chunk = []
+        for row_number, values in read_rows(file_obj, name):
+            result.total += 1
+            try:
+                chunk.append((row_number, self.build(values)))
+            except (ValidationError, ValueError) as e:
+                result.add_error(row_number, error_message(e))
+            if len(chunk) >= self.batch_size:
+                self._write(chunk, result)
+                chunk = []
+        if chunk:
+            self._write(chunk, result)
+        self.finish(result)
+        return result
+
+    def _write(self, chunk, result):
+        objects = [obj for _, obj in chunk]
+        try:
+            self.before_create(objects)
+            with transaction.atomic():
+                created = self.model.objects.bulk_create(objects)
+                self.after_create(created)
+        except Exception as e:
+            logger.error(f"Bulk import {self.label or self.model.__name__} failed for rows {chunk[0][0]}-{chunk[-1][0]}: {e}")
+            for row_number, _ in chunk:
+                result.add_error(row_number, f'Gagal disimpan: {e}')
+        else:
+            result.created += len(created)
+        if self.progress:
+            self.progress(result)
+
+
+importers = {}
+
+
+def register(name, importer_class):
+    importers[name] = importer_class
+    return importer_class
+
+
+def autodiscover():
+    autodiscover_modules('importers')
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from core import benchmark
+from core.datagen import config as datagen_config
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every registered GET endpoint against synthetic datasets and compare with budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            action='append',
+            dest='scales',
+            help='Dataset size in residents, number or preset like 1k (can be repeated)',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help='Only benchmark URL names matching this pattern (can be repeated), e.g. "posyandu:*"',
+        )
+        parser.add_argument('--repeat', type=int, help='Timed requests per endpoint')
+        parser.add_argument('--seed', type=int, help='Seed of the synthetic datasets')
+        parser.add_argument('--budgets', help='Budget file (default: BENCHMARK["BUDGET_FILE"])')
+        parser.add_argument('--report-dir', help='Directory for the JSON and HTML reports')
+        parser.add_argument(
+            '--update-budgets',
+            action='store_true',
+            help='Write the measurements as the new budgets instead of checking them',
+        )
+        parser.add_argument('--no-fail', action='store_true', help='Report violations without a failing exit code')
+
+    def handle(self, *args, **options):
+        scales = [self._scale(value) for value in options['scales'] or []] or benchmark.config()['SCALES']
+        endpoints = benchmark.discover(options['endpoints'])
+        if not endpoints:
+            raise CommandError('No endpoints match')
+        self.stdout.write(f'Benchmarking {len(endpoints)} endpoints at {", ".join(f"{scale:,}" for scale in scales)} residents...')
+
+        runner = benchmark.EndpointBenchmark(
+            endpoints, repeat=options['repeat'], seed=options['seed'], progress=self._progress,
+        )
+        report = runner.run(sorted(scales))
+
+        if options['update_budgets']:
+            known_failures = benchmark.load_budgets(options['budgets']).get('known_failures', {})
+            budgets = benchmark.budgets_from(report, known_failures=known_failures)
+            path = benchmark.write_budgets(budgets, options['budgets'])
+            self.stdout.write(self.style.SUCCESS(f'Budgets for {len(endpoints)} endpoints written to {path}'))
+            # Budget baru selalu lolos kecuali error server baru, yang harus diperbaiki atau
+            # ditinjau lalu dicatat di known_failures
+            violations = benchmark.check(report, budgets)
+        else:
+            violations = benchmark.check(report, benchmark.load_budgets(options['budgets']))
+
+        json_path, html_path = benchmark.write_reports(report, violations, options['report_dir'])
+        self.stdout.write(f'Reports: {json_path}, {html_path}')
+        for violation in violations:
+            self.stdout.write(self.style.ERROR(
+                f"  {violation['endpoint']} @ {violation['scale']:,}: {violation['message']}"
+            ))
+        if violations and not options['no_fail']:
+            raise CommandError(f'{len(violations)} benchmark budget violations')
+        if not violations:
+            self.stdout.write(self.style.SUCCESS('All endpoints within budget'))
+
+    @staticmethod
+    def _scale(value):
+        scales = datagen_config()['SCALES']
+        if value in scales:
+            return scales[value]
+        try:
+            return int(value)
+        except ValueError:
+            raise CommandError(f'Unknown scale {value!r}, use a number or one of {", ".join(scales)}')
+
+    def _progress(self, residents, name, result):
+        style = self.style.WARNING if result['status'] >= 400 else str
+        self.stdout.write(style(
+            f"  [{residents:,}] {name} {result['status']} {result['queries']}q "
+            f"p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms peak {result['peak_kb']}KB"
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from core.media import media_pipeline
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive image variants for every registered image field that has none yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild variants of every registered image, not only missing ones',
+        )
+
+    def handle(self, *args, **options):
+        if options['force']:
+            rows = [
+                (model, field, name)
+                for model, fields in media_pipeline.fields.items()
+                for field in fields
+                for name in model._default_manager.exclude(**{field: ''}).exclude(**{field: None}).values_list(field, flat=True)
+            ]
+        else:
+            rows = media_pipeline.pending()
+
+        built = failed = 0
+        for model, field, name in rows:
+            try:
+                asset = media_pipeline.process(name, force=options['force'])
+            except Exception as e:
+                self.stderr.write(f'{model.__name__}.{field} {name}: {e}')
+                failed += 1
+                continue
+            if asset.status == 'ready':
+                built += 1
+            else:
+                self.stderr.write(f'{model.__name__}.{field} {name}: {asset.error}')
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(f'{built} images processed, {failed} failed'))
@@ -0,0 +1,46 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from core.importer import importers
+
+
+class Command(BaseCommand):
+    help = 'Bulk import a CSV/XLSX file with a registered importer (news, penduduk, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(importers), help='Registered importer name')
+        parser.add_argument('path', help='CSV or XLSX file')
+        parser.add_argument('--user', help='Username recorded as author/creator')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['user']} not found")
+
+        started = time.perf_counter()
+
+        def progress(result):
+            self.stdout.write(
+                f'  {result.total} rows read, {result.created} created, {result.error_count} errors '
+                f'({time.perf_counter() - started:.1f}s)'
+            )
+
+        importer = importers[options['kind']](user=user, batch_size=options['batch_size'], progress=progress)
+        try:
+            with open(options['path'], 'rb') as handle:
+                result = importer.run(handle, options['path'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stderr.write(f"  Baris {error['row']}: {error['error']}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'  ... dan {result.error_count - len(result.errors)} error lainnya')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} of {result.total} rows in {time.perf_counter() - started:.2f}s'
+        ))
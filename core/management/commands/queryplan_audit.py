@@ -0,0 +1,77 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from core.queryplan import QueryPlanAuditor, config
+
+
+class Command(BaseCommand):
+    help = 'Replay the main API endpoints against synthetic data, EXPLAIN every query and report full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help='Only audit this URL name (can be repeated), e.g. references:penduduk_list',
+        )
+        parser.add_argument(
+            '--residents',
+            type=int,
+            help='Synthetic residents seeded inside the rolled-back transaction (0 = audit the existing data)',
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the plan of every statement')
+        parser.add_argument('--json', dest='json_path', help='Write the full report to this file')
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Exit with an error when a full scan is found (for CI)',
+        )
+
+    def handle(self, *args, **options):
+        endpoints = config()['ENDPOINTS']
+        if options['endpoints']:
+            endpoints = [(name, params) for name, params in endpoints if name in options['endpoints']]
+            known = {name for name, _ in endpoints}
+            endpoints += [(name, {}) for name in options['endpoints'] if name not in known]
+
+        try:
+            auditor = QueryPlanAuditor(endpoints)
+            results = auditor.run(residents=options['residents'])
+        except NotImplementedError as e:
+            raise CommandError(str(e))
+
+        for result in results:
+            style = self.style.WARNING if result['scans'] else self.style.SUCCESS
+            self.stdout.write(style(
+                f"{result['name']} [{result['status']}] {result['queries']} queries, "
+                f"{len(result['scans'])} with full scans"
+            ))
+            for statement in result['statements']:
+                if statement.get('error'):
+                    self.stderr.write(f"  EXPLAIN failed: {statement['error']}")
+                if options['verbose_plans'] or statement['scans']:
+                    self.stdout.write(f"  {statement['sql'][:200]}")
+                    for detail in statement['plan']:
+                        self.stdout.write(f'    {detail}')
+
+        summary = auditor.summary(results)
+        if summary:
+            self.stdout.write(self.style.WARNING(f'\n{len(summary)} distinct full scans:'))
+            for (table, sql), names in sorted(summary.items()):
+                self.stdout.write(f"  {table}: {', '.join(names)}")
+                self.stdout.write(f'    {sql[:200]}')
+        else:
+            self.stdout.write(self.style.SUCCESS('\nNo full table scans found'))
+
+        boolean_indexes = auditor.boolean_prefix_indexes()
+        for label, name, fields in boolean_indexes:
+            self.stdout.write(self.style.WARNING(
+                f"Index {name} on {label} {fields} starts with a boolean column and is not used for boolean filters"
+            ))
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump(results, handle, indent=2, default=str)
+
+        if (summary or boolean_indexes) and options['fail_on_scan']:
+            raise CommandError(f'{len(summary)} full table scans, {len(boolean_indexes)} boolean-prefix indexes found')
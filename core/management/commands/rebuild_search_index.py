@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from core.search import search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the global FTS5 search index from all registered models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type',
+            action='append',
+            dest='doc_types',
+            choices=search_index.doc_types,
+            help='Only rebuild this document type (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            counts = search_index.rebuild(options['doc_types'])
+        except Exception as e:
+            raise CommandError(f'Failed to rebuild search index: {e}')
+
+        for doc_type, count in counts.items():
+            self.stdout.write(f'  {doc_type}: {count}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {sum(counts.values())} documents in {time.perf_counter() - started:.2f}s')
+        )
@@ -0,0 +1,233 @@
+import base64
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connection, transaction
+from django.db.models.signals import post_save
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WIDTHS': (320, 640, 1024, 1600),
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': {'webp': 80, 'jpeg': 82},
+    'PLACEHOLDER_WIDTH': 16,
+    'DIRECTORY': 'derivatives',
+    'MAX_WORKERS': 2,       # thread pemroses di luar request; 0 = proses langsung (sinkron)
+}
+
+CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+class MediaPipeline:
+    """Pipeline turunan gambar responsif (didaftarkan di <app>/image_variants.py)
+
+    Setiap upload di-hash (sha256); turunan disimpan per hash sehingga upload ulang berkas yang sama
+    tidak diproses atau disimpan dua kali.
+    """
+
+    def __init__(self):
+        self._fields = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        self._digest_locks = {}
+
+    @property
+    def config(self):
+        return {**DEFAULTS, **getattr(settings, 'MEDIA_PIPELINE', {})}
+
+    def register(self, model, *fields):
+        self._fields.setdefault(model, set()).update(fields)
+        post_save.connect(self._on_save, sender=model, dispatch_uid=f'media_pipeline_{model._meta.label_lower}')
+
+    @property
+    def fields(self):
+        return {model: sorted(fields) for model, fields in self._fields.items()}
+
+    # ----- pemrosesan -----
+
+    def _on_save(self, sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        names = [getattr(instance, field).name for field in self._fields.get(sender, ())]
+        names = [name for name in names if name]
+        if names:
+            transaction.on_commit(lambda: self.enqueue(names))
+
+    def enqueue(self, names):
+        """Proses berkas di thread latar (atau langsung bila MAX_WORKERS = 0)"""
+        workers = self.config['MAX_WORKERS']
+        if not workers:
+            for name in names:
+                self._safe_process(name)
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='media')
+        for name in names:
+            self._executor.submit(self._run_in_thread, name)
+
+    def _run_in_thread(self, name):
+        try:
+            self._safe_process(name)
+        finally:
+            # Setiap thread pool memakai koneksi database sendiri
+            connection.close()
+
+    def _safe_process(self, name):
+        try:
+            return self.process(name)
+        except Exception as e:
+            logger.error(f"Media pipeline failed for {name}: {e}")
+
+    def process(self, name, force=False):
+        """Pastikan berkas punya aset turunan; return MediaAsset"""
+        from .models import MediaAsset, MediaFile
+
+        if not force:
+            existing = MediaFile.objects.select_related('asset').filter(path=name).first()
+            if existing is not None:
+                return existing.asset
+        with default_storage.open(name, 'rb') as handle:
+            data = handle.read()
+        digest = hashlib.sha256(data).hexdigest()
+        with self._digest_lock(digest):
+            asset = MediaAsset.objects.filter(sha256=digest).first()
+            if asset is None or force or asset.status != 'ready':
+                asset = self._build_asset(digest, data, asset)
+        MediaFile.objects.update_or_create(path=name, defaults={'asset': asset})
+        return asset
+
+    def _digest_lock(self, digest):
+        """Lock per isi berkas agar upload kembar yang diproses bersamaan tidak dibangun dua kali"""
+        with self._lock:
+            return self._digest_locks.setdefault(digest, threading.Lock())
+
+    def _build_asset(self, digest, data, asset=None):
+        from PIL import Image, ImageOps
+        from .models import MediaAsset
+
+        asset = asset or MediaAsset(sha256=digest)
+        try:
+            with Image.open(io.BytesIO(data)) as source:
+                image = ImageOps.exif_transpose(source)
+                image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+            asset.width, asset.height = image.size
+            asset.variants = self._write_variants(digest, image)
+            asset.placeholder = self._placeholder(image)
+            asset.status, asset.error = 'ready', ''
+        except Exception as e:
+            asset.status, asset.error = 'failed', str(e)
+        try:
+            with transaction.atomic():
+                asset.save()
+        except IntegrityError:
+            # Proses lain sudah menyimpan aset untuk isi yang sama
+            return MediaAsset.objects.get(sha256=digest)
+        return asset
+
+    def _widths(self, original_width):
+        """Lebar turunan yang lebih kecil dari asli, ditambah lebar asli bila di bawah lebar terbesar"""
+        widths = [width for width in self.config['WIDTHS'] if width < original_width]
+        if original_width <= max(self.config['WIDTHS']):
+            widths.append(original_width)
+        return widths or [max(self.config['WIDTHS'])]
+
+    def _write_variants(self, digest, image):
+        from PIL import Image
+
+        config = self.config
+        variants = {}
+        for width in self._widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in config['FORMATS']:
+                path = f"{config['DIRECTORY']}/{digest[:2]}/{digest}/{width}.{EXTENSIONS[fmt]}"
+                if not default_storage.exists(path):
+                    output = resized.convert('RGB') if fmt == 'jpeg' else resized
+                    buffer = io.BytesIO()
+                    output.save(buffer, fmt.upper(), quality=config['QUALITY'].get(fmt, 80), optimize=True)
+                    default_storage.save(path, ContentFile(buffer.getvalue()))
+                variants.setdefault(fmt, {})[str(width)] = path
+        return variants
+
+    def _placeholder(self, image):
+        from PIL import ImageFilter
+
+        width = self.config['PLACEHOLDER_WIDTH']
+        height = max(1, round(image.height * width / image.width))
+        small = image.convert('RGB').resize((width, height)).filter(ImageFilter.GaussianBlur(1))
+        buffer = io.BytesIO()
+        small.save(buffer, 'JPEG', quality=40)
+        return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+    def pending(self):
+        """[(model, field, path)] berkas terdaftar yang belum punya aset"""
+        from .models import MediaFile
+
+        rows = []
+        for model, fields in self._fields.items():
+            for field in sorted(fields):
+                names = model._default_manager.exclude(**{field: ''}).exclude(**{field: None}).values_list(field, flat=True)
+                rows.extend((model, field, name) for name in names)
+        done = set(MediaFile.objects.values_list('path', flat=True))
+        return [row for row in rows if row[2] not in done]
+
+    # ----- serializer -----
+
+    def lookup(self, files):
+        """Muat aset untuk banyak berkas sekaligus (satu query); return {path: MediaAsset}"""
+        from .models import MediaFile
+
+        names = {getattr(file, 'name', file) for file in files}
+        names.discard('')
+        names.discard(None)
+        if not names:
+            return {}
+        return {
+            item.path: item.asset
+            for item in MediaFile.objects.select_related('asset').filter(path__in=names, asset__status='ready')
+        }
+
+    def payload(self, file, assets=None):
+        """Data gambar siap srcset: url asli, dimensi, placeholder dan srcset per format
+
+        `assets` hasil lookup() untuk satu halaman data; tanpa itu dilakukan satu query.
+        """
+        name = getattr(file, 'name', file)
+        if not name:
+            return None
+        asset = (assets if assets is not None else self.lookup([name])).get(name)
+        data = {'url': default_storage.url(name)}
+        if asset is None:
+            return data
+        data.update({
+            'width': asset.width,
+            'height': asset.height,
+            'placeholder': asset.placeholder,
+            'srcset': {
+                fmt: ', '.join(
+                    f'{default_storage.url(path)} {width}w'
+                    for width, path in sorted(paths.items(), key=lambda item: int(item[0]))
+                )
+                for fmt, paths in asset.variants.items()
+            },
+            'type': {fmt: CONTENT_TYPES[fmt] for fmt in asset.variants},
+        })
+        return data
+
+
+media_pipeline = MediaPipeline()
+register = media_pipeline.register
+
+
+def autodiscover():
+    autodiscover_modules('image_variants')
@@ -231,3 +231,41 @@ class Message(models.Model):
     
     def __str__(self):
         return f"{self.name} - {self.subject}"
+
+
+class MediaAsset(models.Model):
+    """Turunan gambar responsif per isi berkas (sha256), dipakai bersama oleh semua upload yang sama"""
+    STATUS_CHOICES = [
+        ('ready', 'Siap'),
+        ('failed', 'Gagal'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    placeholder = models.TextField(blank=True)   # data URI blur kecil
+    variants = models.JSONField(default=dict, blank=True)   # {format: {lebar: path storage}}
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ready')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Aset Media'
+        verbose_name_plural = 'Aset Media'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.width}x{self.height})"
+
+
+class MediaFile(models.Model):
+    """Berkas upload (path storage) yang sudah diproses, menunjuk ke aset isinya"""
+    path = models.CharField(max_length=255, unique=True)
+    asset = models.ForeignKey(MediaAsset, on_delete=models.CASCADE, related_name='files')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Berkas Media'
+        verbose_name_plural = 'Berkas Media'
+
+    def __str__(self):
+        return self.path
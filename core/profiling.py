@@ -0,0 +1,178 @@
+import cProfile
+import heapq
+import io
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 0.05,            # fraksi request yang diukur
+    'BUFFER_SIZE': 5000,            # sampel terakhir per proses (ring buffer)
+    'SLOW_QUERIES': 5,              # query terlambat yang disimpan per request
+    'SQL_MAX_LENGTH': 500,
+    'PROFILE_RATE': 0.0,            # fraksi request terukur yang dijalankan di bawah cProfile
+    'PROFILE_THRESHOLD_MS': 1000,   # hasil cProfile hanya disimpan bila request selambat ini
+    'PROFILE_BUFFER_SIZE': 20,
+    'PROFILE_LINES': 40,
+    'EXCLUDE_PATHS': ['/static/', '/media/', '/favicon.ico'],
+}
+
+
+class QueryRecorder:
+    """execute_wrapper: jumlah dan total waktu query, plus N query terlambat"""
+
+    def __init__(self, keep, max_length):
+        self.keep = keep
+        self.max_length = max_length
+        self.count = 0
+        self.total_ms = 0.0
+        self._slowest = []          # min-heap (ms, urutan, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += elapsed
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, (elapsed, self.count, sql))
+            elif self._slowest and elapsed > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (elapsed, self.count, sql))
+
+    @property
+    def slowest(self):
+        return [
+            {'ms': round(elapsed, 2), 'sql': sql[:self.max_length]}
+            for elapsed, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+
+class RequestProfiler:
+    """Ring buffer sampel request dan hasil cProfile di memori proses
+
+    Setiap worker menyimpan buffernya sendiri; halaman performa hanya menampilkan proses yang melayaninya.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffers = {'samples': deque(), 'profiles': deque()}
+
+    @property
+    def config(self):
+        return {**DEFAULTS, **getattr(settings, 'REQUEST_PROFILING', {})}
+
+    def _append(self, name, item, size):
+        with self._lock:
+            if self._buffers[name].maxlen != size:
+                self._buffers[name] = deque(self._buffers[name], maxlen=size)
+            self._buffers[name].append(item)
+
+    def record(self, sample):
+        self._append('samples', sample, self.config['BUFFER_SIZE'])
+
+    def record_profile(self, sample):
+        self._append('profiles', sample, self.config['PROFILE_BUFFER_SIZE'])
+
+    def samples(self):
+        with self._lock:
+            return list(self._buffers['samples'])
+
+    def profiles(self):
+        """Hasil cProfile, terbaru dulu"""
+        with self._lock:
+            return list(reversed(self._buffers['profiles']))
+
+    def clear(self):
+        with self._lock:
+            for buffer in self._buffers.values():
+                buffer.clear()
+
+    def summary(self):
+        """Statistik per view, terurut dari p95 terbesar"""
+        from .benchmark import percentile
+
+        views = {}
+        for sample in self.samples():
+            views.setdefault(sample['view'], []).append(sample)
+        rows = []
+        for view, samples in views.items():
+            durations = [sample['duration_ms'] for sample in samples]
+            rows.append({
+                'view': view,
+                'count': len(samples),
+                'p50_ms': percentile(durations, 50),
+                'p95_ms': percentile(durations, 95),
+                'p99_ms': percentile(durations, 99),
+                'max_ms': max(durations),
+                'avg_queries': round(sum(sample['queries'] for sample in samples) / len(samples), 1),
+                'max_queries': max(sample['queries'] for sample in samples),
+                'avg_sql_ms': round(sum(sample['sql_ms'] for sample in samples) / len(samples), 2),
+                'errors': sum(sample['status'] >= 500 for sample in samples),
+            })
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+    def worst(self, limit=20, key='duration_ms'):
+        return heapq.nlargest(limit, self.samples(), key=lambda sample: sample[key])
+
+
+request_profiler = RequestProfiler()
+
+
+class ProfilingMiddleware:
+    """Ukur sebagian request (SAMPLE_RATE): waktu, query SQL, ukuran response; cProfile opsional"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = request_profiler.config
+        if (
+            not options['ENABLED']
+            or random.random() >= options['SAMPLE_RATE']
+            or request.path.startswith(tuple(options['EXCLUDE_PATHS']))
+        ):
+            return self.get_response(request)
+
+        recorder = QueryRecorder(options['SLOW_QUERIES'], options['SQL_MAX_LENGTH'])
+        profiler = cProfile.Profile() if random.random() < options['PROFILE_RATE'] else None
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            if profiler is None:
+                response = self.get_response(request)
+            else:
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+        duration = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        sample = {
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else '<unresolved>',
+            'status': response.status_code,
+            'duration_ms': round(duration, 2),
+            'queries': recorder.count,
+            'sql_ms': round(recorder.total_ms, 2),
+            # Response streaming tidak dibaca agar tidak mengubah perilaku pengiriman
+            'size': None if response.streaming else len(response.content),
+            'slow_queries': recorder.slowest,
+        }
+        request_profiler.record(sample)
+        if profiler is not None and duration >= options['PROFILE_THRESHOLD_MS']:
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(options['PROFILE_LINES'])
+            request_profiler.record_profile({**sample, 'profile': output.getvalue()})
+        return response
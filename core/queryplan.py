@@ -0,0 +1,179 @@
+import re
+from urllib.parse import urlencode
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, models, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+DEFAULTS = {
+    # (nama url, query string) endpoint API utama yang diputar ulang
+    'ENDPOINTS': [
+        ('public_api:stats', {}),
+        ('public_api:news', {}),
+        ('public_api:population', {}),
+        ('public_api:dusun', {}),
+        ('references:penduduk_list', {}),
+        ('references:penduduk_search', {'gender': 'L', 'is_active': 'true'}),
+        ('references:penduduk_list', {'age_min': 60}),
+        ('references:dusun_list', {}),
+        ('news:news_list', {'status': 'published'}),
+        ('news:public_news_list', {}),
+        ('letters:letter_list_api', {'status': 'pending'}),
+        ('beneficiaries:aiddistribution_list', {'status': 'pending'}),
+        ('posyandu:posyandu_stats', {}),
+        ('tourism:tourism_api:destinations', {}),
+    ],
+    # Tabel kecil/lookup yang wajar dibaca penuh
+    'ALLOW_SCANS': [
+        'django_content_type', 'django_session', 'auth_group', 'auth_permission',
+        'references_dusun', 'references_lorong', 'news_newscategory', 'news_newstag',
+        'posyandu_posyandulocation', 'posyandu_ibuhamil',
+        # Data terakhir per balita: tiap baris dibandingkan dengan subquery berindeks (patient/balita, tanggal)
+        'posyandu_nutritiondata', 'posyandu_stuntingdata',
+    ],
+    # Penduduk sintetis yang dibuat di transaksi audit (0 = pakai data database apa adanya)
+    'RESIDENTS': 1000,
+    'SEED': 0,
+}
+
+WRITE_PREFIXES = ('INSERT', 'SAVEPOINT', 'RELEASE', 'ROLLBACK', 'BEGIN', 'COMMIT')
+# FROM "tabel" U0 / JOIN "tabel" T3: alias yang dipakai Django muncul di rencana SQLite menggantikan nama tabel
+ALIAS_PATTERN = re.compile(r'"(\w+)"\s+(?:AS\s+)?"?([A-Z]\d+)"?\b')
+WHERE_PATTERN = re.compile(r'\bWHERE\b', re.IGNORECASE)
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'QUERYPLAN_AUDIT', {})}
+
+
+def normalize_sql(sql):
+    """SQL tanpa literal, untuk mengelompokkan query yang sama dengan parameter berbeda"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    return re.sub(r'\b\d+\b', '?', sql)
+
+
+class QueryPlanAuditor:
+    """Putar ulang endpoint API, jalankan EXPLAIN untuk setiap query lalu tandai full table scan"""
+
+    def __init__(self, endpoints=None, allow_scans=None):
+        options = config()
+        self.endpoints = endpoints if endpoints is not None else options['ENDPOINTS']
+        self.allow_scans = set(options['ALLOW_SCANS'] if allow_scans is None else allow_scans)
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise NotImplementedError(f'Audit rencana query belum mendukung database {connection.vendor}')
+
+    def explain(self, sql):
+        """[baris rencana] untuk satu statement"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[-1] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+
+    def full_scans(self, sql, plan):
+        """Nama tabel yang dibaca penuh tanpa index (alias U0/T1 dikembalikan ke nama tabel)
+
+        Query tanpa WHERE (total/GROUP BY seluruh tabel) memang membaca semua baris dan tidak ditandai.
+        """
+        if not WHERE_PATTERN.search(sql):
+            return []
+        aliases = dict((alias, table) for table, alias in ALIAS_PATTERN.findall(sql))
+        pattern = SQLITE_SCAN if connection.vendor == 'sqlite' else POSTGRES_SCAN
+        tables = []
+        for detail in plan:
+            match = pattern.search(detail)
+            if match:
+                table = aliases.get(match.group(1), match.group(1))
+                if table not in self.allow_scans:
+                    tables.append(table)
+        return tables
+
+    def audit_endpoint(self, client, name, params):
+        path = reverse(name)
+        url = f'{path}?{urlencode(params)}' if params else path
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        statements = []
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if sql.lstrip().upper().startswith(WRITE_PREFIXES):
+                continue
+            try:
+                plan = self.explain(sql)
+            except Exception as e:
+                statements.append({'sql': sql, 'plan': [], 'scans': [], 'error': str(e)})
+                continue
+            statements.append({'sql': sql, 'plan': plan, 'scans': self.full_scans(sql, plan)})
+        return {
+            'name': name,
+            'url': url,
+            'status': response.status_code,
+            'queries': len(queries.captured_queries),
+            'statements': statements,
+            'scans': [statement for statement in statements if statement['scans']],
+        }
+
+    def run(self, user=None, residents=None):
+        """Audit semua endpoint terhadap data sintetis dalam transaksi yang selalu di-rollback
+
+        Data sintetis, efek samping GET dan cache respons hanya hidup selama audit: cache diganti
+        locmem terpisah sehingga versi cache situs tidak dinaikkan.
+        """
+        from references.autocomplete import resident_index
+        from .datagen import GenerationContext, autodiscover, isolated_caches, run as generate
+
+        options = config()
+        residents = options['RESIDENTS'] if residents is None else residents
+        results = []
+        with isolated_caches():
+            with transaction.atomic():
+                user = user or get_user_model().objects.create_superuser(
+                    username='queryplan-audit', email='queryplan-audit@example.com', password=None,
+                )
+                if residents:
+                    autodiscover()
+                    generate(GenerationContext(residents, seed=options['SEED'], user=user))
+                client = Client()
+                client.force_login(user)
+                for name, params in self.endpoints:
+                    results.append(self.audit_endpoint(client, name, params))
+                transaction.set_rollback(True)
+            # Index picker di memori proses mungkin dibangun dari data yang sudah di-rollback
+            resident_index.invalidate()
+        return results
+
+    @staticmethod
+    def boolean_prefix_indexes():
+        """[(model, nama index, field)] index tanpa condition yang diawali field boolean
+
+        SQLite menulis filter boolean sebagai WHERE "kolom" (bukan = 1) sehingga prefix index itu tidak
+        pernah dipakai; letakkan kolom non-boolean di depan atau pakai index parsial (condition=Q(...)).
+        """
+        found = []
+        for model in apps.get_models():
+            for index in model._meta.indexes:
+                if index.condition is not None or not index.fields:
+                    continue
+                field = model._meta.get_field(index.fields[0].lstrip('-'))
+                if isinstance(field, models.BooleanField):
+                    found.append((model._meta.label, index.name, list(index.fields)))
+        return found
+
+    @staticmethod
+    def summary(results):
+        """{(tabel, sql ternormalisasi): [nama endpoint]} untuk semua full scan"""
+        found = {}
+        for result in results:
+            for statement in result['scans']:
+                for table in statement['scans']:
+                    endpoints = found.setdefault((table, normalize_sql(statement['sql'])), [])
+                    if result['name'] not in endpoints:
+                        endpoints.append(result['name'])
+        return found
@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe, quote_etag, parse_etags
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'public_api'
+KEY_PREFIX = 'respcache'
+
+# Query param yang tidak mempengaruhi isi response (cache buster dari frontend)
+IGNORED_PARAMS = {'_', 'callback', 'nocache'}
+
+# Save yang hanya menyentuh counter kunjungan tidak membuat cache kadaluarsa
+COUNTER_FIELDS = {'view_count', 'views_count', 'likes_count', 'shares_count', 'comments_count'}
+
+# Namespace cache -> model yang perubahan datanya membuat namespace kadaluarsa
+DEPENDENCIES = {
+    'public_stats': ['references.Penduduk', 'news.News', 'business.Business'],
+    'public_news': ['news.News', 'news.NewsCategory', 'news.NewsTag'],
+    'village_profile': ['village_profile.VillageVision', 'village_profile.VillageHistory'],
+    'village_history': ['village_profile.VillageHistory', 'village_profile.VillageHistoryPhoto'],
+    'public_dusun': ['references.Dusun'],
+}
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:version:{namespace}'
+
+
+def namespace_version(namespace):
+    """(versi, waktu perubahan terakhir) untuk namespace; dibuat bila belum ada"""
+    cache = get_cache()
+    state = cache.get(_version_key(namespace))
+    if state is None:
+        state = (1, int(time.time()))
+        cache.add(_version_key(namespace), state, timeout=None)
+        state = cache.get(_version_key(namespace), state)
+    return state
+
+
+def invalidate(namespace):
+    """Naikkan versi namespace sehingga semua variasi query lama tidak terpakai lagi"""
+    cache = get_cache()
+    version, _ = namespace_version(namespace)
+    cache.set(_version_key(namespace), (version + 1, int(time.time())), timeout=None)
+
+
+def invalidate_models(*models):
+    """Invalidasi namespace yang bergantung pada model (untuk bulk_create yang tidak memicu sinyal)"""
+    labels = {model._meta.label for model in models}
+    for namespace, model_labels in DEPENDENCIES.items():
+        if labels.intersection(model_labels):
+            invalidate(namespace)
+
+
+def normalized_query(request):
+    """Query string terurut dan tanpa parameter yang diabaikan"""
+    items = []
+    for key in sorted(request.GET.keys()):
+        if key in IGNORED_PARAMS:
+            continue
+        values = sorted(value.strip() for value in request.GET.getlist(key))
+        items.append(f"{key}={','.join(values)}")
+    return '&'.join(items)
+
+
+def build_cache_key(namespace, version, request, extra=''):
+    raw = f'{request.path}?{normalized_query(request)}|{extra}'
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{namespace}:v{version}:{digest}'
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def _finalize(request, entry, cache_status):
+    max_age = getattr(settings, 'PUBLIC_API_CACHE_MAX_AGE', 60)
+    if _not_modified(request, entry['etag'], entry['last_modified']):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry['content'], status=entry['status'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    response['X-Cache'] = cache_status
+    return response
+
+
+def _authenticated(request):
+    """Tanpa cookie sesi tidak ada user login; request.user tidak dimuat agar pengunjung anonim tetap 0 query"""
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return False
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated
+
+
+def cached_public_api(namespace, timeout=DEFAULT_TIMEOUT):
+    """Decorator cache response JSON publik dengan ETag/Last-Modified.
+
+    Kunci cache = path + query ternormalisasi + versi namespace; versi naik
+    lewat sinyal model pada DEPENDENCIES sehingga invalidasi O(1).
+    Entri kedaluwarsa setelah TIMEOUT backend (PUBLIC_API_CACHE_TIMEOUT). Versi disimpan
+    di backend yang sama: dengan locmem invalidasi hanya terlihat di proses yang menyimpan,
+    proses lain baru segar setelah TIMEOUT, jadi deployment multi-worker memakai file/redis.
+    Request selain GET/HEAD dan request user yang login (admin melihat data terbaru) tidak di-cache.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _authenticated(request):
+                return view_func(request, *args, **kwargs)
+
+            try:
+                cache = get_cache()
+                version, changed_at = namespace_version(namespace)
+                key = build_cache_key(namespace, version, request, extra=repr(sorted(kwargs.items())))
+                entry = cache.get(key)
+            except Exception as e:
+                logger.error(f"Response cache unavailable: {e}")
+                return view_func(request, *args, **kwargs)
+
+            if entry is not None:
+                return _finalize(request, entry, 'HIT')
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or getattr(response, 'streaming', False):
+                return response
+
+            content = response.content
+            entry = {
+                'content': content,
+                'status': response.status_code,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(hashlib.md5(content).hexdigest()),
+                'last_modified': changed_at,
+            }
+            try:
+                cache.set(key, entry, timeout=timeout)
+            except Exception as e:
+                logger.error(f"Error storing response cache: {e}")
+            return _finalize(request, entry, 'MISS')
+        return wrapper
+    return decorator
+
+
+def connect_invalidation_signals():
+    """Hubungkan sinyal model ke invalidasi namespace (dipanggil dari CoreConfig.ready)"""
+    for namespace, model_labels in DEPENDENCIES.items():
+        def handler(sender, namespace=namespace, **kwargs):
+            update_fields = kwargs.get('update_fields')
+            if update_fields and set(update_fields) <= COUNTER_FIELDS:
+                return
+            try:
+                invalidate(namespace)
+            except Exception as e:
+                logger.error(f"Error invalidating response cache {namespace}: {e}")
+
+        for label in model_labels:
+            try:
+                model = apps.get_model(label)
+            except LookupError:
+                continue
+            uid = f'respcache:{namespace}:{label}'
+            post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+            post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
+            for field in model._meta.many_to_many:
+                m2m_changed.connect(handler, sender=field.remote_field.through, weak=False,
+                                    dispatch_uid=f'{uid}:{field.name}:m2m')
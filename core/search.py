@@ -0,0 +1,426 @@
+import logging
+import re
+import time
+import zlib
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'TABLE': 'core_search_index',
+    'TOKENIZER': 'unicode61 remove_diacritics 2',
+    'PREFIX': '2 3',          # prefix index FTS5 untuk pencarian 2-3 huruf pertama
+    'TITLE_WEIGHT': 10.0,     # bobot bm25 kolom judul terhadap isi
+    'BODY_WEIGHT': 1.0,
+    'BATCH_SIZE': 500,
+    'RECHECK_INTERVAL': 60,   # detik; cek ulang tabel index bila belum dibangun
+}
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# rowid FTS = (kode jenis dokumen << 40) | pk, sehingga hapus/filter per jenis cukup rentang rowid
+TYPE_SHIFT = 40
+PK_MASK = (1 << TYPE_SHIFT) - 1
+
+
+def resolve(instance, path):
+    """Ambil nilai field (boleh lewat relasi a__b); field choices memakai label tampilannya"""
+    value = instance
+    parts = path.split('__')
+    for index, part in enumerate(parts):
+        if value is None:
+            return ''
+        display = getattr(value, f'get_{part}_display', None)
+        if index == len(parts) - 1 and display is not None:
+            value = display()
+        else:
+            value = getattr(value, part, None)
+    return '' if value is None else str(value)
+
+
+class SearchDocument:
+    """Deklarasi bagaimana satu model masuk ke index pencarian
+
+    `title`, `subtitle` dan isi `fields` berupa path field (boleh lewat relasi) atau callable(instance).
+    """
+
+    def __init__(self, model, doc_type, module, title, fields=(), subtitle=None, queryset=None):
+        self.model = model
+        self.doc_type = doc_type
+        self.module = module
+        self.title = title
+        self.fields = tuple(fields)
+        self.subtitle = subtitle
+        self._queryset = queryset
+        self.type_code = zlib.crc32(doc_type.encode()) & 0x7FFF
+
+    @property
+    def rowid_range(self):
+        start = self.type_code << TYPE_SHIFT
+        return start, start + PK_MASK
+
+    def rowid(self, pk):
+        return (self.type_code << TYPE_SHIFT) | pk
+
+    def _value(self, spec, instance):
+        if spec is None:
+            return ''
+        return spec(instance) if callable(spec) else resolve(instance, spec)
+
+    def queryset(self):
+        if self._queryset is not None:
+            return self._queryset()
+        related = {
+            path.rsplit('__', 1)[0] for path in (self.title, self.subtitle, *self.fields)
+            if isinstance(path, str) and '__' in path
+        }
+        return self.model._default_manager.select_related(*related)
+
+    def row(self, instance):
+        body = ' '.join(filter(None, (self._value(field, instance) for field in self.fields)))
+        return (
+            self.rowid(instance.pk),
+            self._value(self.title, instance),
+            body,
+            self.module,
+            self.doc_type,
+            self._value(self.subtitle, instance),
+        )
+
+    def like_filter(self, query):
+        """Fallback LIKE bila index belum tersedia (field callable dilewati)"""
+        paths = [path for path in (self.title, *self.fields) if isinstance(path, str)]
+        return reduce(or_, (Q(**{f'{path}__icontains': query}) for path in paths))
+
+    def dependencies(self):
+        """[(model terkait, lookup dari model ini, attname yang diawasi)] untuk path lewat relasi
+
+        Nama dari relasi (mis. penduduk__name) ikut tersimpan di dokumen, jadi perubahan baris terkait
+        harus mengindex ulang dokumen yang menunjuk ke sana.
+        """
+        found = []
+        for path in (self.title, self.subtitle, *self.fields):
+            if not isinstance(path, str) or '__' not in path:
+                continue
+            parts = path.split('__')
+            model = self.model
+            for index, part in enumerate(parts[:-1]):
+                model = model._meta.get_field(part).related_model
+                watched = model._meta.get_field(parts[index + 1])
+                found.append((model, '__'.join(parts[:index + 1]), watched.attname))
+        return found
+
+
+class SearchIndex:
+    """Index pencarian global berbasis tabel virtual SQLite FTS5 (didaftarkan di <app>/search_indexes.py)"""
+
+    def __init__(self):
+        self._documents = {}
+        self._by_model = {}
+        self._dependents = {}     # model terkait -> [(dokumen, lookup, attname)]
+        self._ready = None
+        self._checked_at = 0
+
+    @property
+    def config(self):
+        return {**DEFAULTS, **getattr(settings, 'SEARCH_INDEX', {})}
+
+    @property
+    def table(self):
+        return connection.ops.quote_name(self.config['TABLE'])
+
+    def register(self, model, doc_type, module, title, fields=(), subtitle=None, queryset=None):
+        document = SearchDocument(model, doc_type, module, title, fields, subtitle, queryset)
+        for other in self._documents.values():
+            if other.doc_type != doc_type and other.type_code == document.type_code:
+                raise ImproperlyConfigured(f'Search doc_type {doc_type!r} bentrok dengan {other.doc_type!r}')
+        self._documents[doc_type] = document
+        self._by_model[model] = document
+        post_save.connect(self._on_save, sender=model, dispatch_uid=f'search_index_save_{doc_type}')
+        post_delete.connect(self._on_delete, sender=model, dispatch_uid=f'search_index_delete_{doc_type}')
+        for related, lookup, attname in document.dependencies():
+            self._dependents.setdefault(related, []).append((document, lookup, attname))
+            uid = f'search_index_dependents_{related._meta.label_lower}'
+            pre_save.connect(self._on_related_pre_save, sender=related, dispatch_uid=f'{uid}_pre_save')
+            post_save.connect(self._on_related_save, sender=related, dispatch_uid=f'{uid}_save')
+            pre_delete.connect(self._on_related_pre_delete, sender=related, dispatch_uid=f'{uid}_pre_delete')
+            post_delete.connect(self._on_related_delete, sender=related, dispatch_uid=f'{uid}_delete')
+        return document
+
+    @property
+    def doc_types(self):
+        return list(self._documents)
+
+    @property
+    def modules(self):
+        return sorted({document.module for document in self._documents.values()})
+
+    def document_for(self, model):
+        return self._by_model.get(model)
+
+    # ----- tabel -----
+
+    def available(self):
+        """True bila database SQLite dan tabel index sudah dibangun (lihat rebuild_search_index)"""
+        if connection.vendor != 'sqlite':
+            return False
+        if self._ready or time.monotonic() - self._checked_at < self.config['RECHECK_INTERVAL']:
+            return bool(self._ready)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.config['TABLE']])
+            self._ready = cursor.fetchone() is not None
+        self._checked_at = time.monotonic()
+        return self._ready
+
+    def _create_table(self, cursor):
+        config = self.config
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"title, body, module UNINDEXED, doc_type UNINDEXED, subtitle UNINDEXED, "
+            f"tokenize = '{config['TOKENIZER']}', prefix = '{config['PREFIX']}')"
+        )
+
+    def _insert(self, cursor, rows):
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (rowid, title, body, module, doc_type, subtitle) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+    def rebuild(self, doc_types=None):
+        """Bangun ulang index (semua atau jenis tertentu); return {doc_type: jumlah}"""
+        if connection.vendor != 'sqlite':
+            raise ImproperlyConfigured('Index pencarian FTS5 membutuhkan database SQLite')
+        documents = [self._documents[name] for name in (doc_types or self._documents)]
+        batch_size = self.config['BATCH_SIZE']
+        counts = {}
+        with transaction.atomic(), connection.cursor() as cursor:
+            if doc_types is None:
+                cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+            self._create_table(cursor)
+            for document in documents:
+                cursor.execute(f'DELETE FROM {self.table} WHERE rowid BETWEEN %s AND %s', document.rowid_range)
+                rows = []
+                counts[document.doc_type] = 0
+                for instance in document.queryset().iterator(chunk_size=batch_size):
+                    rows.append(document.row(instance))
+                    if len(rows) >= batch_size:
+                        self._insert(cursor, rows)
+                        counts[document.doc_type] += len(rows)
+                        rows = []
+                if rows:
+                    self._insert(cursor, rows)
+                    counts[document.doc_type] += len(rows)
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        self._ready = True
+        return counts
+
+    # ----- sinkronisasi -----
+
+    def index_instance(self, instance):
+        self.index_many([instance])
+
+    def index_many(self, instances):
+        """Index banyak instance satu model sekaligus (bulk_create tidak memicu post_save)"""
+        instances = list(instances)
+        document = self._by_model.get(type(instances[0])) if instances else None
+        if document is None or not self.available():
+            return
+        with connection.cursor() as cursor:
+            self._insert(cursor, [document.row(instance) for instance in instances])
+
+    def remove_instance(self, instance):
+        document = self._by_model.get(type(instance))
+        if document is None or not self.available():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [document.rowid(instance.pk)])
+
+    def _on_save(self, sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        try:
+            self.index_instance(instance)
+        except Exception as e:
+            # Index bisa dibangun ulang; kegagalan di sini tidak boleh menggagalkan penyimpanan data
+            logger.error(f"Search index update failed for {sender.__name__} {instance.pk}: {e}")
+
+    def _on_delete(self, sender, instance, **kwargs):
+        try:
+            self.remove_instance(instance)
+        except Exception as e:
+            logger.error(f"Search index delete failed for {sender.__name__} {instance.pk}: {e}")
+
+    def _reindex(self, document, queryset):
+        """Index ulang hasil queryset dokumen per batch"""
+        batch = []
+        for instance in queryset.iterator(chunk_size=self.config['BATCH_SIZE']):
+            batch.append(instance)
+            if len(batch) >= self.config['BATCH_SIZE']:
+                self.index_many(batch)
+                batch = []
+        if batch:
+            self.index_many(batch)
+
+    def _on_related_pre_save(self, sender, instance, raw=False, update_fields=None, **kwargs):
+        # Simpan nilai lama agar dokumen hanya diindex ulang bila nama yang tersimpan berubah
+        attnames = {attname for _, _, attname in self._dependents.get(sender, ())}
+        if update_fields is not None:
+            attnames &= {sender._meta.get_field(name).attname for name in update_fields}
+        if raw or instance.pk is None or not attnames or not self.available():
+            return
+        try:
+            instance._search_index_previous = sender._default_manager.filter(pk=instance.pk).values(*attnames).first()
+        except Exception as e:
+            logger.error(f"Search index lookup failed for {sender.__name__} {instance.pk}: {e}")
+
+    def _on_related_save(self, sender, instance, created=False, raw=False, **kwargs):
+        previous = instance.__dict__.pop('_search_index_previous', None)
+        if raw or created or not previous:
+            return
+        try:
+            for document, lookup, attname in self._dependents.get(sender, ()):
+                if attname in previous and previous[attname] != getattr(instance, attname):
+                    self._reindex(document, document.queryset().filter(**{lookup: instance}))
+        except Exception as e:
+            logger.error(f"Search index update failed for dependents of {sender.__name__} {instance.pk}: {e}")
+
+    def _on_related_pre_delete(self, sender, instance, **kwargs):
+        # SET_NULL/SET_DEFAULT memperbarui dokumen tanpa sinyal; catat pk-nya sebelum relasi hilang
+        if not self.available():
+            return
+        try:
+            instance._search_index_dependents = [
+                (document, list(document.model._default_manager.filter(**{lookup: instance}).values_list('pk', flat=True)))
+                for document, lookup, _ in self._dependents.get(sender, ())
+            ]
+        except Exception as e:
+            logger.error(f"Search index lookup failed for dependents of {sender.__name__} {instance.pk}: {e}")
+
+    def _on_related_delete(self, sender, instance, **kwargs):
+        # Dokumen yang ikut terhapus (CASCADE) sudah dibuang lewat post_delete-nya sendiri
+        try:
+            for document, pks in instance.__dict__.pop('_search_index_dependents', ()):
+                if pks:
+                    self._reindex(document, document.queryset().filter(pk__in=pks))
+        except Exception as e:
+            logger.error(f"Search index update failed for dependents of {sender.__name__} {instance.pk}: {e}")
+
+    # ----- pencarian -----
+
+    @staticmethod
+    def match_expression(query):
+        """Ubah input pengguna menjadi query FTS5: setiap kata dicocokkan sebagai prefix (AND)"""
+        tokens = TOKEN_PATTERN.findall((query or '').lower())
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def search(self, query, modules=None, doc_types=None, limit=20, offset=0):
+        """Cari di semua modul; return {'results', 'facets', 'total'} terurut bm25"""
+        expression = self.match_expression(query)
+        if not expression:
+            return {'results': [], 'facets': {}, 'total': 0}
+        if not self.available():
+            return self._like_search(query, modules, doc_types, limit, offset)
+
+        config = self.config
+        where = [f'{self.table} MATCH %s']
+        params = [expression]
+        if doc_types:
+            where.append(f"doc_type IN ({', '.join(['%s'] * len(doc_types))})")
+            params.extend(doc_types)
+
+        with connection.cursor() as cursor:
+            # Facet per modul dihitung sebelum filter modul agar pengguna bisa berpindah tab
+            cursor.execute(
+                f"SELECT module, COUNT(*) FROM {self.table} WHERE {' AND '.join(where)} GROUP BY module",
+                params,
+            )
+            facets = dict(cursor.fetchall())
+
+            if modules:
+                where.append(f"module IN ({', '.join(['%s'] * len(modules))})")
+                params.extend(modules)
+            cursor.execute(
+                f"SELECT rowid, title, subtitle, module, doc_type, "
+                f"bm25({self.table}, %s, %s) AS score FROM {self.table} "
+                f"WHERE {' AND '.join(where)} ORDER BY score LIMIT %s OFFSET %s",
+                [config['TITLE_WEIGHT'], config['BODY_WEIGHT'], *params, limit, offset],
+            )
+            results = [
+                {
+                    'title': title,
+                    'subtitle': subtitle,
+                    'module': module,
+                    'type': doc_type,
+                    'id': rowid & PK_MASK,
+                    'score': round(-score, 4),
+                }
+                for rowid, title, subtitle, module, doc_type, score in cursor.fetchall()
+            ]
+
+        total = sum(count for module, count in facets.items() if not modules or module in modules)
+        return {'results': results, 'facets': facets, 'total': total}
+
+    def _like_search(self, query, modules, doc_types, limit, offset):
+        documents = [
+            document for document in self._documents.values()
+            if (not modules or document.module in modules) and (not doc_types or document.doc_type in doc_types)
+        ]
+        results, facets = [], {}
+        for document in documents:
+            queryset = document.queryset().filter(document.like_filter(query))
+            count = queryset.count()
+            if not count:
+                continue
+            facets[document.module] = facets.get(document.module, 0) + count
+            for instance in queryset[:offset + limit]:
+                results.append({
+                    'title': document._value(document.title, instance),
+                    'subtitle': document._value(document.subtitle, instance),
+                    'module': document.module,
+                    'type': document.doc_type,
+                    'id': instance.pk,
+                    'score': None,
+                })
+        return {'results': results[offset:offset + limit], 'facets': facets, 'total': sum(facets.values())}
+
+    def filter_queryset(self, queryset, query, fields):
+        """Filter queryset pada `fields`; index (bila model terdaftar) mempersempit kandidat lebih dulu
+
+        Dokumen index bisa memuat field lain (mis. nama dusun), jadi setiap kata tetap harus ada di
+        salah satu `fields` pemanggil kecuali index memuat persis field yang sama.
+        """
+        query = (query or '').strip()
+        if not query:
+            return queryset
+        document = self._by_model.get(queryset.model)
+        expression = self.match_expression(query)
+        if document is not None and expression and self.available():
+            start, end = document.rowid_range
+            queryset = queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid - %s FROM {self.table} WHERE {self.table} MATCH %s AND rowid BETWEEN %s AND %s',
+                (start, expression, start, end),
+            ))
+            indexed = (document.title, *document.fields)
+            if all(isinstance(path, str) for path in indexed) and set(indexed) <= set(fields):
+                return queryset
+            for token in TOKEN_PATTERN.findall(query):
+                queryset = queryset.filter(reduce(or_, (Q(**{f'{field}__icontains': token}) for field in fields)))
+            return queryset
+        return queryset.filter(reduce(or_, (Q(**{f'{field}__icontains': query}) for field in fields)))
+
+search_index = SearchIndex()
+register = search_index.register
+
+
+def autodiscover():
+    autodiscover_modules('search_indexes')
@@ -11,6 +11,7 @@ import json
 from datetime import datetime
 
 from .models import CustomUser, UserProfile, UMKMBusiness, WhatsAppBotConfig, SystemSettings, WebsiteSettings, ModuleSettings, APIEndpoint
+from .aggregator import registry as aggregator_registry
 
 User = get_user_model()
 
@@ -1368,8 +1369,10 @@ def generate_excel_report(data):
     try:
         import openpyxl
         from openpyxl.styles import Font, Alignment, PatternFill
+        from openpyxl.utils import get_column_letter
         from django.http import HttpResponse
         import io
+        from .excel import column_widths
         
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -1409,18 +1412,10 @@ def generate_excel_report(data):
             ws.cell(row=row, column=1, value=stat)
             ws.cell(row=row, column=2, value=value)
         
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+        # Lebar kolom dari data yang ditulis (tanpa memindai seluruh sel)
+        info_rows = [['Tanggal Generate:', ws['B4'].value], ['Periode:', ws['B3'].value]]
+        for index, width in enumerate(column_widths(info_rows + stats_data, stats_headers), 1):
+            ws.column_dimensions[get_column_letter(index)].width = width
         
         buffer = io.BytesIO()
         wb.save(buffer)
@@ -1448,67 +1443,20 @@ def generate_excel_report(data):
 def dashboard_aggregator_api(request):
     """API for aggregating data from all modules for main dashboard"""
     try:
-        # Import models from all modules
-        from references.models import Penduduk, Dusun, Lorong
-        from events.models import Event
-        from documents.models import Document, DocumentRequest
-        from business.models import Business
-        from posyandu.models import PosyanduLocation
-        from letters.models import Letter
-        from beneficiaries.models import Beneficiary
-        
-        # Aggregate statistics
-        stats = {
-            'total_population': Penduduk.objects.count(),
-            'total_dusun': Dusun.objects.count(),
-            'total_lorong': Lorong.objects.count(),
-            'total_events': Event.objects.count(),
-            'active_events': Event.objects.filter(is_active=True).count(),
-            'total_documents': Document.objects.count(),
-            'pending_document_requests': DocumentRequest.objects.filter(status='pending').count(),
-            'total_businesses': Business.objects.count(),
-            'active_businesses': Business.objects.filter(is_active=True).count(),
-            'total_posyandu': PosyanduLocation.objects.count(),
-            'total_letters': Letter.objects.count(),
-            'total_beneficiaries': Beneficiary.objects.count(),
-            'total_users': CustomUser.objects.count(),
-            'active_users': CustomUser.objects.filter(is_active=True).count(),
-            'total_umkm': UMKMBusiness.objects.count(),
-            'active_modules': ModuleSettings.objects.filter(is_active=True).count(),
-            'total_api_endpoints': APIEndpoint.objects.filter(is_active=True).count()
-        }
-        
-        # Recent activities (last 7 days)
-        from datetime import datetime, timedelta
-        week_ago = datetime.now() - timedelta(days=7)
-        
-        recent_stats = {
-            'new_users_this_week': CustomUser.objects.filter(date_joined__gte=week_ago).count(),
-            'new_documents_this_week': Document.objects.filter(created_at__gte=week_ago).count(),
-            'new_letters_this_week': Letter.objects.filter(created_at__gte=week_ago).count(),
-            'new_events_this_week': Event.objects.filter(created_at__gte=week_ago).count()
-        }
-        
-        # Module status
-        modules_status = [
-            {
-                'module_name': module.module_name,
-                'display_name': module.display_name,
-                'is_active': module.is_active,
-                'api_enabled': module.api_enabled,
-                'endpoints_count': module.api_endpoints.filter(is_active=True).count()
-            }
-            for module in ModuleSettings.objects.all().order_by('menu_order')
-        ]
-        
+        # Provider metrik didaftarkan tiap aplikasi di <app>/dashboard.py
+        use_cache = request.GET.get('refresh') != 'true'
+        data, timings, errors = aggregator_registry.collect(use_cache=use_cache)
+
         return JsonResponse({
             'success': True,
             'data': {
-                'statistics': stats,
-                'recent_activities': recent_stats,
-                'modules_status': modules_status,
+                'statistics': data.get('statistics', {}),
+                'recent_activities': data.get('recent_activities', {}),
+                'modules_status': data.get('modules_status', []),
                 'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            },
+            'providers': timings,
+            'errors': errors
         })
         
     except Exception as e:
@@ -1524,88 +1472,27 @@ def api_aggregator(request):
     """API aggregator untuk mengumpulkan data dari semua modul dengan filter dan pagination"""
     try:
         module = request.GET.get('module', 'all')
-        limit = int(request.GET.get('limit', 10))
+        limit = min(int(request.GET.get('limit', 10)), 100)
         offset = int(request.GET.get('offset', 0))
-        date_from = request.GET.get('date_from')
-        date_to = request.GET.get('date_to')
-        
-        result = {'success': True, 'data': {}}
-        
-        # Filter tanggal jika disediakan
-        date_filter = {}
-        if date_from:
-            date_filter['created_at__gte'] = date_from
-        if date_to:
-            date_filter['created_at__lte'] = date_to
-        
-        if module == 'all' or module == 'population':
-            from references.models import Penduduk
-            population_qs = Penduduk.objects.all()
-            if date_filter:
-                population_qs = population_qs.filter(**date_filter)
-            
-            result['data']['population'] = {
-                'total': population_qs.count(),
-                'items': list(population_qs[offset:offset+limit].values(
-                    'id', 'nama_lengkap', 'nik', 'jenis_kelamin', 'umur', 'status'
-                ))
-            }
-        
-        if module == 'all' or module == 'events':
-            from events.models import Event
-            events_qs = Event.objects.all()
-            if date_from or date_to:
-                if date_from:
-                    events_qs = events_qs.filter(created_at__gte=date_from)
-                if date_to:
-                    events_qs = events_qs.filter(created_at__lte=date_to)
-            
-            result['data']['events'] = {
-                'total': events_qs.count(),
-                'items': list(events_qs[offset:offset+limit].values(
-                    'id', 'nama_event', 'tanggal_mulai', 'tanggal_selesai', 'lokasi', 'is_active'
-                ))
-            }
-        
-        if module == 'all' or module == 'documents':
-            from documents.models import Document
-            documents_qs = Document.objects.all()
-            if date_filter:
-                documents_qs = documents_qs.filter(**date_filter)
-            
-            result['data']['documents'] = {
-                'total': documents_qs.count(),
-                'items': list(documents_qs[offset:offset+limit].values(
-                    'id', 'nama_dokumen', 'jenis_dokumen', 'created_at', 'is_active'
-                ))
-            }
-        
-        if module == 'all' or module == 'business':
-            from business.models import Business
-            business_qs = Business.objects.all()
-            if date_filter:
-                business_qs = business_qs.filter(**date_filter)
-            
-            result['data']['business'] = {
-                'total': business_qs.count(),
-                'items': list(business_qs[offset:offset+limit].values(
-                    'id', 'nama_usaha', 'pemilik', 'jenis_usaha', 'is_active'
-                ))
-            }
-        
-        if module == 'all' or module == 'letters':
-            from letters.models import Letter
-            letters_qs = Letter.objects.all()
-            if date_filter:
-                letters_qs = letters_qs.filter(**date_filter)
-            
-            result['data']['letters'] = {
-                'total': letters_qs.count(),
-                'items': list(letters_qs[offset:offset+limit].values(
-                    'id', 'jenis_surat', 'pemohon', 'status', 'created_at'
-                ))
-            }
-        
+
+        if module != 'all' and module not in aggregator_registry.listing_names:
+            return JsonResponse({
+                'success': False,
+                'error': f'Modul tidak dikenal: {module}',
+                'available_modules': aggregator_registry.listing_names
+            }, status=400)
+
+        data, errors = aggregator_registry.listings(
+            names=None if module == 'all' else [module],
+            offset=offset,
+            limit=limit,
+            date_from=parse_date(request.GET.get('date_from') or ''),
+            date_to=parse_date(request.GET.get('date_to') or ''),
+        )
+
+        result = {'success': True, 'data': data}
+        if errors:
+            result['errors'] = errors
         return JsonResponse(result)
         
     except Exception as e:
@@ -16,6 +16,8 @@ urlpatterns = [
     path('recent-activities/', views.recent_activities_api, name='recent_activities_api'),
     path('system-info/', views.system_info_api, name='system_info_api'),
     path('search/', views.search_global, name='search_global'),
+    path('performance/', views.performance_view, name='performance'),
+    path('performance/api/', views.performance_api, name='performance_api'),
     
     # Module views
     path('module/<str:module_name>/', views.module_view, name='module_view'),
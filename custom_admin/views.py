@@ -5,7 +5,7 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Count, F, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
 import json
@@ -21,6 +21,8 @@ from posyandu.models import PosyanduLocation
 from village_profile.models import VillageHistory, VillageHistoryPhoto
 from documents.models import Document
 from core.models import CustomUser
+from core.search import search_index
+from core.profiling import request_profiler
 
 def is_admin(user):
     """Check if user is admin"""
@@ -307,8 +309,8 @@ def module_view(request, module_name):
             
             # Get popular news (by views)
             popular_news = News.objects.select_related('author', 'category').annotate(
-                total_views=Count('view_records')
-            ).order_by('-total_views')[:5]
+                total_views=F('views_count')
+            ).order_by('-views_count')[:5]
             
             context.update({
                 'total_news': total_news,
@@ -346,50 +348,17 @@ def search_global(request):
     query = request.GET.get('q', '').strip()
     
     if not query:
-        return JsonResponse({'results': []})
+        return JsonResponse({'results': [], 'facets': {}, 'total': 0})
     
-    results = []
-    
-    # Search in Penduduk
-    penduduk_results = Penduduk.objects.filter(
-        Q(nama__icontains=query) | Q(nik__icontains=query)
-    )[:5]
-    
-    for p in penduduk_results:
-        results.append({
-            'title': p.nama,
-            'subtitle': f'NIK: {p.nik}',
-            'module': 'references',
-            'type': 'penduduk',
-            'id': p.id
-        })
-    
-    # Search in Organizations (PerangkatDesa, LembagaAdat, etc.)
-    perangkat_results = PerangkatDesa.objects.filter(nama__icontains=query)[:5]
-    for org in perangkat_results:
-        results.append({
-            'title': org.nama,
-            'subtitle': org.jabatan or 'Perangkat Desa',
-            'module': 'organization',
-            'type': 'perangkat_desa',
-            'id': org.id
-        })
-    
-    # Search in News - temporarily commented out
-    # news_results = News.objects.filter(
-    #     Q(title__icontains=query) | Q(content__icontains=query)
-    # )[:5]
-    # 
-    # for news in news_results:
-    #     results.append({
-    #         'title': news.title,
-    #         'subtitle': 'Berita',
-    #         'module': 'news',
-    #         'type': 'news',
-    #         'id': news.id
-    #     })
+    modules = [module for module in request.GET.get('module', '').split(',') if module]
+    try:
+        limit = min(int(request.GET.get('limit', 20)), 100)
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        return JsonResponse({'error': 'limit/offset harus berupa angka'}, status=400)
     
-    return JsonResponse({'results': results})
+    # Index FTS5: ranking bm25, prefix match dan jumlah hasil per modul
+    return JsonResponse(search_index.search(query, modules=modules, limit=limit, offset=offset))
 
 @login_required
 @user_passes_test(is_admin)
@@ -481,4 +450,41 @@ def admin_settings(request):
         'page_title': 'Pengaturan Sistem',
         'page_subtitle': 'Kelola pengaturan dan konfigurasi sistem'
     }
-    return render(request, 'admin/settings.html', context)
\ No newline at end of file
+    return render(request, 'admin/settings.html', context)
+
+@login_required
+@user_passes_test(is_admin)
+def performance_view(request):
+    """Persentil per view dan request terlambat dari profiling sampel"""
+    options = request_profiler.config
+    context = {
+        'page_title': 'Performa Request',
+        'page_subtitle': 'Sampel request di proses ini',
+        'options': options,
+        'views': request_profiler.summary(),
+        'offenders': [
+            ('Request Terlambat', request_profiler.worst(20)),
+            ('Query Terbanyak', request_profiler.worst(20, key='queries')),
+        ],
+        'profiles': request_profiler.profiles(),
+        'sample_count': len(request_profiler.samples()),
+    }
+    return render(request, 'admin/performance.html', context)
+
+@login_required
+@user_passes_test(is_admin)
+@require_http_methods(['GET', 'POST'])
+def performance_api(request):
+    """JSON profiling sampel; POST mengosongkan buffer"""
+    if request.method == 'POST':
+        request_profiler.clear()
+        return JsonResponse({'success': True})
+    try:
+        limit = min(int(request.GET.get('limit', 20)), 200)
+    except ValueError:
+        return JsonResponse({'error': 'limit harus berupa angka'}, status=400)
+    return JsonResponse({
+        'views': request_profiler.summary(),
+        'worst': request_profiler.worst(limit),
+        'profiles': request_profiler.profiles(),
+    })
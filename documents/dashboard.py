@@ -0,0 +1,30 @@
+from django.db.models import Count, Q
+
+from core.aggregator import register, register_listing, week_ago
+from .models import Document, DocumentRequest
+
+
+@register('documents')
+def document_metrics():
+    stats = Document.objects.aggregate(
+        total_documents=Count('pk'),
+        new_documents_this_week=Count('pk', filter=Q(created_at__gte=week_ago())),
+    )
+    return {
+        'statistics': {'total_documents': stats['total_documents']},
+        'recent_activities': {'new_documents_this_week': stats['new_documents_this_week']},
+    }
+
+
+@register('document_requests')
+def document_request_metrics():
+    return {'statistics': DocumentRequest.objects.aggregate(
+        pending_document_requests=Count('pk', filter=Q(status='pending')),
+    )}
+
+
+register_listing(
+    'documents',
+    lambda: Document.objects.all(),
+    ('id', 'document_number', 'title', 'document_type__name', 'status', 'created_at'),
+)
@@ -0,0 +1,9 @@
+from core.search import register
+from .models import Document
+
+register(
+    Document, 'document', 'documents',
+    title='title',
+    fields=('document_number', 'document_type__name', 'applicant__name', 'content'),
+    subtitle='document_number',
+)
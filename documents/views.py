@@ -10,6 +10,7 @@ import json
 
 from .models import DocumentType, Document, DocumentRequest, DocumentApproval, DocumentTemplate
 from references.models import Penduduk
+from references.autocomplete import search_residents
 
 
 @login_required
@@ -574,17 +575,10 @@ def document_types_dropdown_api(request):
 def residents_dropdown_api(request):
     """API to get residents for dropdown"""
     try:
-        search = request.GET.get('search', '')
-        queryset = Penduduk.objects.all()
-        
-        if search:
-            queryset = queryset.filter(
-                Q(nama__icontains=search) |
-                Q(nik__icontains=search)
-            )
-        
-        residents = queryset.values('id', 'nama', 'nik')[:20]  # Limit to 20 results
-        return JsonResponse({'results': list(residents)})
+        residents = search_residents(request)  # Limit to 20 results
+        return JsonResponse({
+            'results': [{'id': resident.id, 'nama': resident.name, 'nik': resident.nik} for resident in residents]
+        })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
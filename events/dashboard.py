@@ -0,0 +1,24 @@
+from django.db.models import Count, Q
+
+from core.aggregator import register, register_listing, week_ago
+from .models import Event
+
+
+@register('events')
+def event_metrics():
+    stats = Event.objects.aggregate(
+        total_events=Count('pk'),
+        active_events=Count('pk', filter=Q(status__in=['published', 'ongoing'])),
+        new_events_this_week=Count('pk', filter=Q(created_at__gte=week_ago())),
+    )
+    return {
+        'statistics': {'total_events': stats['total_events'], 'active_events': stats['active_events']},
+        'recent_activities': {'new_events_this_week': stats['new_events_this_week']},
+    }
+
+
+register_listing(
+    'events',
+    lambda: Event.objects.all(),
+    ('id', 'title', 'start_date', 'end_date', 'location', 'status', 'created_at'),
+)
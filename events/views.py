@@ -17,6 +17,7 @@ from .models import (
     EventFeedback, EventSchedule, EventDocument
 )
 from references.models import Penduduk
+from references.autocomplete import search_residents
 
 
 # ============= MAIN VIEWS =============
@@ -640,21 +641,15 @@ def get_events_for_dropdown(request):
 def get_penduduk_for_dropdown(request):
     """Get penduduk for dropdown selection"""
     try:
-        search = request.GET.get('search', '')
-        
-        penduduk = Penduduk.objects.all()
-        if search:
-            penduduk = penduduk.filter(nama__icontains=search)
-        
-        penduduk = penduduk.order_by('nama')[:20]  # Limit results
+        penduduk = search_residents(request)  # Limit results
         
         data = []
         for p in penduduk:
             data.append({
                 'id': p.id,
-                'nama': p.nama,
+                'nama': p.name,
                 'nik': p.nik,
-                'alamat': p.alamat
+                'alamat': p.address
             })
         
         return JsonResponse({'results': data})
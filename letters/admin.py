@@ -3,11 +3,12 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import (
-    LetterType, Letter, LetterTracking, APIKeySettings, 
+    LetterType, LetterSequence, Letter, LetterTracking, LetterArtifactJob, APIKeySettings, 
     LetterSettings, LetterTemplate, LetterAIValidation, 
     LetterDigitalSignature
 )
 from .services import GeminiAIService, LetterValidationService
+from .artifacts import LetterArtifactService
 
 @admin.register(LetterType)
 class LetterTypeAdmin(admin.ModelAdmin):
@@ -24,6 +25,13 @@ class LetterTypeAdmin(admin.ModelAdmin):
         )
     letter_count.short_description = 'Jumlah Surat'
 
+@admin.register(LetterSequence)
+class LetterSequenceAdmin(admin.ModelAdmin):
+    list_display = ['letter_type', 'year', 'month', 'last_number', 'updated_at']
+    list_filter = ['year', 'letter_type']
+    search_fields = ['letter_type__name', 'letter_type__code']
+    readonly_fields = ['updated_at']
+
 @admin.register(Letter)
 class LetterAdmin(admin.ModelAdmin):
     list_display = [
@@ -144,15 +152,15 @@ class LetterAdmin(admin.ModelAdmin):
     validate_with_ai.short_description = 'Validasi dengan AI'
     
     def generate_pdf(self, request, queryset):
-        generated_count = 0
+        queued_count = 0
         
         for letter in queryset:
-            if letter.generate_pdf():
-                generated_count += 1
+            LetterArtifactService.enqueue(letter, ['pdf'])
+            queued_count += 1
         
         self.message_user(
             request,
-            f'{generated_count} PDF berhasil dibuat.'
+            f'{queued_count} PDF dijadwalkan untuk dibuat.'
         )
     generate_pdf.short_description = 'Generate PDF'
     
@@ -174,6 +182,13 @@ class LetterTrackingAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False  # Tracking entries are created automatically
 
+@admin.register(LetterArtifactJob)
+class LetterArtifactJobAdmin(admin.ModelAdmin):
+    list_display = ['letter', 'artifact_type', 'status', 'attempts', 'locked_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'artifact_type']
+    search_fields = ['letter__subject', 'letter__letter_number', 'content_hash']
+    readonly_fields = ['content_hash', 'locked_by', 'locked_at', 'started_at', 'finished_at', 'created_at', 'updated_at']
+
 @admin.register(APIKeySettings)
 class APIKeySettingsAdmin(admin.ModelAdmin):
     list_display = [
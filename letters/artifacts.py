@@ -0,0 +1,217 @@
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Letter, LetterArtifactJob
+from .utils import generate_letter_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 30,       # detik, dikalikan jumlah percobaan
+    'STALE_AFTER': 600,      # detik; job 'running' lebih lama dari ini dianggap worker mati
+    'POLL_INTERVAL': 2,      # detik jeda worker saat antrian kosong
+}
+
+
+class LetterArtifactService:
+    """Antrian render artefak surat berbasis tabel LetterArtifactJob (tanpa broker)"""
+
+    ARTIFACT_TYPES = ('qr', 'pdf', 'docx')
+    PUBLISHED_STATUSES = ('approved', 'completed')
+    # Artefak yang juga disimpan di field Letter
+    LETTER_FIELDS = {'qr': 'qr_code', 'pdf': 'pdf_file'}
+    CONTENT_TYPES = {
+        'qr': 'image/png',
+        'pdf': 'application/pdf',
+        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    }
+
+    @staticmethod
+    def config():
+        return {**DEFAULTS, **getattr(settings, 'LETTER_ARTIFACTS', {})}
+
+    @staticmethod
+    def content_hash(letter, artifact_type):
+        """Hash isi yang menentukan artefak; QR hanya bergantung pada URL verifikasi"""
+        if artifact_type == 'qr':
+            return generate_letter_hash(letter.public_url, '', letter.created_at)
+        return generate_letter_hash(f"{letter.subject}\n{letter.content}", letter.letter_number, letter.created_at)
+
+    @staticmethod
+    def enqueue(letter, artifact_types=('qr', 'pdf')):
+        """Jadwalkan render; job dengan hash sama dipakai ulang, job gagal dijadwalkan ulang"""
+        jobs = []
+        for artifact_type in artifact_types:
+            content_hash = LetterArtifactService.content_hash(letter, artifact_type)
+            lookup = {'letter': letter, 'artifact_type': artifact_type, 'content_hash': content_hash}
+            job = LetterArtifactJob.objects.filter(**lookup).first()
+            if job is None:
+                try:
+                    with transaction.atomic():
+                        job = LetterArtifactJob.objects.create(**lookup)
+                except IntegrityError:
+                    job = LetterArtifactJob.objects.get(**lookup)
+            elif job.status == 'failed':
+                LetterArtifactJob.objects.filter(pk=job.pk, status='failed').update(
+                    status='pending', attempts=0, last_error='', run_after=timezone.now()
+                )
+                job.refresh_from_db()
+            elif job.status == 'done' and job.output_file:
+                # Instance lama bisa menimpa field hasil worker; sambungkan lagi tanpa render ulang
+                field = LetterArtifactService.LETTER_FIELDS.get(artifact_type)
+                if field and not getattr(letter, field):
+                    setattr(letter, field, job.output_file.name)
+                    Letter.objects.filter(pk=letter.pk).update(**{field: job.output_file.name})
+            jobs.append(job)
+        return jobs
+
+    @staticmethod
+    def current_job(letter, artifact_type):
+        return LetterArtifactJob.objects.filter(
+            letter=letter,
+            artifact_type=artifact_type,
+            content_hash=LetterArtifactService.content_hash(letter, artifact_type),
+        ).first()
+
+    @staticmethod
+    def job_status(job):
+        return {
+            'id': job.id,
+            'artifact_type': job.artifact_type,
+            'status': job.status,
+            'attempts': job.attempts,
+            'error': job.last_error or None,
+            'url': job.output_file.url if job.status == 'done' and job.output_file else None,
+            'created_at': job.created_at.isoformat(),
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+    @staticmethod
+    def release_stale():
+        """Kembalikan job milik worker yang mati ke antrian; yang sudah MAX_ATTEMPTS kali ditandai gagal"""
+        config = LetterArtifactService.config()
+        now = timezone.now()
+        stale = LetterArtifactJob.objects.filter(
+            status='running', locked_at__lt=now - timedelta(seconds=config['STALE_AFTER'])
+        )
+        failed = stale.filter(attempts__gte=config['MAX_ATTEMPTS']).update(
+            status='failed', locked_by='', locked_at=None, finished_at=now,
+            last_error=f"Worker berhenti saat memproses job (percobaan ke-{config['MAX_ATTEMPTS']})",
+        )
+        return failed + stale.filter(attempts__lt=config['MAX_ATTEMPTS']).update(
+            status='pending', locked_by='', locked_at=None
+        )
+
+    @staticmethod
+    def claim(worker_id, limit=10):
+        """Ambil job siap jalan; UPDATE bersyarat memastikan satu job hanya diambil satu worker"""
+        now = timezone.now()
+        candidates = LetterArtifactJob.objects.filter(status='pending', run_after__lte=now).order_by(
+            'run_after', 'id'
+        ).values_list('pk', flat=True)[:limit]
+        claimed = []
+        for pk in list(candidates):
+            updated = LetterArtifactJob.objects.filter(pk=pk, status='pending').update(
+                status='running', locked_by=worker_id, locked_at=now, started_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if updated:
+                claimed.append(pk)
+        return list(LetterArtifactJob.objects.filter(pk__in=claimed).select_related('letter', 'letter__letter_type'))
+
+    @staticmethod
+    def render(job):
+        """Render artefak; return (nama file, bytes)"""
+        letter = job.letter
+        if job.artifact_type == 'qr':
+            return f"qr_{letter.public_url}.png", letter.build_qr_code().getvalue()
+        if job.artifact_type == 'pdf':
+            return f"letter_{letter.public_url}.pdf", letter.build_pdf().getvalue()
+        if job.artifact_type == 'docx':
+            from .services import LetterExportService
+            buffer = LetterExportService.export_to_docx(letter)
+            if buffer is None:
+                raise RuntimeError('Gagal membuat DOCX')
+            return f"letter_{letter.public_url}.docx", buffer.getvalue()
+        raise ValueError(f'Jenis artefak tidak dikenal: {job.artifact_type}')
+
+    @staticmethod
+    def run(job):
+        """Jalankan satu job yang sudah di-claim; return True bila berhasil"""
+        config = LetterArtifactService.config()
+        try:
+            filename, content = LetterArtifactService.render(job)
+            field = LetterArtifactService.LETTER_FIELDS.get(job.artifact_type)
+            if field:
+                # QR/PDF disimpan di field Letter; job menunjuk ke file yang sama
+                letter_file = getattr(job.letter, field)
+                letter_file.save(filename, ContentFile(content), save=False)
+                Letter.objects.filter(pk=job.letter_id).update(**{field: letter_file.name})
+                job.output_file.name = letter_file.name
+            else:
+                job.output_file.save(filename, ContentFile(content), save=False)
+        except Exception as e:
+            logger.error(f"Error rendering letter artifact job {job.pk}: {e}")
+            failed = job.attempts >= config['MAX_ATTEMPTS']
+            LetterArtifactJob.objects.filter(pk=job.pk).update(
+                status='failed' if failed else 'pending',
+                last_error=str(e)[:1000],
+                locked_by='',
+                locked_at=None,
+                run_after=timezone.now() + timedelta(seconds=config['RETRY_DELAY'] * job.attempts),
+                finished_at=timezone.now() if failed else None,
+            )
+            return False
+
+        LetterArtifactJob.objects.filter(pk=job.pk).update(
+            status='done',
+            output_file=job.output_file.name,
+            last_error='',
+            locked_by='',
+            locked_at=None,
+            finished_at=timezone.now(),
+        )
+        return True
+
+    @staticmethod
+    def run_pending(worker_id=None, limit=10):
+        """Satu putaran worker: lepas job basi, claim, render; return (berhasil, gagal)"""
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        LetterArtifactService.release_stale()
+        succeeded = failed = 0
+        for job in LetterArtifactService.claim(worker_id, limit):
+            if LetterArtifactService.run(job):
+                succeeded += 1
+            else:
+                failed += 1
+        return succeeded, failed
+
+    @staticmethod
+    def work(worker_id=None, limit=10, once=False, stop=None):
+        """Loop worker; berhenti bila `once` atau stop() bernilai True"""
+        poll_interval = LetterArtifactService.config()['POLL_INTERVAL']
+        totals = [0, 0]
+        while True:
+            succeeded, failed = LetterArtifactService.run_pending(worker_id, limit)
+            totals[0] += succeeded
+            totals[1] += failed
+            if once or (stop and stop()):
+                return tuple(totals)
+            if not succeeded and not failed:
+                time.sleep(poll_interval)
+
+    @staticmethod
+    def pending_count():
+        return LetterArtifactJob.objects.filter(
+            Q(status='pending') | Q(status='running')
+        ).count()
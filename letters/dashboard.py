@@ -0,0 +1,23 @@
+from django.db.models import Count, Q
+
+from core.aggregator import register, register_listing, week_ago
+from .models import Letter
+
+
+@register('letters')
+def letter_metrics():
+    stats = Letter.objects.aggregate(
+        total_letters=Count('pk'),
+        new_letters_this_week=Count('pk', filter=Q(created_at__gte=week_ago())),
+    )
+    return {
+        'statistics': {'total_letters': stats['total_letters']},
+        'recent_activities': {'new_letters_this_week': stats['new_letters_this_week']},
+    }
+
+
+register_listing(
+    'letters',
+    lambda: Letter.objects.all(),
+    ('id', 'letter_number', 'letter_type__name', 'applicant__name', 'subject', 'status', 'created_at'),
+)
@@ -0,0 +1,51 @@
+import signal
+
+from django.core.management.base import BaseCommand
+from letters.artifacts import LetterArtifactService
+
+
+class Command(BaseCommand):
+    help = 'Run the letter artifact worker (QR code, PDF and DOCX rendering jobs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process ready jobs once and exit instead of polling',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Number of jobs claimed per round',
+        )
+        parser.add_argument(
+            '--worker-id',
+            help='Worker name stored on claimed jobs (defaults to host:pid)',
+        )
+
+    def handle(self, *args, **options):
+        self._stopping = False
+
+        def request_stop(signum, frame):
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+
+        if not options['once']:
+            self.stdout.write('Letter artifact worker started, press Ctrl+C to stop...')
+        try:
+            succeeded, failed = LetterArtifactService.work(
+                worker_id=options['worker_id'],
+                limit=options['batch_size'],
+                once=options['once'],
+                stop=lambda: self._stopping,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write('Worker stopped')
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Processed {succeeded} artifact jobs ({failed} failed), '
+                               f'{LetterArtifactService.pending_count()} still queued')
+        )
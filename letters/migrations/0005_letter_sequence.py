@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_letter_sequences(apps, schema_editor):
+    """Lanjutkan counter lama agar nomor baru tidak bentrok dengan nomor yang sudah terbit"""
+    LetterType = apps.get_model('letters', 'LetterType')
+    LetterSequence = apps.get_model('letters', 'LetterSequence')
+    LetterSettings = apps.get_model('letters', 'LetterSettings')
+    Letter = apps.get_model('letters', 'Letter')
+
+    today = timezone.localdate()
+    settings = LetterSettings.objects.filter(is_active=True).first()
+    sequences = []
+    for letter_type in LetterType.objects.all():
+        if settings:
+            year = today.year if settings.reset_counter_yearly else 0
+            month = 0
+            last_number = settings.current_year_counter
+        else:
+            year, month = today.year, today.month
+            last_number = Letter.objects.filter(
+                letter_type=letter_type,
+                created_at__year=today.year,
+                created_at__month=today.month,
+            ).count()
+        if last_number:
+            sequences.append(LetterSequence(
+                letter_type=letter_type, year=year, month=month, last_number=last_number
+            ))
+    LetterSequence.objects.bulk_create(sequences)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('letters', '0004_alter_apikeysettings_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LetterSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(default=0, verbose_name='Tahun')),
+                ('month', models.PositiveSmallIntegerField(default=0, verbose_name='Bulan')),
+                ('last_number', models.PositiveIntegerField(default=0, verbose_name='Nomor Terakhir')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('letter_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sequences', to='letters.lettertype', verbose_name='Jenis Surat')),
+            ],
+            options={
+                'verbose_name': 'Urutan Nomor Surat',
+                'verbose_name_plural': 'Urutan Nomor Surat',
+                'ordering': ['-year', '-month', 'letter_type'],
+                'unique_together': {('letter_type', 'year', 'month')},
+            },
+        ),
+        migrations.RunPython(seed_letter_sequences, migrations.RunPython.noop),
+    ]
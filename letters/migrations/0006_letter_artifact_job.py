@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('letters', '0005_letter_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LetterArtifactJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('artifact_type', models.CharField(choices=[('qr', 'QR Code'), ('pdf', 'PDF'), ('docx', 'DOCX')], max_length=10, verbose_name='Jenis Artefak')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Hash Konten')),
+                ('status', models.CharField(choices=[('pending', 'Menunggu'), ('running', 'Diproses'), ('done', 'Selesai'), ('failed', 'Gagal')], default='pending', max_length=10, verbose_name='Status')),
+                ('output_file', models.FileField(blank=True, null=True, upload_to='letter_artifacts/', verbose_name='File Hasil')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Percobaan')),
+                ('last_error', models.TextField(blank=True, verbose_name='Error Terakhir')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Jalankan Setelah')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('letter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifact_jobs', to='letters.letter', verbose_name='Surat')),
+            ],
+            options={
+                'verbose_name': 'Job Artefak Surat',
+                'verbose_name_plural': 'Job Artefak Surat',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='letters_let_status_7e9bad_idx')],
+                'unique_together': {('letter', 'artifact_type', 'content_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('letters', '0006_letter_artifact_job'),
+        ('references', '0006_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='letter',
+            index=models.Index(fields=['status', 'created_at'], name='letters_status_created_idx'),
+        ),
+    ]
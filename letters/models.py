@@ -52,6 +52,31 @@ class LetterType(models.Model):
         return f"{self.code} - {self.name}"
 
 
+class LetterSequence(models.Model):
+    """Counter nomor surat per jenis surat dan periode (dikelola LetterNumberAllocator)"""
+    letter_type = models.ForeignKey(
+        LetterType,
+        on_delete=models.CASCADE,
+        related_name='sequences',
+        verbose_name='Jenis Surat'
+    )
+    # year = 0 berarti counter tidak pernah direset; month = 0 berarti counter tahunan
+    year = models.PositiveSmallIntegerField(default=0, verbose_name='Tahun')
+    month = models.PositiveSmallIntegerField(default=0, verbose_name='Bulan')
+    last_number = models.PositiveIntegerField(default=0, verbose_name='Nomor Terakhir')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Urutan Nomor Surat'
+        verbose_name_plural = 'Urutan Nomor Surat'
+        unique_together = ['letter_type', 'year', 'month']
+        ordering = ['-year', '-month', 'letter_type']
+
+    def __str__(self):
+        period = f"{self.month:02d}/{self.year}" if self.month else (str(self.year) if self.year else 'tanpa reset')
+        return f"{self.letter_type.code} {period}: {self.last_number}"
+
+
 class Letter(models.Model):
     """Model untuk surat"""
     STATUS_CHOICES = [
@@ -215,35 +240,18 @@ class Letter(models.Model):
         verbose_name = 'Surat'
         verbose_name_plural = 'Surat'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='letters_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.letter_number or 'Draft'} - {self.subject}"
 
     def save(self, *args, **kwargs):
-        # Generate letter number using LetterSettings
+        # Nomor surat dialokasikan atomik per (jenis surat, periode)
         if not self.letter_number and self.status != 'draft':
-            try:
-                letter_settings = LetterSettings.objects.filter(is_active=True).first()
-                if letter_settings:
-                    self.letter_number = letter_settings.get_next_letter_number(self.letter_type.code)
-                else:
-                    # Fallback to old method
-                    year = timezone.now().year
-                    month = timezone.now().month
-                    count = Letter.objects.filter(
-                        created_at__year=year,
-                        created_at__month=month
-                    ).count() + 1
-                    self.letter_number = f"{self.letter_type.code}/{count:03d}/{month:02d}/{year}"
-            except:
-                # Fallback to old method if LetterSettings not available
-                year = timezone.now().year
-                month = timezone.now().month
-                count = Letter.objects.filter(
-                    created_at__year=year,
-                    created_at__month=month
-                ).count() + 1
-                self.letter_number = f"{self.letter_type.code}/{count:03d}/{month:02d}/{year}"
+            from .sequences import LetterNumberAllocator
+            self.letter_number = LetterNumberAllocator.next_number(self.letter_type)
         
         # Generate public URL if not exists
         if not self.public_url:
@@ -257,41 +265,42 @@ class Letter(models.Model):
         
         super().save(*args, **kwargs)
         
-        # Generate QR code after saving (when we have an ID)
-        if self.pk and not self.qr_code:
-            self.generate_qr_code()
+        # QR code dan PDF dirender worker (process_letter_artifacts), bukan di request
+        if not kwargs.get('update_fields'):
+            from .artifacts import LetterArtifactService
+            artifact_types = [] if self.qr_code else ['qr']
+            if self.status in LetterArtifactService.PUBLISHED_STATUSES:
+                # Dedupe per hash konten: PDF hanya dirender ulang bila isi surat berubah
+                artifact_types.append('pdf')
+            if artifact_types:
+                LetterArtifactService.enqueue(self, artifact_types)
+    
+    def build_qr_code(self):
+        """Render QR code verifikasi ke BytesIO (PNG)"""
+        import qrcode
+        from io import BytesIO
+        
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+        )
+        qr.add_data(self.get_verification_url())
+        qr.make(fit=True)
+        
+        buffer = BytesIO()
+        qr.make_image(fill_color="black", back_color="white").save(buffer, format='PNG')
+        buffer.seek(0)
+        return buffer
     
     def generate_qr_code(self):
         """Generate QR code for letter verification"""
         try:
-            import qrcode
-            from io import BytesIO
             from django.core.files import File
             
-            # Create verification URL
-            verification_url = f"https://pulosarok.desa.id/verify/{self.public_url}"
-            
-            # Generate QR code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(verification_url)
-            qr.make(fit=True)
-            
-            # Create QR code image
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-            
-            # Save to BytesIO
-            buffer = BytesIO()
-            qr_img.save(buffer, format='PNG')
-            buffer.seek(0)
-            
-            # Save to model
             filename = f"qr_{self.public_url}.png"
-            self.qr_code.save(filename, File(buffer), save=False)
+            self.qr_code.save(filename, File(self.build_qr_code()), save=False)
             self.save(update_fields=['qr_code'])
             
         except ImportError:
@@ -299,70 +308,74 @@ class Letter(models.Model):
         except Exception as e:
             pass  # Handle any other errors silently
     
+    def build_pdf(self):
+        """Render PDF surat ke BytesIO"""
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import A4
+        from io import BytesIO
+        
+        buffer = BytesIO()
+        p = canvas.Canvas(buffer, pagesize=A4)
+        
+        # Get letter settings for header
+        letter_settings = LetterSettings.objects.filter(is_active=True).first()
+        
+        # Add content to PDF
+        y_position = 750
+        
+        if letter_settings:
+            # Header
+            p.setFont("Helvetica-Bold", 16)
+            p.drawString(100, y_position, letter_settings.village_name)
+            y_position -= 20
+            p.setFont("Helvetica", 12)
+            p.drawString(100, y_position, letter_settings.village_address)
+            y_position -= 40
+        
+        # Letter number and date
+        p.setFont("Helvetica", 12)
+        p.drawString(100, y_position, f"Nomor: {self.letter_number or 'Draft'}")
+        y_position -= 20
+        p.drawString(100, y_position, f"Tanggal: {self.created_at.strftime('%d %B %Y')}")
+        y_position -= 40
+        
+        # Subject
+        p.setFont("Helvetica-Bold", 14)
+        p.drawString(100, y_position, f"Perihal: {self.subject}")
+        y_position -= 40
+        
+        # Content
+        p.setFont("Helvetica", 12)
+        # Simple text wrapping
+        lines = self.content.split('\n')
+        for line in lines:
+            if y_position < 100:  # Start new page if needed
+                p.showPage()
+                y_position = 750
+            p.drawString(100, y_position, line[:80])  # Limit line length
+            y_position -= 15
+        
+        # Signature area
+        if letter_settings and y_position > 150:
+            y_position -= 40
+            p.drawString(400, y_position, f"{letter_settings.village_name}")
+            y_position -= 20
+            p.drawString(400, y_position, f"Kepala Desa")
+            y_position -= 60
+            p.drawString(400, y_position, f"{letter_settings.head_of_village_name}")
+        
+        p.save()
+        buffer.seek(0)
+        return buffer
+    
     def generate_pdf(self):
         """Generate PDF version of the letter"""
         try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import A4
-            from io import BytesIO
             from django.core.files import File
             
-            buffer = BytesIO()
-            p = canvas.Canvas(buffer, pagesize=A4)
-            
-            # Get letter settings for header
-            letter_settings = LetterSettings.objects.filter(is_active=True).first()
-            
-            # Add content to PDF
-            y_position = 750
-            
-            if letter_settings:
-                # Header
-                p.setFont("Helvetica-Bold", 16)
-                p.drawString(100, y_position, letter_settings.village_name)
-                y_position -= 20
-                p.setFont("Helvetica", 12)
-                p.drawString(100, y_position, letter_settings.village_address)
-                y_position -= 40
-            
-            # Letter number and date
-            p.setFont("Helvetica", 12)
-            p.drawString(100, y_position, f"Nomor: {self.letter_number or 'Draft'}")
-            y_position -= 20
-            p.drawString(100, y_position, f"Tanggal: {self.created_at.strftime('%d %B %Y')}")
-            y_position -= 40
-            
-            # Subject
-            p.setFont("Helvetica-Bold", 14)
-            p.drawString(100, y_position, f"Perihal: {self.subject}")
-            y_position -= 40
-            
-            # Content
-            p.setFont("Helvetica", 12)
-            # Simple text wrapping
-            lines = self.content.split('\n')
-            for line in lines:
-                if y_position < 100:  # Start new page if needed
-                    p.showPage()
-                    y_position = 750
-                p.drawString(100, y_position, line[:80])  # Limit line length
-                y_position -= 15
-            
-            # Signature area
-            if letter_settings and y_position > 150:
-                y_position -= 40
-                p.drawString(400, y_position, f"{letter_settings.village_name}")
-                y_position -= 20
-                p.drawString(400, y_position, f"Kepala Desa")
-                y_position -= 60
-                p.drawString(400, y_position, f"{letter_settings.head_of_village_name}")
-            
-            p.save()
-            buffer.seek(0)
-            
             # Save PDF file
             filename = f"letter_{self.public_url}.pdf"
-            self.pdf_file.save(filename, File(buffer), save=False)
+            self.pdf_file.save(filename, File(self.build_pdf()), save=False)
             self.save(update_fields=['pdf_file'])
             
             return True
@@ -586,6 +599,71 @@ class LetterTracking(models.Model):
         return f"{self.letter.subject} - {self.get_action_display()}"
 
 
+class LetterArtifactJob(models.Model):
+    """Antrian job render artefak surat (QR, PDF, DOCX) yang diproses worker"""
+    ARTIFACT_CHOICES = [
+        ('qr', 'QR Code'),
+        ('pdf', 'PDF'),
+        ('docx', 'DOCX'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Menunggu'),
+        ('running', 'Diproses'),
+        ('done', 'Selesai'),
+        ('failed', 'Gagal'),
+    ]
+
+    letter = models.ForeignKey(
+        Letter,
+        on_delete=models.CASCADE,
+        related_name='artifact_jobs',
+        verbose_name='Surat'
+    )
+    artifact_type = models.CharField(
+        max_length=10,
+        choices=ARTIFACT_CHOICES,
+        verbose_name='Jenis Artefak'
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        verbose_name='Hash Konten'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='Status'
+    )
+    output_file = models.FileField(
+        upload_to='letter_artifacts/',
+        blank=True,
+        null=True,
+        verbose_name='File Hasil'
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Percobaan')
+    last_error = models.TextField(blank=True, verbose_name='Error Terakhir')
+    run_after = models.DateTimeField(default=timezone.now, verbose_name='Jalankan Setelah')
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+    locked_at = models.DateTimeField(blank=True, null=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Job Artefak Surat'
+        verbose_name_plural = 'Job Artefak Surat'
+        ordering = ['-created_at']
+        unique_together = ['letter', 'artifact_type', 'content_hash']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f"{self.letter_id} {self.artifact_type} ({self.status})"
+
+
 class APIKeySettings(models.Model):
     """Model untuk menyimpan API key Gemini dan konfigurasi AI"""
     service_name = models.CharField(
@@ -865,25 +943,9 @@ class LetterSettings(models.Model):
 
     def get_next_letter_number(self, letter_type_code):
         """Generate next letter number"""
-        from django.utils import timezone
-        now = timezone.now()
-        
-        if self.reset_counter_yearly:
-            # Reset counter if new year
-            current_year = now.year
-            if not hasattr(self, '_last_year') or self._last_year != current_year:
-                self.current_year_counter = 0
-                self._last_year = current_year
-        
-        self.current_year_counter += 1
-        self.save()
-        
-        return self.letter_number_format.format(
-            code=letter_type_code,
-            number=self.current_year_counter,
-            month=now.month,
-            year=now.year
-        )
+        from .sequences import LetterNumberAllocator
+        letter_type = LetterType.objects.get(code=letter_type_code)
+        return LetterNumberAllocator.next_number(letter_type, settings=self)
 
 
 class LetterTemplate(models.Model):
@@ -951,22 +1013,27 @@ class LetterTemplate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_template_type_display()})"
 
-    def increment_usage(self):
+    def increment_usage(self, count=1):
         """Increment usage counter"""
-        self.usage_count += 1
-        self.save()
+        # UPDATE atomik tanpa menyentuh updated_at (kunci cache template)
+        LetterTemplate.objects.filter(pk=self.pk).update(usage_count=models.F('usage_count') + count)
+        self.usage_count += count
+
+    def get_compiled(self, field='content_template'):
+        from .template_engine import get_compiled
+        return get_compiled(self, field)
 
     def render_content(self, context):
         """Render template with context variables"""
-        import re
-        content = self.content_template
-        
-        # Replace {{variable}} with context values
-        for key, value in context.items():
-            pattern = r'\{\{\s*' + re.escape(key) + r'\s*\}\}'
-            content = re.sub(pattern, str(value), content)
-        
-        return content
+        return self.get_compiled().render(context)
+
+    def render_batch(self, contexts, record_usage=True):
+        """Render banyak surat dari satu template; penggunaan dicatat dengan satu UPDATE"""
+        contexts = list(contexts)
+        contents = self.get_compiled().render_many(contexts)
+        if record_usage and contents:
+            self.increment_usage(len(contents))
+        return contents
 
 
 class LetterAIValidation(models.Model):
@@ -0,0 +1,9 @@
+from core.search import register
+from .models import Letter
+
+register(
+    Letter, 'letter', 'letters',
+    title='subject',
+    fields=('letter_number', 'letter_type__name', 'applicant__name', 'applicant__nik', 'content'),
+    subtitle='letter_number',
+)
@@ -0,0 +1,125 @@
+import logging
+import random
+import time
+
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Letter, LetterSequence, LetterSettings
+
+logger = logging.getLogger(__name__)
+
+
+class LetterNumberAllocator:
+    """Alokasi nomor surat tanpa race condition.
+
+    Setiap (jenis surat, periode) punya satu baris LetterSequence yang dinaikkan
+    dengan UPDATE ... SET last_number = last_number + n. UPDATE mengunci baris
+    sampai transaksi selesai sehingga dua worker tidak pernah mendapat nomor sama.
+    """
+
+    DEFAULT_FORMAT = '{code}/{number:03d}/{month:02d}/{year}'
+    MAX_RETRIES = 10
+    # Batas nomor lama (sebelum tabel sequence) yang dilewati saat bentrok
+    MAX_SKIPS = 50
+
+    @staticmethod
+    def get_settings():
+        return LetterSettings.objects.filter(is_active=True).only(
+            'letter_number_format', 'reset_counter_yearly'
+        ).first()
+
+    @staticmethod
+    def period_for(on_date, settings=None):
+        """(year, month) baris sequence: tahunan, tanpa reset, atau bulanan bila belum ada pengaturan"""
+        if settings is None:
+            return on_date.year, on_date.month
+        if settings.reset_counter_yearly:
+            return on_date.year, 0
+        return 0, 0
+
+    @staticmethod
+    def allocate(letter_type, count=1, year=0, month=0):
+        """Ambil blok `count` nomor berurutan; return range nomor yang dialokasikan"""
+        if count < 1:
+            raise ValueError('count must be at least 1')
+
+        sequences = LetterSequence.objects.filter(letter_type=letter_type, year=year, month=month)
+        for attempt in range(LetterNumberAllocator.MAX_RETRIES):
+            try:
+                with transaction.atomic():
+                    updated = sequences.update(last_number=F('last_number') + count, updated_at=timezone.now())
+                    if not updated:
+                        LetterSequence.objects.create(
+                            letter_type=letter_type, year=year, month=month, last_number=count
+                        )
+                        last_number = count
+                    else:
+                        last_number = sequences.values_list('last_number', flat=True).get()
+                return range(last_number - count + 1, last_number + 1)
+            except IntegrityError:
+                # Worker lain membuat baris sequence lebih dulu; ulangi dengan UPDATE
+                continue
+            except OperationalError as e:
+                # SQLite: "database is locked" saat writer lain memegang lock
+                if 'locked' not in str(e) or attempt == LetterNumberAllocator.MAX_RETRIES - 1:
+                    raise
+                time.sleep(min(0.5, 0.01 * (2 ** attempt)) * (1 + random.random()))
+        raise OperationalError(f'Gagal mengalokasikan nomor surat untuk {letter_type.code}')
+
+    @staticmethod
+    def format_number(number, letter_type, on_date, settings=None):
+        number_format = settings.letter_number_format if settings else LetterNumberAllocator.DEFAULT_FORMAT
+        values = {'code': letter_type.code, 'number': number, 'month': on_date.month, 'year': on_date.year}
+        try:
+            return number_format.format(**values)
+        except (KeyError, IndexError, ValueError):
+            logger.error(f"Invalid letter number format: {number_format}")
+            return LetterNumberAllocator.DEFAULT_FORMAT.format(**values)
+
+    @staticmethod
+    def issue(letter_type, count=1, on_date=None, settings=None):
+        """Alokasikan dan format `count` nomor surat; nomor lama yang sudah terpakai dilewati"""
+        on_date = on_date or timezone.localdate()
+        if settings is None:
+            settings = LetterNumberAllocator.get_settings()
+        year, month = LetterNumberAllocator.period_for(on_date, settings)
+
+        issued = []
+        skipped = 0
+        while len(issued) < count:
+            numbers = LetterNumberAllocator.allocate(letter_type, count - len(issued), year, month)
+            candidates = [
+                LetterNumberAllocator.format_number(number, letter_type, on_date, settings)
+                for number in numbers
+            ]
+            taken = set(Letter.objects.filter(letter_number__in=candidates).values_list('letter_number', flat=True))
+            issued.extend(candidate for candidate in candidates if candidate not in taken)
+            skipped += len(taken)
+            if skipped > LetterNumberAllocator.MAX_SKIPS:
+                raise IntegrityError(f'Terlalu banyak nomor surat {letter_type.code} yang sudah terpakai')
+        return issued
+
+    @staticmethod
+    def next_number(letter_type, on_date=None, settings=None):
+        return LetterNumberAllocator.issue(letter_type, 1, on_date, settings)[0]
+
+    @staticmethod
+    def assign_block(letters, on_date=None):
+        """Beri nomor ke banyak surat sekaligus: satu alokasi blok per jenis surat + satu bulk_update"""
+        settings = LetterNumberAllocator.get_settings()
+        by_type = {}
+        for letter in letters:
+            if not letter.letter_number:
+                by_type.setdefault(letter.letter_type_id, []).append(letter)
+
+        numbered = []
+        with transaction.atomic():
+            for group in by_type.values():
+                numbers = LetterNumberAllocator.issue(group[0].letter_type, len(group), on_date, settings)
+                for letter, number in zip(group, numbers):
+                    letter.letter_number = number
+                    numbered.append(letter)
+            Letter.objects.bulk_update(numbered, ['letter_number'], batch_size=500)
+        return numbered
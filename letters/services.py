@@ -929,23 +929,18 @@ class LetterNumberingService:
     @staticmethod
     def generate_letter_number(letter_type_code, settings=None):
         """Generate letter number based on settings"""
-        from .models import LetterSettings
-        from datetime import datetime
+        from .models import LetterType
+        from .sequences import LetterNumberAllocator
         
-        if not settings:
-            settings = LetterSettings.objects.filter(is_active=True).first()
-        
-        if not settings:
-            # Fallback to default format
-            now = datetime.now()
-            count = Letter.objects.filter(
-                letter_type__code=letter_type_code,
-                created_at__year=now.year,
-                created_at__month=now.month
-            ).count() + 1
-            return f"{letter_type_code}/{count:03d}/{now.month:02d}/{now.year}"
+        letter_type = LetterType.objects.get(code=letter_type_code)
+        return LetterNumberAllocator.next_number(letter_type, settings=settings)
+    
+    @staticmethod
+    def generate_number(letter):
+        """Generate letter number for a letter instance"""
+        from .sequences import LetterNumberAllocator
         
-        return settings.get_next_letter_number(letter_type_code)
+        return LetterNumberAllocator.next_number(letter.letter_type)
 
 
 class LetterExportService:
@@ -0,0 +1,62 @@
+import re
+import threading
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([^{}]+?)\s*\}\}')
+
+
+class CompiledTemplate:
+    """Template {{variable}} yang sudah di-parse menjadi segmen literal dan nama variabel.
+
+    Render cukup satu kali join tanpa regex.
+    """
+
+    __slots__ = ('literals', 'keys', 'placeholders', 'variables')
+
+    def __init__(self, source):
+        parts = PLACEHOLDER_PATTERN.split(source or '')
+        self.literals = parts[0::2]
+        self.keys = parts[1::2]
+        # Teks placeholder asli dipertahankan untuk variabel yang tidak ada di context
+        self.placeholders = [match.group(0) for match in PLACEHOLDER_PATTERN.finditer(source or '')]
+        self.variables = tuple(dict.fromkeys(self.keys))
+
+    def render(self, context):
+        output = [self.literals[0]]
+        for key, placeholder, literal in zip(self.keys, self.placeholders, self.literals[1:]):
+            output.append(str(context[key]) if key in context else placeholder)
+            output.append(literal)
+        return ''.join(output)
+
+    def render_many(self, contexts):
+        return [self.render(context) for context in contexts]
+
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+def compile_template(source):
+    return CompiledTemplate(source)
+
+
+def get_compiled(template, field='content_template'):
+    """CompiledTemplate untuk field LetterTemplate, di-cache per (id, field) dan updated_at"""
+    if template.pk is None:
+        return CompiledTemplate(getattr(template, field))
+    key = (template.pk, field)
+    cached = _compiled.get(key)
+    if cached is not None and cached[0] == template.updated_at:
+        return cached[1]
+    compiled = CompiledTemplate(getattr(template, field))
+    with _lock:
+        _compiled[key] = (template.updated_at, compiled)
+    return compiled
+
+
+def clear_cache(template_id=None):
+    with _lock:
+        if template_id is None:
+            _compiled.clear()
+        else:
+            for key in [key for key in _compiled if key[0] == template_id]:
+                del _compiled[key]
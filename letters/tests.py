@@ -1,3 +1,193 @@
-from django.test import TestCase
+import threading
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .artifacts import LetterArtifactService
+from .models import Letter, LetterArtifactJob, LetterType, LetterSequence, LetterTemplate
+from .sequences import LetterNumberAllocator
+from .template_engine import CompiledTemplate
+
+
+class LetterNumberAllocatorTest(TestCase):
+    def setUp(self):
+        self.letter_type = LetterType.objects.create(name='Surat Keterangan Domisili', code='SKD')
+
+    def test_numbers_are_sequential_per_period(self):
+        first = LetterNumberAllocator.next_number(self.letter_type, on_date=date(2025, 3, 10))
+        second = LetterNumberAllocator.next_number(self.letter_type, on_date=date(2025, 3, 11))
+        next_month = LetterNumberAllocator.next_number(self.letter_type, on_date=date(2025, 4, 1))
+
+        self.assertEqual(first, 'SKD/001/03/2025')
+        self.assertEqual(second, 'SKD/002/03/2025')
+        # Tanpa LetterSettings counter direset per bulan
+        self.assertEqual(next_month, 'SKD/001/04/2025')
+
+    def test_block_allocation_is_contiguous(self):
+        block = LetterNumberAllocator.allocate(self.letter_type, 50, 2025, 0)
+        following = LetterNumberAllocator.allocate(self.letter_type, 1, 2025, 0)
+
+        self.assertEqual(list(block), list(range(1, 51)))
+        self.assertEqual(list(following), [51])
+        self.assertEqual(LetterSequence.objects.get(letter_type=self.letter_type, year=2025).last_number, 51)
+
+
+class LetterNumberAllocatorConcurrencyTest(TransactionTestCase):
+    """Stress test: banyak thread (koneksi database terpisah) meminta nomor bersamaan"""
+
+    THREADS = 8
+    NUMBERS_PER_THREAD = 25
+
+    def setUp(self):
+        self.letter_type = LetterType.objects.create(name='Surat Pengantar', code='SP')
+
+    def _worker(self, barrier, results, errors, block_size):
+        try:
+            barrier.wait()
+            allocated = []
+            while len(allocated) < self.NUMBERS_PER_THREAD:
+                allocated.extend(LetterNumberAllocator.allocate(self.letter_type, block_size, 2025, 0))
+            results.append(allocated)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def _run(self, block_size):
+        barrier = threading.Barrier(self.THREADS)
+        results, errors = [], []
+        threads = [
+            threading.Thread(target=self._worker, args=(barrier, results, errors, block_size))
+            for _ in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        return [number for allocated in results for number in allocated]
+
+    def test_concurrent_single_allocation_has_no_duplicates_or_gaps(self):
+        numbers = self._run(block_size=1)
+        total = self.THREADS * self.NUMBERS_PER_THREAD
+
+        self.assertEqual(len(numbers), total)
+        self.assertEqual(sorted(numbers), list(range(1, total + 1)))
+
+    def test_concurrent_block_allocation_has_no_duplicates(self):
+        numbers = self._run(block_size=5)
+
+        self.assertEqual(len(numbers), len(set(numbers)))
+        self.assertEqual(
+            LetterSequence.objects.get(letter_type=self.letter_type, year=2025, month=0).last_number,
+            max(numbers),
+        )
+
+
+class LetterTemplateRenderTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user('operator', password='x')
+        self.template = LetterTemplate.objects.create(
+            name='Domisili',
+            template_type='certificate',
+            content_template='Nama: {{ nama }}, Dusun: {{dusun}}, NIK: {{nik}}',
+            created_by=user,
+        )
+
+    def test_missing_variables_keep_placeholder(self):
+        compiled = CompiledTemplate('Halo {{ nama }}, {{ jabatan }}')
+
+        self.assertEqual(compiled.variables, ('nama', 'jabatan'))
+        self.assertEqual(compiled.render({'nama': 'Budi'}), 'Halo Budi, {{ jabatan }}')
+
+    def test_render_batch_records_usage_once(self):
+        contexts = [{'nama': f'Warga {i}', 'dusun': 'Lhok', 'nik': i} for i in range(3)]
+
+        contents = self.template.render_batch(contexts)
+
+        self.assertEqual(contents[2], 'Nama: Warga 2, Dusun: Lhok, NIK: 2')
+        self.template.refresh_from_db()
+        self.assertEqual(self.template.usage_count, 3)
+
+    def test_cache_follows_updated_at(self):
+        self.assertEqual(self.template.render_content({'nama': 'A'}), 'Nama: A, Dusun: {{dusun}}, NIK: {{nik}}')
+        self.template.content_template = 'Kepada {{nama}}'
+        self.template.save()
+
+        self.assertEqual(self.template.render_content({'nama': 'A'}), 'Kepada A')
+
+
+@override_settings(LETTER_ARTIFACTS={'MAX_ATTEMPTS': 2, 'RETRY_DELAY': 30, 'STALE_AFTER': 600})
+class LetterArtifactQueueTest(TestCase):
+    def setUp(self):
+        from references.models import Dusun, Penduduk
+
+        applicant = Penduduk.objects.create(
+            nik='1102010101900001', name='Pemohon', gender='L', birth_place='Sarok', birth_date=date(1990, 1, 1),
+            religion='Islam', marital_status='KAWIN', dusun=Dusun.objects.create(name='Dusun A'), address='-',
+        )
+        # Surat draft menjadwalkan job QR saat disimpan
+        self.letter = Letter.objects.create(
+            letter_type=LetterType.objects.create(name='Surat Keterangan Domisili', code='SKD'),
+            applicant=applicant, subject='Domisili', content='Isi surat', purpose='-',
+            created_by=get_user_model().objects.create_user('operator', 'operator@example.com', 'x'),
+        )
+        self.job = LetterArtifactJob.objects.get(letter=self.letter, artifact_type='qr')
+
+    def test_enqueue_reuses_the_job_for_the_same_hash(self):
+        self.assertEqual(LetterArtifactService.enqueue(self.letter, ['qr'])[0].pk, self.job.pk)
+        first_pdf = LetterArtifactService.enqueue(self.letter, ['pdf'])[0]
+        self.assertEqual(LetterArtifactService.enqueue(self.letter, ['pdf'])[0].pk, first_pdf.pk)
+
+        self.letter.content = 'Isi surat yang diubah'
+        self.assertNotEqual(LetterArtifactService.enqueue(self.letter, ['pdf'])[0].pk, first_pdf.pk)
+        self.assertEqual(LetterArtifactJob.objects.filter(letter=self.letter, artifact_type='pdf').count(), 2)
+
+    def test_claim_is_exclusive(self):
+        claimed = LetterArtifactService.claim('worker-a')
+
+        self.assertEqual([job.pk for job in claimed], [self.job.pk])
+        self.assertEqual((claimed[0].status, claimed[0].attempts, claimed[0].locked_by), ('running', 1, 'worker-a'))
+        self.assertEqual(LetterArtifactService.claim('worker-b'), [])
+
+    def test_failed_render_backs_off_until_max_attempts(self):
+        with mock.patch.object(LetterArtifactService, 'render', side_effect=RuntimeError('printer rusak')):
+            self.assertFalse(LetterArtifactService.run(LetterArtifactService.claim('worker-a')[0]))
+            self.job.refresh_from_db()
+            self.assertEqual((self.job.status, self.job.last_error), ('pending', 'printer rusak'))
+            self.assertGreater(self.job.run_after, timezone.now() + timedelta(seconds=25))
+            # Belum waktunya dicoba ulang
+            self.assertEqual(LetterArtifactService.claim('worker-a'), [])
+
+            LetterArtifactJob.objects.filter(pk=self.job.pk).update(run_after=timezone.now())
+            self.assertFalse(LetterArtifactService.run(LetterArtifactService.claim('worker-a')[0]))
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.attempts), ('failed', 2))
+        self.assertIsNotNone(self.job.finished_at)
+        LetterArtifactJob.objects.filter(pk=self.job.pk).update(run_after=timezone.now())
+        self.assertEqual(LetterArtifactService.claim('worker-a'), [])
+
+    def test_release_stale_requeues_or_fails_after_max_attempts(self):
+        retry = self.job
+        exhausted = LetterArtifactService.enqueue(self.letter, ['pdf'])[0]
+        fresh = LetterArtifactService.enqueue(self.letter, ['docx'])[0]
+        long_ago = timezone.now() - timedelta(seconds=900)
+        LetterArtifactJob.objects.filter(pk=retry.pk).update(status='running', attempts=1, locked_at=long_ago)
+        LetterArtifactJob.objects.filter(pk=exhausted.pk).update(status='running', attempts=2, locked_at=long_ago)
+        LetterArtifactJob.objects.filter(pk=fresh.pk).update(status='running', attempts=1, locked_at=timezone.now())
+
+        self.assertEqual(LetterArtifactService.release_stale(), 2)
+
+        for job in (retry, exhausted, fresh):
+            job.refresh_from_db()
+        self.assertEqual((retry.status, retry.locked_at, retry.finished_at), ('pending', None, None))
+        self.assertEqual(exhausted.status, 'failed')
+        self.assertIsNotNone(exhausted.finished_at)
+        self.assertTrue(exhausted.last_error)
+        self.assertEqual(fresh.status, 'running')
@@ -39,6 +39,7 @@ urlpatterns = [
     path('letters/<int:pk>/', views.letter_detail_api, name='letter_detail_api'),
     path('letters/<int:pk>/update/', views.letter_update_api, name='letter_update_api'),
     path('letters/<int:pk>/delete/', views.letter_delete_api, name='letter_delete_api'),
+    path('letters/<int:pk>/artifacts/', views.letter_artifacts_api, name='letter_artifacts_api'),
     
     # AI Integration APIs
     path('letters/<int:pk>/ai/validate/', views.letter_ai_validate_api, name='letter_ai_validate_api'),
@@ -52,6 +53,7 @@ urlpatterns = [
     
     # Template Management APIs
     path('templates/', views.letter_templates_api, name='letter_templates_api'),
+    path('templates/<int:pk>/render/', views.letter_template_render_api, name='letter_template_render_api'),
     path('letters/<int:pk>/template/apply/', views.letter_apply_template_api, name='letter_apply_template_api'),
     
     # Letter Recipient API
@@ -19,7 +19,9 @@ from .models import (
     LetterDigitalSignature
 )
 from references.models import Penduduk
+from references.autocomplete import search_residents
 from .forms import LetterForm
+from .artifacts import LetterArtifactService
 from .services import (
     GeminiAIService, LetterValidationService, 
     LetterNumberingService, LetterExportService
@@ -258,27 +260,45 @@ def letter_delete(request, letter_id):
     })
 
 # Export Views
+def _letter_artifact_response(request, letter, artifact_type, action, description):
+    """Kirim artefak yang sudah dirender worker, atau jadwalkan render dan kembali segera"""
+    job = LetterArtifactService.enqueue(letter, [artifact_type])[0]
+    
+    if job.status == 'done' and job.output_file:
+        LetterTracking.objects.create(
+            letter=letter,
+            action=action,
+            description=description,
+            performed_by=request.user
+        )
+        filename = (letter.letter_number or 'surat').replace('/', '-')
+        return FileResponse(
+            job.output_file.open('rb'),
+            as_attachment=True,
+            filename=f'{filename}.{"png" if artifact_type == "qr" else artifact_type}',
+            content_type=LetterArtifactService.CONTENT_TYPES[artifact_type]
+        )
+    
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest' or 'application/json' in request.headers.get('accept', ''):
+        return JsonResponse({
+            'success': job.status != 'failed',
+            'message': 'File sedang diproses, coba lagi beberapa saat',
+            'data': LetterArtifactService.job_status(job)
+        }, status=202)
+    
+    if job.status == 'failed':
+        messages.error(request, f'Gagal membuat file {artifact_type.upper()}: {job.last_error}')
+    else:
+        messages.info(request, f'File {artifact_type.upper()} sedang diproses, silakan unduh kembali beberapa saat lagi.')
+    return redirect('letters:detail', letter_id=letter.id)
+
 @login_required
 def letter_export_pdf(request, letter_id):
     """Export letter to PDF"""
     letter = get_object_or_404(Letter, id=letter_id)
     
     try:
-        export_service = LetterExportService()
-        pdf_buffer = export_service.export_to_pdf(letter)
-        
-        response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{letter.letter_number or "surat"}.pdf"'
-        
-        # Add tracking entry
-        LetterTracking.objects.create(
-            letter=letter,
-            action='exported_pdf',
-            description='Surat diekspor ke PDF',
-            performed_by=request.user
-        )
-        
-        return response
+        return _letter_artifact_response(request, letter, 'pdf', 'exported_pdf', 'Surat diekspor ke PDF')
         
     except Exception as e:
         logger.error(f"Error exporting PDF: {e}")
@@ -291,24 +311,7 @@ def letter_export_docx(request, letter_id):
     letter = get_object_or_404(Letter, id=letter_id)
     
     try:
-        export_service = LetterExportService()
-        docx_buffer = export_service.export_to_docx(letter)
-        
-        response = HttpResponse(
-            docx_buffer.getvalue(), 
-            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{letter.letter_number or "surat"}.docx"'
-        
-        # Add tracking entry
-        LetterTracking.objects.create(
-            letter=letter,
-            action='exported_docx',
-            description='Surat diekspor ke DOCX',
-            performed_by=request.user
-        )
-        
-        return response
+        return _letter_artifact_response(request, letter, 'docx', 'exported_docx', 'Surat diekspor ke DOCX')
         
     except Exception as e:
         logger.error(f"Error exporting DOCX: {e}")
@@ -611,7 +614,11 @@ def letter_detail_api(request, pk):
             'is_digitally_signed': letter.is_digitally_signed,
             'requires_digital_signature': letter.requires_digital_signature,
             'created_at': letter.created_at.strftime('%d/%m/%Y %H:%M'),
-            'updated_at': letter.updated_at.strftime('%d/%m/%Y %H:%M')
+            'updated_at': letter.updated_at.strftime('%d/%m/%Y %H:%M'),
+            'artifacts': [
+                LetterArtifactService.job_status(job)
+                for job in letter.artifact_jobs.order_by('-created_at')[:10]
+            ]
         }
         
         return JsonResponse(data)
@@ -620,6 +627,40 @@ def letter_detail_api(request, pk):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@login_required
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def letter_artifacts_api(request, pk):
+    """API status job artefak surat (GET) atau jadwalkan render ulang (POST)"""
+    try:
+        letter = get_object_or_404(Letter, pk=pk)
+        
+        if request.method == 'POST':
+            data = json.loads(request.body or '{}')
+            artifact_types = data.get('types') or ['qr', 'pdf']
+            invalid = [t for t in artifact_types if t not in LetterArtifactService.ARTIFACT_TYPES]
+            if invalid:
+                return JsonResponse({'error': f'Jenis artefak tidak dikenal: {", ".join(invalid)}'}, status=400)
+            jobs = LetterArtifactService.enqueue(letter, artifact_types)
+            return JsonResponse({
+                'success': True,
+                'data': [LetterArtifactService.job_status(job) for job in jobs]
+            }, status=202)
+        
+        current = {}
+        for artifact_type in LetterArtifactService.ARTIFACT_TYPES:
+            job = LetterArtifactService.current_job(letter, artifact_type)
+            current[artifact_type] = LetterArtifactService.job_status(job) if job else None
+        
+        return JsonResponse({
+            'success': True,
+            'data': current
+        })
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 @login_required
 @csrf_exempt
 @require_http_methods(["PUT"])
@@ -1386,17 +1427,10 @@ def letter_types_dropdown_api(request):
 def residents_dropdown_api(request):
     """API to get residents for dropdown"""
     try:
-        search = request.GET.get('search', '')
-        queryset = Penduduk.objects.all()
-        
-        if search:
-            queryset = queryset.filter(
-                Q(nama__icontains=search) |
-                Q(nik__icontains=search)
-            )
-        
-        residents = queryset.values('id', 'nama', 'nik')[:20]  # Limit to 20 results
-        return JsonResponse({'results': list(residents)})
+        residents = search_residents(request)  # Limit to 20 results
+        return JsonResponse({
+            'results': [{'id': resident.id, 'nama': resident.name, 'nik': resident.nik} for resident in residents]
+        })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -1628,9 +1662,9 @@ def letter_templates_api(request):
                     'id': template.id,
                     'name': template.name,
                     'description': template.description,
-                    'content': template.content,
-                    'variables': template.template_variables,
-                    'category': template.category
+                    'content': template.content_template,
+                    'variables': template.variables,
+                    'category': template.template_type
                 }
                 for template in templates
             ]
@@ -1655,12 +1689,11 @@ def letter_apply_template_api(request, pk):
         variables = data.get('variables', {})
         
         # Apply template with variable substitution
-        content = template.content
-        for key, value in variables.items():
-            content = content.replace(f'{{{key}}}', str(value))
+        content = template.render_content(variables)
         
         letter.content = content
         letter.save()
+        template.increment_usage()
         
         # Add tracking entry
         LetterTracking.objects.create(
@@ -1682,6 +1715,33 @@ def letter_apply_template_api(request, pk):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@login_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def letter_template_render_api(request, pk):
+    """API to render one template for many contexts (bulk letter generation)"""
+    try:
+        template = get_object_or_404(LetterTemplate, pk=pk, is_active=True)
+        data = json.loads(request.body)
+        contexts = data.get('contexts', [])
+        if not isinstance(contexts, list) or not all(isinstance(context, dict) for context in contexts):
+            return JsonResponse({'error': 'contexts harus berupa list object'}, status=400)
+        
+        contents = template.render_batch(contexts, record_usage=data.get('record_usage', True))
+        
+        return JsonResponse({
+            'success': True,
+            'count': len(contents),
+            'variables': list(template.get_compiled().variables),
+            'results': contents
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 # Public Views
 def letter_request(request):
     """Public letter request page"""
@@ -0,0 +1,149 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core.datagen import DataGenerator, register, weighted
+from core.response_cache import invalidate_models
+from .models import News, NewsCategory, NewsComment, NewsLike, NewsTag, NewsView
+
+logger = logging.getLogger(__name__)
+
+NEWS_PER_1000_RESIDENTS = 10
+HISTORY_DAYS = 3 * 365
+MAX_VIEWS = 3000
+
+DEFAULT_CATEGORIES = ['Pemerintahan', 'Kesehatan', 'Pendidikan', 'Ekonomi', 'Sosial Budaya', 'Pengumuman']
+DEFAULT_TAGS = ['posyandu', 'bantuan', 'musyawarah', 'gotong-royong', 'pembangunan', 'umkm', 'wisata', 'banjir']
+TOPICS = [
+    'Musyawarah Gampong', 'Penyaluran Bantuan Langsung Tunai', 'Gotong Royong Membersihkan Saluran',
+    'Posyandu Balita', 'Pelatihan UMKM', 'Pembangunan Jalan Lorong', 'Vaksinasi Anak', 'Peringatan Maulid',
+    'Lomba Perahu Tradisional', 'Sosialisasi Pencegahan Stunting', 'Rapat Anggaran Dana Desa', 'Panen Raya',
+]
+PLACES = ['Pulo Sarok', 'Meunasah Gampong', 'Kantor Keuchik', 'Dermaga Singkil', 'Balai Pertemuan', 'Pasar Singkil']
+SENTENCES = [
+    'Kegiatan ini dihadiri oleh perangkat gampong dan tokoh masyarakat setempat.',
+    'Warga antusias mengikuti acara sejak pagi hari.',
+    'Keuchik menyampaikan terima kasih atas partisipasi seluruh warga.',
+    'Program ini merupakan bagian dari rencana kerja pemerintah gampong tahun berjalan.',
+    'Petugas posyandu mencatat hasil pemeriksaan setiap peserta.',
+    'Anggaran kegiatan bersumber dari dana desa dan swadaya masyarakat.',
+    'Diharapkan kegiatan serupa dapat dilaksanakan secara rutin.',
+    'Informasi lebih lanjut dapat diperoleh di kantor keuchik pada jam kerja.',
+]
+STATUSES = [('published', 85), ('archived', 5), ('draft', 8), ('scheduled', 2)]
+PRIORITIES = [('normal', 75), ('high', 15), ('low', 7), ('urgent', 3)]
+DEVICES = [('mobile', 70), ('desktop', 25), ('tablet', 5)]
+BROWSERS = [('Chrome', 65), ('Safari', 15), ('Firefox', 8), ('Samsung Internet', 12)]
+
+
+class NewsGenerator(DataGenerator):
+    """Berita dengan popularitas berekor panjang: tampilan, like dan komentar yang konsisten dengan counter"""
+
+    order = 30
+    search_models = (News,)
+
+    def generate(self, context):
+        rng = context.random(self.name)
+        if context.user is None:
+            raise ValueError('Data berita membutuhkan user sebagai penulis')
+        categories = self._ensure(NewsCategory, DEFAULT_CATEGORIES)
+        tags = self._ensure(NewsTag, DEFAULT_TAGS)
+        slugs = set(News.objects.values_list('slug', flat=True))
+        now = timezone.now()
+        session_serial = 0
+
+        total = context.scaled(NEWS_PER_1000_RESIDENTS, minimum=20)
+        for start in range(0, total, context.batch_size):
+            batch = []
+            for index in range(start, min(start + context.batch_size, total)):
+                batch.append(self._news(context, rng, index, categories, slugs, now))
+
+            with transaction.atomic():
+                created = context.create(News, batch)
+                context.create(News.tags.through, [
+                    News.tags.through(news_id=news.pk, newstag_id=tag.pk)
+                    for news in created for tag in rng.sample(tags, rng.randint(1, 3))
+                ])
+                # created_at ditimpa auto_now_add saat bulk_create; dikembalikan ke tanggal terbit
+                for news in created:
+                    news.created_at = news._created_at
+                News.objects.bulk_update(created, ['created_at'], batch_size=500)
+
+                views, likes, comments = [], [], []
+                for news in created:
+                    for view_index in range(news.views_count):
+                        session_serial += 1
+                        visitor = {
+                            'ip_address': f'10.{session_serial >> 16 & 255}.{session_serial >> 8 & 255}.{session_serial & 255}',
+                            'session_key': f'synthetic{context.seed:04d}{session_serial:012x}',
+                        }
+                        views.append(NewsView(
+                            news=news, view_duration=rng.randint(5, 400), device_type=weighted(rng, DEVICES),
+                            browser=weighted(rng, BROWSERS), **visitor,
+                        ))
+                        if view_index < news.likes_count:
+                            likes.append(NewsLike(news=news, **visitor))
+                    for comment_index in range(news.comments_count + news._rejected_comments):
+                        comments.append(NewsComment(
+                            news=news, author_name=f'Warga {comment_index + 1}',
+                            author_email=f'warga{comment_index + 1}@example.com', content=rng.choice(SENTENCES),
+                            status='approved' if comment_index < news.comments_count else 'pending',
+                        ))
+                context.insert(NewsView, views)
+                context.insert(NewsLike, likes)
+                context.insert(NewsComment, comments)
+
+    @staticmethod
+    def _ensure(model, names):
+        existing = list(model.objects.order_by('pk'))
+        if existing:
+            return existing
+        return model.objects.bulk_create([model(name=name, slug=slugify(name)) for name in names])
+
+    @staticmethod
+    def _news(context, rng, index, categories, slugs, now):
+        title = f'{rng.choice(TOPICS)} di {rng.choice(PLACES)} #{index + 1}'
+        slug = base = slugify(title)
+        suffix = 2
+        while slug in slugs:
+            slug, suffix = f'{base}-{suffix}', suffix + 1
+        slugs.add(slug)
+
+        content = '\n\n'.join(
+            ' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 7))) for _ in range(rng.randint(2, 6))
+        )
+        status = weighted(rng, STATUSES)
+        published = datetime.combine(
+            context.today - timedelta(days=rng.randint(0, HISTORY_DAYS)), time(rng.randint(7, 20), rng.randint(0, 59)),
+            tzinfo=now.tzinfo,
+        )
+        news = News(
+            title=title, slug=slug, category=rng.choice(categories), content=content,
+            excerpt=content[:297] + '...' if len(content) > 300 else content,
+            reading_time=max(1, round(len(content.split()) / 200)),
+            status=status, priority=weighted(rng, PRIORITIES),
+            is_featured=rng.random() < 0.05, is_breaking=rng.random() < 0.01,
+            published_date=published if status in ('published', 'archived') else None,
+            scheduled_date=now + timedelta(days=rng.randint(1, 30)) if status == 'scheduled' else None,
+            author=context.user,
+        )
+        news._created_at = published
+        if news.published_date:
+            # Popularitas berekor panjang (Pareto): sebagian kecil berita mendapat sebagian besar tampilan
+            news.views_count = min(int((rng.paretovariate(1.6) - 1) * 40), MAX_VIEWS)
+            news.likes_count = sum(rng.random() < 0.05 for _ in range(news.views_count))
+            news.comments_count = sum(rng.random() < 0.01 for _ in range(news.views_count))
+        news._rejected_comments = rng.randint(0, 1) if news.comments_count else 0
+        return news
+
+    def finish(self, context):
+        try:
+            invalidate_models(News, NewsCategory, NewsTag)
+        except Exception as e:
+            logger.error(f"Error invalidating response cache after synthetic news: {e}")
+
+
+register('news', NewsGenerator)
@@ -0,0 +1,5 @@
+from core.media import register
+from .models import News, NewsImage
+
+register(News, 'featured_image')
+register(NewsImage, 'image')
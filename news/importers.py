@@ -0,0 +1,120 @@
+import logging
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core.importer import BulkImporter, choice_lookup, register
+from core.response_cache import invalidate_models
+from core.search import search_index
+from .models import News, NewsCategory, NewsTag
+
+logger = logging.getLogger(__name__)
+
+
+class NewsImporter(BulkImporter):
+    """Import berita (kolom: title, content, excerpt, status, category, tags dipisah koma)"""
+
+    model = News
+    label = 'berita'
+    statuses = choice_lookup(News.STATUS_CHOICES)
+
+    def prepare(self):
+        if self.user is None:
+            raise ValueError('Import berita membutuhkan user sebagai penulis')
+        self.slugs = set(News.objects.values_list('slug', flat=True))
+        self.categories = self._index(NewsCategory.objects.all())
+        self.tags = self._index(NewsTag.objects.all())
+
+    @staticmethod
+    def _index(objects):
+        """{slug: obj}; nama ikut di-slugify sehingga 'Desa' dan 'desa' menunjuk objek yang sama"""
+        index = {}
+        for obj in objects:
+            index[obj.slug] = obj
+            index.setdefault(slugify(obj.name), obj)
+        return index
+
+    def _unique_slug(self, title):
+        base = slugify(title)[:200] or 'berita'
+        slug, suffix = base, 2
+        while slug in self.slugs:
+            slug, suffix = f'{base}-{suffix}', suffix + 1
+        self.slugs.add(slug)
+        return slug
+
+    def build(self, values):
+        title = str(values.get('title') or '').strip()
+        if not title:
+            raise ValidationError('Judul wajib diisi')
+        category = str(values.get('category') or '').strip()
+        if not slugify(category):
+            raise ValidationError('Kategori wajib diisi')
+        status = self.statuses.get(str(values.get('status') or 'draft').lower())
+        if status is None:
+            raise ValidationError(f"Status tidak dikenal: {values.get('status')}")
+
+        content = str(values.get('content') or '')
+        excerpt = str(values.get('excerpt') or '')
+        if not excerpt and content:
+            excerpt = content[:297] + '...' if len(content) > 300 else content
+        news = News(
+            title=title,
+            slug=self._unique_slug(title),
+            content=content,
+            excerpt=excerpt,
+            status=status,
+            author=self.user,
+            reading_time=max(1, round(len(content.split()) / 200)) if content else 0,
+            published_date=timezone.now() if status == 'published' else None,
+        )
+        news._import_category = category
+        news._import_tags = [name.strip() for name in str(values.get('tags') or '').split(',') if slugify(name)]
+        return news
+
+    def _ensure(self, model, index, names):
+        """Buat kategori/tag yang belum ada dalam satu bulk_create lalu muat ulang ke index"""
+        missing = {}
+        for name in names:
+            slug = slugify(name)
+            if slug not in index:
+                missing.setdefault(slug, name)
+        if not missing:
+            return
+        model.objects.bulk_create(
+            [model(name=name, slug=slug) for slug, name in missing.items()], ignore_conflicts=True,
+        )
+        index.update(self._index(model.objects.filter(Q(slug__in=missing) | Q(name__in=missing.values()))))
+
+    def before_create(self, objects):
+        self._ensure(NewsCategory, self.categories, [news._import_category for news in objects])
+        self._ensure(NewsTag, self.tags, [name for news in objects for name in news._import_tags])
+        for news in objects:
+            news.category = self.categories[slugify(news._import_category)]
+
+    def after_create(self, objects):
+        Through = News.tags.through
+        links = []
+        for news in objects:
+            tag_ids = {self.tags[slugify(name)].pk for name in news._import_tags}
+            links.extend(Through(news_id=news.pk, newstag_id=tag_id) for tag_id in tag_ids)
+        Through.objects.bulk_create(links)
+        try:
+            with transaction.atomic():
+                search_index.index_many(objects)
+        except Exception as e:
+            # Index bisa dibangun ulang dengan rebuild_search_index
+            logger.error(f"Search index update failed for imported news: {e}")
+
+    def finish(self, result):
+        if not result.created:
+            return
+        try:
+            invalidate_models(News, NewsCategory, NewsTag)
+        except Exception as e:
+            logger.error(f"Error invalidating response cache after news import: {e}")
+
+
+register('news', NewsImporter)
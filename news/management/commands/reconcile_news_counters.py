@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from news.models import News, NewsView, NewsLike, NewsShare, NewsComment
+
+
+def count_subquery(model, **filters):
+    """Subquery COUNT(*) per berita untuk model relasi"""
+    counts = model.objects.filter(news=OuterRef('pk'), **filters).order_by().values('news').annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = 'Repair drift in News views/likes/shares/comments counter columns'
+
+    COUNTERS = {
+        'views_count': (NewsView, {}),
+        'likes_count': (NewsLike, {}),
+        'shares_count': (NewsShare, {}),
+        'comments_count': (NewsComment, {'status': 'approved'}),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted counters without saving',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Reconciling news counters...')
+
+        actual = News.objects.order_by().annotate(**{
+            f'actual_{field}': count_subquery(model, **filters)
+            for field, (model, filters) in self.COUNTERS.items()
+        }).only('id', 'title', *self.COUNTERS.keys())
+
+        drifted = []
+        for news in actual.iterator(chunk_size=500):
+            changes = []
+            for field in self.COUNTERS:
+                stored = getattr(news, field)
+                real = getattr(news, f'actual_{field}')
+                if stored != real:
+                    changes.append(f'{field} {stored} -> {real}')
+                    setattr(news, field, real)
+            if changes:
+                drifted.append(news)
+                self.stdout.write(f'{news.title}: ' + ', '.join(changes))
+
+        if drifted and not options['dry_run']:
+            News.objects.bulk_update(drifted, list(self.COUNTERS.keys()), batch_size=500)
+
+        action = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(
+            self.style.SUCCESS(f'{action} {len(drifted)} news with drifted counters')
+        )
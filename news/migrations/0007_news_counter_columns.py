@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:47
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    sources = [
+        ('views_count', apps.get_model('news', 'NewsView')),
+        ('likes_count', apps.get_model('news', 'NewsLike')),
+        ('shares_count', apps.get_model('news', 'NewsShare')),
+    ]
+    for field, model in sources:
+        counts = model.objects.values('news_id').annotate(total=Count('id')).order_by()
+        for row in counts:
+            News.objects.filter(pk=row['news_id']).update(**{field: row['total']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_remove_news_likes_count_remove_news_shares_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='shares_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_news_counter_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['status', 'published_date'], name='news_status_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['is_featured', 'priority'], name='news_featured_priority_idx'),
+        ),
+    ]
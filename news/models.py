@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from django.utils import timezone
@@ -85,6 +87,9 @@ class News(models.Model):
     scheduled_date = models.DateTimeField(null=True, blank=True, help_text='Tanggal untuk publikasi otomatis')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='news_articles')
     comments_count = models.PositiveIntegerField(default=0)
+    views_count = models.PositiveIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+    shares_count = models.PositiveIntegerField(default=0)
     reading_time = models.PositiveIntegerField(default=0, help_text='Estimasi waktu baca dalam menit')
     meta_title = models.CharField(max_length=60, blank=True)
     meta_description = models.CharField(max_length=160, blank=True)
@@ -107,28 +112,36 @@ class News(models.Model):
     def update_counts(self):
         """Update all related counts"""
         self.comments_count = self.comments.filter(status='approved').count()
-        self.save(update_fields=['comments_count'])
+        self.views_count = self.view_records.count()
+        self.likes_count = self.likes.count()
+        self.shares_count = self.shares.count()
+        self.save(update_fields=['comments_count', 'views_count', 'likes_count', 'shares_count'])
+    
+    def adjust_counter(self, field, delta=1):
+        """Atomically add delta to a counter column and refresh it on this instance"""
+        News.objects.filter(pk=self.pk).update(**{field: Greatest(F(field) + delta, 0)})
+        self.refresh_from_db(fields=[field])
+    
+    def update_likes_count(self):
+        self.likes_count = self.likes.count()
+        self.save(update_fields=['likes_count'])
+    
+    def update_shares_count(self):
+        self.shares_count = self.shares.count()
+        self.save(update_fields=['shares_count'])
         
     def get_views_count(self):
-        return self.view_records.count()
+        return self.views_count
     get_views_count.short_description = 'Views'
     
     def get_likes_count(self):
-        return self.likes.count()
+        return self.likes_count
     get_likes_count.short_description = 'Likes'
     
     def get_shares_count(self):
-        return self.shares.count()
+        return self.shares_count
     get_shares_count.short_description = 'Shares'
     
-    @property
-    def views_count(self):
-        return self.view_records.count()
-    
-    @property
-    def likes_count(self):
-        return self.likes.count()
-    
     def is_published(self):
         """Check if news is published"""
         from django.utils import timezone
@@ -176,6 +189,11 @@ class News(models.Model):
         verbose_name = 'Berita'
         verbose_name_plural = 'Berita'
         ordering = ['-published_date', '-created_at']
+        indexes = [
+            models.Index(fields=['status', 'published_date'], name='news_status_published_idx'),
+            # Index parsial: filter boolean di SQLite tidak bisa memakai prefix index
+            models.Index(fields=['priority'], condition=Q(is_featured=True), name='news_featured_priority_idx'),
+        ]
 
 
 class NewsComment(models.Model):
@@ -0,0 +1,11 @@
+from django.utils.html import strip_tags
+
+from core.search import register
+from .models import News
+
+register(
+    News, 'news', 'news',
+    title='title',
+    fields=('excerpt', lambda news: strip_tags(news.content), 'category__name'),
+    subtitle='status',
+)
@@ -1,3 +1,78 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import News, NewsCategory, NewsView
+from .view_buffer import NewsViewBuffer
+
+
+class NewsViewBufferTest(TestCase):
+    def setUp(self):
+        author = get_user_model().objects.create_user('penulis', 'penulis@example.com', 'x')
+        category = NewsCategory.objects.create(name='Umum')
+        self.first, self.second = (
+            News.objects.create(title=title, category=category, content='-', author=author, views_count=views)
+            for title, views in (('Berita Satu', 10), ('Berita Dua', 0))
+        )
+        self.buffer = NewsViewBuffer(ENABLED=True, FLUSH_INTERVAL=3600, MAX_PENDING=1000)
+        self.addCleanup(self.buffer.flush)
+
+    def test_repeat_visits_within_window_are_deduplicated(self):
+        self.assertTrue(self.buffer.record(self.first.pk, '10.0.0.1', 'sesi-a'))
+        self.assertFalse(self.buffer.record(self.first.pk, '10.0.0.1', 'sesi-a'))
+        self.assertTrue(self.buffer.record(self.first.pk, '10.0.0.1', 'sesi-b'))
+        self.assertTrue(self.buffer.record(self.second.pk, '10.0.0.1', 'sesi-a'))
+
+        self.assertEqual(self.buffer.pending_for(self.first.pk), 2)
+        self.assertEqual(self.buffer.metrics()['deduplicated'], 1)
+
+    def test_flush_is_one_insert_and_one_counter_update(self):
+        # Kunjungan yang sudah tersimpan dari window sebelumnya tidak menambah counter lagi
+        NewsView.objects.create(news=self.first, ip_address='10.0.0.3')
+        self.buffer.record(self.first.pk, '10.0.0.1')
+        self.buffer.record(self.first.pk, '10.0.0.2')
+        self.buffer.record(self.first.pk, '10.0.0.3')
+        self.buffer.record(self.second.pk, '10.0.0.1')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.buffer.flush(), 4)
+
+        writes = [query['sql'].split()[0] for query in queries.captured_queries
+                  if query['sql'].startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(writes, ['INSERT', 'UPDATE'])
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.views_count, self.second.views_count), (12, 1))
+        self.assertEqual(NewsView.objects.count(), 4)
+        self.assertEqual(self.buffer.metrics()['backlog'], 0)
+
+    def test_failed_flush_requeues_rows(self):
+        self.buffer.record(self.first.pk, '10.0.0.1')
+        self.buffer.record(self.second.pk, '10.0.0.1')
+
+        with mock.patch.object(NewsView.objects, 'bulk_create', side_effect=DatabaseError('locked')):
+            self.assertEqual(self.buffer.flush(), 0)
+
+        self.assertEqual(self.buffer.metrics()['flush_errors'], 1)
+        self.assertEqual(self.buffer.pending_for(self.first.pk), 1)
+        self.assertEqual(NewsView.objects.count(), 0)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views_count, 10)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views_count, 11)
+
+    def test_buffer_api_is_admin_only(self):
+        url = reverse('news:news_view_buffer')
+        self.client.force_login(get_user_model().objects.create_user('warga', 'warga@example.com', 'x'))
+        self.assertEqual(self.client.get(url).status_code, 302)
 
-# Create your tests here.
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('backlog', response.json()['metrics'])
@@ -52,8 +52,8 @@ urlpatterns = [
     
     # Public news URLs (tanpa autentikasi)
     path('public/news/', views.public_news_list, name='public_news_list'),
-    path('public/news/<slug:slug>/', views.public_news_detail, name='public_news_detail'),
     path('public/news/featured/', views.public_featured_news, name='public_featured_news'),
+    path('public/news/<slug:slug>/', views.public_news_detail, name='public_news_detail'),
     
     # NewsCategory APIs
     path('api/categories/', views.news_category_list_api, name='newscategory_list'),
@@ -90,6 +90,7 @@ urlpatterns = [
     
     # Statistics API
     path('api/statistics/', views.news_statistics_api, name='news_statistics'),
+    path('api/statistics/view-buffer/', views.news_view_buffer_api, name='news_view_buffer'),
     
     # Media APIs
     path('api/media/', views.news_media_list_api, name='news_media_list_api'),
@@ -0,0 +1,167 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 5,      # detik sebelum buffer ditulis ke database
+    'MAX_PENDING': 500,       # flush langsung bila jumlah antrian mencapai batas ini
+    'DEDUP_WINDOW': 1800,     # detik; kunjungan ulang (news, ip, session) diabaikan
+    'BATCH_SIZE': 500,
+}
+
+
+class NewsViewBuffer:
+    """Buffer write-behind untuk NewsView per proses.
+
+    Kunjungan dikumpulkan di memori, di-dedup per (news, ip, session) dalam
+    DEDUP_WINDOW, lalu ditulis dengan satu bulk_create(ignore_conflicts=True)
+    dan satu UPDATE views_count += jumlah baris baru per berita. Hitung ulang
+    penuh tetap tugas reconcile_news_counters.
+    """
+
+    def __init__(self, **options):
+        config = {**DEFAULTS, **getattr(settings, 'NEWS_VIEW_BUFFER', {}), **options}
+        self.enabled = config['ENABLED']
+        self.flush_interval = config['FLUSH_INTERVAL']
+        self.max_pending = config['MAX_PENDING']
+        self.dedup_window = config['DEDUP_WINDOW']
+        self.batch_size = config['BATCH_SIZE']
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._recent = {}
+        self._timer = None
+        self._stats = {
+            'recorded': 0,
+            'deduplicated': 0,
+            'flushed': 0,
+            'flush_count': 0,
+            'flush_errors': 0,
+            'last_flush_at': None,
+            'last_flush_ms': 0.0,
+            'max_backlog': 0,
+        }
+
+    def record(self, news_id, ip_address, session_key='', user_agent='', referrer='', user_id=None):
+        """Catat satu kunjungan; return False bila duplikat dalam dedup window"""
+        key = (news_id, ip_address or '', session_key or '')
+        now = time.monotonic()
+        with self._lock:
+            seen_at = self._recent.get(key)
+            if seen_at is not None and now - seen_at < self.dedup_window:
+                self._stats['deduplicated'] += 1
+                return False
+            self._recent[key] = now
+            self._pending[key] = {
+                'news_id': news_id,
+                'ip_address': key[1],
+                'session_key': key[2],
+                'user_agent': user_agent or '',
+                'referrer': (referrer or '')[:200],
+                'user_id': user_id,
+            }
+            self._stats['recorded'] += 1
+            backlog = len(self._pending)
+            self._stats['max_backlog'] = max(self._stats['max_backlog'], backlog)
+            flush_now = not self.enabled or backlog >= self.max_pending
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if flush_now:
+            self.flush()
+        return True
+
+    def pending_for(self, news_id):
+        """Jumlah kunjungan berita ini yang belum ditulis ke database"""
+        with self._lock:
+            return sum(1 for key in self._pending if key[0] == news_id)
+
+    def flush(self):
+        """Tulis semua kunjungan tertunda ke database; return jumlah baris yang dikirim"""
+        from .models import News, NewsView
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._prune_recent()
+            if not pending:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                # Atomic: bila UPDATE gagal, baris baru ikut batal dan antrian bisa dicoba ulang utuh
+                with transaction.atomic():
+                    # Kunci yang sudah ada di tabel (kunjungan ulang setelah DEDUP_WINDOW, proses lain)
+                    # ditolak unique_together dan tidak boleh ikut menambah views_count
+                    existing = set(NewsView.objects.filter(
+                        news_id__in={key[0] for key in pending},
+                        ip_address__in={key[1] for key in pending},
+                    ).order_by().values_list('news_id', 'ip_address', 'session_key'))
+                    rows = [values for key, values in pending.items() if key not in existing]
+                    if rows:
+                        NewsView.objects.bulk_create(
+                            [NewsView(**values) for values in rows],
+                            batch_size=self.batch_size,
+                            ignore_conflicts=True,
+                        )
+                        deltas = Counter(values['news_id'] for values in rows)
+                        News.objects.filter(pk__in=deltas).update(views_count=F('views_count') + Case(
+                            *(When(pk=news_id, then=Value(delta)) for news_id, delta in deltas.items()),
+                            default=Value(0), output_field=IntegerField(),
+                        ))
+            except Exception as e:
+                logger.error(f"Error flushing news view buffer: {e}")
+                with self._lock:
+                    self._stats['flush_errors'] += 1
+                    # Kembalikan ke antrian agar dicoba lagi pada flush berikutnya
+                    for key, values in pending.items():
+                        self._pending.setdefault(key, values)
+                return 0
+
+            with self._lock:
+                self._stats['flushed'] += len(pending)
+                self._stats['flush_count'] += 1
+                self._stats['last_flush_at'] = time.time()
+                self._stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            return len(pending)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'backlog': len(self._pending),
+                'dedup_keys': len(self._recent),
+                'flush_interval': self.flush_interval,
+                'max_pending': self.max_pending,
+                'dedup_window': self.dedup_window,
+            }
+
+    def _prune_recent(self):
+        cutoff = time.monotonic() - self.dedup_window
+        self._recent = {key: seen_at for key, seen_at in self._recent.items() if seen_at >= cutoff}
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # Timer berjalan di thread sendiri, tutup koneksi database thread ini
+            connection.close()
+
+
+view_buffer = NewsViewBuffer()
+atexit.register(view_buffer.flush)
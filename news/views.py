@@ -5,7 +5,7 @@ from django.views.decorators.http import require_http_methods, require_POST
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, Sum
 from django.db import transaction
 from django.utils import timezone
 from django.utils.text import slugify
@@ -23,6 +23,11 @@ from .models import (
     NewsCategory, NewsTag, News, NewsComment, NewsView, 
     NewsImage, NewsLike, NewsShare, Announcement
 )
+from .importers import NewsImporter
+from .view_buffer import view_buffer
+from core.media import media_pipeline
+from core.response_cache import cached_public_api
+from core.search import search_index
 from .forms import (
     NewsCategoryForm, NewsTagForm, NewsForm, NewsCommentForm, 
     NewsSearchForm, NewsImageForm, NewsImageFormSet, 
@@ -31,6 +36,11 @@ from .forms import (
 )
 
 
+def is_admin(user):
+    """Check if user is admin"""
+    return user.is_authenticated and (user.is_staff or user.is_superuser)
+
+
 @login_required
 def news_admin(request):
     """Main admin view for news management"""
@@ -39,8 +49,9 @@ def news_admin(request):
     published_news = News.objects.filter(status='published').count()
     draft_news = News.objects.filter(status='draft').count()
     scheduled_news = News.objects.filter(status='scheduled').count()
-    total_views = NewsView.objects.count()
-    total_likes = NewsLike.objects.count()
+    counter_totals = News.objects.aggregate(total_views=Sum('views_count'), total_likes=Sum('likes_count'))
+    total_views = counter_totals['total_views'] or 0
+    total_likes = counter_totals['total_likes'] or 0
     total_comments = NewsComment.objects.filter(status='approved').count()
     
     # Debug print
@@ -54,9 +65,7 @@ def news_admin(request):
     recent_news = News.objects.select_related('category', 'author').order_by('-created_at')[:5]
     
     # Popular news (by views)
-    popular_news = News.objects.filter(status='published').annotate(
-        views_count=Count('view_records')
-    ).order_by('-views_count')[:5]
+    popular_news = News.objects.filter(status='published').order_by('-views_count')[:5]
     
     # Recent comments
     recent_comments = NewsComment.objects.select_related('news').filter(
@@ -361,7 +370,7 @@ def news_like(request, pk):
         liked = True
     
     # Update likes count
-    news.update_likes_count()
+    news.adjust_counter('likes_count', 1 if liked else -1)
     
     return JsonResponse({
         'success': True,
@@ -396,7 +405,7 @@ def news_share(request, pk):
     )
     
     # Update shares count
-    news.update_shares_count()
+    news.adjust_counter('shares_count')
     
     return JsonResponse({
         'success': True,
@@ -476,112 +485,18 @@ def news_import(request):
             file = form.cleaned_data['file']
             
             try:
-                imported_count = 0
-                errors = []
-                
-                if file.name.endswith('.csv'):
-                    # Handle CSV import
-                    decoded_file = file.read().decode('utf-8')
-                    csv_reader = csv.DictReader(decoded_file.splitlines())
-                    
-                    for row_num, row in enumerate(csv_reader, start=2):
-                        try:
-                            # Create news from CSV row
-                            news = News(
-                                title=row.get('title', ''),
-                                content=row.get('content', ''),
-                                excerpt=row.get('excerpt', ''),
-                                author=request.user,
-                                status=row.get('status', 'draft')
-                            )
-                            
-                            # Set category if provided
-                            category_name = row.get('category')
-                            if category_name:
-                                category, created = NewsCategory.objects.get_or_create(
-                                    name=category_name,
-                                    defaults={'slug': slugify(category_name)}
-                                )
-                                news.category = category
-                            
-                            news.slug = slugify(news.title)
-                            news.reading_time = news.calculate_reading_time()
-                            news.save()
-                            
-                            # Add tags if provided
-                            tags_str = row.get('tags', '')
-                            if tags_str:
-                                tag_names = [tag.strip() for tag in tags_str.split(',')]
-                                for tag_name in tag_names:
-                                    if tag_name:
-                                        tag, created = NewsTag.objects.get_or_create(
-                                            name=tag_name,
-                                            defaults={'slug': slugify(tag_name)}
-                                        )
-                                        news.tags.add(tag)
-                            
-                            imported_count += 1
-                            
-                        except Exception as e:
-                            errors.append(f'Baris {row_num}: {str(e)}')
-                
-                elif file.name.endswith(('.xlsx', '.xls')):
-                    # Handle Excel import
-                    workbook = openpyxl.load_workbook(file)
-                    worksheet = workbook.active
-                    
-                    # Assume first row is header
-                    headers = [cell.value for cell in worksheet[1]]
-                    
-                    for row_num, row in enumerate(worksheet.iter_rows(min_row=2, values_only=True), start=2):
-                        try:
-                            row_data = dict(zip(headers, row))
-                            
-                            news = News(
-                                title=row_data.get('title', ''),
-                                content=row_data.get('content', ''),
-                                excerpt=row_data.get('excerpt', ''),
-                                author=request.user,
-                                status=row_data.get('status', 'draft')
-                            )
-                            
-                            # Set category if provided
-                            category_name = row_data.get('category')
-                            if category_name:
-                                category, created = NewsCategory.objects.get_or_create(
-                                    name=category_name,
-                                    defaults={'slug': slugify(category_name)}
-                                )
-                                news.category = category
-                            
-                            news.slug = slugify(news.title)
-                            news.reading_time = news.calculate_reading_time()
-                            news.save()
-                            
-                            # Add tags if provided
-                            tags_str = row_data.get('tags', '')
-                            if tags_str:
-                                tag_names = [tag.strip() for tag in str(tags_str).split(',')]
-                                for tag_name in tag_names:
-                                    if tag_name:
-                                        tag, created = NewsTag.objects.get_or_create(
-                                            name=tag_name,
-                                            defaults={'slug': slugify(tag_name)}
-                                        )
-                                        news.tags.add(tag)
-                            
-                            imported_count += 1
-                            
-                        except Exception as e:
-                            errors.append(f'Baris {row_num}: {str(e)}')
+                # Baris dibaca streaming dan disimpan per blok (news/importers.py)
+                result = NewsImporter(user=request.user).run(file)
+                imported_count = result.created
+                errors = [f"Baris {error['row']}: {error['error']}" for error in result.errors]
                 
                 if imported_count > 0:
                     messages.success(request, f'{imported_count} berita berhasil diimpor.')
                 
                 if errors:
                     error_msg = 'Beberapa baris gagal diimpor:\n' + '\n'.join(errors[:10])
-                    if len(errors) > 10:
-                        error_msg += f'\n... dan {len(errors) - 10} error lainnya'
+                    if result.error_count > 10:
+                        error_msg += f'\n... dan {result.error_count - 10} error lainnya'
                     messages.warning(request, error_msg)
                 
                 return redirect('news:list')
@@ -1600,6 +1515,26 @@ def news_statistics_api(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@login_required
+@user_passes_test(is_admin)
+@require_http_methods(["GET", "POST"])
+def news_view_buffer_api(request):
+    """API for view buffer metrics (GET) and forcing a flush (POST)"""
+    try:
+        flushed = None
+        if request.method == 'POST':
+            flushed = view_buffer.flush()
+        
+        return JsonResponse({
+            'success': True,
+            'flushed': flushed,
+            'metrics': view_buffer.metrics()
+        })
+        
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
 # Helper APIs for dropdowns
 @login_required
 @require_http_methods(["GET"])
@@ -2743,6 +2678,7 @@ def public_announcement_detail(request, slug):
 # Public News Views (tanpa autentikasi)
 @csrf_exempt
 @require_http_methods(["GET"])
+@cached_public_api('public_news')
 def public_news_list(request):
     """Public API endpoint untuk daftar berita tanpa autentikasi"""
     try:
@@ -2760,11 +2696,7 @@ def public_news_list(request):
         
         # Apply search filter
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(content__icontains=search) |
-                Q(excerpt__icontains=search)
-            )
+            queryset = search_index.filter_queryset(queryset, search, ('title', 'content', 'excerpt'))
         
         # Apply category filter
         if category_id:
@@ -2779,6 +2711,7 @@ def public_news_list(request):
         
         # Serialize data
         results = []
+        images = media_pipeline.lookup(news.featured_image for news in page_obj)
         for news in page_obj:
             results.append({
                 'id': news.id,
@@ -2787,6 +2720,7 @@ def public_news_list(request):
                 'excerpt': news.excerpt,
                 'content': news.content[:200] + '...' if len(news.content) > 200 else news.content,
                 'featured_image': news.featured_image.url if news.featured_image else None,
+                'featured_image_variants': media_pipeline.payload(news.featured_image, images),
                 'category': {
                     'id': news.category.id,
                     'name': news.category.name,
@@ -2838,17 +2772,18 @@ def public_news_detail(request, slug):
             published_date__lte=timezone.now()
         )
         
-        # Increment view count
-        NewsView.objects.create(
-            news=news,
-            ip_address=request.META.get('REMOTE_ADDR', ''),
+        # Record view in the write-behind buffer (deduplicated, flushed in bulk)
+        view_buffer.record(
+            news.id,
+            request.META.get('REMOTE_ADDR', ''),
+            session_key=request.session.session_key or '',
             user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            session_key=request.session.session_key or ''
+            referrer=request.META.get('HTTP_REFERER', ''),
+            user_id=request.user.id if request.user.is_authenticated else None
         )
-        
-        # Update news views count
-        news.views_count = news.view_records.count()
-        news.save(update_fields=['views_count'])
+        news.views_count += view_buffer.pending_for(news.id)
+        gallery = list(news.images.all().order_by('order'))
+        images = media_pipeline.lookup([news.featured_image, *(img.image for img in gallery)])
         
         data = {
             'success': True,
@@ -2859,6 +2794,7 @@ def public_news_detail(request, slug):
                 'excerpt': news.excerpt,
                 'content': news.content,
                 'featured_image': news.featured_image.url if news.featured_image else None,
+                'featured_image_variants': media_pipeline.payload(news.featured_image, images),
                 'category': {
                     'id': news.category.id,
                     'name': news.category.name,
@@ -2878,11 +2814,12 @@ def public_news_detail(request, slug):
                 'images': [{
                     'id': img.id,
                     'image': img.image.url if img.image else None,
+                    'image_variants': media_pipeline.payload(img.image, images),
                     'caption': img.caption,
                     'alt_text': img.alt_text,
                     'is_featured': img.is_featured,
                     'order': img.order
-                } for img in news.images.all().order_by('order')],
+                } for img in gallery],
                 'created_at': news.created_at.isoformat(),
                 'updated_at': news.updated_at.isoformat()
             }
@@ -2899,6 +2836,7 @@ def public_news_detail(request, slug):
 
 @csrf_exempt
 @require_http_methods(["GET"])
+@cached_public_api('public_news')
 def public_featured_news(request):
     """Public API endpoint untuk berita unggulan tanpa autentikasi"""
     try:
@@ -2912,6 +2850,7 @@ def public_featured_news(request):
         ).select_related('category', 'author').prefetch_related('tags').order_by('-published_date')[:limit]
         
         results = []
+        images = media_pipeline.lookup(news.featured_image for news in featured_news)
         for news in featured_news:
             results.append({
                 'id': news.id,
@@ -2920,6 +2859,7 @@ def public_featured_news(request):
                 'excerpt': news.excerpt,
                 'content': news.content[:200] + '...' if len(news.content) > 200 else news.content,
                 'featured_image': news.featured_image.url if news.featured_image else None,
+                'featured_image_variants': media_pipeline.payload(news.featured_image, images),
                 'category': {
                     'id': news.category.id,
                     'name': news.category.name,
@@ -4,6 +4,7 @@ from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
 from .models import PerangkatDesa, LembagaAdat, PenggerakPKK, Kepemudaan, KarangTaruna
+from core.media import media_pipeline
 import json
 import logging
 from .views import handle_api_error
@@ -85,6 +86,7 @@ def api_perangkat_desa(request):
         page_obj = paginator.get_page(page)
         
         results = []
+        images = media_pipeline.lookup(perangkat.foto_profil for perangkat in page_obj)
         for perangkat in page_obj:
             results.append({
                 'id': perangkat.id,
@@ -94,6 +96,7 @@ def api_perangkat_desa(request):
                 'nip': perangkat.nip,
                 'deskripsi_tugas': perangkat.deskripsi_tugas,
                 'foto_profil': perangkat.foto_profil.url if perangkat.foto_profil else None,
+                'foto_profil_variants': media_pipeline.payload(perangkat.foto_profil, images),
                 'kontak_whatsapp': perangkat.kontak_whatsapp,
                 'email_dinas': perangkat.email_dinas,
                 'tanggal_mulai_tugas': perangkat.tanggal_mulai_tugas.isoformat() if perangkat.tanggal_mulai_tugas else None,
@@ -201,6 +204,7 @@ def api_penggerak_pkk(request):
         page_obj = paginator.get_page(page)
         
         results = []
+        images = media_pipeline.lookup(pkk.foto_profil for pkk in page_obj)
         for pkk in page_obj:
             results.append({
                 'id': pkk.id,
@@ -212,6 +216,7 @@ def api_penggerak_pkk(request):
                 'pengalaman_organisasi': pkk.pengalaman_organisasi,
                 'prestasi': pkk.prestasi,
                 'foto_profil': pkk.foto_profil.url if pkk.foto_profil else None,
+                'foto_profil_variants': media_pipeline.payload(pkk.foto_profil, images),
                 'kontak_whatsapp': pkk.kontak_whatsapp,
                 'tanggal_bergabung': pkk.tanggal_bergabung.isoformat() if pkk.tanggal_bergabung else None,
             })
@@ -325,6 +330,7 @@ def api_karang_taruna(request):
         page_obj = paginator.get_page(page)
         
         results = []
+        images = media_pipeline.lookup(kt.foto_profil for kt in page_obj)
         for kt in page_obj:
             results.append({
                 'id': kt.id,
@@ -338,6 +344,7 @@ def api_karang_taruna(request):
                 'kontribusi': kt.kontribusi,
                 'is_pengurus_inti': kt.is_pengurus_inti,
                 'foto_profil': kt.foto_profil.url if kt.foto_profil else None,
+                'foto_profil_variants': media_pipeline.payload(kt.foto_profil, images),
                 'kontak_whatsapp': kt.kontak_whatsapp,
                 'email_pribadi': kt.email_pribadi,
                 'pendidikan_terakhir': kt.pendidikan_terakhir,
@@ -401,12 +408,19 @@ def api_organization_structure(request):
             }
         }
         
+        images = media_pipeline.lookup([
+            *(perangkat.foto_profil for perangkat in perangkat_desa),
+            *(pkk.foto_profil for pkk in penggerak_pkk),
+            *(kt.foto_profil for kt in karang_taruna),
+        ])
+        
         # Add perangkat desa data
         for perangkat in perangkat_desa:
             structure['perangkat_desa']['members'].append({
                 'nama': perangkat.penduduk.name,
                 'jabatan': perangkat.get_jabatan_display(),
-                'foto': perangkat.foto_profil.url if perangkat.foto_profil else None
+                'foto': perangkat.foto_profil.url if perangkat.foto_profil else None,
+                'foto_variants': media_pipeline.payload(perangkat.foto_profil, images)
             })
         
         # Add lembaga adat data
@@ -423,7 +437,8 @@ def api_organization_structure(request):
             structure['penggerak_pkk']['members'].append({
                 'nama': pkk.penduduk.name,
                 'jabatan': pkk.get_jabatan_display(),
-                'foto': pkk.foto_profil.url if pkk.foto_profil else None
+                'foto': pkk.foto_profil.url if pkk.foto_profil else None,
+                'foto_variants': media_pipeline.payload(pkk.foto_profil, images)
             })
         
         # Add kepemudaan data
@@ -441,6 +456,7 @@ def api_organization_structure(request):
                 'nama': kt.penduduk.name,
                 'jabatan': kt.get_jabatan_display(),
                 'foto': kt.foto_profil.url if kt.foto_profil else None,
+                'foto_variants': media_pipeline.payload(kt.foto_profil, images),
                 'pengurus_inti': kt.is_pengurus_inti
             })
         
@@ -0,0 +1,6 @@
+from core.media import register
+from .models import KarangTaruna, PenggerakPKK, PerangkatDesa
+
+register(PerangkatDesa, 'foto_profil')
+register(PenggerakPKK, 'foto_profil')
+register(KarangTaruna, 'foto_profil')
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0008_add_sk_kepengurusan_to_kepemudaan'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='karangtaruna',
+            name='organizatio_is_peng_58c404_idx',
+        ),
+    ]
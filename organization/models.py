@@ -319,7 +319,6 @@ class KarangTaruna(models.Model):
             models.Index(fields=['jabatan']),
             models.Index(fields=['status']),
             models.Index(fields=['nomor_anggota']),
-            models.Index(fields=['is_pengurus_inti']),
             models.Index(fields=['jabatan', 'status']),
             models.Index(fields=['status', 'is_pengurus_inti']),
             models.Index(fields=['status', 'tanggal_bergabung']),
@@ -0,0 +1,44 @@
+from core.search import register
+from .models import Organization, PerangkatDesa, LembagaAdat, PenggerakPKK, Kepemudaan, KarangTaruna
+
+register(
+    Organization, 'organization', 'organization',
+    title='name',
+    fields=('organization_type', 'description', 'address'),
+    subtitle='organization_type',
+)
+
+register(
+    PerangkatDesa, 'perangkat_desa', 'organization',
+    title='penduduk__name',
+    fields=('jabatan', 'nip', 'deskripsi_tugas'),
+    subtitle='jabatan',
+)
+
+register(
+    LembagaAdat, 'lembaga_adat', 'organization',
+    title='nama_lembaga',
+    fields=('jenis_lembaga', 'ketua__name', 'deskripsi'),
+    subtitle='jenis_lembaga',
+)
+
+register(
+    PenggerakPKK, 'penggerak_pkk', 'organization',
+    title='penduduk__name',
+    fields=('jabatan', 'nomor_anggota', 'keahlian'),
+    subtitle='jabatan',
+)
+
+register(
+    Kepemudaan, 'kepemudaan', 'organization',
+    title='nama_organisasi',
+    fields=('jenis_organisasi', 'ketua__name', 'deskripsi'),
+    subtitle='jenis_organisasi',
+)
+
+register(
+    KarangTaruna, 'karang_taruna', 'organization',
+    title='penduduk__name',
+    fields=('jabatan', 'nomor_anggota', 'bidang_keahlian'),
+    subtitle='jabatan',
+)
@@ -19,6 +19,8 @@ from django.core.exceptions import ObjectDoesNotExist
 from .models import PerangkatDesa, LembagaAdat, PenggerakPKK, Kepemudaan, KarangTaruna
 from .forms import PerangkatDesaForm, LembagaAdatForm, PenggerakPKKForm, KepemudaanForm, KarangTarunaForm
 from references.models import Penduduk
+from references.autocomplete import search_residents
+from core.search import search_index
 
 logger = logging.getLogger(__name__)
 
@@ -97,10 +99,7 @@ def handle_search_and_filter(queryset, request, search_fields, filter_fields=Non
     search_query = request.GET.get('search', '').strip()
     
     if search_query:
-        search_q = Q()
-        for field in search_fields:
-            search_q |= Q(**{f"{field}__icontains": search_query})
-        queryset = queryset.filter(search_q)
+        queryset = search_index.filter_queryset(queryset, search_query, search_fields)
     
     if filter_fields:
         for field_name, choices in filter_fields.items():
@@ -933,20 +932,11 @@ def karang_taruna_detail(request, pk):
 @require_http_methods(["GET"])
 def api_penduduk_choices(request):
     """API untuk mendapatkan pilihan penduduk (untuk select2)"""
-    search = request.GET.get('search', '')
-    penduduk_list = Penduduk.objects.all()
-    
-    if search:
-        penduduk_list = penduduk_list.filter(
-            Q(name__icontains=search) |
-            Q(nik__icontains=search)
-        )
-    
     results = []
-    for penduduk in penduduk_list[:20]:  # Limit to 20 results
+    for penduduk in search_residents(request):  # Limit to 20 results
         results.append({
             'id': penduduk.id,
-            'text': f"{penduduk.name} - {penduduk.nik}"
+            'text': penduduk.label
         })
     
     return JsonResponse({
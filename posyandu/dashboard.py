@@ -0,0 +1,9 @@
+from django.db.models import Count
+
+from core.aggregator import register
+from .models import PosyanduLocation
+
+
+@register('posyandu')
+def posyandu_metrics():
+    return {'statistics': PosyanduLocation.objects.aggregate(total_posyandu=Count('pk'))}
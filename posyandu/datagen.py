@@ -0,0 +1,244 @@
+import logging
+from bisect import bisect_right
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from core.datagen import DataGenerator, register, weighted, years_ago
+from references.models import Dusun, Penduduk
+from .growth import GrowthService, classify_nutrition, classify_stunting, get_standards
+from .models import (
+    HealthRecord, IbuHamil, Immunization, NutritionData, PemeriksaanIbuHamil, PosyanduLocation, StuntingData,
+)
+from .series import GrowthSeriesService
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MONTHS = 12         # riwayat penimbangan bulanan per balita
+ATTENDANCE = 0.75           # peluang balita datang ke posyandu tiap bulan
+STUNTING_EVERY = 3          # pengukuran stunting tiap n bulan
+
+# Median WHO (bulan -> tinggi cm, berat kg) untuk membentuk kurva pertumbuhan sintetis
+GROWTH_MONTHS = [0, 3, 6, 9, 12, 18, 24, 36, 48, 60]
+MEDIAN_HEIGHT = {
+    'L': [49.9, 61.4, 67.6, 72.0, 75.7, 82.3, 87.1, 96.1, 103.3, 110.0],
+    'P': [49.1, 59.8, 65.7, 70.1, 74.0, 80.7, 85.7, 95.1, 102.7, 109.4],
+}
+MEDIAN_WEIGHT = {
+    'L': [3.3, 6.4, 7.9, 8.9, 9.6, 10.9, 12.2, 14.3, 16.3, 18.3],
+    'P': [3.2, 5.8, 7.3, 8.2, 8.9, 10.2, 11.5, 13.9, 16.1, 18.2],
+}
+
+# (jenis, nama vaksin, dosis, umur bulan) jadwal imunisasi dasar
+IMMUNIZATION_SCHEDULE = [
+    ('hepatitis_b', 'Hepatitis B 0', 1, 0),
+    ('bcg', 'BCG', 1, 1),
+    ('polio', 'Polio Tetes 1', 1, 1),
+    ('dpt', 'DPT-HB-Hib 1', 1, 2),
+    ('polio', 'Polio Tetes 2', 2, 2),
+    ('dpt', 'DPT-HB-Hib 2', 2, 3),
+    ('polio', 'Polio Tetes 3', 3, 3),
+    ('dpt', 'DPT-HB-Hib 3', 3, 4),
+    ('polio', 'Polio Tetes 4', 4, 4),
+    ('campak', 'Campak Rubela (MR)', 1, 9),
+    ('dpt', 'DPT-HB-Hib Lanjutan', 4, 18),
+    ('campak', 'Campak Rubela Lanjutan', 2, 18),
+]
+IMMUNIZATION_COVERAGE = 0.9
+
+LANSIA_DIAGNOSIS = [
+    ('Sehat', 55), ('Perlu perhatian: tekanan darah tinggi ringan', 20), ('Hipertensi', 12),
+    ('Diabetes melitus', 6), ('Asam urat', 4), ('Perlu perhatian: kolesterol', 3),
+]
+LANSIA_VISIT = 0.35         # peluang lansia berkunjung tiap bulan
+
+
+def interpolate(month, values):
+    """Nilai kurva median pada umur (bulan) tertentu"""
+    month = min(max(month, 0), GROWTH_MONTHS[-1])
+    index = min(bisect_right(GROWTH_MONTHS, month), len(GROWTH_MONTHS) - 1)
+    start, end = GROWTH_MONTHS[index - 1], GROWTH_MONTHS[index]
+    ratio = (month - start) / (end - start)
+    return values[index - 1] + (values[index] - values[index - 1]) * ratio
+
+
+def months_between(start, end):
+    return (end.year - start.year) * 12 + end.month - start.month - (end.day < start.day)
+
+
+def add_months(on_date, months):
+    month = on_date.month - 1 + months
+    year = on_date.year + month // 12
+    month = month % 12 + 1
+    return on_date.replace(year=year, month=month, day=min(on_date.day, 28))
+
+
+def measurement(gender, age_months, haz, waz):
+    """(tinggi, berat) dari z-score anak terhadap median; SD dihampiri linear menurut umur"""
+    height = interpolate(age_months, MEDIAN_HEIGHT[gender]) + haz * (1.9 + 0.047 * age_months)
+    weight = interpolate(age_months, MEDIAN_WEIGHT[gender]) + waz * (0.4 + 0.035 * age_months)
+    return Decimal(f'{height:.1f}'), Decimal(f'{max(weight, 1.5):.2f}')
+
+
+class PosyanduGenerator(DataGenerator):
+    """Riwayat posyandu: penimbangan bulanan dan stunting balita, imunisasi, ibu hamil dan kunjungan lansia
+
+    Setiap balita mendapat z-score tetap (rata-rata di bawah median) sehingga kurvanya konsisten antar bulan
+    dan prevalensi stunting mendekati data lapangan; status dihitung ulang dengan standar WHO di finish()
+    bila tabel referensi tersedia.
+    """
+
+    order = 20
+
+    def generate(self, context):
+        rng = context.random(self.name)
+        self.locations = self._locations()
+        self._balita(context, rng)
+        self._ibu_hamil(context, rng)
+        self._lansia(context, rng)
+
+    def _locations(self):
+        locations = list(PosyanduLocation.objects.filter(is_active=True).order_by('pk'))
+        if not locations:
+            locations = PosyanduLocation.objects.bulk_create([
+                PosyanduLocation(name=f'Posyandu {dusun.name}', address=dusun.name, capacity=80)
+                for dusun in Dusun.objects.filter(is_active=True).order_by('pk')
+            ])
+        return locations
+
+    def _location(self, rng, dusun_id):
+        # Satu posyandu per dusun bila jumlahnya sama, selain itu dibagi merata
+        return self.locations[dusun_id % len(self.locations)] if dusun_id else rng.choice(self.locations)
+
+    def _balita(self, context, rng):
+        today = context.today
+        first_month = add_months(today, -HISTORY_MONTHS)
+        balita = Penduduk.objects.filter(
+            is_alive=True, birth_date__gt=years_ago(today, 5), birth_date__lte=today,
+        ).order_by('pk').values_list('pk', 'gender', 'birth_date', 'dusun_id')
+
+        nutrition, stunting, immunizations = [], [], []
+        for patient_id, gender, birth_date, dusun_id in balita.iterator(chunk_size=context.batch_size):
+            location = self._location(rng, dusun_id)
+            haz = rng.gauss(-1.0, 1.1)
+            waz = 0.6 * haz + rng.gauss(0, 0.8)
+            start = max(months_between(birth_date, first_month), 0)
+            for age_months in range(start, months_between(birth_date, today) + 1):
+                if age_months < 1 or rng.random() > ATTENDANCE:
+                    continue
+                measured_on = add_months(birth_date, age_months)
+                point_haz, point_waz = haz + rng.gauss(0, 0.15), waz + rng.gauss(0, 0.15)
+                point_whz = point_waz - 0.5 * point_haz
+                height, weight = measurement(gender, age_months, point_haz, point_waz)
+                nutrition.append(NutritionData(
+                    patient_id=patient_id, posyandu=location, measurement_date=measured_on,
+                    age_months=age_months, weight=weight, height=height,
+                    nutrition_status=classify_nutrition([point_whz], [point_waz], [point_haz])[0],
+                    vitamin_a_given=measured_on.month in (2, 8) and age_months >= 6,
+                    iron_supplement_given=rng.random() < 0.3, recorded_by=context.user,
+                ))
+                if age_months % STUNTING_EVERY == 0:
+                    stunting.append(StuntingData(
+                        balita_id=patient_id, posyandu=location, tanggal_ukur=measured_on,
+                        usia_bulan=age_months, tinggi_badan=height, berat_badan=weight,
+                        z_score_tb_u=Decimal(f'{point_haz:.2f}'), z_score_bb_u=Decimal(f'{point_waz:.2f}'),
+                        z_score_bb_tb=Decimal(f'{point_whz:.2f}'),
+                        status_stunting=classify_stunting([point_haz])[0],
+                        asi_eksklusif=rng.random() < 0.6, riwayat_bblr=haz < -2 and rng.random() < 0.4,
+                        recorded_by=context.user,
+                    ))
+            for vaccine_type, vaccine_name, dose, age_months in IMMUNIZATION_SCHEDULE:
+                given_on = add_months(birth_date, age_months)
+                if given_on <= today and rng.random() < IMMUNIZATION_COVERAGE:
+                    immunizations.append(Immunization(
+                        patient_id=patient_id, posyandu=location, vaccine_type=vaccine_type,
+                        vaccine_name=vaccine_name, dose_number=dose,
+                        immunization_date=min(given_on + timedelta(days=rng.randint(0, 20)), today),
+                        administered_by=context.user,
+                    ))
+            if len(nutrition) >= context.batch_size:
+                self._flush(context, nutrition, stunting, immunizations)
+                nutrition, stunting, immunizations = [], [], []
+        self._flush(context, nutrition, stunting, immunizations)
+
+    @staticmethod
+    def _flush(context, *groups):
+        with transaction.atomic():
+            for objects in groups:
+                if objects:
+                    context.create(type(objects[0]), objects)
+
+    def _ibu_hamil(self, context, rng):
+        today = context.today
+        women = Penduduk.objects.filter(
+            gender='P', marital_status='KAWIN', is_alive=True, is_active=True,
+            birth_date__gt=years_ago(today, 42), birth_date__lte=years_ago(today, 18),
+        ).order_by('pk').values_list('pk', 'birth_date', 'dusun_id')
+
+        pregnancies = []
+        for penduduk_id, birth_date, dusun_id in women.iterator(chunk_size=context.batch_size):
+            if rng.random() > 0.08:
+                continue
+            weeks = rng.randint(6, 40)
+            hpht = today - timedelta(weeks=weeks, days=rng.randint(0, 6))
+            age = months_between(birth_date, today) // 12
+            pregnancies.append(IbuHamil(
+                penduduk_id=penduduk_id, posyandu=self._location(rng, dusun_id), tanggal_hpht=hpht,
+                usia_kehamilan=weeks, tanggal_perkiraan_lahir=hpht + timedelta(days=280),
+                riwayat_kehamilan=weighted(rng, [('1', 30), ('2', 30), ('3', 22), ('4+', 18)]),
+                berat_badan_sebelum_hamil=Decimal(f'{rng.gauss(52, 7):.2f}'),
+                tinggi_badan=Decimal(f'{rng.gauss(153, 5):.2f}'),
+                risiko_kehamilan='tinggi' if age >= 35 or rng.random() < 0.1 else 'rendah',
+                nomor_buku_kia=f'KIA-{today.year}-{len(pregnancies) + 1:05d}',
+            ))
+
+        checkups = []
+        with transaction.atomic():
+            for pregnancy in context.create(IbuHamil, pregnancies):
+                # Pemeriksaan (ANC) kira-kira tiap 4 minggu sejak minggu ke-8
+                for week in range(8, pregnancy.usia_kehamilan + 1, 4):
+                    checkups.append(PemeriksaanIbuHamil(
+                        ibu_hamil=pregnancy, tanggal_periksa=pregnancy.tanggal_hpht + timedelta(weeks=week),
+                        usia_kehamilan=week,
+                        berat_badan=pregnancy.berat_badan_sebelum_hamil + Decimal(f'{week * 0.3:.2f}'),
+                        tekanan_darah=f'{rng.randint(100, 135)}/{rng.randint(65, 90)}',
+                        tinggi_fundus=Decimal(f'{max(week - 12, 0) + 10:.1f}') if week >= 20 else None,
+                        lingkar_lengan_atas=Decimal(f'{rng.gauss(25, 2):.1f}'),
+                        tablet_fe=rng.random() < 0.8, imunisasi_tt=week <= 16 and rng.random() < 0.7,
+                        pemeriksa=context.user,
+                    ))
+            context.insert(PemeriksaanIbuHamil, checkups)
+
+    def _lansia(self, context, rng):
+        today = context.today
+        first_month = add_months(today, -HISTORY_MONTHS)
+        lansia = Penduduk.objects.filter(
+            is_alive=True, is_active=True, birth_date__lte=years_ago(today, 60),
+        ).order_by('pk').values_list('pk', 'dusun_id')
+
+        def visits():
+            for patient_id, dusun_id in lansia.iterator(chunk_size=context.batch_size):
+                location = self._location(rng, dusun_id)
+                for month in range(HISTORY_MONTHS + 1):
+                    if rng.random() > LANSIA_VISIT:
+                        continue
+                    systolic = rng.randint(110, 175)
+                    yield HealthRecord(
+                        patient_id=patient_id, posyandu=location, patient_type='lansia',
+                        visit_date=add_months(first_month, month) + timedelta(days=rng.randint(0, 20)),
+                        blood_pressure=f'{systolic}/{systolic // 2 + rng.randint(5, 20)}',
+                        diagnosis=weighted(rng, LANSIA_DIAGNOSIS), recorded_by=context.user,
+                    )
+
+        context.insert(HealthRecord, (visit for visit in visits() if visit.visit_date <= today))
+
+    def finish(self, context):
+        if get_standards() is not None:
+            # z-score sintetis diganti hasil standar WHO yang sebenarnya
+            for model in (StuntingData, NutritionData):
+                GrowthService.reclassify(model)
+        GrowthSeriesService.rebuild_all()
+
+
+register('posyandu', PosyanduGenerator)
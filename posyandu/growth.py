@@ -0,0 +1,330 @@
+import logging
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Berkas referensi WHO Anthro (igrowup): lenanthro.txt, weianthro.txt, wflanthro.txt, wfhanthro.txt
+    'DIRECTORY': Path(__file__).resolve().parent / 'data' / 'who',
+    'BATCH_SIZE': 2000,
+    'RETRY_AFTER': 300,      # detik sebelum berkas yang gagal dimuat dicoba lagi
+}
+
+# indikator: (nama berkas, kolom sumbu x)
+TABLES = {
+    'lhfa': ('lenanthro.txt', 'age'),      # panjang/tinggi badan menurut umur (hari)
+    'wfa': ('weianthro.txt', 'age'),       # berat badan menurut umur (hari)
+    'wfl': ('wflanthro.txt', 'length'),    # berat badan menurut panjang badan (cm), < 2 tahun
+    'wfh': ('wfhanthro.txt', 'height'),    # berat badan menurut tinggi badan (cm), >= 2 tahun
+}
+
+SEX_CODES = {'L': 1, 'P': 2}
+DAYS_PER_MONTH = 30.4375
+RECUMBENT_UNTIL_DAYS = 731
+
+# Batas nilai tidak wajar (flag WHO); z-score di luar batas dianggap salah ukur
+PLAUSIBLE = {
+    'haz': (-6, 6),
+    'waz': (-6, 5),
+    'whz': (-5, 5),
+}
+
+
+class LMSTable:
+    """Tabel L, M, S satu indikator untuk satu jenis kelamin, terurut menurut sumbu x"""
+
+    def __init__(self, x, l, m, s):
+        order = np.argsort(x)
+        self.x, self.l, self.m, self.s = x[order], l[order], m[order], s[order]
+
+    def lookup(self, values):
+        """Interpolasi linear L, M, S; NaN di luar rentang tabel"""
+        outside = (values < self.x[0]) | (values > self.x[-1]) | np.isnan(values)
+        result = []
+        for column in (self.l, self.m, self.s):
+            interpolated = np.interp(values, self.x, column)
+            interpolated[outside] = np.nan
+            result.append(interpolated)
+        return result
+
+
+class GrowthStandards:
+    """Standar pertumbuhan WHO 2006 (metode LMS) dalam array NumPy, dihitung per batch
+
+    Tinggi diasumsikan diukur telentang di bawah 2 tahun dan berdiri sesudahnya, sesuai kebiasaan posyandu.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.tables = {indicator: self._load(filename, column) for indicator, (filename, column) in TABLES.items()}
+
+    def _load(self, filename, column):
+        data = np.genfromtxt(self.directory / filename, names=True, dtype=None, encoding='utf-8')
+        names = {name.lower(): name for name in data.dtype.names}
+        sex = data[names['sex']].astype(int)
+        return {
+            code: LMSTable(*(data[names[key]][sex == code].astype(float) for key in (column, 'l', 'm', 's')))
+            for code in SEX_CODES.values()
+        }
+
+    def _lms(self, indicator, sex, values):
+        l, m, s = (np.full(values.shape, np.nan) for _ in range(3))
+        for code, table in self.tables[indicator].items():
+            mask = sex == code
+            if mask.any():
+                l[mask], m[mask], s[mask] = table.lookup(values[mask])
+        return l, m, s
+
+    @staticmethod
+    def zscore(y, l, m, s, restricted=False):
+        """z = ((y/M)^L - 1) / (L*S); `restricted` memakai koreksi SD23 WHO untuk |z| > 3 (indikator berat)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            safe_l = np.where(np.abs(l) < 1e-7, 1.0, l)
+            z = np.where(np.abs(l) < 1e-7, np.log(y / m) / s, (np.power(y / m, safe_l) - 1) / (safe_l * s))
+            if restricted:
+                def sd(k):
+                    return m * np.power(1 + safe_l * s * k, 1 / safe_l)
+                sd3pos, sd3neg = sd(3), sd(-3)
+                z = np.where(z > 3, 3 + (y - sd3pos) / (sd3pos - sd(2)), z)
+                z = np.where(z < -3, -3 + (y - sd3neg) / (sd(-2) - sd3neg), z)
+        return z
+
+    def zscores(self, sex, age_days, weight, height):
+        """HAZ, WAZ, WHZ untuk array input; NaN bila data kurang, di luar tabel, atau tidak wajar"""
+        sex = np.asarray(sex, dtype=int)
+        age_days = np.asarray(age_days, dtype=float)
+        weight = np.asarray(weight, dtype=float)
+        height = np.asarray(height, dtype=float)
+
+        haz = self.zscore(height, *self._lms('lhfa', sex, np.round(age_days)))
+        waz = self.zscore(weight, *self._lms('wfa', sex, np.round(age_days)), restricted=True)
+        recumbent = age_days < RECUMBENT_UNTIL_DAYS
+        whz = np.where(
+            recumbent,
+            self.zscore(weight, *self._lms('wfl', sex, height), restricted=True),
+            self.zscore(weight, *self._lms('wfh', sex, height), restricted=True),
+        )
+
+        result = {'haz': haz, 'waz': waz, 'whz': whz}
+        for name, (low, high) in PLAUSIBLE.items():
+            values = result[name]
+            values[(values < low) | (values > high)] = np.nan
+        return result
+
+
+def classify_stunting(haz):
+    """Status TB/U (Permenkes 2/2020) sesuai choices StuntingData.status_stunting; '' bila HAZ tidak ada"""
+    haz = np.asarray(haz, dtype=float)
+    status = np.select([haz < -3, haz < -2], ['sangat_pendek', 'pendek'], 'normal').astype(object)
+    status[np.isnan(haz)] = ''
+    return status
+
+
+def classify_nutrition(whz, waz, haz):
+    """Status gizi sesuai choices NutritionData.nutrition_status
+
+    BB/TB menjadi dasar (BB/U bila BB/TB tidak tersedia); anak bergizi normal dengan TB/U < -2 dicatat stunting.
+    """
+    whz, waz, haz = (np.asarray(values, dtype=float) for values in (whz, waz, haz))
+    basis = np.where(np.isnan(whz), waz, whz)
+    status = np.select(
+        [basis < -3, basis < -2, np.isfinite(whz) & (whz > 2), haz < -2],
+        ['buruk', 'kurang', 'lebih', 'stunting'],
+        'normal',
+    ).astype(object)
+    status[np.isnan(basis)] = ''
+    return status
+
+
+_standards = None
+_standards_lock = threading.Lock()
+_standards_failed_at = None
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'POSYANDU_GROWTH_STANDARDS', {})}
+
+
+def _load_pending():
+    return _standards is None and (
+        _standards_failed_at is None or time.monotonic() - _standards_failed_at >= config()['RETRY_AFTER']
+    )
+
+
+def get_standards():
+    """GrowthStandards yang dimuat sekali per proses; None bila berkas referensi tidak tersedia
+
+    Kegagalan dimuat diingat RETRY_AFTER detik, sehingga berkas yang dipasang belakangan
+    terbaca tanpa restart proses.
+    """
+    global _standards, _standards_failed_at
+    if not _load_pending():
+        return _standards
+    with _standards_lock:
+        if _load_pending():
+            try:
+                _standards = GrowthStandards(config()['DIRECTORY'])
+                _standards_failed_at = None
+            except (OSError, KeyError, ValueError) as e:
+                _standards_failed_at = time.monotonic()
+                logger.warning(f"WHO growth standard tables unavailable, z-scores not computed: {e}")
+    return _standards
+
+
+def reset_standards():
+    global _standards, _standards_failed_at
+    with _standards_lock:
+        _standards = None
+        _standards_failed_at = None
+
+
+def age_in_days(birth_date, measured_on, age_months=None):
+    if birth_date and measured_on:
+        return (measured_on - birth_date).days
+    if age_months is not None:
+        return round(age_months * DAYS_PER_MONTH)
+    return None
+
+
+def to_decimal(value):
+    return Decimal(str(round(float(value), 2)))
+
+
+class GrowthService:
+    """Hitung z-score dan status gizi/stunting untuk StuntingData dan NutritionData"""
+
+    # field per model: pasien, tanggal ukur, umur (bulan), berat, tinggi
+    FIELDS = {
+        'StuntingData': ('balita', 'tanggal_ukur', 'usia_bulan', 'berat_badan', 'tinggi_badan'),
+        'NutritionData': ('patient', 'measurement_date', 'age_months', 'weight', 'height'),
+    }
+
+    @staticmethod
+    def _measure(standards, rows):
+        """rows: (gender, birth_date, tanggal, umur_bulan, berat, tinggi) -> dict array z-score"""
+        sex, ages, weights, heights = [], [], [], []
+        for gender, birth_date, measured_on, age_months, weight, height in rows:
+            age = age_in_days(birth_date, measured_on, age_months)
+            sex.append(SEX_CODES.get(gender, 0))
+            ages.append(np.nan if age is None else age)
+            weights.append(np.nan if weight is None else float(weight))
+            heights.append(np.nan if height is None else float(height))
+        return standards.zscores(sex, ages, weights, heights)
+
+    @staticmethod
+    def _values(record):
+        patient_field, date_field, age_field, weight_field, height_field = GrowthService.FIELDS[type(record).__name__]
+        patient = getattr(record, patient_field)
+        return (
+            patient.gender, patient.birth_date, getattr(record, date_field), getattr(record, age_field),
+            getattr(record, weight_field), getattr(record, height_field),
+        )
+
+    @staticmethod
+    def apply_to_stunting(record):
+        """Isi z_score_* dan status_stunting dari pengukuran; return False bila tidak bisa dihitung"""
+        standards = get_standards()
+        if standards is None:
+            return False
+        scores = GrowthService._measure(standards, [GrowthService._values(record)])
+        haz, waz, whz = scores['haz'][0], scores['waz'][0], scores['whz'][0]
+        if np.isnan(haz):
+            return False
+        record.z_score_tb_u = to_decimal(haz)
+        record.z_score_bb_u = None if np.isnan(waz) else to_decimal(waz)
+        record.z_score_bb_tb = None if np.isnan(whz) else to_decimal(whz)
+        record.status_stunting = classify_stunting([haz])[0]
+        return True
+
+    @staticmethod
+    def apply_to_nutrition(record):
+        """Isi nutrition_status dari pengukuran; return False bila tidak bisa dihitung"""
+        standards = get_standards()
+        if standards is None:
+            return False
+        scores = GrowthService._measure(standards, [GrowthService._values(record)])
+        status = classify_nutrition(scores['whz'], scores['waz'], scores['haz'])[0]
+        if not status:
+            return False
+        record.nutrition_status = status
+        return True
+
+    @staticmethod
+    def reclassify(model, queryset=None, batch_size=None, dry_run=False):
+        """Hitung ulang seluruh pengukuran secara batch; return (diproses, diperbarui, {status: jumlah})"""
+        standards = get_standards()
+        if standards is None:
+            raise RuntimeError(f'Tabel standar WHO tidak ditemukan di {config()["DIRECTORY"]}')
+        batch_size = batch_size or config()['BATCH_SIZE']
+        patient_field, date_field, age_field, weight_field, height_field = GrowthService.FIELDS[model.__name__]
+        rows = (queryset if queryset is not None else model.objects.all()).order_by('pk').values_list(
+            'pk', f'{patient_field}__gender', f'{patient_field}__birth_date',
+            date_field, age_field, weight_field, height_field,
+        )
+        processed = updated = 0
+        counts = {}
+        batch = []
+
+        def flush():
+            nonlocal updated
+            scores = GrowthService._measure(standards, [row[1:] for row in batch])
+            if model.__name__ == 'StuntingData':
+                statuses = classify_stunting(scores['haz'])
+                fields = ['z_score_tb_u', 'z_score_bb_u', 'z_score_bb_tb', 'status_stunting']
+                objects = [
+                    model(
+                        pk=row[0],
+                        z_score_tb_u=to_decimal(haz),
+                        z_score_bb_u=None if np.isnan(waz) else to_decimal(waz),
+                        z_score_bb_tb=None if np.isnan(whz) else to_decimal(whz),
+                        status_stunting=status,
+                    )
+                    for row, haz, waz, whz, status in zip(batch, scores['haz'], scores['waz'], scores['whz'], statuses)
+                    if status
+                ]
+            else:
+                statuses = classify_nutrition(scores['whz'], scores['waz'], scores['haz'])
+                fields = ['nutrition_status']
+                objects = [model(pk=row[0], nutrition_status=status) for row, status in zip(batch, statuses) if status]
+            for status in statuses:
+                if status:
+                    counts[status] = counts.get(status, 0) + 1
+            if not dry_run and objects:
+                model.objects.bulk_update(objects, fields, batch_size=500)
+            updated += len(objects)
+
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            processed += 1
+            if len(batch) >= batch_size:
+                flush()
+                batch = []
+        if batch:
+            flush()
+        return processed, updated, counts
+
+    @staticmethod
+    def benchmark(size=100_000, seed=0):
+        """Throughput perhitungan batch pada data sintetis; return (detik, pengukuran per detik)"""
+        import time
+
+        standards = get_standards()
+        if standards is None:
+            raise RuntimeError(f'Tabel standar WHO tidak ditemukan di {config()["DIRECTORY"]}')
+        rng = np.random.default_rng(seed)
+        sex = rng.integers(1, 3, size)
+        ages = rng.integers(0, 1857, size)
+        heights = 50 + ages / 1856 * 60 + rng.normal(0, 4, size)
+        weights = 3.3 + ages / 1856 * 15 + rng.normal(0, 1.5, size)
+        started = time.perf_counter()
+        scores = standards.zscores(sex, ages, weights, heights)
+        classify_stunting(scores['haz'])
+        classify_nutrition(scores['whz'], scores['waz'], scores['haz'])
+        elapsed = time.perf_counter() - started
+        return elapsed, size / elapsed if elapsed else float('inf')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from posyandu.series import GrowthSeriesService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-patient growth series from every posyandu measurement'
+
+    def handle(self, *args, **options):
+        count = GrowthSeriesService.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'{count} growth series rebuilt'))
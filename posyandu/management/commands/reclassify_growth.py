@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from posyandu.growth import GrowthService
+from posyandu.models import NutritionData, StuntingData
+
+
+class Command(BaseCommand):
+    help = 'Recompute WHO z-scores and stunting/nutrition status for every posyandu measurement'
+
+    MODELS = {'stunting': StuntingData, 'nutrition': NutritionData}
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            choices=list(self.MODELS),
+            action='append',
+            help='Only reclassify this data set (default: all)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Measurements computed per vectorized batch',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Compute and report status counts without saving',
+        )
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            metavar='N',
+            help='Only measure z-score throughput on N synthetic measurements',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['benchmark']:
+                elapsed, rate = GrowthService.benchmark(options['benchmark'])
+                self.stdout.write(self.style.SUCCESS(
+                    f'{options["benchmark"]} measurements in {elapsed * 1000:.1f} ms ({rate:,.0f}/s)'
+                ))
+                return
+
+            for name in options['model'] or self.MODELS:
+                processed, updated, counts = GrowthService.reclassify(
+                    self.MODELS[name], batch_size=options['batch_size'], dry_run=options['dry_run'],
+                )
+                summary = ', '.join(f'{status}: {count}' for status, count in sorted(counts.items()))
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}: {processed} measurements, {updated} classified'
+                    f'{" (dry run)" if options["dry_run"] else ""}' + (f' [{summary}]' if summary else '')
+                ))
+        except RuntimeError as e:
+            raise CommandError(str(e))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posyandu', '0003_merge_20250827_2039'),
+        ('references', '0005_penduduk_is_active_birth_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='healthrecord',
+            options={'get_latest_by': 'visit_date', 'ordering': ['-visit_date'], 'verbose_name': 'Rekam Kesehatan', 'verbose_name_plural': 'Rekam Kesehatan'},
+        ),
+        migrations.AlterModelOptions(
+            name='nutritiondata',
+            options={'get_latest_by': 'measurement_date', 'ordering': ['-measurement_date'], 'verbose_name': 'Data Nutrisi', 'verbose_name_plural': 'Data Nutrisi'},
+        ),
+        migrations.AlterModelOptions(
+            name='pemeriksaanibuhamil',
+            options={'get_latest_by': 'tanggal_periksa', 'ordering': ['-tanggal_periksa'], 'verbose_name': 'Pemeriksaan Ibu Hamil', 'verbose_name_plural': 'Pemeriksaan Ibu Hamil'},
+        ),
+        migrations.AlterModelOptions(
+            name='stuntingdata',
+            options={'get_latest_by': 'tanggal_ukur', 'ordering': ['-tanggal_ukur'], 'verbose_name': 'Data Stunting', 'verbose_name_plural': 'Data Stunting'},
+        ),
+        migrations.AddIndex(
+            model_name='healthrecord',
+            index=models.Index(fields=['patient', 'visit_date'], name='posyandu_hr_patient_visit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nutritiondata',
+            index=models.Index(fields=['patient', 'measurement_date'], name='posyandu_nd_patient_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pemeriksaanibuhamil',
+            index=models.Index(fields=['ibu_hamil', 'tanggal_periksa'], name='posyandu_pih_ibu_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stuntingdata',
+            index=models.Index(fields=['balita', 'tanggal_ukur'], name='posyandu_sd_balita_date_idx'),
+        ),
+    ]
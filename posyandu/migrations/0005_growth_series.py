@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posyandu', '0004_latest_record_indexes'),
+        ('references', '0005_penduduk_is_active_birth_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GrowthSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.BinaryField(default=b'')),
+                ('point_count', models.PositiveIntegerField(default=0)),
+                ('first_date', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_posyandu', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='growth_series', to='posyandu.posyandulocation')),
+                ('patient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='growth_series', to='references.penduduk')),
+            ],
+            options={
+                'verbose_name': 'Seri Pertumbuhan',
+                'verbose_name_plural': 'Seri Pertumbuhan',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posyandu', '0005_growth_series'),
+        ('references', '0006_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='posyandukader',
+            index=models.Index(fields=['status'], name='posyandu_kader_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posyanduschedule',
+            index=models.Index(fields=['schedule_date'], name='posyandu_sched_date_idx'),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from references.models import Penduduk
 from django.utils import timezone
@@ -7,6 +10,34 @@ from datetime import date
 User = get_user_model()
 
 
+class LatestRecordQuerySet(models.QuerySet):
+    """QuerySet rekam posyandu dengan data terakhir per pasien dalam satu query
+
+    Model menentukan field pasien lewat `PATIENT_FIELD` dan field tanggal lewat `Meta.get_latest_by`;
+    subquery berkorelasi memakai index (pasien, tanggal).
+    """
+
+    def latest_per_patient(self):
+        """Satu rekam terbaru (tanggal terakhir, lalu id terbesar) per pasien, dengan filter yang sama"""
+        patient_field = self.model.PATIENT_FIELD
+        date_field = self.model._meta.get_latest_by
+        newest = self.filter(**{patient_field: OuterRef(patient_field)}).order_by(
+            f'-{date_field}', '-pk'
+        ).values('pk')[:1]
+        return self.filter(pk=Subquery(newest))
+
+    def latest_by_patient(self, patients=None):
+        """Dict {patient_id: rekam terbaru}, opsional dibatasi ke daftar pasien/id"""
+        patient_field = self.model.PATIENT_FIELD
+        queryset = self
+        if patients is not None:
+            queryset = queryset.filter(**{f'{patient_field}__in': patients})
+        return {
+            getattr(record, f'{patient_field}_id'): record
+            for record in queryset.latest_per_patient()
+        }
+
+
 class PosyanduLocation(models.Model):
     name = models.CharField(max_length=200)
     address = models.TextField()
@@ -59,6 +90,9 @@ class PosyanduSchedule(models.Model):
         verbose_name = 'Jadwal Posyandu'
         verbose_name_plural = 'Jadwal Posyandu'
         ordering = ['-schedule_date', 'start_time']
+        indexes = [
+            models.Index(fields=['schedule_date'], name='posyandu_sched_date_idx'),
+        ]
 
 
 class HealthRecord(models.Model):
@@ -69,6 +103,8 @@ class HealthRecord(models.Model):
         ('lansia', 'Lansia'),
     ]
     
+    PATIENT_FIELD = 'patient'
+
     patient = models.ForeignKey(Penduduk, on_delete=models.CASCADE, related_name='health_records')
     posyandu = models.ForeignKey(PosyanduLocation, on_delete=models.CASCADE)
     patient_type = models.CharField(max_length=20, choices=PATIENT_TYPE_CHOICES)
@@ -85,6 +121,8 @@ class HealthRecord(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LatestRecordQuerySet.as_manager()
+
     def __str__(self):
         return f'{self.patient.name} - {self.visit_date}'
 
@@ -92,6 +130,10 @@ class HealthRecord(models.Model):
         verbose_name = 'Rekam Kesehatan'
         verbose_name_plural = 'Rekam Kesehatan'
         ordering = ['-visit_date']
+        get_latest_by = 'visit_date'
+        indexes = [
+            models.Index(fields=['patient', 'visit_date'], name='posyandu_hr_patient_visit_idx'),
+        ]
 
 
 class Immunization(models.Model):
@@ -139,6 +181,8 @@ class NutritionData(models.Model):
         ('wasting', 'Wasting'),
     ]
     
+    PATIENT_FIELD = 'patient'
+
     patient = models.ForeignKey(Penduduk, on_delete=models.CASCADE, related_name='nutrition_data')
     posyandu = models.ForeignKey(PosyanduLocation, on_delete=models.CASCADE)
     measurement_date = models.DateField()
@@ -155,6 +199,15 @@ class NutritionData(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LatestRecordQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # Status dihitung dari standar WHO bila tabel referensi tersedia; nilai manual dipakai bila tidak
+        if kwargs.get('update_fields') is None:
+            from .growth import GrowthService
+            GrowthService.apply_to_nutrition(self)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f'{self.patient.name} - {self.measurement_date} ({self.nutrition_status})'
 
@@ -162,6 +215,10 @@ class NutritionData(models.Model):
         verbose_name = 'Data Nutrisi'
         verbose_name_plural = 'Data Nutrisi'
         ordering = ['-measurement_date']
+        get_latest_by = 'measurement_date'
+        indexes = [
+            models.Index(fields=['patient', 'measurement_date'], name='posyandu_nd_patient_date_idx'),
+        ]
 
 
 class PosyanduKader(models.Model):
@@ -199,6 +256,9 @@ class PosyanduKader(models.Model):
         verbose_name_plural = 'Kader Posyandu'
         unique_together = ['penduduk', 'posyandu', 'jabatan']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status'], name='posyandu_kader_status_idx'),
+        ]
 
 
 class IbuHamil(models.Model):
@@ -247,6 +307,8 @@ class IbuHamil(models.Model):
 
 
 class PemeriksaanIbuHamil(models.Model):
+    PATIENT_FIELD = 'ibu_hamil'
+
     ibu_hamil = models.ForeignKey(IbuHamil, on_delete=models.CASCADE, related_name='pemeriksaan')
     tanggal_periksa = models.DateField()
     usia_kehamilan = models.PositiveIntegerField(help_text='Dalam minggu')
@@ -263,6 +325,8 @@ class PemeriksaanIbuHamil(models.Model):
     pemeriksa = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = LatestRecordQuerySet.as_manager()
+
     def __str__(self):
         return f'{self.ibu_hamil.penduduk.name} - {self.tanggal_periksa}'
     
@@ -270,6 +334,10 @@ class PemeriksaanIbuHamil(models.Model):
         verbose_name = 'Pemeriksaan Ibu Hamil'
         verbose_name_plural = 'Pemeriksaan Ibu Hamil'
         ordering = ['-tanggal_periksa']
+        get_latest_by = 'tanggal_periksa'
+        indexes = [
+            models.Index(fields=['ibu_hamil', 'tanggal_periksa'], name='posyandu_pih_ibu_date_idx'),
+        ]
 
 
 class StuntingData(models.Model):
@@ -286,6 +354,8 @@ class StuntingData(models.Model):
         ('edukasi', 'Edukasi Keluarga'),
     ]
     
+    PATIENT_FIELD = 'balita'
+
     balita = models.ForeignKey(Penduduk, on_delete=models.CASCADE, related_name='stunting_data')
     posyandu = models.ForeignKey(PosyanduLocation, on_delete=models.CASCADE)
     tanggal_ukur = models.DateField()
@@ -307,6 +377,15 @@ class StuntingData(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = LatestRecordQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # Status dihitung dari standar WHO bila tabel referensi tersedia; nilai manual dipakai bila tidak
+        if kwargs.get('update_fields') is None:
+            from .growth import GrowthService
+            GrowthService.apply_to_stunting(self)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f'{self.balita.name} - {self.tanggal_ukur} ({self.status_stunting})'
     
@@ -314,3 +393,61 @@ class StuntingData(models.Model):
         verbose_name = 'Data Stunting'
         verbose_name_plural = 'Data Stunting'
         ordering = ['-tanggal_ukur']
+        get_latest_by = 'tanggal_ukur'
+        indexes = [
+            models.Index(fields=['balita', 'tanggal_ukur'], name='posyandu_sd_balita_date_idx'),
+        ]
+
+
+class GrowthSeries(models.Model):
+    """Riwayat pertumbuhan per pasien sebagai array biner terurut tanggal (lihat posyandu.series)"""
+
+    patient = models.OneToOneField(Penduduk, on_delete=models.CASCADE, related_name='growth_series')
+    last_posyandu = models.ForeignKey(
+        PosyanduLocation, on_delete=models.SET_NULL, null=True, blank=True, related_name='growth_series'
+    )
+    points = models.BinaryField(default=b'')
+    point_count = models.PositiveIntegerField(default=0)
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.patient.name} - {self.point_count} titik'
+
+    class Meta:
+        verbose_name = 'Seri Pertumbuhan'
+        verbose_name_plural = 'Seri Pertumbuhan'
+
+
+@receiver(pre_save, sender=NutritionData)
+@receiver(pre_save, sender=StuntingData)
+@receiver(pre_save, sender=HealthRecord)
+def remember_growth_series_patient(sender, instance, raw=False, **kwargs):
+    """Simpan pasien lama agar titiknya dibuang bila pengukuran dipindah ke pasien lain"""
+    if raw or instance.pk is None:
+        return
+    from .series import SOURCES
+    instance._previous_growth_patient_id = sender.objects.filter(pk=instance.pk).values_list(
+        f'{SOURCES[sender][1]}_id', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=NutritionData)
+@receiver(post_save, sender=StuntingData)
+@receiver(post_save, sender=HealthRecord)
+def update_growth_series_on_save(sender, instance, raw=False, **kwargs):
+    """Perbarui titik pengukuran di seri pertumbuhan pasien"""
+    if raw:
+        return
+    from .series import GrowthSeriesService
+    GrowthSeriesService.sync(instance)
+
+
+@receiver(post_delete, sender=NutritionData)
+@receiver(post_delete, sender=StuntingData)
+@receiver(post_delete, sender=HealthRecord)
+def update_growth_series_on_delete(sender, instance, **kwargs):
+    """Buang titik pengukuran yang dihapus dari seri pertumbuhan pasien"""
+    from .series import GrowthSeriesService
+    GrowthSeriesService.sync(instance, deleted=True)
@@ -0,0 +1,258 @@
+import logging
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .growth import GrowthService, get_standards
+from .models import GrowthSeries, HealthRecord, NutritionData, StuntingData
+
+logger = logging.getLogger(__name__)
+
+# Satu titik pengukuran; tanggal disimpan sebagai ordinal agar bisa dicari dengan searchsorted
+POINT_DTYPE = np.dtype([
+    ('day', '<i4'),
+    ('source', 'u1'),
+    ('record', '<i8'),
+    ('weight', '<f4'),
+    ('height', '<f4'),
+    ('haz', '<f4'),
+    ('waz', '<f4'),
+    ('whz', '<f4'),
+])
+
+# sumber: (kode, field pasien, field tanggal, field berat, field tinggi)
+SOURCES = {
+    NutritionData: (1, 'patient', 'measurement_date', 'weight', 'height'),
+    StuntingData: (2, 'balita', 'tanggal_ukur', 'berat_badan', 'tinggi_badan'),
+    HealthRecord: (3, 'patient', 'visit_date', 'weight', 'height'),
+}
+SOURCE_NAMES = {1: 'nutrition', 2: 'stunting', 3: 'health'}
+
+
+def decode(data):
+    return np.frombuffer(bytes(data or b''), dtype=POINT_DTYPE)
+
+
+def encode(points):
+    return np.ascontiguousarray(points, dtype=POINT_DTYPE).tobytes()
+
+
+class GrowthSeriesService:
+    """Seri (tanggal, berat, tinggi, z-score) per anak, dimaterialisasi saat data ukur disimpan"""
+
+    @staticmethod
+    def _points(patient, rows):
+        """rows: (sumber, id, tanggal, berat, tinggi) -> array titik terurut tanggal dengan z-score"""
+        rows = [row for row in rows if row[3] is not None or row[4] is not None]
+        points = np.zeros(len(rows), dtype=POINT_DTYPE)
+        if not rows:
+            return points
+        points['source'] = [row[0] for row in rows]
+        points['record'] = [row[1] for row in rows]
+        points['day'] = [row[2].toordinal() for row in rows]
+        points['weight'] = [np.nan if row[3] is None else float(row[3]) for row in rows]
+        points['height'] = [np.nan if row[4] is None else float(row[4]) for row in rows]
+        points['haz'] = points['waz'] = points['whz'] = np.nan
+
+        standards = get_standards()
+        if standards is not None:
+            scores = GrowthService._measure(standards, [
+                (patient.gender, patient.birth_date, row[2], None, row[3], row[4]) for row in rows
+            ])
+            for name in ('haz', 'waz', 'whz'):
+                points[name] = scores[name]
+        return np.sort(points, order=('day', 'source', 'record'))
+
+    @staticmethod
+    def build(patient):
+        """Bangun ulang seri satu pasien dari semua sumber (satu query per sumber)"""
+        rows = []
+        last_visit = None     # (tanggal, posyandu_id) pengukuran terbaru
+        for model, (code, patient_field, date_field, weight_field, height_field) in SOURCES.items():
+            for pk, measured_on, weight, height, posyandu_id in model.objects.filter(
+                **{patient_field: patient}
+            ).values_list('pk', date_field, weight_field, height_field, 'posyandu_id'):
+                rows.append((code, pk, measured_on, weight, height))
+                if last_visit is None or measured_on >= last_visit[0]:
+                    last_visit = (measured_on, posyandu_id)
+        points = GrowthSeriesService._points(patient, rows)
+        return GrowthSeriesService._store(patient, points, last_visit[1] if last_visit else None)
+
+    @staticmethod
+    def _fields(points, posyandu_id):
+        return {
+            'points': encode(points),
+            'point_count': len(points),
+            'first_date': date.fromordinal(int(points['day'][0])) if len(points) else None,
+            'last_date': date.fromordinal(int(points['day'][-1])) if len(points) else None,
+            'last_posyandu_id': posyandu_id,
+        }
+
+    @staticmethod
+    def _store(patient, points, posyandu_id):
+        series, _ = GrowthSeries.objects.update_or_create(
+            patient=patient, defaults=GrowthSeriesService._fields(points, posyandu_id),
+        )
+        return series
+
+    @staticmethod
+    def record_saved(record, previous_patient_id=None):
+        """Sisipkan/ganti titik dari satu rekam tanpa membaca ulang seluruh riwayat"""
+        code, patient_field, date_field, weight_field, height_field = SOURCES[type(record)]
+        patient = getattr(record, patient_field)
+        if previous_patient_id is not None and previous_patient_id != patient.pk:
+            # Pindah pasien: seri pasien lama dibangun ulang tanpa titik ini
+            previous = GrowthSeries.objects.select_related('patient').filter(patient_id=previous_patient_id).first()
+            if previous is not None:
+                GrowthSeriesService.build(previous.patient)
+        series = GrowthSeries.objects.filter(patient=patient).first()
+        if series is None:
+            GrowthSeriesService.build(patient)
+            return
+        point = GrowthSeriesService._points(patient, [(
+            code, record.pk, getattr(record, date_field), getattr(record, weight_field), getattr(record, height_field),
+        )])
+        points = decode(series.points)
+        points = points[~((points['source'] == code) & (points['record'] == record.pk))]
+        merged = np.sort(np.concatenate([points, point]), order=('day', 'source', 'record'))
+        # Posyandu terakhir ikut pengukuran terbaru
+        posyandu_id = series.last_posyandu_id
+        if len(point) and (series.last_date is None or getattr(record, date_field) >= series.last_date):
+            posyandu_id = record.posyandu_id
+        GrowthSeriesService._store(patient, merged, posyandu_id)
+
+    @staticmethod
+    def record_deleted(record):
+        code, patient_field, date_field = SOURCES[type(record)][:3]
+        series = GrowthSeries.objects.select_related('patient').filter(
+            patient_id=getattr(record, f'{patient_field}_id')
+        ).first()
+        if series is None:
+            return
+        if series.last_date and getattr(record, date_field) >= series.last_date:
+            # Pengukuran terbaru hilang: posyandu terakhir harus dihitung ulang dari sumber
+            GrowthSeriesService.build(series.patient)
+            return
+        points = decode(series.points)
+        GrowthSeriesService._store(
+            series.patient, points[~((points['source'] == code) & (points['record'] == record.pk))],
+            series.last_posyandu_id,
+        )
+
+    @staticmethod
+    def sync(record, deleted=False):
+        """Dipanggil dari signal; bila gagal seri dihapus agar dibangun ulang saat dibaca"""
+        patient_id = getattr(record, f'{SOURCES[type(record)][1]}_id')
+        previous_patient_id = record.__dict__.pop('_previous_growth_patient_id', None)
+        try:
+            with transaction.atomic():
+                if deleted:
+                    GrowthSeriesService.record_deleted(record)
+                else:
+                    GrowthSeriesService.record_saved(record, previous_patient_id)
+        except Exception as e:
+            logger.error(f"Growth series update failed for patient {patient_id}: {e}")
+            GrowthSeries.objects.filter(patient_id__in={patient_id, previous_patient_id} - {None}).delete()
+
+    @staticmethod
+    def slice(points, start=None, end=None, max_points=None):
+        """Potong rentang tanggal (inklusif) lalu kurangi titik secara merata, titik pertama/terakhir tetap"""
+        days = points['day']
+        lo = np.searchsorted(days, start.toordinal(), side='left') if start else 0
+        hi = np.searchsorted(days, end.toordinal(), side='right') if end else len(points)
+        points = points[lo:hi]
+        if max_points and len(points) > max_points:
+            points = points[np.unique(np.linspace(0, len(points) - 1, max_points).round().astype(int))]
+        return points
+
+    @staticmethod
+    def serialize(points):
+        """Format kolom (bukan list objek) agar payload kecil untuk grafik"""
+        def column(name):
+            values = points[name].astype(float).round(2)
+            return [None if np.isnan(value) else float(value) for value in values]
+
+        return {
+            'date': [date.fromordinal(int(day)).isoformat() for day in points['day']],
+            'source': [SOURCE_NAMES[int(code)] for code in points['source']],
+            'weight': column('weight'),
+            'height': column('height'),
+            'haz': column('haz'),
+            'waz': column('waz'),
+            'whz': column('whz'),
+        }
+
+    @staticmethod
+    def load(patient_ids=None, posyandu_id=None):
+        """Seri beberapa pasien sekaligus; pasien tanpa seri dibangun sekali lalu disimpan"""
+        from references.models import Penduduk
+
+        queryset = GrowthSeries.objects.select_related('patient')
+        if posyandu_id:
+            queryset = queryset.filter(last_posyandu_id=posyandu_id)
+        if patient_ids is not None:
+            queryset = queryset.filter(patient_id__in=patient_ids)
+        series = {item.patient_id: item for item in queryset}
+        if posyandu_id:
+            # Seri yang terhapus (sync gagal) tidak punya last_posyandu_id; cari dari data ukur posyandu ini
+            missing = set()
+            for model, (code, patient_field, *_rest) in SOURCES.items():
+                measured = model.objects.filter(posyandu_id=posyandu_id).exclude(
+                    Exists(GrowthSeries.objects.filter(patient_id=OuterRef(f'{patient_field}_id')))
+                )
+                if patient_ids is not None:
+                    measured = measured.filter(**{f'{patient_field}_id__in': patient_ids})
+                missing.update(measured.order_by().values_list(f'{patient_field}_id', flat=True).distinct())
+        elif patient_ids is not None:
+            missing = set(patient_ids) - set(series)
+        else:
+            missing = set()
+        for patient in Penduduk.objects.filter(pk__in=missing):
+            built = GrowthSeriesService.build(patient)
+            if not posyandu_id or built.last_posyandu_id == posyandu_id:
+                series[patient.pk] = built
+        return series
+
+    @staticmethod
+    def rebuild_all(batch_size=2000):
+        """Bangun ulang seri semua pasien yang punya data ukur per blok pasien; return jumlah seri
+
+        Satu query per sumber untuk setiap blok dan seri ditulis dengan bulk_create, sehingga data
+        ratusan ribu pasien (mis. hasil generate_synthetic_data) tidak dibangun satu per satu.
+        """
+        from references.models import Penduduk
+
+        stale = GrowthSeries.objects.all()
+        patient_ids = set()
+        for model, (code, patient_field, *_rest) in SOURCES.items():
+            stale = stale.exclude(Exists(model.objects.filter(**{patient_field: OuterRef('patient_id')})))
+            patient_ids.update(model.objects.order_by().values_list(f'{patient_field}_id', flat=True).distinct())
+        stale.delete()
+
+        patient_ids = sorted(patient_ids)
+        for start in range(0, len(patient_ids), batch_size):
+            block = patient_ids[start:start + batch_size]
+            patients = Penduduk.objects.only('gender', 'birth_date').in_bulk(block)
+            rows = defaultdict(list)
+            last_visit = {}     # patient_id -> (tanggal, posyandu_id) pengukuran terbaru
+            for model, (code, patient_field, date_field, weight_field, height_field) in SOURCES.items():
+                for patient_id, pk, measured_on, weight, height, posyandu_id in model.objects.filter(
+                    **{f'{patient_field}_id__in': block}
+                ).order_by().values_list(f'{patient_field}_id', 'pk', date_field, weight_field, height_field, 'posyandu_id'):
+                    rows[patient_id].append((code, pk, measured_on, weight, height))
+                    if patient_id not in last_visit or measured_on >= last_visit[patient_id][0]:
+                        last_visit[patient_id] = (measured_on, posyandu_id)
+            series = [
+                GrowthSeries(patient_id=patient_id, **GrowthSeriesService._fields(
+                    GrowthSeriesService._points(patients[patient_id], rows[patient_id]),
+                    last_visit[patient_id][1] if patient_id in last_visit else None,
+                ))
+                for patient_id in block if patient_id in patients
+            ]
+            with transaction.atomic():
+                GrowthSeries.objects.filter(patient_id__in=block).delete()
+                GrowthSeries.objects.bulk_create(series)
+        return len(patient_ids)
@@ -1,3 +1,267 @@
-from django.test import TestCase
+import math
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .growth import GrowthStandards, classify_nutrition, classify_stunting, get_standards, reset_standards
+
+# Tabel LMS kecil berformat WHO Anthro dengan nilai bulat, sehingga z-score bisa dihitung tangan.
+# M diinterpolasi linear: TB/U laki-laki umur 365 hari -> M 70, BB/PB panjang 70 cm -> M 8
+FIXTURE_TABLES = {
+    'lenanthro.txt': ('sex\tage\tl\tm\ts\tloh', [
+        (1, 0, 1, 50, 0.05, 'L'), (1, 730, 1, 90, 0.05, 'L'),
+        (2, 0, 1, 48, 0.05, 'L'), (2, 730, 1, 88, 0.05, 'L'),
+    ]),
+    'weianthro.txt': ('sex\tage\tl\tm\ts', [
+        (1, 0, 1, 3, 0.1), (1, 730, 1, 12, 0.1), (1, 1460, 1, 16, 0.1),
+        (2, 0, 1, 3, 0.1), (2, 730, 1, 11, 0.1), (2, 1460, 1, 15, 0.1),
+    ]),
+    'wflanthro.txt': ('sex\tlength\tl\tm\ts\tlorh', [
+        (1, 50, 1, 3, 0.1, 'L'), (1, 90, 1, 13, 0.1, 'L'),
+        (2, 50, 1, 3, 0.1, 'L'), (2, 90, 1, 12, 0.1, 'L'),
+    ]),
+    'wfhanthro.txt': ('sex\theight\tl\tm\ts\tlorh', [
+        (1, 70, 1, 9, 0.1, 'H'), (1, 110, 1, 19, 0.1, 'H'),
+        (2, 70, 1, 9, 0.1, 'H'), (2, 110, 1, 18, 0.1, 'H'),
+    ]),
+}
+
+
+def write_fixture_tables(directory):
+    for filename, (header, rows) in FIXTURE_TABLES.items():
+        lines = [header] + ['\t'.join(str(value) for value in row) for row in rows]
+        (Path(directory) / filename).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+class LMSZScoreTest(SimpleTestCase):
+    def zscore(self, y, l, m, s, restricted=False):
+        return float(GrowthStandards.zscore(*(np.array([value], dtype=float) for value in (y, l, m, s)),
+                                            restricted=restricted)[0])
+
+    def test_box_cox_formula(self):
+        self.assertAlmostEqual(self.zscore(55, 1, 50, 0.1), 1.0)
+        # ((12/10)^-0.5 - 1) / (-0.5 * 0.1)
+        self.assertAlmostEqual(self.zscore(12, -0.5, 10, 0.1), 1.742581, places=6)
+        # L = 0: ln(y/M) / S
+        self.assertAlmostEqual(self.zscore(50 * math.exp(0.1), 0, 50, 0.1), 1.0)
+
+    def test_restricted_sd23_correction(self):
+        # L = -1, M = 10, S = 0.1: SD(k) = 10 / (1 - 0.1k); SD3 = 100/7, SD2 = 12.5, SD-2 = 100/12, SD-3 = 100/13
+        self.assertAlmostEqual(self.zscore(16, -1, 10, 0.1), 3.75)
+        self.assertAlmostEqual(self.zscore(16, -1, 10, 0.1, restricted=True), 3.96)
+        self.assertAlmostEqual(self.zscore(7, -1, 10, 0.1, restricted=True), -4.08)
+        # Di dalam +-3 SD koreksi tidak berlaku
+        self.assertAlmostEqual(self.zscore(11, -1, 10, 0.1, restricted=True), self.zscore(11, -1, 10, 0.1))
+
+
+class GrowthStandardsFixtureTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        write_fixture_tables(directory)
+        self.directory = directory
+        self.standards = GrowthStandards(directory)
+
+    def scores(self, sex, age_days, weight, height):
+        return {name: values.tolist() for name, values in self.standards.zscores(sex, age_days, weight, height).items()}
+
+    def test_interpolated_lms_per_sex(self):
+        scores = self.scores([1, 2], [365, 365], [7.5, 7.5], [70, 70])
+        self.assertAlmostEqual(scores['haz'][0], 0.0)
+        self.assertAlmostEqual(scores['haz'][1], (70 / 68 - 1) / 0.05)
+        self.assertAlmostEqual(scores['waz'][0], 0.0)
+        self.assertAlmostEqual(scores['waz'][1], (7.5 / 7 - 1) / 0.1)
+
+    def test_weight_for_length_below_two_years_then_height(self):
+        scores = self.scores([1, 1], [365, 800], [8, 8], [70, 70])
+        self.assertAlmostEqual(scores['whz'][0], 0.0)
+        self.assertAlmostEqual(scores['whz'][1], (8 / 9 - 1) / 0.1)
+
+    def test_outside_table_and_implausible_values_are_nan(self):
+        scores = self.scores([1, 1, 0], [2000, 365, 365], [8, 8, 8], [70, 40, 70])
+        self.assertTrue(np.isnan(scores['haz'][0]))     # umur di luar tabel
+        self.assertTrue(np.isnan(scores['whz'][1]))     # panjang di luar tabel
+        self.assertTrue(np.isnan(scores['haz'][1]))     # z -8.6, tidak wajar
+        self.assertTrue(np.isnan(scores['haz'][2]))     # jenis kelamin tidak diketahui
+
+    def test_get_standards_reads_configured_directory(self):
+        reset_standards()
+        self.addCleanup(reset_standards)
+        with override_settings(POSYANDU_GROWTH_STANDARDS={'DIRECTORY': self.directory}):
+            standards = get_standards()
+        self.assertIsNotNone(standards)
+        self.assertAlmostEqual(float(standards.zscores([1], [365], [8], [70])['whz'][0]), 0.0)
+
+    def test_missing_tables_are_retried_after_delay(self):
+        reset_standards()
+        self.addCleanup(reset_standards)
+        missing = Path(self.directory) / 'missing'
+        with override_settings(POSYANDU_GROWTH_STANDARDS={'DIRECTORY': missing, 'RETRY_AFTER': 3600}):
+            with self.assertLogs('posyandu.growth', 'WARNING'):
+                self.assertIsNone(get_standards())
+            shutil.copytree(self.directory, missing)
+            # Kegagalan masih diingat
+            self.assertIsNone(get_standards())
+        with override_settings(POSYANDU_GROWTH_STANDARDS={'DIRECTORY': missing, 'RETRY_AFTER': 0}):
+            self.assertIsNotNone(get_standards())
+
+
+class GrowthClassificationTest(SimpleTestCase):
+    def test_stunting_thresholds(self):
+        self.assertEqual(
+            list(classify_stunting([-3.01, -3.0, -2.01, -2.0, 1.5, np.nan])),
+            ['sangat_pendek', 'pendek', 'pendek', 'normal', 'normal', ''],
+        )
+
+    def test_nutrition_thresholds(self):
+        nan = np.nan
+        cases = [
+            # (whz, waz, haz, status)
+            (-3.01, 0, 0, 'buruk'),
+            (-3.0, 0, 0, 'kurang'),
+            (-2.0, 0, 0, 'normal'),
+            (2.01, 0, 0, 'lebih'),
+            (2.0, 0, 0, 'normal'),
+            (0, 0, -2.01, 'stunting'),
+            (-2.5, 0, -3.5, 'kurang'),      # gizi kurang lebih berat dari stunting
+            (nan, -2.5, 0, 'kurang'),       # BB/U bila BB/TB tidak ada
+            (nan, 2.5, 0, 'normal'),        # gizi lebih hanya dari BB/TB
+            (nan, nan, -2.5, ''),
+        ]
+        whz, waz, haz, expected = zip(*cases)
+        self.assertEqual(list(classify_nutrition(whz, waz, haz)), list(expected))
+
+
+class GrowthSeriesTest(TestCase):
+    def setUp(self):
+        from references.models import Dusun, Penduduk
+        from .models import PosyanduLocation
+
+        dusun = Dusun.objects.create(name='Dusun A')
+        self.first, self.second = (
+            Penduduk.objects.create(
+                nik=nik, name=name, gender='L', birth_place='Sarok', birth_date=date(2023, 1, 1),
+                religion='Islam', marital_status='BELUM_KAWIN', dusun=dusun, address='-',
+            )
+            for nik, name in (('1102010101230001', 'Anak Satu'), ('1102010101230002', 'Anak Dua'))
+        )
+        self.posyandu = PosyanduLocation.objects.create(name='Posyandu Mawar', address='-')
+
+    def measure(self, patient, day):
+        from .models import NutritionData
+
+        return NutritionData.objects.create(
+            patient=patient, posyandu=self.posyandu, measurement_date=date(2024, 1, day), age_months=12,
+            weight=9, height=75, nutrition_status='normal',
+        )
+
+    def records(self, patient):
+        from .models import GrowthSeries
+        from .series import decode
+
+        return decode(GrowthSeries.objects.get(patient=patient).points)['record'].tolist()
+
+    def test_moving_a_measurement_removes_it_from_the_old_patient(self):
+        kept, moved = self.measure(self.first, 1), self.measure(self.first, 2)
+        self.measure(self.second, 3)
+        self.assertEqual(self.records(self.first), [kept.pk, moved.pk])
+
+        moved.patient = self.second
+        moved.save()
+        self.assertEqual(self.records(self.first), [kept.pk])
+        self.assertIn(moved.pk, self.records(self.second))
+
+    def test_load_by_posyandu_rebuilds_missing_series(self):
+        from .models import GrowthSeries, PosyanduLocation
+        from .series import GrowthSeriesService
+
+        first = self.measure(self.first, 1)
+        self.measure(self.second, 2)
+        # Pengukuran terbaru anak kedua di posyandu lain
+        other = PosyanduLocation.objects.create(name='Posyandu Melati', address='-')
+        moved = self.measure(self.second, 3)
+        moved.posyandu = other
+        moved.save()
+        # Seri dihapus seperti saat sync gagal
+        GrowthSeries.objects.all().delete()
+
+        series = GrowthSeriesService.load(posyandu_id=self.posyandu.pk)
+
+        self.assertEqual(list(series), [self.first.pk])
+        self.assertEqual(self.records(self.first), [first.pk])
+        self.assertEqual(list(GrowthSeriesService.load(posyandu_id=other.pk)), [self.second.pk])
+        self.assertEqual(GrowthSeries.objects.count(), 2)
+
+    def test_invalid_posyandu_id_is_a_bad_request(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x'))
+        response = self.client.get(reverse('posyandu:growth_series_api'), {'posyandu_id': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('posyandu:growth_series_api'), {'posyandu_id': self.posyandu.pk})
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(POSYANDU_GROWTH_STANDARDS={'DIRECTORY': Path(tempfile.gettempdir()) / 'no-who-tables'})
+class LatestRecordStatsTest(TestCase):
+    """Statistik hanya menghitung rekam terbaru per pasien: tanggal terakhir, lalu id terbesar"""
+
+    def setUp(self):
+        from references.models import Dusun, Penduduk
+        from .models import PosyanduLocation
+
+        # Status stunting manual dipakai tanpa tabel WHO
+        reset_standards()
+        self.addCleanup(reset_standards)
+        dusun = Dusun.objects.create(name='Dusun A')
+        self.people = [
+            Penduduk.objects.create(
+                nik=f'11020101{index:08d}', name=f'Warga {index}', gender='P', birth_place='Sarok',
+                birth_date=born, religion='Islam', marital_status='KAWIN', dusun=dusun, address='-',
+            )
+            for index, born in enumerate([date(2022, 1, 1)] * 3 + [date(1950, 1, 1)] * 3)
+        ]
+        self.posyandu = PosyanduLocation.objects.create(name='Posyandu Mawar', address='-')
+
+    def stunting(self, balita, day, status, intervensi=''):
+        from .models import StuntingData
+
+        StuntingData.objects.create(
+            balita=balita, posyandu=self.posyandu, tanggal_ukur=day, usia_bulan=24, tinggi_badan=80,
+            berat_badan=10, z_score_tb_u=0, status_stunting=status, intervensi_diberikan=intervensi,
+        )
+
+    def visit(self, patient, day, diagnosis):
+        from .models import HealthRecord
+
+        HealthRecord.objects.create(
+            patient=patient, posyandu=self.posyandu, patient_type='lansia', visit_date=day, diagnosis=diagnosis,
+        )
+
+    def test_stunting_stats_count_only_the_newest_measurement(self):
+        first, second, third = self.people[:3]
+        self.stunting(first, date(2024, 1, 1), 'sangat_pendek', 'gizi')
+        self.stunting(first, date(2024, 3, 1), 'normal')
+        # Tanggal sama: rekam yang disimpan terakhir yang berlaku
+        self.stunting(second, date(2024, 2, 1), 'pendek', 'gizi')
+        self.stunting(second, date(2024, 2, 1), 'normal')
+        self.stunting(third, date(2024, 2, 1), 'pendek', 'edukasi')
+
+        response = self.client.get(reverse('posyandu:stunting_stats_api'))
+
+        self.assertEqual(response.json(), {'total': 3, 'severe': 0, 'moderate': 1, 'interventions': 1})
+
+    def test_lansia_stats_count_only_the_newest_visit(self):
+        first, second, _ = self.people[3:]
+        self.visit(first, date(2024, 1, 1), 'hipertensi')
+        self.visit(first, date(2024, 5, 1), 'sehat')
+        self.visit(second, date(2024, 2, 1), 'perlu perhatian')
+        self.visit(second, date(2024, 2, 1), 'hipertensi')
+
+        response = self.client.get(reverse('posyandu:lansia_stats_api'))
+
+        self.assertEqual(response.json(), {'total': 3, 'healthy': 2, 'attention': 0, 'sick': 1})
@@ -94,6 +94,7 @@ urlpatterns = [
     path('api/stunting/create/', views.stunting_create_api, name='stunting_create_api'),
     path('api/stunting/<int:stunting_id>/update/', views.stunting_update_api, name='stunting_update_api'),
     path('api/stunting/<int:stunting_id>/delete/', views.stunting_delete_api, name='stunting_delete_api'),
+    path('api/growth-series/', views.growth_series_api, name='growth_series_api'),
     
     # Penduduk APIs
     path('api/penduduk/', views.penduduk_list_api, name='penduduk_list_api'),
@@ -5,6 +5,7 @@ from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
+from django.db.models.functions import Trim
 from django.utils import timezone
 from datetime import datetime, date
 import json
@@ -14,7 +15,9 @@ from .models import (
     Immunization, NutritionData, PosyanduKader, IbuHamil, 
     PemeriksaanIbuHamil, StuntingData
 )
-from references.models import Penduduk, Dusun, Lorong
+from references.models import Penduduk, Dusun, Lorong, years_before
+from references.autocomplete import search_residents
+from .series import GrowthSeriesService, decode
 
 
 @login_required
@@ -578,6 +581,33 @@ def nutrition_data_list(request):
 
 # ============= STATISTICS API =============
 
+STUNTED_STATUSES = ['pendek', 'sangat_pendek']
+
+
+def balita_birth_cutoff(today=None):
+    """Balita: lahir setelah tanggal ini (di bawah 5 tahun)"""
+    return years_before(today or date.today(), 5)
+
+
+def lansia_birth_cutoff(today=None):
+    """Lansia: lahir paling lambat tanggal ini (60 tahun ke atas)"""
+    return years_before(today or date.today(), 60)
+
+
+def latest_stunting():
+    return StuntingData.objects.latest_per_patient()
+
+
+def latest_balita_nutrition(today=None):
+    return NutritionData.objects.filter(patient__birth_date__gte=balita_birth_cutoff(today)).latest_per_patient()
+
+
+def latest_lansia_records(today=None):
+    return HealthRecord.objects.filter(
+        patient_type='lansia', patient__birth_date__lte=lansia_birth_cutoff(today)
+    ).latest_per_patient()
+
+
 @login_required
 def posyandu_stats(request):
     """Get posyandu statistics"""
@@ -591,17 +621,18 @@ def posyandu_stats(request):
         # New specific counts for dashboard
         total_kader = PosyanduKader.objects.filter(status='aktif').count()
         total_ibu_hamil = IbuHamil.objects.filter(status_aktif=True).count()
-        total_stunting = StuntingData.objects.count()
+        # Balita yang pengukuran terakhirnya pendek/sangat pendek
+        total_stunting = latest_stunting().filter(status_stunting__in=STUNTED_STATUSES).count()
         
         # Count balita (children under 5 years old)
         today = date.today()
         balita = Penduduk.objects.filter(
-            birth_date__gte=today.replace(year=today.year-5)
+            birth_date__gte=balita_birth_cutoff(today)
         ).count()
         
         # Count lansia (elderly 60+ years old)
         lansia = Penduduk.objects.filter(
-            birth_date__lte=today.replace(year=today.year-60)
+            birth_date__lte=lansia_birth_cutoff(today)
         ).count()
         
         # Recent activities
@@ -614,18 +645,19 @@ def posyandu_stats(request):
             count=Count('id')
         ).order_by('-count')
         
-        # Nutrition status distribution
-        nutrition_status = NutritionData.objects.values('nutrition_status').annotate(
+        # Nutrition status distribution (pengukuran terakhir per balita)
+        nutrition_status = list(latest_balita_nutrition(today).order_by().values('nutrition_status').annotate(
             count=Count('id')
-        ).order_by('-count')
+        ).order_by('-count'))
+        nutrition_counts = {row['nutrition_status']: row['count'] for row in nutrition_status}
         
         # Vaccine type distribution
         vaccine_types = Immunization.objects.values('vaccine_type').annotate(
             count=Count('id')
         ).order_by('-count')[:5]
         
-        # Stunting status distribution
-        stunting_status = StuntingData.objects.values('status_stunting').annotate(
+        # Stunting status distribution (pengukuran terakhir per balita)
+        stunting_status = latest_stunting().order_by().values('status_stunting').annotate(
             count=Count('id')
         ).order_by('-count')
         
@@ -655,9 +687,9 @@ def posyandu_stats(request):
                 'warning': 0,  # Calculate from actual data
                 'critical': 0,  # Calculate from actual data
                 'nutrition': {
-                    'gizi_normal': 0,
-                    'gizi_kurang': 0,
-                    'gizi_buruk': 0,
+                    'gizi_normal': nutrition_counts.get('normal', 0),
+                    'gizi_kurang': nutrition_counts.get('kurang', 0),
+                    'gizi_buruk': nutrition_counts.get('buruk', 0),
                     'stunting': total_stunting
                 }
             },
@@ -680,7 +712,7 @@ def posyandu_stats(request):
                 'total_immunizations': total_immunizations,
                 'recent_schedules': recent_schedules,
                 'patient_types': list(patient_types),
-                'nutrition_status': list(nutrition_status),
+                'nutrition_status': nutrition_status,
                 'vaccine_types': list(vaccine_types),
                 'stunting_status': list(stunting_status),
                 'pregnancy_risk': list(pregnancy_risk)
@@ -701,28 +733,21 @@ def balita_stats_api(request):
     try:
         today = date.today()
         total_balita = Penduduk.objects.filter(
-            birth_date__gte=today.replace(year=today.year-5)
-        ).count()
-        
-        # Get nutrition status counts
-        normal = NutritionData.objects.filter(
-            patient__birth_date__gte=today.replace(year=today.year-5),
-            nutrition_status='normal'
+            birth_date__gte=balita_birth_cutoff(today)
         ).count()
         
-        kurang = NutritionData.objects.filter(
-            patient__birth_date__gte=today.replace(year=today.year-5),
-            nutrition_status='kurang'
-        ).count()
+        # Status gizi dari pengukuran terakhir setiap balita
+        nutrition = latest_balita_nutrition(today).aggregate(
+            normal=Count('pk', filter=Q(nutrition_status='normal')),
+            kurang=Count('pk', filter=Q(nutrition_status='kurang')),
+        )
         
-        stunting = StuntingData.objects.filter(
-            status_stunting__in=['pendek', 'sangat_pendek']
-        ).count()
+        stunting = latest_stunting().filter(status_stunting__in=STUNTED_STATUSES).count()
         
         return JsonResponse({
             'total': total_balita,
-            'normal': normal,
-            'kurang': kurang,
+            'normal': nutrition['normal'],
+            'kurang': nutrition['kurang'],
             'stunting': stunting
         })
         
@@ -736,19 +761,16 @@ def balita_stats_api(request):
 def kader_stats_api(request):
     """Get kader statistics"""
     try:
-        total = PosyanduKader.objects.count()
-        active = PosyanduKader.objects.filter(status='aktif').count()
-        leader = PosyanduKader.objects.filter(jabatan='ketua', status='aktif').count()
-        inactive = PosyanduKader.objects.filter(status='nonaktif').count()
+        stats = PosyanduKader.objects.aggregate(
+            total=Count('pk'),
+            aktif=Count('pk', filter=Q(status='aktif')),
+            ketua=Count('pk', filter=Q(jabatan='ketua', status='aktif')),
+            nonaktif=Count('pk', filter=Q(status='nonaktif')),
+        )
         
         return JsonResponse({
             'success': True,
-            'data': {
-                'total': total,
-                'aktif': active,
-                'ketua': leader,
-                'nonaktif': inactive
-            }
+            'data': stats
         })
         
     except Exception as e:
@@ -762,17 +784,14 @@ def kader_stats_api(request):
 def ibu_hamil_stats_api(request):
     """Get ibu hamil statistics"""
     try:
-        total = IbuHamil.objects.filter(status_aktif=True).count()
-        trimester1 = IbuHamil.objects.filter(status_aktif=True, usia_kehamilan__lte=12).count()
-        trimester2 = IbuHamil.objects.filter(status_aktif=True, usia_kehamilan__gt=12, usia_kehamilan__lte=28).count()
-        trimester3 = IbuHamil.objects.filter(status_aktif=True, usia_kehamilan__gt=28).count()
+        stats = IbuHamil.objects.filter(status_aktif=True).aggregate(
+            total=Count('pk'),
+            trimester1=Count('pk', filter=Q(usia_kehamilan__lte=12)),
+            trimester2=Count('pk', filter=Q(usia_kehamilan__gt=12, usia_kehamilan__lte=28)),
+            trimester3=Count('pk', filter=Q(usia_kehamilan__gt=28)),
+        )
         
-        return JsonResponse({
-            'total': total,
-            'trimester1': trimester1,
-            'trimester2': trimester2,
-            'trimester3': trimester3
-        })
+        return JsonResponse(stats)
         
     except Exception as e:
         return JsonResponse({
@@ -784,17 +803,15 @@ def ibu_hamil_stats_api(request):
 def stunting_stats_api(request):
     """Get stunting statistics"""
     try:
-        total = StuntingData.objects.count()
-        severe = StuntingData.objects.filter(status_stunting='stunting_berat').count()
-        moderate = StuntingData.objects.filter(status_stunting='stunting_sedang').count()
-        interventions = StuntingData.objects.exclude(intervensi_diberikan='').count()
+        # Satu baris per balita: pengukuran terakhirnya
+        stats = latest_stunting().aggregate(
+            total=Count('pk'),
+            severe=Count('pk', filter=Q(status_stunting='sangat_pendek')),
+            moderate=Count('pk', filter=Q(status_stunting='pendek')),
+            interventions=Count('pk', filter=~Q(intervensi_diberikan='')),
+        )
         
-        return JsonResponse({
-            'total': total,
-            'severe': severe,
-            'moderate': moderate,
-            'interventions': interventions
-        })
+        return JsonResponse(stats)
         
     except Exception as e:
         return JsonResponse({
@@ -809,36 +826,20 @@ def lansia_stats_api(request):
         today = date.today()
         
         # Get lansia from penduduk based on age (60+ years)
-        lansia = Penduduk.objects.filter(
-            birth_date__lte=today.replace(year=today.year-60)
-        )
+        total_lansia = Penduduk.objects.filter(
+            birth_date__lte=lansia_birth_cutoff(today)
+        ).count()
         
-        total_lansia = lansia.count()
-        healthy = 0
-        attention = 0
-        sick = 0
-        
-        # Count health status based on latest health records
-        for l in lansia:
-            latest_record = HealthRecord.objects.filter(
-                patient=l, 
-                patient_type='lansia'
-            ).order_by('-visit_date').first()
-            
-            if latest_record:
-                if latest_record.diagnosis and latest_record.diagnosis.strip():
-                    if 'sehat' in latest_record.diagnosis.lower():
-                        healthy += 1
-                    elif 'perhatian' in latest_record.diagnosis.lower():
-                        attention += 1
-                    else:
-                        sick += 1
-                else:
-                    # No diagnosis means healthy
-                    healthy += 1
-            else:
-                # No health record means healthy
-                healthy += 1
+        # Count health status based on latest health records; diagnosis kosong/'sehat' atau
+        # tanpa rekam dianggap sehat
+        status = latest_lansia_records(today).alias(diagnosis_text=Trim('diagnosis')).aggregate(
+            attention=Count('pk', filter=Q(diagnosis_text__icontains='perhatian') & ~Q(diagnosis_text__icontains='sehat')),
+            sick=Count('pk', filter=~Q(diagnosis_text='') & ~Q(diagnosis_text__icontains='sehat')
+                       & ~Q(diagnosis_text__icontains='perhatian')),
+        )
+        attention = status['attention']
+        sick = status['sick']
+        healthy = total_lansia - attention - sick
         
         return JsonResponse({
             'total': total_lansia,
@@ -865,58 +866,33 @@ def get_posyandu_locations(request):
 @login_required
 def get_residents_for_posyandu(request):
     """Get residents for posyandu selection"""
-    search = request.GET.get('search', '')
-    age_max = request.GET.get('age_max', '')
-    age_min = request.GET.get('age_min', '')
     gender = request.GET.get('gender', '')
-    residents = Penduduk.objects.all()
-    
-    if search:
-        residents = residents.filter(
-            Q(name__icontains=search) |
-            Q(nik__icontains=search)
-        )
-    
-    # Filter by gender if provided
-    if gender:
-        residents = residents.filter(gender=gender)
-    
-    residents = residents.values('id', 'name', 'nik', 'birth_date', 'gender')[:50]
+    try:
+        age_max = int(request.GET.get('age_max', ''))
+    except ValueError:
+        age_max = None
+    try:
+        age_min = int(request.GET.get('age_min', ''))
+    except ValueError:
+        age_min = None
+    
+    def matches(resident):
+        # Filter gender dan umur dilakukan sebelum limit, di index memori
+        if gender and resident.gender != gender:
+            return False
+        age = resident.age()
+        if age is None:
+            return True
+        return (age_max is None or age <= age_max) and (age_min is None or age >= age_min)
     
     data = []
-    for resident in residents:
-        age = None
-        if resident['birth_date']:
-            today = date.today()
-            age = today.year - resident['birth_date'].year
-            if today.month < resident['birth_date'].month or \
-               (today.month == resident['birth_date'].month and today.day < resident['birth_date'].day):
-                age -= 1
-        
-        # Filter by age_max if provided
-        if age_max and age is not None:
-            try:
-                max_age = int(age_max)
-                if age > max_age:
-                    continue
-            except ValueError:
-                pass
-        
-        # Filter by age_min if provided
-        if age_min and age is not None:
-            try:
-                min_age = int(age_min)
-                if age < min_age:
-                    continue
-            except ValueError:
-                pass
-        
+    for resident in search_residents(request, predicate=matches, default_limit=50):
         data.append({
-            'id': resident['id'],
-            'name': resident['name'],
-            'nik': resident['nik'],
-            'age': age,
-            'gender': resident['gender']
+            'id': resident.id,
+            'name': resident.name,
+            'nik': resident.nik,
+            'age': resident.age(),
+            'gender': resident.gender
         })
     
     return JsonResponse({'results': data})
@@ -1000,12 +976,12 @@ def posyandu_dashboard(request):
     
     # Basic statistics
     total_balita = Penduduk.objects.filter(
-        birth_date__gte=date.today().replace(year=date.today().year-5)
+        birth_date__gte=balita_birth_cutoff()
     ).count()
     
     total_ibu_hamil = IbuHamil.objects.filter(status_aktif=True).count()
     total_kader = PosyanduKader.objects.filter(status='aktif').count()
-    total_stunting = StuntingData.objects.count()
+    total_stunting = latest_stunting().filter(status_stunting__in=STUNTED_STATUSES).count()
     
     # Calculate growth (mock data for now)
     balita_growth = 5
@@ -1948,7 +1924,7 @@ def lansia_list_api(request):
     # Get lansia from penduduk based on age (60+ years)
     today = date.today()
     lansia = Penduduk.objects.filter(
-        birth_date__lte=today.replace(year=today.year-60)
+        birth_date__lte=lansia_birth_cutoff(today)
     )
     
     if search:
@@ -1962,6 +1938,11 @@ def lansia_list_api(request):
     paginator = Paginator(lansia, per_page)
     page_obj = paginator.get_page(page)
     
+    # Rekam terakhir semua lansia di halaman ini dalam satu query
+    latest_records = HealthRecord.objects.filter(patient_type='lansia').select_related('posyandu').latest_by_patient(
+        [l.id for l in page_obj]
+    )
+    
     data = []
     for l in page_obj:
         age = 0
@@ -1971,7 +1952,7 @@ def lansia_list_api(request):
                 age -= 1
         
         # Get latest health record
-        latest_record = HealthRecord.objects.filter(patient=l, patient_type='lansia').first()
+        latest_record = latest_records.get(l.id)
         
         # Determine health status based on latest record
         health_status = 'sehat'
@@ -1994,7 +1975,7 @@ def lansia_list_api(request):
             'height': float(latest_record.height) if latest_record and latest_record.height else None,
             'blood_pressure_systolic': latest_record.blood_pressure.split('/')[0] if latest_record and latest_record.blood_pressure and '/' in latest_record.blood_pressure else None,
             'blood_pressure_diastolic': latest_record.blood_pressure.split('/')[1] if latest_record and latest_record.blood_pressure and '/' in latest_record.blood_pressure else None,
-            'blood_sugar': float(latest_record.blood_sugar) if latest_record and latest_record.blood_sugar else None,
+            'blood_sugar': None,  # HealthRecord belum menyimpan gula darah
             'last_checkup': latest_record.visit_date.strftime('%Y-%m-%d') if latest_record else None
         })
     
@@ -2362,6 +2343,38 @@ def stunting_delete_api(request, stunting_id):
         }, status=400)
 
 
+@login_required
+@require_http_methods(["GET"])
+def growth_series_api(request):
+    """Seri pertumbuhan (berat, tinggi, z-score) per anak untuk grafik
+
+    ?patients=1,2 atau ?posyandu_id=, opsional ?start=&end= (YYYY-MM-DD) dan ?max_points=
+    """
+    try:
+        patient_ids = [int(pk) for pk in request.GET.get('patients', '').split(',') if pk.strip()] or None
+        posyandu_id = int(request.GET['posyandu_id']) if request.GET.get('posyandu_id') else None
+        if patient_ids is None and posyandu_id is None:
+            return JsonResponse({'success': False, 'message': 'Parameter patients atau posyandu_id wajib diisi'}, status=400)
+        start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date() if request.GET.get('start') else None
+        end = datetime.strptime(request.GET['end'], '%Y-%m-%d').date() if request.GET.get('end') else None
+        max_points = max(int(request.GET.get('max_points') or 0), 0) or None
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Parameter tidak valid'}, status=400)
+
+    results = []
+    for patient_id, series in GrowthSeriesService.load(patient_ids, posyandu_id).items():
+        points = GrowthSeriesService.slice(decode(series.points), start, end, max_points)
+        results.append({
+            'patient_id': patient_id,
+            'patient_name': series.patient.name,
+            'birth_date': series.patient.birth_date.strftime('%Y-%m-%d') if series.patient.birth_date else None,
+            'total_points': series.point_count,
+            'series': GrowthSeriesService.serialize(points),
+        })
+    results.sort(key=lambda item: item['patient_name'])
+    return JsonResponse({'success': True, 'results': results})
+
+
 @login_required
 def penduduk_admin(request):
     """Data penduduk admin page"""
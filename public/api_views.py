@@ -1,4 +1,5 @@
 from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import get_object_or_404
 from django.core.paginator import Paginator
@@ -13,8 +14,16 @@ from village_profile.models import VillageHistory, VillageHistoryPhoto, VillageV
 from core.models import CustomUser, UserProfile, UMKMBusiness, WebsiteSettings
 from business.models import Business
 from letters.models import LetterSettings
+from core.media import media_pipeline
+from core.response_cache import cached_public_api
 
 
+def is_admin(user):
+    """Check if user is admin"""
+    return user.is_authenticated and (user.is_staff or user.is_superuser)
+
+
+@cached_public_api('public_stats')
 def api_stats(request):
     """API untuk statistik umum"""
     try:
@@ -62,6 +71,7 @@ def api_stats(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@cached_public_api('public_news')
 def api_news(request):
     """API untuk berita"""
     try:
@@ -69,12 +79,13 @@ def api_news(request):
         page_size = int(request.GET.get('page_size', 10))
         ordering = request.GET.get('ordering', '-created_at')
         
-        news_list = News.objects.filter(status='published').order_by(ordering)
+        news_list = News.objects.filter(status='published').select_related('category', 'author').order_by(ordering)
         
         paginator = Paginator(news_list, page_size)
         news_page = paginator.get_page(page)
         
         news_data = []
+        images = media_pipeline.lookup(news.featured_image for news in news_page)
         for news in news_page:
             news_data.append({
                 'id': news.id,
@@ -82,6 +93,7 @@ def api_news(request):
                 'content': news.content,
                 'excerpt': news.excerpt,
                 'image': news.featured_image.url if news.featured_image else None,
+                'image_variants': media_pipeline.payload(news.featured_image, images),
                 'created_at': news.created_at.isoformat(),
                 'category': news.category.name if news.category else None,
                 'author': news.author.username if news.author else 'Admin'
@@ -120,6 +132,7 @@ def api_event_detail(request, event_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@cached_public_api('village_profile')
 def api_village_profile(request):
     """API untuk profil desa"""
     try:
@@ -157,20 +170,22 @@ def api_village_profile(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@login_required
+@user_passes_test(is_admin)
 def api_population(request):
-    """API untuk data penduduk"""
+    """API untuk data penduduk (khusus admin; tanpa NIK dan tanggal lahir)"""
     try:
         page = int(request.GET.get('page', 1))
         page_size = int(request.GET.get('page_size', 10))
         dusun_nama = request.GET.get('dusun_nama')
         lorong_nama = request.GET.get('lorong_nama')
         
-        penduduk_list = Penduduk.objects.all()
+        penduduk_list = Penduduk.objects.select_related('dusun', 'lorong').order_by('name', 'pk')
         
         if dusun_nama:
-            penduduk_list = penduduk_list.filter(dusun__nama__icontains=dusun_nama)
+            penduduk_list = penduduk_list.filter(dusun__name__icontains=dusun_nama)
         if lorong_nama:
-            penduduk_list = penduduk_list.filter(lorong__nama__icontains=lorong_nama)
+            penduduk_list = penduduk_list.filter(lorong__name__icontains=lorong_nama)
         
         paginator = Paginator(penduduk_list, page_size)
         penduduk_page = paginator.get_page(page)
@@ -179,12 +194,10 @@ def api_population(request):
         for penduduk in penduduk_page:
             penduduk_data.append({
                 'id': penduduk.id,
-                'nama': penduduk.nama,
-                'nik': penduduk.nik,
-                'jenis_kelamin': penduduk.jenis_kelamin,
-                'tanggal_lahir': penduduk.tanggal_lahir.isoformat() if penduduk.tanggal_lahir else None,
-                'dusun': penduduk.dusun.nama if penduduk.dusun else None,
-                'lorong': penduduk.lorong.nama if penduduk.lorong else None
+                'nama': penduduk.name,
+                'jenis_kelamin': penduduk.gender,
+                'dusun': penduduk.dusun.name if penduduk.dusun else None,
+                'lorong': penduduk.lorong.name if penduduk.lorong else None
             })
         
         return JsonResponse({
@@ -197,16 +210,17 @@ def api_population(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@cached_public_api('public_dusun')
 def api_dusun(request):
     """API untuk data dusun"""
     try:
-        dusun_list = Dusun.objects.all()
+        dusun_list = Dusun.objects.order_by('name').values('id', 'name', 'code')
         dusun_data = []
         for dusun in dusun_list:
             dusun_data.append({
-                'id': dusun.id,
-                'nama': dusun.nama,
-                'kode': dusun.kode if hasattr(dusun, 'kode') else None
+                'id': dusun['id'],
+                'nama': dusun['name'],
+                'kode': dusun['code'] or None
             })
         return JsonResponse({'results': dusun_data})
     except Exception as e:
@@ -247,6 +261,7 @@ def api_contact(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@cached_public_api('village_history')
 def api_village_history(request):
     """API publik untuk daftar sejarah desa"""
     try:
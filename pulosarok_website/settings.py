@@ -64,6 +64,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.profiling.ProfilingMiddleware",  # paling luar agar seluruh waktu request terukur
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -71,7 +72,6 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "debug_middleware.DebugMiddleware",  # Debug middleware for PUT requests
 ]
 
 ROOT_URLCONF = "pulosarok_website.urls"
@@ -172,6 +172,99 @@ LOGIN_REDIRECT_URL = '/pulosarok/'
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# News view tracking: views are buffered per process and written in bulk
+NEWS_VIEW_BUFFER = {
+    'FLUSH_INTERVAL': int(os.getenv('NEWS_VIEW_FLUSH_INTERVAL', 5)),
+    'MAX_PENDING': int(os.getenv('NEWS_VIEW_MAX_PENDING', 500)),
+    'DEDUP_WINDOW': int(os.getenv('NEWS_VIEW_DEDUP_WINDOW', 1800)),
+}
+
+# Worker artefak surat (python manage.py process_letter_artifacts)
+LETTER_ARTIFACTS = {
+    'MAX_ATTEMPTS': int(os.getenv('LETTER_ARTIFACT_MAX_ATTEMPTS', 3)),
+    'POLL_INTERVAL': int(os.getenv('LETTER_ARTIFACT_POLL_INTERVAL', 2)),
+}
+
+# Cache response API publik: locmem (per proses), file, atau redis.
+# Versi namespace (invalidasi) ikut backend ini: dengan locmem worker lain tidak melihat
+# invalidasi dan menyajikan data lama hingga PUBLIC_API_CACHE_TIMEOUT. Gunakan file/redis
+# bila menjalankan lebih dari satu worker.
+PUBLIC_API_CACHE_BACKEND = os.getenv('PUBLIC_API_CACHE_BACKEND', 'locmem')
+PUBLIC_API_CACHE_TIMEOUT = int(os.getenv('PUBLIC_API_CACHE_TIMEOUT', 300))
+PUBLIC_API_CACHE_MAX_AGE = int(os.getenv('PUBLIC_API_CACHE_MAX_AGE', 60))
+
+PUBLIC_API_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'public-api',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'public_api',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'public_api': {
+        **PUBLIC_API_CACHE_BACKENDS[PUBLIC_API_CACHE_BACKEND],
+        'TIMEOUT': PUBLIC_API_CACHE_TIMEOUT,
+    },
+}
+
+# Dashboard aggregator: provider metrik dijalankan paralel dan di-cache per metrik
+DASHBOARD_AGGREGATOR = {
+    'MAX_WORKERS': int(os.getenv('DASHBOARD_MAX_WORKERS', 4)),
+    'CACHE_TIMEOUT': int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 60)),
+}
+
+# Index pencarian global (SQLite FTS5); bangun dengan `manage.py rebuild_search_index`
+SEARCH_INDEX = {
+    'TITLE_WEIGHT': 10.0,
+    'BODY_WEIGHT': 1.0,
+    'BATCH_SIZE': 500,
+}
+
+# Index picker penduduk di memori proses; versi dibagi lewat cache CACHE_ALIAS (file/redis bila
+# multi-worker), MAX_AGE membatasi basi bila cache itu per proses
+RESIDENT_AUTOCOMPLETE = {
+    'LIMIT': 20,
+    'MAX_LIMIT': 50,
+    'MAX_AGE': int(os.getenv('RESIDENT_AUTOCOMPLETE_MAX_AGE', 300)),
+    'CACHE_ALIAS': 'public_api',
+}
+
+# Tabel LMS standar pertumbuhan WHO (berkas WHO Anthro) untuk z-score posyandu
+POSYANDU_GROWTH_STANDARDS = {
+    'DIRECTORY': os.getenv('WHO_GROWTH_TABLES_DIR', BASE_DIR / 'posyandu' / 'data' / 'who'),
+    'BATCH_SIZE': 2000,
+    'RETRY_AFTER': 300,
+}
+
+# Turunan gambar responsif (WebP/JPEG + placeholder blur); isi lama: `manage.py build_image_variants`
+MEDIA_PIPELINE = {
+    'WIDTHS': (320, 640, 1024, 1600),
+    'FORMATS': ('webp', 'jpeg'),
+    'MAX_WORKERS': int(os.getenv('MEDIA_PIPELINE_WORKERS', 2)),
+}
+
+# Profiling request sampel (ring buffer per proses); lihat /pulosarok/performance/
+REQUEST_PROFILING = {
+    'ENABLED': os.getenv('REQUEST_PROFILING_ENABLED', 'True').lower() == 'true',
+    'SAMPLE_RATE': float(os.getenv('REQUEST_PROFILING_SAMPLE_RATE', 0.05)),
+    'PROFILE_RATE': float(os.getenv('REQUEST_PROFILING_PROFILE_RATE', 0)),
+    'PROFILE_THRESHOLD_MS': int(os.getenv('REQUEST_PROFILING_PROFILE_THRESHOLD_MS', 1000)),
+}
+
 # Django Debug Toolbar Configuration
 if DEBUG:
     INTERNAL_IPS = [
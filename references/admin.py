@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Dusun, Lorong, Penduduk, DisabilitasType, DisabilitasData, ReligionReference
+from .models import Dusun, Lorong, Penduduk, DisabilitasType, DisabilitasData, ReligionReference, PopulationRollup
 
 # Try to import Family model
 try:
@@ -65,6 +65,13 @@ class ReligionReferenceAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at')
 
 
+@admin.register(PopulationRollup)
+class PopulationRollupAdmin(admin.ModelAdmin):
+    list_display = ('dusun', 'lorong', 'gender', 'age_band', 'religion', 'education', 'marital_status', 'is_active', 'count')
+    list_filter = ('dusun', 'gender', 'age_band', 'is_active')
+    readonly_fields = ('updated_at',)
+
+
 if FAMILY_MODEL_EXISTS:
     @admin.register(Family)
     class FamilyAdmin(admin.ModelAdmin):
@@ -0,0 +1,179 @@
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULTS = {
+    'LIMIT': 20,
+    'MAX_LIMIT': 50,
+    'MAX_AGE': 300,     # detik; batas basi index di proses lain (bulk update tidak memicu signal)
+    # Versi index dibagi antar worker lewat cache ini; alias yang di-file/redis-kan saat multi-worker
+    'CACHE_ALIAS': 'public_api',
+}
+
+VERSION_KEY = 'resident_autocomplete:version'
+
+
+class Resident(namedtuple('Resident', 'id name nik gender birth_date birth_place address is_active')):
+    """Entri ringkas penduduk untuk picker"""
+
+    __slots__ = ()
+
+    @property
+    def label(self):
+        return f'{self.name} - {self.nik}'
+
+    def age(self, on_date=None):
+        if self.birth_date is None:
+            return None
+        on_date = on_date or date.today()
+        return on_date.year - self.birth_date.year - (
+            (on_date.month, on_date.day) < (self.birth_date.month, self.birth_date.day)
+        )
+
+
+def normalize(text):
+    """Huruf kecil tanpa diakritik, untuk pencocokan prefix"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower().strip()
+
+
+class ResidentIndex:
+    """Index prefix penduduk di memori proses (nama per kata dan NIK), tanpa query database saat pencarian
+
+    Dibangun malas saat pertama dipakai dan dibuang oleh signal save/delete Penduduk.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()   # satu thread membangun, thread lain menunggu hasilnya
+        self._entries = ()        # Resident, terurut nama
+        self._names = ()          # nama ternormalisasi, sejajar dengan _entries
+        self._keys = ()           # kunci prefix terurut: kata nama dan NIK
+        self._positions = ()      # posisi entri untuk setiap kunci
+        self._built_at = None
+        self._version = None
+
+    @property
+    def config(self):
+        return {**DEFAULTS, **getattr(settings, 'RESIDENT_AUTOCOMPLETE', {})}
+
+    @property
+    def cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    def invalidate(self):
+        """Buang index proses ini dan tandai versi baru di cache bersama untuk proses lain"""
+        with self._lock:
+            self._built_at = None
+        try:
+            self.cache.set(VERSION_KEY, time.time(), None)
+        except Exception:
+            pass
+
+    def _is_stale(self):
+        if self._built_at is None or time.monotonic() - self._built_at > self.config['MAX_AGE']:
+            return True
+        try:
+            return self.cache.get(VERSION_KEY) != self._version
+        except Exception:
+            return False
+
+    def build(self):
+        from .models import Penduduk
+
+        try:
+            version = self.cache.get(VERSION_KEY)
+        except Exception:
+            version = None
+        rows = Penduduk.objects.order_by('name', 'id').values_list(
+            'id', 'name', 'nik', 'gender', 'birth_date', 'birth_place', 'address', 'is_active'
+        )
+        entries = tuple(Resident(*row) for row in rows)
+        names = tuple(normalize(entry.name) for entry in entries)
+        keys = []
+        for position, (entry, name) in enumerate(zip(entries, names)):
+            for word in set(name.split()):
+                keys.append((word, position))
+            if entry.nik:
+                keys.append((entry.nik, position))
+        keys.sort()
+        with self._lock:
+            self._entries = entries
+            self._names = names
+            self._keys = tuple(key for key, position in keys)
+            self._positions = tuple(position for key, position in keys)
+            self._version = version
+            self._built_at = time.monotonic()
+        return len(entries)
+
+    def _ensure_built(self):
+        if not self._is_stale():
+            return
+        with self._build_lock:
+            # Thread yang menunggu lock memakai index yang baru dibangun thread sebelumnya
+            if self._is_stale():
+                self.build()
+
+    def _prefix_positions(self, prefix):
+        keys, positions = self._keys, self._positions
+        index = bisect_left(keys, prefix)
+        matched = set()
+        while index < len(keys) and keys[index].startswith(prefix):
+            matched.add(positions[index])
+            index += 1
+        return matched
+
+    def search(self, query='', limit=None, predicate=None):
+        """Penduduk yang setiap kata query-nya cocok dengan awal kata nama atau awal NIK, terurut nama"""
+        self._ensure_built()
+        config = self.config
+        limit = min(int(limit or config['LIMIT']), config['MAX_LIMIT'])
+        entries, names = self._entries, self._names
+        tokens = normalize(query).split()
+
+        if tokens:
+            # Kata terpanjang biasanya paling selektif; kata lain dicek pada kandidatnya saja
+            tokens.sort(key=len, reverse=True)
+            candidates = sorted(self._prefix_positions(tokens[0]))
+            rest = tokens[1:]
+        else:
+            candidates = range(len(entries))
+            rest = ()
+
+        results = []
+        for position in candidates:
+            if rest:
+                words = names[position].split()
+                nik = entries[position].nik or ''
+                if not all(nik.startswith(token) or any(word.startswith(token) for word in words) for token in rest):
+                    continue
+            entry = entries[position]
+            if predicate is not None and not predicate(entry):
+                continue
+            results.append(entry)
+            if len(results) >= limit:
+                break
+        return results
+
+    def __len__(self):
+        self._ensure_built()
+        return len(self._entries)
+
+
+resident_index = ResidentIndex()
+
+
+def search_residents(request, predicate=None, default_limit=None):
+    """Helper view: cari dari parameter ?search= / ?q= dan ?limit="""
+    query = request.GET.get('search') or request.GET.get('q') or ''
+    try:
+        limit = int(request.GET.get('limit') or default_limit or 0) or None
+    except ValueError:
+        limit = default_limit
+    return resident_index.search(query, limit=limit, predicate=predicate)
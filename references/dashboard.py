@@ -0,0 +1,25 @@
+from django.db.models import Count
+
+from core.aggregator import register, register_listing
+from .models import Penduduk, Dusun
+
+
+@register('population')
+def population_metrics():
+    return {'statistics': Penduduk.objects.aggregate(total_population=Count('pk'))}
+
+
+@register('territory')
+def territory_metrics():
+    # Lorong selalu terikat ke dusun, cukup satu query dengan join
+    return {'statistics': Dusun.objects.aggregate(
+        total_dusun=Count('pk', distinct=True),
+        total_lorong=Count('lorongs', distinct=True),
+    )}
+
+
+register_listing(
+    'population',
+    lambda: Penduduk.objects.all(),
+    ('id', 'name', 'nik', 'gender', 'birth_date', 'dusun__name', 'is_active', 'created_at'),
+)
@@ -0,0 +1,265 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+
+from core.datagen import DataGenerator, config, register, weighted, years_ago
+from core.response_cache import invalidate_models
+from .models import Dusun, Family, Lorong, Penduduk
+from .population import dusun_population
+from .services import PopulationRollupService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DUSUN = [
+    ('Dusun Pulo Sarok', 'PS01'),
+    ('Dusun Kampung Baru', 'PS02'),
+    ('Dusun Teluk Ambun', 'PS03'),
+    ('Dusun Ujung Bawang', 'PS04'),
+    ('Dusun Pasar Singkil', 'PS05'),
+]
+LORONG_PER_DUSUN = 4
+
+MALE_NAMES = [
+    'Ahmad', 'Muhammad', 'Abdul', 'Rizki', 'Fadli', 'Zulkifli', 'Teuku', 'Hasan', 'Husaini', 'Ilham',
+    'Irfan', 'Mahdi', 'Nasrul', 'Ridwan', 'Safrizal', 'Syahrul', 'Taufik', 'Yusuf', 'Zainal', 'Bukhari',
+]
+FEMALE_NAMES = [
+    'Siti', 'Nur', 'Aisyah', 'Fatimah', 'Cut', 'Rahmah', 'Nurul', 'Zahra', 'Khairunnisa', 'Mariani',
+    'Ratna', 'Salmiah', 'Wardah', 'Yusnidar', 'Hafsah', 'Intan', 'Maulidia', 'Rosmawati', 'Suryani', 'Juliana',
+]
+SECOND_NAMES = [
+    'Saputra', 'Hidayat', 'Ramadhan', 'Fajri', 'Maulana', 'Hakim', 'Rahman', 'Amin', 'Syahputra', 'Iskandar',
+    'Azhari', 'Harahap', 'Lubis', 'Nasution', 'Pohan', 'Putri', 'Wati', 'Lestari', 'Andriani', 'Safitri',
+]
+BIRTH_PLACES = [
+    ('Singkil', 60), ('Pulo Sarok', 15), ('Subulussalam', 8), ('Rimo', 5), ('Tapaktuan', 4),
+    ('Banda Aceh', 4), ('Medan', 4),
+]
+EDUCATION = [
+    ('TIDAK_BELUM_SEKOLAH', 4), ('TAMAT_SD', 22), ('SLTP', 22), ('SLTA', 35), ('D3', 4), ('D4_S1', 11), ('S2', 2),
+]
+OCCUPATIONS = [
+    ('Petani', 30), ('Nelayan', 20), ('Pedagang', 12), ('Wiraswasta', 12), ('Buruh Harian Lepas', 12),
+    ('Karyawan Swasta', 5), ('PNS', 5), ('Guru', 4),
+]
+BLOOD_TYPES = [('O', 40), ('B', 28), ('A', 25), ('AB', 7)]
+RELIGIONS = [('Islam', 98), ('Kristen Protestan', 1), ('Kristen Katolik', 1)]
+FAMILY_STATUS = [
+    ('PRASEJAHTERA', 20), ('SEJAHTERA_1', 25), ('SEJAHTERA_2', 25), ('SEJAHTERA_3', 15), ('MISKIN', 10),
+    ('SEJAHTERA_3_PLUS', 5),
+]
+CHILD_COUNT = [(0, 8), (1, 14), (2, 24), (3, 22), (4, 15), (5, 10), (6, 7)]
+
+
+def household(rng):
+    """Susunan satu keluarga: [(hubungan, gender, umur, status kawin)], kepala keluarga lebih dulu
+
+    Umur anak mengikuti umur ibu (18-42 tahun saat melahirkan), sehingga keluarga-keluarga ini
+    membentuk piramida penduduk dengan dasar lebar.
+    """
+    head_age = round(rng.triangular(20, 85, 38))
+    head_gender = 'L' if rng.random() < 0.88 else 'P'
+    married = head_gender == 'L' and rng.random() < (0.92 if head_age < 65 else 0.6)
+    if married:
+        head_status = 'KAWIN'
+    elif head_age < 30 and rng.random() < 0.7:
+        head_status = 'BELUM_KAWIN'
+    else:
+        head_status = 'CERAI_MATI' if head_age >= 55 else 'CERAI_HIDUP'
+    members = [('Kepala Keluarga', head_gender, head_age, head_status)]
+
+    mother_age = head_age
+    if married:
+        mother_age = max(18, head_age - rng.randint(-2, 8))
+        members.append(('Istri', 'P', mother_age, 'KAWIN'))
+    elif head_gender == 'L':
+        mother_age = head_age - 5
+
+    if head_status != 'BELUM_KAWIN':
+        oldest, youngest = min(mother_age - 18, 30), max(0, mother_age - 42)
+        for _ in range(weighted(rng, CHILD_COUNT) if oldest >= youngest else 0):
+            members.append(('Anak', rng.choice('LP'), rng.randint(youngest, oldest), 'BELUM_KAWIN'))
+
+    if head_age < 60 and rng.random() < 0.07:
+        members.append((
+            'Orang Tua', 'P' if rng.random() < 0.65 else 'L', min(95, head_age + rng.randint(20, 32)), 'CERAI_MATI',
+        ))
+    return members
+
+
+class SerialNumbers:
+    """Nomor 16 digit unik: kode wilayah + 6 digit tanggal + 4 digit urut (format NIK/No. KK)"""
+
+    def __init__(self, region, taken):
+        self.region = region
+        self.taken = taken
+        self.last = defaultdict(int)
+
+    def next(self, day, on_date):
+        prefix = f'{self.region}{day:02d}{on_date:%m%y}'
+        serial = self.last[prefix] + 1
+        while f'{prefix}{serial:04d}' in self.taken:
+            serial += 1
+        if serial > 9999:
+            raise RuntimeError(f'Nomor urut {prefix} habis')
+        self.last[prefix] = serial
+        return f'{prefix}{serial:04d}'
+
+
+class ResidentGenerator(DataGenerator):
+    """Penduduk per keluarga (No. KK bersama, kepala keluarga, Family) dengan piramida umur realistis"""
+
+    order = 10
+    search_models = (Penduduk,)
+
+    def generate(self, context):
+        rng = context.random(self.name)
+        region = config()['REGION_CODE']
+        self.dusun = self._dusun()
+        self.lorong = defaultdict(list)
+        for lorong in Lorong.objects.filter(dusun__in=self.dusun).order_by('pk'):
+            self.lorong[lorong.dusun_id].append(lorong)
+        self._ensure_lorong()
+        self.house_numbers = defaultdict(int)
+        self.niks = SerialNumbers(
+            region, set(Penduduk.objects.filter(nik__startswith=region).values_list('nik', flat=True)),
+        )
+        self.kk_numbers = SerialNumbers(region, set(
+            Family.objects.filter(kk_number__startswith=region).values_list('kk_number', flat=True)
+        ) | set(Penduduk.objects.filter(kk_number__startswith=region).values_list('kk_number', flat=True)))
+
+        remaining = context.residents
+        households = []
+        pending = 0
+        while remaining > 0:
+            members = household(rng)[:remaining]
+            households.append(self._household(context, rng, members))
+            remaining -= len(members)
+            pending += len(members)
+            if pending >= context.batch_size:
+                self._write(context, households)
+                households, pending = [], 0
+        if households:
+            self._write(context, households)
+
+    def _dusun(self):
+        dusun = list(Dusun.objects.filter(is_active=True).order_by('pk'))
+        if not dusun:
+            dusun = Dusun.objects.bulk_create([
+                Dusun(name=name, code=code, description=f'Data sintetis {name}') for name, code in DEFAULT_DUSUN
+            ])
+        return dusun
+
+    def _ensure_lorong(self):
+        missing = [
+            Lorong(dusun=dusun, name=f'Lorong {chr(65 + index)}', code=f'{dusun.code}L{index + 1:02d}')
+            for dusun in self.dusun if not self.lorong[dusun.pk]
+            for index in range(LORONG_PER_DUSUN)
+        ]
+        for lorong in Lorong.objects.bulk_create(missing):
+            self.lorong[lorong.dusun_id].append(lorong)
+
+    def _household(self, context, rng, members):
+        """(daftar Penduduk belum disimpan, Family) untuk satu keluarga; kepala keluarga di indeks 0"""
+        dusun_index = rng.randrange(len(self.dusun))
+        dusun = self.dusun[dusun_index]
+        lorong = rng.choice(self.lorong[dusun.pk])
+        self.house_numbers[lorong.pk] += 1
+        house_number = self.house_numbers[lorong.pk]
+        address = {
+            'dusun': dusun, 'lorong': lorong,
+            'rt_number': f'{house_number // 40 + 1:03d}', 'rw_number': f'{dusun_index + 1:03d}',
+            'house_number': str(house_number),
+        }
+        issued = context.today - timedelta(days=rng.randint(0, 20 * 365))
+        kk_number = self.kk_numbers.next(issued.day, issued)
+        full_address = f'{lorong.name}, {dusun.name}, No. {house_number}'
+
+        people = [
+            self._person(context, rng, relationship, gender, age, status, kk_number, full_address, address)
+            for relationship, gender, age, status in members
+        ]
+        family = Family(
+            kk_number=kk_number, family_status=weighted(rng, FAMILY_STATUS), total_members=len(people),
+            total_income=rng.randrange(800_000, 8_000_000, 50_000) if rng.random() < 0.6 else None,
+            address=full_address, **address,
+        )
+        return people, family
+
+    def _person(self, context, rng, relationship, gender, age, status, kk_number, full_address, address):
+        birth_date = years_ago(context.today, age, rng.randint(0, 364))
+        first_names = MALE_NAMES if gender == 'L' else FEMALE_NAMES
+        person = Penduduk(
+            nik=self.niks.next(birth_date.day + (40 if gender == 'P' else 0), birth_date),
+            name=f'{rng.choice(first_names)} {rng.choice(SECOND_NAMES)}',
+            gender=gender, birth_place=weighted(rng, BIRTH_PLACES), birth_date=birth_date,
+            kk_number=kk_number, relationship_to_head=relationship,
+            religion=weighted(rng, RELIGIONS), marital_status=status,
+            education=self._education(rng, age), occupation=self._occupation(rng, age, relationship),
+            blood_type=weighted(rng, BLOOD_TYPES) if rng.random() < 0.7 else None,
+            mobile_number=f'08{rng.randrange(10 ** 9, 10 ** 10)}' if age >= 17 and rng.random() < 0.7 else None,
+            address=full_address, is_active=rng.random() < 0.98,
+            created_by=context.user, updated_by=context.user, **address,
+        )
+        if age >= 18:
+            person.height = round(rng.gauss(165 if gender == 'L' else 153, 6))
+            person.weight = max(35, round(rng.gauss(62 if gender == 'L' else 54, 9)))
+        if rng.random() < (0.08 if age >= 70 else 0.003):
+            person.is_alive = False
+            person.death_date = max(birth_date, context.today - timedelta(days=rng.randint(0, 5 * 365)))
+            person.death_place = 'Singkil'
+        return person
+
+    @staticmethod
+    def _education(rng, age):
+        if age < 5:
+            return 'TIDAK_BELUM_SEKOLAH'
+        if age < 12:
+            return 'BELUM_TAMAT_SD'
+        if age < 15:
+            return 'TAMAT_SD'
+        if age < 18:
+            return 'SLTP'
+        return weighted(rng, EDUCATION)
+
+    @staticmethod
+    def _occupation(rng, age, relationship):
+        if age < 6:
+            return 'Belum/Tidak Bekerja'
+        if age < 19:
+            return 'Pelajar/Mahasiswa'
+        if relationship == 'Istri' and rng.random() < 0.6:
+            return 'Mengurus Rumah Tangga'
+        if age >= 65 and rng.random() < 0.5:
+            return 'Tidak Bekerja'
+        return weighted(rng, OCCUPATIONS)
+
+    @staticmethod
+    def _write(context, households):
+        """Kepala keluarga lebih dulu (butuh pk untuk family_head), lalu anggota dan Family"""
+        with transaction.atomic():
+            heads = context.create(Penduduk, [people[0] for people, _ in households])
+            members = []
+            for (people, family), head in zip(households, heads):
+                family.head = head
+                for person in people[1:]:
+                    person.family_head = head
+                    members.append(person)
+            context.create(Penduduk, members)
+            context.create(Family, [family for _, family in households])
+
+    def finish(self, context):
+        # Rekap, population_count dan index picker biasanya dijaga signal post_save Penduduk
+        PopulationRollupService.rebuild()
+        dusun_population.rebuild()
+        from .autocomplete import resident_index
+        resident_index.invalidate()
+        try:
+            invalidate_models(Penduduk, Dusun)
+        except Exception as e:
+            logger.error(f"Error invalidating response cache after synthetic residents: {e}")
+
+
+register('references', ResidentGenerator)
@@ -0,0 +1,154 @@
+import logging
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from core.importer import BulkImporter, choice_lookup, parse_date, register
+from core.response_cache import invalidate_models
+from core.search import search_index
+from .models import Dusun, Lorong, Penduduk
+from .population import counted_dusun, dusun_population
+from .services import PopulationRollupService
+
+logger = logging.getLogger(__name__)
+
+# Header kolom (hasil normalize_header) -> field Penduduk; header export penduduk ikut diterima
+COLUMN_ALIASES = {
+    'nik': 'nik',
+    'nama': 'name',
+    'nama_lengkap': 'name',
+    'no_kk': 'kk_number',
+    'nomor_kk': 'kk_number',
+    'jenis_kelamin': 'gender',
+    'tempat_lahir': 'birth_place',
+    'tanggal_lahir': 'birth_date',
+    'dusun': 'dusun',
+    'lorong': 'lorong',
+    'alamat': 'address',
+    'telepon': 'phone_number',
+    'hp': 'mobile_number',
+    'agama': 'religion',
+    'status_perkawinan': 'marital_status',
+    'pendidikan': 'education',
+    'pekerjaan': 'occupation',
+    'golongan_darah': 'blood_type',
+    'kewarganegaraan': 'citizenship',
+    'hubungan_keluarga': 'relationship_to_head',
+    'rt': 'rt_number',
+    'rw': 'rw_number',
+    'nomor_rumah': 'house_number',
+    'kode_pos': 'postal_code',
+}
+
+REQUIRED = ('nik', 'name', 'gender', 'birth_place', 'birth_date', 'religion', 'marital_status', 'dusun', 'address')
+TEXT_FIELDS = (
+    'name', 'birth_place', 'address', 'kk_number', 'occupation', 'phone_number', 'mobile_number', 'email',
+    'relationship_to_head', 'rt_number', 'rw_number', 'house_number', 'postal_code',
+)
+CHOICE_FIELDS = {
+    'gender': choice_lookup(Penduduk.GENDER_CHOICES),
+    'religion': choice_lookup(Penduduk.RELIGION_CHOICES),
+    'marital_status': choice_lookup(Penduduk.MARITAL_STATUS_CHOICES),
+    'education': choice_lookup(Penduduk.EDUCATION_CHOICES),
+    'blood_type': choice_lookup(Penduduk.BLOOD_TYPE_CHOICES),
+    'citizenship': choice_lookup(Penduduk.CITIZENSHIP_CHOICES),
+}
+
+# clean_fields() per baris terlalu mahal untuk ribuan baris; cukup panjang kolom dan email
+MAX_LENGTHS = {field.name: field.max_length for field in Penduduk._meta.fields if field.max_length}
+
+
+def as_text(value):
+    """Nilai sel sebagai teks; angka dari Excel (NIK, No. KK) tanpa '.0'"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class PendudukImporter(BulkImporter):
+    """Import data penduduk (sensus); dusun/lorong dicocokkan lewat nama atau kode"""
+
+    model = Penduduk
+    label = 'penduduk'
+
+    def prepare(self):
+        self.niks = set(Penduduk.objects.values_list('nik', flat=True))
+        self.dusun = {}
+        for dusun in Dusun.objects.all():
+            self.dusun[dusun.name.lower()] = dusun
+            self.dusun[dusun.code.lower()] = dusun
+        self.lorong = {}
+        for lorong in Lorong.objects.all():
+            self.lorong[(lorong.dusun_id, lorong.name.lower())] = lorong
+            self.lorong[(lorong.dusun_id, lorong.code.lower())] = lorong
+
+    def build(self, values):
+        data = {}
+        for header, value in values.items():
+            field = COLUMN_ALIASES.get(header, header)
+            if value is not None and data.get(field) is None:
+                data[field] = value
+        missing = [field for field in REQUIRED if data.get(field) is None]
+        if missing:
+            raise ValidationError(f"Kolom wajib kosong: {', '.join(missing)}")
+
+        nik = as_text(data['nik'])
+        if len(nik) != 16 or not nik.isdigit():
+            raise ValidationError(f'NIK harus 16 digit angka: {nik}')
+        if nik in self.niks:
+            raise ValidationError(f'NIK {nik} sudah terdaftar')
+
+        dusun = self.dusun.get(as_text(data['dusun']).lower())
+        if dusun is None:
+            raise ValidationError(f"Dusun tidak ditemukan: {data['dusun']}")
+        lorong = None
+        if data.get('lorong') is not None:
+            lorong = self.lorong.get((dusun.pk, as_text(data['lorong']).lower()))
+            if lorong is None:
+                raise ValidationError(f"Lorong {data['lorong']} tidak ditemukan di dusun {dusun.name}")
+
+        fields = {field: as_text(data[field]) for field in TEXT_FIELDS if data.get(field) is not None}
+        for field, lookup in CHOICE_FIELDS.items():
+            if data.get(field) is None:
+                continue
+            fields[field] = lookup.get(as_text(data[field]).lower())
+            if fields[field] is None:
+                raise ValidationError(f'Nilai {field} tidak dikenal: {data[field]}')
+
+        penduduk = Penduduk(
+            nik=nik, birth_date=parse_date(data['birth_date']), dusun=dusun, lorong=lorong,
+            created_by=self.user, updated_by=self.user, **fields,
+        )
+        for field, value in fields.items():
+            max_length = MAX_LENGTHS.get(field)
+            if max_length and len(value) > max_length:
+                raise ValidationError(f'{field} lebih dari {max_length} karakter')
+        if fields.get('email'):
+            validate_email(fields['email'])
+        self.niks.add(nik)
+        return penduduk
+
+    def after_create(self, objects):
+        PopulationRollupService.add_rows(PopulationRollupService.row_from_instance(obj) for obj in objects)
+        for obj in objects:
+            dusun_population.record(counted_dusun(obj.dusun_id, obj.is_active, obj.is_alive), 1)
+        try:
+            with transaction.atomic():
+                search_index.index_many(objects)
+        except Exception as e:
+            # Index bisa dibangun ulang dengan rebuild_search_index
+            logger.error(f"Search index update failed for imported penduduk: {e}")
+
+    def finish(self, result):
+        if not result.created:
+            return
+        from .autocomplete import resident_index
+        resident_index.invalidate()
+        try:
+            invalidate_models(Penduduk)
+        except Exception as e:
+            logger.error(f"Error invalidating response cache after penduduk import: {e}")
+
+
+register('penduduk', PendudukImporter)
@@ -0,0 +1,54 @@
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from references.services import PopulationRollupService
+
+
+class Command(BaseCommand):
+    help = 'Refresh population rollup: age residents across band boundaries (nightly) or rebuild from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Rebuild the whole rollup table from Penduduk data',
+        )
+        parser.add_argument(
+            '--since',
+            help='Date the rollup ages were last computed (YYYY-MM-DD), defaults to the recorded last run',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write('Rebuilding population rollup...')
+            cell_count = PopulationRollupService.rebuild()
+            self.stdout.write(
+                self.style.SUCCESS(f'Successfully rebuilt population rollup with {cell_count} cells')
+            )
+            return
+
+        today = date.today()
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since must use the YYYY-MM-DD format')
+            if since >= today:
+                raise CommandError('--since must be before today')
+        else:
+            since = PopulationRollupService.aged_until()
+            if since is None:
+                since = today - timedelta(days=1)
+                self.stdout.write(self.style.WARNING(f'No previous run recorded, assuming {since}'))
+            elif since >= today:
+                self.stdout.write(self.style.SUCCESS(f'Population rollup already aged up to {since}'))
+                return
+
+        if (today - since).days > 366:
+            raise CommandError('Window is longer than a year, use --rebuild instead')
+
+        self.stdout.write(f'Ageing residents with birthdays after {since} up to {today}...')
+        aged_count = PopulationRollupService.age_residents(since, today)
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully aged {aged_count} residents in population rollup')
+        )
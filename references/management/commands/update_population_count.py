@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from references.models import Dusun
+from references.population import dusun_population
 
 
 class Command(BaseCommand):
@@ -7,25 +8,15 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         self.stdout.write('Starting population count update...')
-        
-        updated_count = 0
-        for dusun in Dusun.objects.all():
-            old_count = dusun.population_count
-            dusun.update_population_count()
-            new_count = dusun.population_count
-            
-            if old_count != new_count:
-                self.stdout.write(
-                    f'Updated {dusun.name}: {old_count} -> {new_count}'
-                )
-                updated_count += 1
-            else:
-                self.stdout.write(
-                    f'No change for {dusun.name}: {new_count}'
-                )
-        
+
+        # Satu GROUP BY untuk semua dusun, satu UPDATE untuk yang berubah
+        changed = dusun_population.rebuild()
+        names = dict(Dusun.objects.filter(pk__in=changed).values_list('pk', 'name'))
+        for pk, (old_count, new_count) in changed.items():
+            self.stdout.write(f'Updated {names.get(pk, pk)}: {old_count} -> {new_count}')
+
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully updated {updated_count} dusun population counts'
+                f'Successfully updated {len(changed)} dusun population counts'
             )
-        )
\ No newline at end of file
+        )
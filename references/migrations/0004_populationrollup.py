@@ -0,0 +1,65 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:42
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def build_population_rollup(apps, schema_editor):
+    from references.services import age_band_for, calculate_age
+
+    Penduduk = apps.get_model('references', 'Penduduk')
+    PopulationRollup = apps.get_model('references', 'PopulationRollup')
+
+    cells = defaultdict(lambda: [0, 0])
+    rows = Penduduk.objects.values_list(
+        'dusun_id', 'lorong_id', 'gender', 'religion', 'education', 'marital_status', 'is_active', 'birth_date'
+    )
+    for dusun_id, lorong_id, gender, religion, education, marital_status, is_active, birth_date in rows.iterator():
+        if not dusun_id or not birth_date:
+            continue
+        age = calculate_age(birth_date)
+        key = (dusun_id, lorong_id, gender, religion or '', education or '', marital_status or '',
+               bool(is_active), age_band_for(age))
+        cells[key][0] += 1
+        cells[key][1] += age
+
+    fields = ('dusun_id', 'lorong_id', 'gender', 'religion', 'education', 'marital_status', 'is_active', 'age_band')
+    PopulationRollup.objects.bulk_create(
+        [PopulationRollup(count=count, age_sum=age_sum, **dict(zip(fields, key))) for key, (count, age_sum) in cells.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('references', '0003_alter_penduduk_options_penduduk_blood_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopulationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gender', models.CharField(choices=[('L', 'Laki-laki'), ('P', 'Perempuan')], max_length=1)),
+                ('age_band', models.CharField(choices=[('0-17', '0-17 tahun'), ('18-30', '18-30 tahun'), ('31-50', '31-50 tahun'), ('51-59', '51-59 tahun'), ('60+', '60 tahun ke atas')], max_length=5)),
+                ('religion', models.CharField(blank=True, default='', max_length=50)),
+                ('education', models.CharField(blank=True, default='', max_length=50)),
+                ('marital_status', models.CharField(blank=True, default='', max_length=15)),
+                ('is_active', models.BooleanField(default=True)),
+                ('count', models.IntegerField(default=0)),
+                ('age_sum', models.IntegerField(default=0, help_text='Jumlah umur seluruh penduduk dalam sel, untuk rata-rata umur')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('dusun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='population_rollups', to='references.dusun')),
+                ('lorong', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='population_rollups', to='references.lorong')),
+            ],
+            options={
+                'verbose_name': 'Rekap Penduduk',
+                'verbose_name_plural': 'Rekap Penduduk',
+                'unique_together': {('dusun', 'lorong', 'gender', 'age_band', 'religion', 'education', 'marital_status', 'is_active')},
+            },
+        ),
+        migrations.RunPython(build_population_rollup, migrations.RunPython.noop),
+    ]
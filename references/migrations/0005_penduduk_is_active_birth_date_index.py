@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('references', '0004_populationrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='penduduk',
+            index=models.Index(fields=['is_active', 'birth_date'], name='references__is_acti_22170e_idx'),
+        ),
+    ]
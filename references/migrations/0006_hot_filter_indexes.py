@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('references', '0005_penduduk_is_active_birth_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='penduduk',
+            index=models.Index(fields=['gender', 'is_active'], name='ref_pend_gender_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='penduduk',
+            index=models.Index(fields=['dusun', 'is_active'], name='ref_pend_dusun_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='penduduk',
+            index=models.Index(fields=['created_at'], name='ref_pend_created_idx'),
+        ),
+    ]
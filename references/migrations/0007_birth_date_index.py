@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('references', '0006_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='penduduk',
+            name='references__is_acti_22170e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='penduduk',
+            index=models.Index(fields=['birth_date', 'is_active'], name='ref_pend_birth_active_idx'),
+        ),
+    ]
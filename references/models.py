@@ -1,7 +1,11 @@
-from django.db import models
+from datetime import date
+
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Coalesce, ExtractDay, ExtractMonth, ExtractYear
 from django.utils import timezone
 from django.conf import settings
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
 
@@ -55,6 +59,60 @@ class Lorong(models.Model):
         return f"{self.name} - {self.dusun.name}"
 
 
+def years_before(on_date, years):
+    """Tanggal tepat `years` tahun sebelum on_date (29 Feb menjadi 28 Feb)"""
+    try:
+        return on_date.replace(year=on_date.year - years)
+    except ValueError:
+        return on_date.replace(year=on_date.year - years, day=28)
+
+
+class PendudukQuerySet(models.QuerySet):
+    """QuerySet Penduduk dengan perhitungan umur di sisi database"""
+
+    def active(self):
+        """Penduduk aktif (`is_active IN (1)`); rentang birth_date memakai ref_pend_birth_active_idx (birth_date, is_active)"""
+        return self.filter(is_active__in=[True])
+
+    def with_age(self, on_date=None):
+        """Annotate `age_years`: umur tepat pada on_date (atau tanggal meninggal) dihitung di SQL"""
+        on_date = on_date or date.today()
+        end_date = Coalesce(F('death_date'), Value(on_date), output_field=models.DateField())
+        return self.alias(
+            _birth_year=ExtractYear('birth_date'),
+            _birth_month=ExtractMonth('birth_date'),
+            _birth_day=ExtractDay('birth_date'),
+            _end_year=ExtractYear(end_date),
+            _end_month=ExtractMonth(end_date),
+            _end_day=ExtractDay(end_date),
+        ).annotate(
+            age_years=F('_end_year') - F('_birth_year') - Case(
+                When(
+                    Q(_birth_month__gt=F('_end_month')) | Q(_birth_month=F('_end_month'), _birth_day__gt=F('_end_day')),
+                    then=Value(1),
+                ),
+                default=Value(0),
+                output_field=models.IntegerField(),
+            )
+        )
+
+    def age_between(self, age_min=None, age_max=None, on_date=None):
+        """Filter umur sebagai range birth_date agar bisa memakai index (birth_date, is_active)"""
+        on_date = on_date or date.today()
+        queryset = self
+        if age_min is not None:
+            queryset = queryset.filter(birth_date__lte=years_before(on_date, int(age_min)))
+        if age_max is not None:
+            queryset = queryset.filter(birth_date__gt=years_before(on_date, int(age_max) + 1))
+        return queryset
+
+    def order_by_age(self, descending=False):
+        """Urutkan berdasarkan umur (termuda dulu), memakai urutan birth_date"""
+        if descending:
+            return self.order_by('birth_date', 'id')
+        return self.order_by('-birth_date', '-id')
+
+
 class Penduduk(models.Model):
     """Population/Resident data with comprehensive information"""
     GENDER_CHOICES = [
@@ -170,17 +228,29 @@ class Penduduk(models.Model):
     updated_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True, 
                                   related_name='updated_penduduk', verbose_name="Diperbarui Oleh")
 
+    objects = PendudukQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Penduduk"
         verbose_name_plural = "Penduduk"
         ordering = ['name']
+        indexes = [
+            # birth_date di depan: filter is_active (boolean) di SQLite tidak bisa memakai prefix index
+            models.Index(fields=['birth_date', 'is_active'], name='ref_pend_birth_active_idx'),
+            # gender di depan: statistik publik memfilter gender saja, pencarian gender + is_active
+            models.Index(fields=['gender', 'is_active'], name='ref_pend_gender_active_idx'),
+            models.Index(fields=['dusun', 'is_active'], name='ref_pend_dusun_active_idx'),
+            models.Index(fields=['created_at'], name='ref_pend_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.nik})"
 
     @property
     def age(self):
-        from datetime import date
+        # Pakai hasil PendudukQuerySet.with_age() bila tersedia
+        if 'age_years' in self.__dict__:
+            return self.age_years
         today = date.today()
         if self.death_date:
             end_date = self.death_date
@@ -294,19 +364,80 @@ class DisabilitasType(models.Model):
         return self.name
 
 
+class PopulationRollup(models.Model):
+    """Precomputed resident counts per demographic cell for statistics endpoints"""
+    AGE_BAND_CHOICES = [
+        ('0-17', '0-17 tahun'),
+        ('18-30', '18-30 tahun'),
+        ('31-50', '31-50 tahun'),
+        ('51-59', '51-59 tahun'),
+        ('60+', '60 tahun ke atas'),
+    ]
+
+    dusun = models.ForeignKey(Dusun, on_delete=models.CASCADE, related_name='population_rollups')
+    lorong = models.ForeignKey(Lorong, on_delete=models.CASCADE, related_name='population_rollups', blank=True, null=True)
+    gender = models.CharField(max_length=1, choices=Penduduk.GENDER_CHOICES)
+    age_band = models.CharField(max_length=5, choices=AGE_BAND_CHOICES)
+    religion = models.CharField(max_length=50, blank=True, default='')
+    education = models.CharField(max_length=50, blank=True, default='')
+    marital_status = models.CharField(max_length=15, blank=True, default='')
+    is_active = models.BooleanField(default=True)
+    count = models.IntegerField(default=0)
+    age_sum = models.IntegerField(default=0, help_text="Jumlah umur seluruh penduduk dalam sel, untuk rata-rata umur")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Rekap Penduduk"
+        verbose_name_plural = "Rekap Penduduk"
+        unique_together = ['dusun', 'lorong', 'gender', 'age_band', 'religion', 'education', 'marital_status', 'is_active']
+
+    def __str__(self):
+        return f"{self.dusun_id}/{self.lorong_id or '-'} {self.gender} {self.age_band}: {self.count}"
+
+
 # Signals to automatically update population count
+@receiver(pre_save, sender=Penduduk)
+def remember_previous_rollup_key(sender, instance, **kwargs):
+    """Simpan kunci rekap dan dusun terhitung lama sebelum Penduduk disimpan"""
+    from .population import counted_dusun
+    from .services import PopulationRollupService
+    previous = PopulationRollupService.load_row(instance.pk, 'is_alive')
+    instance._previous_rollup_row = previous[:-1] if previous else None
+    instance._previous_population_dusun = counted_dusun(previous[0], previous[6], previous[-1]) if previous else None
+
+
 @receiver(post_save, sender=Penduduk)
 def update_dusun_population_on_save(sender, instance, created, **kwargs):
     """Update dusun population count when a Penduduk is saved"""
-    if instance.dusun:
-        instance.dusun.update_population_count()
+    from .population import counted_dusun, dusun_population
+    from .services import PopulationRollupService
+    PopulationRollupService.move(
+        getattr(instance, '_previous_rollup_row', None),
+        PopulationRollupService.row_from_instance(instance),
+    )
+    # Delta ±1 digabung dan diterapkan saat commit, bukan COUNT ulang per simpan
+    dusun_population.move(
+        getattr(instance, '_previous_population_dusun', None),
+        counted_dusun(instance.dusun_id, instance.is_active, instance.is_alive),
+    )
 
 
 @receiver(post_delete, sender=Penduduk)
 def update_dusun_population_on_delete(sender, instance, **kwargs):
     """Update dusun population count when a Penduduk is deleted"""
-    if instance.dusun:
-        instance.dusun.update_population_count()
+    from .population import counted_dusun, dusun_population
+    from .services import PopulationRollupService
+    PopulationRollupService.move(PopulationRollupService.row_from_instance(instance), None)
+    dusun_population.move(counted_dusun(instance.dusun_id, instance.is_active, instance.is_alive), None)
+
+
+@receiver(post_save, sender=Penduduk)
+@receiver(post_delete, sender=Penduduk)
+def invalidate_resident_autocomplete(sender, instance, **kwargs):
+    """Index picker penduduk dibangun ulang saat dipakai berikutnya"""
+    from .autocomplete import resident_index
+    # Setelah commit: build yang berjalan sebelum commit masih membaca data lama
+    transaction.on_commit(resident_index.invalidate)
 
 
 class DisabilitasData(models.Model):
@@ -0,0 +1,149 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+logger = logging.getLogger(__name__)
+
+
+def counted_dusun(dusun_id, is_active, is_alive):
+    """Dusun tempat penduduk ikut dihitung di population_count (aktif dan masih hidup), atau None"""
+    return dusun_id if dusun_id and is_active and is_alive else None
+
+
+class _Batch:
+    """Delta population_count yang menunggu commit untuk satu tingkat savepoint"""
+
+    def __init__(self, counter):
+        self.counter = counter
+        self.deltas = {}
+
+    def add(self, dusun_id, delta):
+        self.deltas[dusun_id] = self.deltas.get(dusun_id, 0) + delta
+
+    def flush(self):
+        deltas, self.deltas = self.deltas, {}
+        self.counter.apply(deltas)
+
+
+class DusunPopulationCounter:
+    """Menjaga Dusun.population_count lewat delta ±1 yang digabung per transaksi
+
+    Delta dicatat per tingkat savepoint dan diterapkan dengan satu UPDATE saat commit (transaction.on_commit),
+    sehingga savepoint/transaksi yang di-rollback ikut membuang deltanya. Di dalam deferred() pencatatan
+    dihentikan dan jumlah dihitung ulang sekali dengan GROUP BY di akhir.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def _batches(self):
+        if not hasattr(self._local, 'batches'):
+            self._local.batches = {}
+        return self._local.batches
+
+    @property
+    def suspended(self):
+        return getattr(self._local, 'suspended', 0) > 0
+
+    def move(self, old_dusun_id, new_dusun_id):
+        if old_dusun_id == new_dusun_id:
+            return
+        if old_dusun_id:
+            self.record(old_dusun_id, -1)
+        if new_dusun_id:
+            self.record(new_dusun_id, 1)
+
+    def record(self, dusun_id, delta):
+        if self.suspended or not dusun_id or not delta:
+            return
+        if not connection.in_atomic_block:
+            self._batches.clear()
+            self.apply({dusun_id: delta})
+            return
+        self._batch().add(dusun_id, delta)
+
+    def _batch(self):
+        """Batch untuk savepoint aktif; dibuat ulang bila flush-nya sudah jalan atau dibuang rollback"""
+        key = tuple(connection.savepoint_ids)
+        batch = self._batches.get(key)
+        pending = self._pending()
+        if batch is None or batch not in pending:
+            for other_key, other in list(self._batches.items()):
+                if other not in pending:
+                    del self._batches[other_key]
+            batch = self._batches[key] = _Batch(self)
+            transaction.on_commit(batch.flush)
+        return batch
+
+    @staticmethod
+    def _pending():
+        """Batch yang flush-nya masih terdaftar di on_commit koneksi ini"""
+        return {
+            getattr(func, '__self__', None) for _, func, *_rest in connection.run_on_commit
+        }
+
+    def apply(self, deltas):
+        """Satu UPDATE untuk semua dusun yang berubah"""
+        from .models import Dusun
+
+        deltas = {dusun_id: delta for dusun_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        Dusun.objects.filter(pk__in=deltas).update(population_count=F('population_count') + Case(
+            *(When(pk=dusun_id, then=Value(delta)) for dusun_id, delta in deltas.items()),
+            default=Value(0), output_field=IntegerField(),
+        ))
+        self._invalidate()
+
+    def rebuild(self):
+        """Hitung ulang semua dusun dengan satu GROUP BY; return {dusun_id: (lama, baru)} yang berubah"""
+        from .models import Dusun, Penduduk
+
+        # Delta yang belum di-commit sudah tercakup dalam hitungan ulang
+        for batch in self._batches.values():
+            batch.deltas.clear()
+        counts = dict(
+            Penduduk.objects.filter(is_active=True, is_alive=True).order_by()
+            .values_list('dusun_id').annotate(total=Count('id'))
+        )
+        changed = {
+            pk: (old, counts.get(pk, 0))
+            for pk, old in Dusun.objects.values_list('pk', 'population_count')
+            if old != counts.get(pk, 0)
+        }
+        if changed:
+            Dusun.objects.filter(pk__in=changed).update(population_count=Case(
+                *(When(pk=pk, then=Value(new)) for pk, (_, new) in changed.items()),
+                default=F('population_count'), output_field=IntegerField(),
+            ))
+            self._invalidate()
+        return changed
+
+    @contextmanager
+    def deferred(self):
+        """Hentikan pencatatan delta selama proses massal, lalu hitung ulang sekali di akhir"""
+        self._local.suspended = getattr(self._local, 'suspended', 0) + 1
+        try:
+            yield self
+        finally:
+            self._local.suspended -= 1
+            if not self._local.suspended:
+                self.rebuild()
+
+    @staticmethod
+    def _invalidate():
+        # update() tidak memicu post_save Dusun
+        from core.response_cache import invalidate_models
+        from .models import Dusun
+
+        try:
+            invalidate_models(Dusun)
+        except Exception as e:
+            logger.error(f"Error invalidating response cache after population update: {e}")
+
+
+dusun_population = DusunPopulationCounter()
@@ -0,0 +1,9 @@
+from core.search import register
+from .models import Penduduk
+
+register(
+    Penduduk, 'penduduk', 'references',
+    title='name',
+    fields=('nik', 'kk_number', 'address', 'birth_place', 'occupation', 'dusun__name', 'lorong__name'),
+    subtitle=lambda penduduk: f'NIK: {penduduk.nik}',
+)
@@ -0,0 +1,357 @@
+from collections import defaultdict
+from datetime import date, timedelta
+import csv
+import json
+import logging
+import tempfile
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+
+from .models import Penduduk, PopulationRollup
+
+logger = logging.getLogger(__name__)
+
+
+def calculate_age(birth_date, on_date=None):
+    """Hitung umur tepat (tahun penuh) pada tanggal tertentu"""
+    on_date = on_date or date.today()
+    return on_date.year - birth_date.year - ((on_date.month, on_date.day) < (birth_date.month, birth_date.day))
+
+
+def age_band_for(age):
+    """Kelompokkan umur ke dalam age band PopulationRollup"""
+    if age <= 17:
+        return '0-17'
+    if age <= 30:
+        return '18-30'
+    if age <= 50:
+        return '31-50'
+    if age <= 59:
+        return '51-59'
+    return '60+'
+
+
+class PopulationRollupService:
+    """Service untuk menjaga tabel rekap demografi penduduk"""
+
+    # Field Penduduk yang menentukan sel rekap; birth_date selalu terakhir
+    ROW_FIELDS = ('dusun_id', 'lorong_id', 'gender', 'religion', 'education', 'marital_status', 'is_active', 'birth_date')
+    KEY_FIELDS = ('dusun_id', 'lorong_id', 'gender', 'religion', 'education', 'marital_status', 'is_active', 'age_band')
+    # SystemSettings: tanggal umur di tabel rekap terakhir dihitung (rebuild atau age_residents)
+    AGED_UNTIL_KEY = 'population_rollup_aged_until'
+
+    @staticmethod
+    def aged_until():
+        """Tanggal terakhir umur tabel rekap diperbarui; None bila belum pernah tercatat"""
+        from core.models import SystemSettings
+
+        value = SystemSettings.objects.filter(
+            setting_key=PopulationRollupService.AGED_UNTIL_KEY
+        ).values_list('setting_value', flat=True).first()
+        try:
+            return date.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _mark_aged_until(day):
+        from core.models import SystemSettings
+
+        SystemSettings.objects.update_or_create(
+            setting_key=PopulationRollupService.AGED_UNTIL_KEY,
+            defaults={
+                'setting_value': day.isoformat(),
+                'description': 'Tanggal terakhir rekap penduduk dihitung (refresh_population_rollup)',
+            },
+        )
+
+    @staticmethod
+    def load_row(pk, *extra_fields):
+        """Ambil nilai dimensi rekap (ditambah extra_fields) yang tersimpan di database untuk satu penduduk"""
+        if pk is None:
+            return None
+        return Penduduk.objects.filter(pk=pk).values_list(*PopulationRollupService.ROW_FIELDS, *extra_fields).first()
+
+    @staticmethod
+    def row_from_instance(instance):
+        return tuple(getattr(instance, field) for field in PopulationRollupService.ROW_FIELDS)
+
+    @staticmethod
+    def cell_for(row, on_date=None):
+        """Ubah row penduduk menjadi (kunci sel, umur)"""
+        dusun_id, lorong_id, gender, religion, education, marital_status, is_active, birth_date = row
+        if not dusun_id or not birth_date:
+            return None, 0
+        age = calculate_age(birth_date, on_date)
+        key = (dusun_id, lorong_id, gender, religion or '', education or '', marital_status or '',
+               bool(is_active), age_band_for(age))
+        return key, age
+
+    @staticmethod
+    def move(old_row, new_row):
+        """Pindahkan satu penduduk dari sel lama ke sel baru (None = tidak ada)
+
+        Umur dihitung pada aged_until(), tanggal yang sama dengan isi sel rekap, bukan hari ini.
+        """
+        if old_row == new_row:
+            return
+        on_date = PopulationRollupService.aged_until()
+        old_key, old_age = PopulationRollupService.cell_for(old_row, on_date) if old_row else (None, 0)
+        new_key, new_age = PopulationRollupService.cell_for(new_row, on_date) if new_row else (None, 0)
+        if old_key == new_key and old_age == new_age:
+            return
+        try:
+            if old_key:
+                PopulationRollupService._apply_delta(old_key, -1, -old_age)
+            if new_key:
+                PopulationRollupService._apply_delta(new_key, 1, new_age)
+        except Exception as e:
+            # Rekap bisa diperbaiki dengan refresh_population_rollup --rebuild
+            logger.error(f"Error updating population rollup: {e}")
+
+    @staticmethod
+    def add_rows(rows):
+        """Tambahkan banyak penduduk baru sekaligus (import massal): satu update per sel rekap"""
+        on_date = PopulationRollupService.aged_until()
+        cells = defaultdict(lambda: [0, 0])
+        for row in rows:
+            key, age = PopulationRollupService.cell_for(row, on_date)
+            if key:
+                cells[key][0] += 1
+                cells[key][1] += age
+        for key, (count, age_sum) in cells.items():
+            PopulationRollupService._apply_delta(key, count, age_sum)
+
+    @staticmethod
+    def _apply_delta(key, count_delta, age_delta):
+        filters = dict(zip(PopulationRollupService.KEY_FIELDS, key))
+        rollups = PopulationRollup.objects.filter(**filters)
+        pk = rollups.values_list('pk', flat=True).first()
+        if pk is None:
+            if count_delta <= 0:
+                return
+            try:
+                with transaction.atomic():
+                    PopulationRollup.objects.create(count=count_delta, age_sum=age_delta, **filters)
+                return
+            except IntegrityError:
+                pk = rollups.values_list('pk', flat=True).first()
+        PopulationRollup.objects.filter(pk=pk).update(
+            count=F('count') + count_delta,
+            age_sum=F('age_sum') + age_delta,
+        )
+
+    @staticmethod
+    def rebuild(on_date=None):
+        """Bangun ulang seluruh tabel rekap dari data Penduduk"""
+        cells = defaultdict(lambda: [0, 0])
+        rows = Penduduk.objects.order_by().values_list(*PopulationRollupService.ROW_FIELDS)
+        for row in rows.iterator(chunk_size=2000):
+            key, age = PopulationRollupService.cell_for(row, on_date)
+            if key:
+                cells[key][0] += 1
+                cells[key][1] += age
+
+        rollups = [
+            PopulationRollup(count=count, age_sum=age_sum, **dict(zip(PopulationRollupService.KEY_FIELDS, key)))
+            for key, (count, age_sum) in cells.items()
+        ]
+        with transaction.atomic():
+            PopulationRollup.objects.all().delete()
+            PopulationRollup.objects.bulk_create(rollups, batch_size=500)
+            PopulationRollupService._mark_aged_until(on_date or date.today())
+        return len(rollups)
+
+    @staticmethod
+    def age_residents(since, until=None):
+        """Terapkan pertambahan umur untuk penduduk yang berulang tahun pada (since, until]
+
+        `until` dicatat sebagai aged_until() sehingga run berikutnya melanjutkan dari sana.
+        """
+        until = until or date.today()
+        birthdays = Q()
+        day = since + timedelta(days=1)
+        while day <= until:
+            birthdays |= Q(birth_date__month=day.month, birth_date__day=day.day)
+            # Kelahiran 29 Februari bertambah umur pada 1 Maret di tahun non-kabisat
+            if day.month == 3 and day.day == 1:
+                birthdays |= Q(birth_date__month=2, birth_date__day=29)
+            day += timedelta(days=1)
+        if not birthdays:
+            return 0
+
+        aged = 0
+        rows = Penduduk.objects.filter(birthdays).order_by().values_list(*PopulationRollupService.ROW_FIELDS)
+        # Satu transaksi dengan penanda tanggal: run yang gagal tidak pernah menuakan penduduk dua kali
+        with transaction.atomic():
+            for row in rows.iterator(chunk_size=2000):
+                old_key, old_age = PopulationRollupService.cell_for(row, since)
+                new_key, new_age = PopulationRollupService.cell_for(row, until)
+                if not old_key or (old_key == new_key and old_age == new_age):
+                    continue
+                PopulationRollupService._apply_delta(old_key, -1, -old_age)
+                PopulationRollupService._apply_delta(new_key, 1, new_age)
+                aged += 1
+            PopulationRollupService._mark_aged_until(until)
+        return aged
+
+    @staticmethod
+    def summary(active_only=True):
+        """Ringkasan statistik penduduk dari tabel rekap dalam satu query"""
+        rollups = PopulationRollup.objects.filter(count__gt=0)
+        if active_only:
+            rollups = rollups.filter(is_active=True)
+        cells = rollups.values(
+            'dusun_id', 'dusun__name', 'gender', 'age_band', 'religion', 'education', 'marital_status'
+        ).annotate(total=Sum('count'), ages=Sum('age_sum')).order_by()
+
+        summary = {
+            'total': 0,
+            'age_sum': 0,
+            'gender': defaultdict(int),
+            'age_bands': {band: 0 for band, _ in PopulationRollup.AGE_BAND_CHOICES},
+            'dusun': {},
+            'religion': defaultdict(int),
+            'education': defaultdict(int),
+            'marital_status': defaultdict(int),
+        }
+        for cell in cells:
+            total = cell['total']
+            summary['total'] += total
+            summary['age_sum'] += cell['ages']
+            summary['gender'][cell['gender']] += total
+            summary['age_bands'][cell['age_band']] += total
+            dusun = summary['dusun'].setdefault(cell['dusun_id'], {'name': cell['dusun__name'], 'count': 0})
+            dusun['count'] += total
+            summary['religion'][cell['religion'] or None] += total
+            summary['education'][cell['education'] or None] += total
+            summary['marital_status'][cell['marital_status'] or None] += total
+
+        summary['average_age'] = round(summary['age_sum'] / summary['total'], 1) if summary['total'] else 0
+        return summary
+
+
+class Echo:
+    """Pseudo-buffer untuk csv.writer: write() langsung mengembalikan baris"""
+
+    def write(self, value):
+        return value
+
+
+class PendudukExportService:
+    """Service export data penduduk secara streaming (CSV, XLSX, JSON Lines)"""
+
+    CHUNK_SIZE = 2000
+
+    # (header, key dari .values(), formatter)
+    COLUMNS = [
+        ('ID', 'id', None),
+        ('Nama', 'name', None),
+        ('NIK', 'nik', None),
+        ('No. KK', 'kk_number', None),
+        ('Jenis Kelamin', 'gender', dict(Penduduk.GENDER_CHOICES).get),
+        ('Tempat Lahir', 'birth_place', None),
+        ('Tanggal Lahir', 'birth_date', lambda value: value.strftime('%Y-%m-%d') if value else ''),
+        ('Umur', 'age_years', None),
+        ('Dusun', 'dusun__name', None),
+        ('Lorong', 'lorong__name', None),
+        ('Alamat', 'address', None),
+        ('Telepon', 'phone_number', None),
+        ('HP', 'mobile_number', None),
+        ('Email', 'email', None),
+        ('Agama', 'religion', dict(Penduduk.RELIGION_CHOICES).get),
+        ('Status Perkawinan', 'marital_status', dict(Penduduk.MARITAL_STATUS_CHOICES).get),
+        ('Pendidikan', 'education', dict(Penduduk.EDUCATION_CHOICES).get),
+        ('Pekerjaan', 'occupation', None),
+    ]
+
+    CONTENT_TYPES = {
+        'csv': 'text/csv',
+        'jsonl': 'application/x-ndjson',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    }
+
+    @staticmethod
+    def filter_queryset(queryset, params):
+        """Terapkan filter search/dusun/umur yang sama dengan API pencarian penduduk"""
+        search = params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(
+                Q(name__icontains=search) |
+                Q(nik__icontains=search) |
+                Q(kk_number__icontains=search)
+            )
+        dusun_id = params.get('dusun', '')
+        if dusun_id:
+            queryset = queryset.filter(dusun_id=dusun_id)
+        age_min = params.get('age_min', '')
+        age_max = params.get('age_max', '')
+        if age_min or age_max:
+            queryset = queryset.age_between(age_min or None, age_max or None)
+        return queryset
+
+    @staticmethod
+    def iter_rows(queryset, chunk_size=None):
+        """Baris export sebagai list nilai; dusun/lorong di-join, tanpa instansiasi model"""
+        keys = [key for _, key, _ in PendudukExportService.COLUMNS]
+        formatters = [formatter for _, _, formatter in PendudukExportService.COLUMNS]
+        values = queryset.with_age().values(*keys)
+        for record in values.iterator(chunk_size=chunk_size or PendudukExportService.CHUNK_SIZE):
+            row = []
+            for key, formatter in zip(keys, formatters):
+                value = record[key]
+                if formatter and value is not None:
+                    value = formatter(value) or value
+                row.append('' if value is None else value)
+            yield row
+
+    @staticmethod
+    def headers():
+        return [header for header, _, _ in PendudukExportService.COLUMNS]
+
+    @staticmethod
+    def stream_csv(queryset):
+        writer = csv.writer(Echo())
+        yield writer.writerow(PendudukExportService.headers())
+        for row in PendudukExportService.iter_rows(queryset):
+            yield writer.writerow(row)
+
+    @staticmethod
+    def stream_jsonl(queryset):
+        keys = [key.replace('__name', '').replace('age_years', 'age') for _, key, _ in PendudukExportService.COLUMNS]
+        for row in PendudukExportService.iter_rows(queryset):
+            yield json.dumps(dict(zip(keys, row)), ensure_ascii=False) + '\n'
+
+    @staticmethod
+    def write_xlsx(queryset, file_obj):
+        """Tulis XLSX dengan worksheet write-only agar memori tetap datar"""
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Penduduk')
+        worksheet.append(PendudukExportService.headers())
+        for row in PendudukExportService.iter_rows(queryset):
+            worksheet.append(row)
+        workbook.save(file_obj)
+
+    @staticmethod
+    def build_response(queryset, export_format, filename='data_penduduk'):
+        """Response streaming untuk format csv, jsonl atau xlsx"""
+        content_type = PendudukExportService.CONTENT_TYPES[export_format]
+        full_filename = f'{filename}.{export_format}'
+
+        if export_format == 'xlsx':
+            # openpyxl menulis baris ke file sementara; hasilnya di-stream per blok
+            temp_file = tempfile.TemporaryFile()
+            PendudukExportService.write_xlsx(queryset, temp_file)
+            temp_file.seek(0)
+            return FileResponse(temp_file, as_attachment=True, filename=full_filename, content_type=content_type)
+
+        if export_format == 'csv':
+            content = PendudukExportService.stream_csv(queryset)
+        else:
+            content = PendudukExportService.stream_jsonl(queryset)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{full_filename}"'
+        return response
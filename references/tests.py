@@ -1,3 +1,172 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+
+class PendudukExportAccessTest(TestCase):
+    URLS = ['references:api_population_export', 'references:penduduk_export']
+
+    def test_anonymous_and_non_staff_users_cannot_export(self):
+        user = get_user_model().objects.create_user('warga', 'warga@example.com', 'x')
+        for name in self.URLS:
+            self.assertEqual(self.client.get(reverse(name)).status_code, 302, name)
+        self.client.force_login(user)
+        for name in self.URLS:
+            self.assertEqual(self.client.get(reverse(name)).status_code, 302, name)
+
+    def test_admin_can_export(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x'))
+        for name in self.URLS:
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200, name)
+
+
+class PendudukAgeIndexTest(TestCase):
+    def test_age_range_uses_birth_date_index(self):
+        from .models import Penduduk
+
+        for queryset in (
+            Penduduk.objects.filter(is_active=True).age_between(60, None),
+            Penduduk.objects.filter(is_active=True).age_between(5, 12),
+        ):
+            self.assertIn('ref_pend_birth_active_idx', queryset.explain())
+
+
+class PopulationRollupRefreshTest(TestCase):
+    def test_default_window_starts_at_the_recorded_last_run(self):
+        from datetime import date, timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from core.datagen import years_ago
+        from .models import Dusun, Penduduk, PopulationRollup
+        from .services import PopulationRollupService
+
+        today = date.today()
+        Penduduk.objects.create(
+            nik='1102010101000001', name='Cut Nyak', gender='P', birth_place='Sarok',
+            birth_date=years_ago(today, 18, days=1), religion='Islam', marital_status='BELUM_KAWIN',
+            dusun=Dusun.objects.create(name='Dusun A'), address='-',
+        )
+        # Run terakhir tiga hari lalu; ulang tahun ke-18 kemarin terlewat bila jendela hanya "kemarin"
+        PopulationRollupService.rebuild(on_date=today - timedelta(days=3))
+        self.assertEqual(PopulationRollupService.aged_until(), today - timedelta(days=3))
+
+        call_command('refresh_population_rollup', stdout=StringIO())
+        self.assertEqual(
+            list(PopulationRollup.objects.filter(count__gt=0).values_list('age_band', flat=True)), ['18-30'],
+        )
+        self.assertEqual(PopulationRollupService.aged_until(), today)
+
+        output = StringIO()
+        call_command('refresh_population_rollup', stdout=output)
+        self.assertIn('already aged', output.getvalue())
+
+    def test_residents_saved_between_runs_are_aged_from_the_recorded_date(self):
+        from datetime import date, timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from core.datagen import years_ago
+        from .models import Dusun, Penduduk, PopulationRollup
+        from .services import PopulationRollupService
+
+        today = date.today()
+        dusun = Dusun.objects.create(name='Dusun A')
+        PopulationRollupService.rebuild(on_date=today - timedelta(days=3))
+        # Disimpan sebelum refresh: sel rekap masih berisi umur per tiga hari lalu (17 tahun)
+        for nik in ('1102010101000002', '1102010101000003'):
+            Penduduk.objects.create(
+                nik=nik, name='Teuku Umar', gender='L', birth_place='Sarok',
+                birth_date=years_ago(today, 18, days=1), religion='Islam', marital_status='BELUM_KAWIN',
+                dusun=dusun, address='-',
+            )
+        cells = PopulationRollup.objects.filter(count__gt=0).values_list('age_band', 'count', 'age_sum')
+        self.assertEqual(list(cells.all()), [('0-17', 2, 34)])
+
+        call_command('refresh_population_rollup', stdout=StringIO())
+        self.assertEqual(list(cells.all()), [('18-30', 2, 36)])
+
+    def test_population_stats_list_every_dusun_with_active_residents(self):
+        from datetime import date
+
+        from .models import Dusun, Penduduk
+        from .services import PopulationRollupService
+
+        busy, quiet, empty = (Dusun.objects.create(name=f'Dusun {code}', code=code) for code in 'ABC')
+        for nik, dusun, is_active in (('1102010101000004', busy, True), ('1102010101000005', quiet, False)):
+            Penduduk.objects.create(
+                nik=nik, name='Warga', gender='P', birth_place='Sarok', birth_date=date(1990, 1, 1),
+                religion='Islam', marital_status='KAWIN', dusun=dusun, address='-', is_active=is_active,
+            )
+        PopulationRollupService.rebuild()
+
+        data = self.client.get(reverse('references:api_population_stats')).json()
+
+        self.assertEqual(data['total_population'], 1)
+        self.assertEqual(
+            sorted((row['name'], row['population_count']) for row in data['dusun_distribution']),
+            [('Dusun A', 1), ('Dusun B', 0), ('Dusun C', 0)],
+        )
+
+
+class ResidentIndexBuildTest(TestCase):
+    def test_concurrent_searches_build_once(self):
+        import threading
+        import time
+
+        from .autocomplete import ResidentIndex
+
+        class CountingIndex(ResidentIndex):
+            builds = 0
+
+            def build(self):
+                self.builds += 1
+                time.sleep(0.05)
+                with self._lock:
+                    self._version = self.cache.get('resident_autocomplete:version')
+                    self._built_at = time.monotonic()
+                return 0
+
+        index = CountingIndex()
+        threads = [threading.Thread(target=index._ensure_built) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(index.builds, 1)
+
+    def test_version_is_shared_through_configured_cache(self):
+        from django.core.cache import caches
+        from .autocomplete import VERSION_KEY, ResidentIndex
+
+        index = ResidentIndex()
+        index.build()
+        self.assertFalse(index._is_stale())
+        # Worker lain menyimpan penduduk: versinya terlihat lewat cache bersama
+        caches[index.config['CACHE_ALIAS']].set(VERSION_KEY, 'other-worker', None)
+        self.assertTrue(index._is_stale())
+
+    def test_search_sees_committed_create_and_rename(self):
+        from datetime import date
+        from django.test import RequestFactory
+        from .autocomplete import search_residents
+        from .models import Dusun, Penduduk
+
+        def names(query):
+            return [entry.name for entry in search_residents(RequestFactory().get('/', {'q': query}))]
+
+        self.assertEqual(names('sulaiman'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            resident = Penduduk.objects.create(
+                nik='1102010101900003', name='Sulaiman Daud', gender='L', birth_place='Sarok',
+                birth_date=date(1990, 1, 1), religion='Islam', marital_status='KAWIN',
+                dusun=Dusun.objects.create(name='Dusun A'), address='-',
+            )
+        self.assertEqual(names('sulaiman'), ['Sulaiman Daud'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resident.name = 'Sulaiman Yusuf'
+            resident.save()
+        self.assertEqual(names('yusuf'), ['Sulaiman Yusuf'])
+        self.assertEqual(names('daud'), [])
@@ -26,6 +26,7 @@ admin_api_patterns = [
     path('penduduk/<int:pk>/', views.penduduk_detail_api, name='admin_penduduk_detail'),
     path('penduduk/create/', views.penduduk_create_api, name='admin_penduduk_create'),
     path('penduduk/count/', views.penduduk_count_api, name='admin_penduduk_count'),
+    path('penduduk/export/', views.penduduk_export_api, name='admin_penduduk_export'),
     
     # Dusun Admin APIs
     path('dusun/', views.dusun_list_api, name='admin_dusun_list'),
@@ -16,6 +16,15 @@ from openpyxl.utils.dataframe import dataframe_to_rows
 
 from .models import Penduduk, Dusun, Lorong, DisabilitasType, DisabilitasData, ReligionReference, Family
 from .forms import PendudukForm, DusunForm, LorongForm, DisabilitasTypeForm, DisabilitasDataForm, FamilyForm
+from .services import PopulationRollupService, PendudukExportService
+from core.importer import importers
+from core.search import search_index
+
+
+def is_admin(user):
+    """Check if user is admin"""
+    return user.is_authenticated and (user.is_staff or user.is_superuser)
+
 
 # Test endpoint tanpa autentikasi untuk debugging
 @csrf_exempt
@@ -31,12 +40,13 @@ def api_test_endpoint(request):
     })
 
 # Consolidated API endpoints from former api_views.py
-@csrf_exempt
+@login_required
+@user_passes_test(is_admin)
 @require_http_methods(["GET"])
 def api_population(request):
     """API endpoint untuk data populasi (consolidated from api_views.py)"""
     try:
-        populations = Penduduk.objects.all()
+        populations = Penduduk.objects.select_related('dusun', 'lorong').order_by('name')
         
         # Search functionality
         search = request.GET.get('search', '')
@@ -75,7 +85,7 @@ def api_population(request):
                 'address': population.address,
                 'dusun': population.dusun.name if population.dusun else None,
                 'lorong': population.lorong.name if population.lorong else None,
-                'phone': population.phone,
+                'phone': population.phone_number,
                 'email': population.email,
                 'is_active': population.is_active,
             })
@@ -101,79 +111,50 @@ def test_debug_view(request):
 @csrf_exempt
 @require_http_methods(["GET"])
 def api_population_stats(request):
-    """API endpoint untuk statistik populasi"""
+    """API endpoint untuk statistik populasi
+
+    Semua angka, termasuk dusun_distribution, menghitung penduduk aktif yang punya dusun dan
+    tanggal lahir (tabel rekap); setiap dusun tetap tercantum walau jumlahnya 0.
+    """
     try:
-        total_population = Penduduk.objects.filter(is_active=True).count()
-        male_count = Penduduk.objects.filter(gender='L', is_active=True).count()
-        female_count = Penduduk.objects.filter(gender='P', is_active=True).count()
+        summary = PopulationRollupService.summary(active_only=True)
+        age_bands = summary['age_bands']
         
         # Age distribution
-        from datetime import date
-        today = date.today()
         age_groups = {
-            '0-17': 0,
-            '18-30': 0,
-            '31-50': 0,
-            '51+': 0
+            '0-17': age_bands['0-17'],
+            '18-30': age_bands['18-30'],
+            '31-50': age_bands['31-50'],
+            '51+': age_bands['51-59'] + age_bands['60+']
         }
         
-        for person in Penduduk.objects.filter(is_active=True, birth_date__isnull=False):
-            age = today.year - person.birth_date.year
-            if age <= 17:
-                age_groups['0-17'] += 1
-            elif age <= 30:
-                age_groups['18-30'] += 1
-            elif age <= 50:
-                age_groups['31-50'] += 1
-            else:
-                age_groups['51+'] += 1
-        
         return JsonResponse({
-            'total_population': total_population,
-            'male_count': male_count,
-            'female_count': female_count,
+            'total_population': summary['total'],
+            'male_count': summary['gender']['L'],
+            'female_count': summary['gender']['P'],
             'age_distribution': age_groups,
-            'dusun_distribution': list(Dusun.objects.annotate(
-                population_count=Count('penduduk')
-            ).values('name', 'population_count'))
+            'dusun_distribution': [
+                {'name': name, 'population_count': summary['dusun'].get(pk, {}).get('count', 0)}
+                for pk, name in Dusun.objects.values_list('pk', 'name')
+            ]
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-@csrf_exempt
+@login_required
+@user_passes_test(is_admin)
 @require_http_methods(["GET"])
 def api_population_export(request):
-    """API endpoint untuk export data populasi"""
+    """API endpoint untuk export data populasi (streaming csv/xlsx/jsonl)"""
     try:
-        populations = Penduduk.objects.filter(is_active=True)
-        
-        # Create CSV response
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="population_data.csv"'
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow(['ID', 'Nama', 'NIK', 'Jenis Kelamin', 'Tanggal Lahir', 'Alamat', 'Dusun', 'Lorong', 'Telepon', 'Email'])
-        
-        # Write data
-        for pop in populations:
-            writer.writerow([
-                pop.id,
-                pop.name,
-                pop.nik,
-                pop.get_gender_display(),
-                pop.birth_date.strftime('%Y-%m-%d') if pop.birth_date else '',
-                pop.address,
-                pop.dusun.name if pop.dusun else '',
-                pop.lorong.name if pop.lorong else '',
-                pop.phone or '',
-                pop.email or ''
-            ])
-        
-        response.write(output.getvalue())
-        return response
+        export_format = request.GET.get('format', 'csv').lower()
+        if export_format not in PendudukExportService.CONTENT_TYPES:
+            return JsonResponse({'error': f'Format {export_format} tidak didukung'}, status=400)
+        
+        populations = PendudukExportService.filter_queryset(Penduduk.objects.active(), request.GET)
+        populations = populations.order_by('id')
+        
+        return PendudukExportService.build_response(populations, export_format, filename='population_data')
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -340,6 +321,8 @@ def public_penduduk_list_api(request):
         per_page = int(request.GET.get('per_page', 10))
         search = request.GET.get('search', '').strip()
         dusun_id = request.GET.get('dusun', '')
+        age_min = request.GET.get('age_min', '')
+        age_max = request.GET.get('age_max', '')
         
         queryset = Penduduk.objects.all()
         
@@ -353,7 +336,11 @@ def public_penduduk_list_api(request):
         if dusun_id:
             queryset = queryset.filter(dusun_id=dusun_id)
         
-        queryset = queryset.order_by('-created_at')
+        if age_min or age_max:
+            queryset = queryset.age_between(age_min or None, age_max or None)
+        
+        queryset = order_penduduk(queryset, request.GET.get('sort', ''), default='-created_at')
+        queryset = queryset.select_related('dusun', 'lorong')
         
         paginator = Paginator(queryset, per_page)
         page_obj = paginator.get_page(page)
@@ -618,9 +605,15 @@ def public_penduduk_update_api(request, penduduk_id):
             'message': str(e)
         }, status=500)
 
-def is_admin(user):
-    """Check if user is admin"""
-    return user.is_authenticated and (user.is_staff or user.is_superuser)
+def order_penduduk(queryset, sort, default='-created_at'):
+    """Apply ?sort= for penduduk lists: age, -age, name, -name, created_at, -created_at"""
+    if sort == 'age':
+        return queryset.order_by_age()
+    if sort == '-age':
+        return queryset.order_by_age(descending=True)
+    if sort.lstrip('-') in ('name', 'created_at'):
+        return queryset.order_by(sort, 'id')
+    return queryset.order_by(default)
 
 @login_required
 @user_passes_test(is_admin)
@@ -689,6 +682,8 @@ def penduduk_list_api(request):
         per_page = int(request.GET.get('per_page', 10))
         search = request.GET.get('search', '').strip()
         dusun_id = request.GET.get('dusun', '')
+        age_min = request.GET.get('age_min', '')
+        age_max = request.GET.get('age_max', '')
         
         queryset = Penduduk.objects.all()
         
@@ -702,7 +697,11 @@ def penduduk_list_api(request):
         if dusun_id:
             queryset = queryset.filter(dusun_id=dusun_id)
         
-        queryset = queryset.order_by('-created_at')
+        if age_min or age_max:
+            queryset = queryset.age_between(age_min or None, age_max or None)
+        
+        queryset = order_penduduk(queryset, request.GET.get('sort', ''), default='-created_at')
+        queryset = queryset.select_related('dusun', 'lorong').with_age()
         
         paginator = Paginator(queryset, per_page)
         page_obj = paginator.get_page(page)
@@ -721,7 +720,7 @@ def penduduk_list_api(request):
                     'lorong': p.lorong.name if p.lorong else '',
                     'marital_status': p.get_marital_status_display(),
                     'religion': p.religion,
-                    'age': p.age,
+                    'age': p.age_years,
                     'phone_number': p.phone_number,
                     'mobile_number': p.mobile_number,
                     'is_active': p.is_active,
@@ -812,32 +811,23 @@ def references_stats_api(request):
         from django.db.models import Count, Q
         from datetime import datetime, timedelta
         
+        summary = PopulationRollupService.summary(active_only=False)
+        age_bands = summary['age_bands']
+        
         # Basic stats
-        total_penduduk = Penduduk.objects.count()
+        total_penduduk = summary['total']
         total_dusun = Dusun.objects.count()
         total_lorong = Lorong.objects.count()
         total_disabilitas = DisabilitasData.objects.count()
         
         # Demographics
-        male_count = Penduduk.objects.filter(gender='L').count()
-        female_count = Penduduk.objects.filter(gender='P').count()
-        
-        # Age groups calculation
-        from datetime import date
-        today = date.today()
-        
-        anak_count = 0
-        dewasa_count = 0
-        lansia_count = 0
-        
-        for penduduk in Penduduk.objects.all():
-            age = today.year - penduduk.birth_date.year - ((today.month, today.day) < (penduduk.birth_date.month, penduduk.birth_date.day))
-            if age < 18:
-                anak_count += 1
-            elif age < 60:
-                dewasa_count += 1
-            else:
-                lansia_count += 1
+        male_count = summary['gender']['L']
+        female_count = summary['gender']['P']
+        
+        # Age groups from rollup bands
+        anak_count = age_bands['0-17']
+        dewasa_count = age_bands['18-30'] + age_bands['31-50'] + age_bands['51-59']
+        lansia_count = age_bands['60+']
         
         # Recent activity (last 30 days)
         thirty_days_ago = timezone.now() - timedelta(days=30)
@@ -845,16 +835,25 @@ def references_stats_api(request):
         new_disabilitas = DisabilitasData.objects.filter(created_at__gte=thirty_days_ago).count()
         
         # Population by dusun
-        population_by_dusun = list(Penduduk.objects.values('dusun__name').annotate(count=Count('id')).order_by('-count'))
+        population_by_dusun = sorted(
+            [{'dusun__name': dusun['name'], 'count': dusun['count']} for dusun in summary['dusun'].values()],
+            key=lambda item: -item['count']
+        )
         
         # Disability by type
         disability_by_type = list(DisabilitasData.objects.values('disability_type__name').annotate(count=Count('id')).order_by('-count'))
         
         # Religion distribution
-        religion_distribution = list(Penduduk.objects.values('religion').annotate(count=Count('id')).order_by('-count'))
+        religion_distribution = sorted(
+            [{'religion': religion, 'count': count} for religion, count in summary['religion'].items()],
+            key=lambda item: -item['count']
+        )
         
         # Education distribution
-        education_distribution = list(Penduduk.objects.values('education').annotate(count=Count('id')).order_by('-count'))
+        education_distribution = sorted(
+            [{'education': education, 'count': count} for education, count in summary['education'].items()],
+            key=lambda item: -item['count']
+        )
         
         stats = {
             'basic_stats': {
@@ -889,7 +888,7 @@ def references_stats_api(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-# Export/Import APIs (placeholder)
+# Export/Import APIs
 @login_required
 @user_passes_test(is_admin)
 def export_data(request, model_type):
@@ -898,9 +897,22 @@ def export_data(request, model_type):
 
 @login_required
 @user_passes_test(is_admin)
+@require_http_methods(["POST"])
 def import_data(request, model_type):
-    """Import data API"""
-    return JsonResponse({'message': f'Import {model_type} not implemented yet'})
+    """Import data API: upload CSV/XLSX (field `file`) ke importer massal (references/importers.py)"""
+    importer_class = importers.get(model_type)
+    if importer_class is None or importer_class.model._meta.app_label != 'references':
+        return JsonResponse({'success': False, 'error': f'Import {model_type} tidak didukung'}, status=404)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'success': False, 'error': 'File wajib diunggah'}, status=400)
+    try:
+        result = importer_class(user=request.user).run(upload)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': result.error_count == 0, 'data': result.as_dict()})
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
@@ -1132,15 +1144,10 @@ def penduduk_search_api(request):
         
         # Apply filters
         if is_active.lower() == 'true':
-            queryset = queryset.filter(is_active=True)
+            queryset = queryset.active()
         
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(nik__icontains=search) |
-                Q(kk_number__icontains=search) |
-                Q(address__icontains=search)
-            )
+            queryset = search_index.filter_queryset(queryset, search, ('name', 'nik', 'kk_number', 'address'))
         
         if dusun_id:
             queryset = queryset.filter(dusun_id=dusun_id)
@@ -1154,21 +1161,12 @@ def penduduk_search_api(request):
         if marital_status:
             queryset = queryset.filter(marital_status=marital_status)
         
-        # Age filtering (requires calculation)
+        # Age filtering as birth_date range (indexed)
         if age_min or age_max:
-            from datetime import date
-            today = date.today()
-            
-            if age_min:
-                birth_year_max = today.year - int(age_min)
-                queryset = queryset.filter(birth_date__year__lte=birth_year_max)
-            
-            if age_max:
-                birth_year_min = today.year - int(age_max)
-                queryset = queryset.filter(birth_date__year__gte=birth_year_min)
+            queryset = queryset.age_between(age_min or None, age_max or None)
         
-        # Order by name
-        queryset = queryset.order_by('-created_at')
+        queryset = order_penduduk(queryset, request.GET.get('sort', ''), default='-created_at')
+        queryset = queryset.select_related('dusun', 'lorong').with_age()
         
         # Pagination
         paginator = Paginator(queryset, per_page)
@@ -1177,7 +1175,7 @@ def penduduk_search_api(request):
         # Serialize results
         results = []
         for penduduk in page_obj:
-            age = penduduk.age if hasattr(penduduk, 'age') else None
+            age = penduduk.age_years
             results.append({
                 'id': penduduk.id,
                 'name': penduduk.name,
@@ -1210,32 +1208,25 @@ def penduduk_search_api(request):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
-@csrf_exempt
+@login_required
+@user_passes_test(is_admin)
 @require_http_methods(["GET"])
 def penduduk_export_api(request):
     """API endpoint for exporting penduduk data"""
     try:
-        format_type = request.GET.get('format', 'excel')  # excel, csv, json
+        format_type = request.GET.get('format', 'excel')  # excel/xlsx, csv, jsonl, json
+        if format_type == 'excel':
+            format_type = 'xlsx'
         
         # Get filtered data (reuse search logic)
-        search = request.GET.get('search', '')
-        dusun_id = request.GET.get('dusun', '')
+        queryset = PendudukExportService.filter_queryset(Penduduk.objects.active(), request.GET)
+        queryset = order_penduduk(queryset, request.GET.get('sort', ''), default='name')
         
-        queryset = Penduduk.objects.filter(is_active=True)
-        
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(nik__icontains=search) |
-                Q(kk_number__icontains=search)
-            )
-        
-        if dusun_id:
-            queryset = queryset.filter(dusun_id=dusun_id)
-        
-        queryset = queryset.order_by('name')
+        if format_type in PendudukExportService.CONTENT_TYPES:
+            return PendudukExportService.build_response(queryset, format_type)
         
         if format_type == 'json':
+            queryset = queryset.select_related('dusun', 'lorong').with_age()
             data = []
             for penduduk in queryset:
                 data.append({
@@ -1246,7 +1237,7 @@ def penduduk_export_api(request):
                     'gender': dict(Penduduk.GENDER_CHOICES).get(penduduk.gender, ''),
                     'birth_place': penduduk.birth_place,
                     'birth_date': penduduk.birth_date.strftime('%Y-%m-%d') if penduduk.birth_date else '',
-                    'age': penduduk.age,
+                    'age': penduduk.age_years,
                     'dusun': penduduk.dusun.name if penduduk.dusun else '',
                     'lorong': penduduk.lorong.name if penduduk.lorong else '',
                     'address': penduduk.address,
@@ -1263,13 +1254,10 @@ def penduduk_export_api(request):
                 'total_records': len(data)
             })
         
-        else:
-            # For Excel/CSV, return download URL or file
-            return JsonResponse({
-                'success': True,
-                'message': 'Export functionality available',
-                'download_url': f'/admin/references/export/penduduk/?format={format_type}'
-            })
+        return JsonResponse({
+            'success': False,
+            'error': f'Format {format_type} tidak didukung'
+        }, status=400)
             
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -1934,7 +1922,7 @@ def dashboard_summary_api(request):
             # Basic counts
             'total_dusun': Dusun.objects.filter(is_active=True).count(),
             'total_lorong': Lorong.objects.filter(is_active=True).count(),
-            'total_penduduk': Penduduk.objects.filter(is_active=True).count(),
+            'total_penduduk': 0,
             'total_disabilitas': DisabilitasData.objects.filter(is_active=True).count(),
             
             # Demographics
@@ -1955,24 +1943,20 @@ def dashboard_summary_api(request):
             'avg_houses_per_lorong': 0,
         }
         
-        total_penduduk = Penduduk.objects.filter(is_active=True).count()
+        summary = PopulationRollupService.summary(active_only=True)
+        total_penduduk = summary['total']
+        stats['total_penduduk'] = total_penduduk
         
         if total_penduduk > 0:
             # Demographics calculations
-            male_count = Penduduk.objects.filter(gender='L', is_active=True).count()
-            female_count = Penduduk.objects.filter(gender='P', is_active=True).count()
+            male_count = summary['gender']['L']
+            female_count = summary['gender']['P']
             
             stats['male_percentage'] = round((male_count / total_penduduk) * 100, 1)
             stats['female_percentage'] = round((female_count / total_penduduk) * 100, 1)
             
-            # Average age calculation
-            today = date.today()
-            ages = []
-            for p in Penduduk.objects.filter(is_active=True):
-                if p.birth_date:
-                    age = today.year - p.birth_date.year - ((today.month, today.day) < (p.birth_date.month, p.birth_date.day))
-                    ages.append(age)
-            stats['average_age'] = round(sum(ages) / len(ages), 1) if ages else 0
+            # Average age from rollup age sums
+            stats['average_age'] = summary['average_age']
             
             # Disability statistics
             total_disabilitas = DisabilitasData.objects.filter(is_active=True).count()
@@ -17,6 +17,11 @@ from .forms import (
     TourismEventForm, TourismPackageForm
 )
 import json
+from core.media import media_pipeline
+from core.search import search_index
+from . import geo
+
+MAX_RADIUS_KM = 200
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -42,12 +47,20 @@ def api_stats(request):
 def api_destinations(request):
     """API endpoint untuk daftar destinasi wisata"""
     try:
-        destinations = TourismLocation.objects.filter(is_active=True, status='published')
+        destinations = TourismLocation.objects.filter(is_active=True, status='published').select_related('category')
         
         # Filtering
         featured = request.GET.get('featured')
         category = request.GET.get('category')
         search = request.GET.get('search')
+        min_rating = request.GET.get('min_rating')
+        if min_rating:
+            try:
+                min_rating = float(min_rating)
+                if not 0 <= min_rating <= 5:
+                    raise ValueError(min_rating)
+            except ValueError:
+                return JsonResponse({'error': 'Parameter min_rating tidak valid'}, status=400)
         
         if featured == 'true':
             destinations = destinations.filter(featured=True)
@@ -56,24 +69,50 @@ def api_destinations(request):
             destinations = destinations.filter(category_id=category)
         
         if search:
-            destinations = destinations.filter(
-                Q(title__icontains=search) |
-                Q(short_description__icontains=search) |
-                Q(address__icontains=search)
+            destinations = search_index.filter_queryset(
+                destinations, search, ('title', 'short_description', 'address')
             )
         
+        if min_rating:
+            destinations = destinations.filter(avg_rating__gte=min_rating)
+        
+        if request.GET.get('sort') == 'rating':
+            destinations = destinations.order_by('-avg_rating', '-rating_count', '-created_at')
+        
+        # Area peta: ?near=lat,lng&radius_km= dan/atau ?bbox=barat,selatan,timur,utara, terurut jarak
+        near = request.GET.get('near')
+        bbox = request.GET.get('bbox')
+        distances = {}
+        if near or bbox:
+            try:
+                origin = geo.parse_point(near) if near else None
+                geo_query = geo.GeoQuery(destinations)
+                if bbox:
+                    hits = geo_query.within(*geo.parse_bbox(bbox), origin=origin)
+                else:
+                    radius_km = min(float(request.GET.get('radius_km', 10)), MAX_RADIUS_KM)
+                    hits = geo_query.near(*origin, radius_km)
+            except ValueError:
+                return JsonResponse({'error': 'Parameter near/bbox/radius_km tidak valid'}, status=400)
+            distances = dict(hits)
+        
         # Pagination
         page_size = int(request.GET.get('page_size', 10))
         page = int(request.GET.get('page', 1))
         
-        paginator = Paginator(destinations, page_size)
-        page_obj = paginator.get_page(page)
+        if near or bbox:
+            paginator = Paginator(list(distances), page_size)
+            page_obj = paginator.get_page(page)
+            by_pk = destinations.in_bulk(page_obj.object_list)
+            page_destinations = [by_pk[pk] for pk in page_obj.object_list]
+        else:
+            paginator = Paginator(destinations, page_size)
+            page_obj = paginator.get_page(page)
+            page_destinations = page_obj
         
         results = []
-        for destination in page_obj:
-            # Get featured image
-            featured_image = destination.gallery.filter(is_featured=True).first()
-            
+        images = media_pipeline.lookup(destination.main_image for destination in page_destinations)
+        for destination in page_destinations:
             results.append({
                 'id': destination.id,
                 'title': destination.title,
@@ -89,7 +128,11 @@ def api_destinations(request):
                 'average_rating': destination.average_rating,
                 'total_reviews': destination.total_reviews,
                 'featured': destination.featured,
-                'image': featured_image.image.url if featured_image and featured_image.image else None,
+                'image': destination.featured_image_url or None,
+                'image_variants': media_pipeline.payload(destination.main_image, images),
+                'latitude': float(destination.latitude) if destination.latitude is not None else None,
+                'longitude': float(destination.longitude) if destination.longitude is not None else None,
+                'distance_km': distances.get(destination.id),
                 'created_at': destination.created_at.isoformat()
             })
         
@@ -832,7 +875,8 @@ class TourismGalleryAPIView(View):
                 paginator = Paginator(galleries, page_size)
                 page_obj = paginator.get_page(page)
                 
-                results = [self._serialize_gallery(gallery) for gallery in page_obj]
+                images = media_pipeline.lookup(gallery.image for gallery in page_obj)
+                results = [self._serialize_gallery(gallery, images) for gallery in page_obj]
                 
                 return JsonResponse({
                     'results': results,
@@ -928,8 +972,8 @@ class TourismGalleryAPIView(View):
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
     
-    def _serialize_gallery(self, gallery):
-        """Serialize gallery object to dict"""
+    def _serialize_gallery(self, gallery, images=None):
+        """Serialize gallery object to dict (`images` hasil media_pipeline.lookup untuk satu halaman)"""
         return {
             'id': gallery.id,
             'tourism_location': {
@@ -940,6 +984,7 @@ class TourismGalleryAPIView(View):
             'description': gallery.description,
             'media_type': gallery.media_type,
             'image': gallery.image.url if gallery.image else None,
+            'image_variants': media_pipeline.payload(gallery.image, images),
             'video': gallery.video.url if gallery.video else None,
             'video_url': gallery.video_url,
             'alt_text': gallery.alt_text,
@@ -963,12 +1008,15 @@ def api_destination_detail(request, destination_id):
         
         # Get gallery
         gallery = []
-        for item in destination.gallery.filter(is_active=True).order_by('order'):
+        gallery_items = list(destination.gallery.filter(is_active=True).order_by('order'))
+        images = media_pipeline.lookup([destination.main_image, *(item.image for item in gallery_items)])
+        for item in gallery_items:
             gallery.append({
                 'id': item.id,
                 'title': item.title,
                 'media_type': item.media_type,
                 'image': item.image.url if item.image else None,
+                'image_variants': media_pipeline.payload(item.image, images),
                 'video_url': item.video_url,
                 'caption': item.caption,
                 'is_featured': item.is_featured
@@ -991,6 +1039,8 @@ def api_destination_detail(request, destination_id):
             'id': destination.id,
             'title': destination.title,
             'slug': destination.slug,
+            'image': destination.featured_image_url or None,
+            'image_variants': media_pipeline.payload(destination.main_image, images),
             'short_description': destination.short_description,
             'full_description': destination.full_description,
             'address': destination.address,
@@ -1054,12 +1104,14 @@ def api_gallery(request):
         page_obj = paginator.get_page(page)
         
         results = []
+        images = media_pipeline.lookup(item.image for item in page_obj)
         for item in page_obj:
             results.append({
                 'id': item.id,
                 'title': item.title,
                 'media_type': item.media_type,
                 'image': item.image.url if item.image else None,
+                'image_variants': media_pipeline.payload(item.image, images),
                 'video_url': item.video_url,
                 'caption': item.caption,
                 'destination': {
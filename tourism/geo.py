@@ -0,0 +1,198 @@
+import time
+from functools import reduce
+from operator import or_
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+
+DEFAULTS = {
+    'PRECISION': 9,       # panjang geohash tersimpan (~5 m)
+    'MAX_CELLS': 32,      # batas jumlah sel geohash per query area
+}
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'TOURISM_GEO', {})}
+
+
+def cell_size(precision):
+    """(tinggi lintang, lebar bujur) satu sel geohash dalam derajat"""
+    bits = precision * 5
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def encode_many(lats, lngs, precision=None):
+    """Geohash untuk array koordinat sekaligus (bit bujur dan lintang disilang, bujur lebih dulu)"""
+    precision = precision or config()['PRECISION']
+    bits = precision * 5
+    lng_bits, lat_bits = (bits + 1) // 2, bits // 2
+    lats = np.clip(np.asarray(lats, dtype=float), -90, 90)
+    lngs = np.clip(np.asarray(lngs, dtype=float), -180, 180)
+    lat_cells = np.minimum(((lats + 90) / 180 * 2 ** lat_bits).astype(np.int64), 2 ** lat_bits - 1)
+    lng_cells = np.minimum(((lngs + 180) / 360 * 2 ** lng_bits).astype(np.int64), 2 ** lng_bits - 1)
+
+    code = np.zeros(lats.shape, dtype=np.int64)
+    lat_index, lng_index = lat_bits, lng_bits
+    for position in range(bits):
+        if position % 2 == 0:
+            lng_index -= 1
+            bit = (lng_cells >> lng_index) & 1
+        else:
+            lat_index -= 1
+            bit = (lat_cells >> lat_index) & 1
+        code = (code << 1) | bit
+
+    chars = np.array(list(BASE32))
+    digits = [(code >> (5 * (precision - 1 - index))) & 31 for index in range(precision)]
+    return [''.join(row) for row in chars[np.stack(digits, axis=-1)].reshape(-1, precision)]
+
+
+def encode(lat, lng, precision=None):
+    if lat is None or lng is None:
+        return ''
+    return encode_many([float(lat)], [float(lng)], precision)[0]
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Jarak (km) dari satu titik ke array titik"""
+    lat, lng = np.radians(lat), np.radians(lng)
+    lats, lngs = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lngs, dtype=float))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def radius_bbox(lat, lng, radius_km):
+    """Kotak (selatan, barat, utara, timur) yang memuat lingkaran radius"""
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(np.cos(np.radians(lat)), 1e-6))
+    return max(lat - dlat, -90.0), max(lng - dlng, -180.0), min(lat + dlat, 90.0), min(lng + dlng, 180.0)
+
+
+def cover(south, west, north, east, max_cells=None):
+    """Prefix geohash terpanjang yang menutup kotak dengan paling banyak max_cells sel
+
+    Kotak yang melewati garis 180° tidak didukung (tidak relevan untuk data desa).
+    """
+    max_cells = max_cells or config()['MAX_CELLS']
+    best = ['']
+    for precision in range(1, config()['PRECISION'] + 1):
+        lat_size, lng_size = cell_size(precision)
+        rows = int(np.floor((north + 90) / lat_size) - np.floor((south + 90) / lat_size)) + 1
+        cols = int(np.floor((east + 180) / lng_size) - np.floor((west + 180) / lng_size)) + 1
+        if rows * cols > max_cells:
+            break
+        lats = np.minimum(south + np.arange(rows) * lat_size, north)
+        lngs = np.minimum(west + np.arange(cols) * lng_size, east)
+        grid_lat, grid_lng = np.meshgrid(lats, lngs, indexing='ij')
+        best = sorted(set(encode_many(grid_lat.ravel(), grid_lng.ravel(), precision)))
+    return best
+
+
+def cover_filter(prefixes, field='geohash'):
+    """Q rentang string per prefix sehingga index kolom geohash bisa dipakai (bukan LIKE)"""
+    if prefixes == ['']:
+        return ~Q(**{field: ''})
+    return reduce(or_, (Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + '~'}) for prefix in prefixes))
+
+
+class GeoQuery:
+    """Cari lokasi dalam radius atau kotak: saring kandidat lewat index geohash, lalu hitung jarak dengan NumPy"""
+
+    def __init__(self, queryset, lat_field='latitude', lng_field='longitude', geohash_field='geohash'):
+        self.queryset = queryset
+        self.lat_field = lat_field
+        self.lng_field = lng_field
+        self.geohash_field = geohash_field
+
+    def _candidates(self, south, west, north, east):
+        rows = list(self.queryset.filter(cover_filter(cover(south, west, north, east), self.geohash_field)).values_list(
+            'pk', self.lat_field, self.lng_field
+        ))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+        pks, lats, lngs = zip(*rows)
+        return np.array(pks, dtype=np.int64), np.array(lats, dtype=float), np.array(lngs, dtype=float)
+
+    def near(self, lat, lng, radius_km):
+        """[(pk, jarak_km)] dalam radius, terurut terdekat"""
+        pks, lats, lngs = self._candidates(*radius_bbox(lat, lng, radius_km))
+        distances = haversine_km(lat, lng, lats, lngs)
+        inside = distances <= radius_km
+        return self._sorted(pks[inside], distances[inside])
+
+    def within(self, south, west, north, east, origin=None):
+        """[(pk, jarak_km)] di dalam kotak, terurut dari origin (default: tengah kotak)"""
+        pks, lats, lngs = self._candidates(south, west, north, east)
+        inside = (lats >= south) & (lats <= north) & (lngs >= west) & (lngs <= east)
+        lat, lng = origin or ((south + north) / 2, (west + east) / 2)
+        return self._sorted(pks[inside], haversine_km(lat, lng, lats[inside], lngs[inside]))
+
+    @staticmethod
+    def _sorted(pks, distances):
+        order = np.argsort(distances, kind='stable')
+        return [(int(pk), round(float(distance), 3)) for pk, distance in zip(pks[order], distances[order])]
+
+
+def parse_point(value):
+    lat, lng = (float(part) for part in value.split(','))
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Koordinat di luar jangkauan')
+    return lat, lng
+
+
+def parse_bbox(value):
+    """bbox=barat,selatan,timur,utara (urutan GeoJSON/Leaflet toBBoxString) -> (selatan, barat, utara, timur)"""
+    west, south, east, north = (float(part) for part in value.split(','))
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise ValueError('bbox tidak valid')
+    return south, west, north, east
+
+
+def benchmark(size=50_000, queries=200, radius_km=5.0, seed=0):
+    """Ukur encode, seleksi kandidat per sel (setara range scan index) dan haversine pada titik sintetis
+
+    Return dict waktu (detik) dan rata-rata kandidat/hasil per query.
+    """
+    rng = np.random.default_rng(seed)
+    # Sebaran di sekitar wilayah Aceh
+    lats = rng.uniform(2.0, 6.0, size)
+    lngs = rng.uniform(95.0, 98.5, size)
+
+    started = time.perf_counter()
+    hashes = np.array(encode_many(lats, lngs))
+    encoded = time.perf_counter() - started
+
+    order = np.argsort(hashes)
+    hashes, lats, lngs = hashes[order], lats[order], lngs[order]
+    centers = rng.integers(0, size, queries)
+    candidates = results = 0
+    started = time.perf_counter()
+    for index in centers:
+        lat, lng = lats[index], lngs[index]
+        selected = []
+        for prefix in cover(*radius_bbox(lat, lng, radius_km)):
+            lo = np.searchsorted(hashes, prefix, side='left')
+            hi = np.searchsorted(hashes, prefix + '~', side='left')
+            selected.append(np.arange(lo, hi))
+        selected = np.concatenate(selected) if selected else np.empty(0, dtype=int)
+        distances = haversine_km(lat, lng, lats[selected], lngs[selected])
+        candidates += len(selected)
+        results += int((distances <= radius_km).sum())
+    queried = time.perf_counter() - started
+
+    started = time.perf_counter()
+    haversine_km(lats[0], lngs[0], lats, lngs)
+    full_scan = time.perf_counter() - started
+    return {
+        'size': size,
+        'encode': encoded,
+        'query': queried / queries,
+        'full_scan': full_scan,
+        'candidates': candidates / queries,
+        'results': results / queries,
+    }
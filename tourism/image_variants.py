@@ -0,0 +1,5 @@
+from core.media import register
+from .models import TourismGallery, TourismLocation
+
+register(TourismLocation, 'main_image')
+register(TourismGallery, 'image')
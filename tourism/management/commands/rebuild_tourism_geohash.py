@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from tourism import geo
+from tourism.models import TourismLocation
+
+
+class Command(BaseCommand):
+    help = 'Recompute the geohash of every tourism location, or benchmark proximity search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            metavar='N',
+            help='Only measure proximity search on N synthetic points',
+        )
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            result = geo.benchmark(options['benchmark'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{result["size"]} points: encode {result["encode"] * 1000:.1f} ms, '
+                f'5 km query {result["query"] * 1000:.2f} ms '
+                f'({result["candidates"]:.0f} candidates, {result["results"]:.0f} hits), '
+                f'full haversine scan {result["full_scan"] * 1000:.2f} ms'
+            ))
+            return
+
+        locations = list(TourismLocation.objects.only('latitude', 'longitude', 'geohash'))
+        changed = []
+        for location in locations:
+            geohash = geo.encode(location.latitude, location.longitude)
+            if geohash != location.geohash:
+                location.geohash = geohash
+                changed.append(location)
+        TourismLocation.objects.bulk_update(changed, ['geohash'], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f'{len(changed)} of {len(locations)} geohashes updated'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from tourism.services import TourismRatingService
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored rating aggregates of tourism locations from their ratings'
+
+    def handle(self, *args, **options):
+        changed = TourismRatingService.reconcile()
+        self.stdout.write(self.style.SUCCESS(f'{changed} tourism locations corrected'))
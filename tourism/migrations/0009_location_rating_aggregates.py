@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:13
+
+from django.conf import settings
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_aggregates(apps, schema_editor):
+    TourismLocation = apps.get_model('tourism', 'TourismLocation')
+    TourismRating = apps.get_model('tourism', 'TourismRating')
+    totals = TourismRating.objects.values('tourism_location_id').annotate(
+        total=Sum('rating'), count=Count('id')
+    ).order_by()
+    for row in totals:
+        TourismLocation.objects.filter(pk=row['tourism_location_id']).update(
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            avg_rating=(Decimal(row['total']) / row['count']).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+        )
+    for pk, main_image in TourismLocation.objects.exclude(main_image='').exclude(main_image=None).values_list('pk', 'main_image'):
+        TourismLocation.objects.filter(pk=pk).update(featured_image_url=default_storage.url(main_image))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0008_auto_20250904_1433'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourismlocation',
+            name='avg_rating',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=3, verbose_name='Rating Rata-rata'),
+        ),
+        migrations.AddField(
+            model_name='tourismlocation',
+            name='featured_image_url',
+            field=models.CharField(blank=True, editable=False, max_length=500, verbose_name='URL Gambar Unggulan'),
+        ),
+        migrations.AddField(
+            model_name='tourismlocation',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Jumlah Rating'),
+        ),
+        migrations.AddField(
+            model_name='tourismlocation',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Jumlah Nilai Rating'),
+        ),
+        migrations.AddIndex(
+            model_name='tourismlocation',
+            index=models.Index(fields=['is_active', 'avg_rating'], name='tourism_loc_active_rating_idx'),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
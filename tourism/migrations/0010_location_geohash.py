@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:14
+
+from django.db import migrations, models
+
+from tourism.geo import encode_many
+
+
+def backfill_geohash(apps, schema_editor):
+    TourismLocation = apps.get_model('tourism', 'TourismLocation')
+    rows = list(TourismLocation.objects.exclude(latitude=None).exclude(longitude=None).values_list(
+        'pk', 'latitude', 'longitude'
+    ))
+    if not rows:
+        return
+    pks, lats, lngs = zip(*rows)
+    for pk, geohash in zip(pks, encode_many([float(lat) for lat in lats], [float(lng) for lng in lngs])):
+        TourismLocation.objects.filter(pk=pk).update(geohash=geohash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0009_location_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourismlocation',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
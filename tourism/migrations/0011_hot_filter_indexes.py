@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0010_location_geohash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tourismlocation',
+            index=models.Index(fields=['status', 'is_active'], name='tourism_loc_status_active_idx'),
+        ),
+    ]
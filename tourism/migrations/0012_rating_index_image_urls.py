@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def refresh_featured_image_urls(apps, schema_editor):
+    """featured_image_url lama dihitung sebelum upload_to diterapkan (tanpa folder tourism/locations/)"""
+    TourismLocation = apps.get_model('tourism', 'TourismLocation')
+    for location in TourismLocation.objects.only('main_image', 'featured_image_url').iterator():
+        image_url = location.main_image.url if location.main_image else ''
+        if image_url != location.featured_image_url:
+            TourismLocation.objects.filter(pk=location.pk).update(featured_image_url=image_url)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0011_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tourismlocation',
+            name='tourism_loc_active_rating_idx',
+        ),
+        migrations.AddIndex(
+            model_name='tourismlocation',
+            index=models.Index(fields=['status', 'avg_rating'], name='tourism_loc_status_rating_idx'),
+        ),
+        migrations.RunPython(refresh_featured_image_urls, migrations.RunPython.noop),
+    ]
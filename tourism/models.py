@@ -1,9 +1,13 @@
 from django.db import models
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import uuid
 
+from . import geo
+
 User = get_user_model()
 
 class TourismCategory(models.Model):
@@ -57,6 +61,7 @@ class TourismLocation(models.Model):
     address = models.TextField(verbose_name="Alamat Lengkap")
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True, verbose_name="Latitude")
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True, verbose_name="Longitude")
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False, verbose_name="Geohash")
     
     # Informasi Wisata
     opening_hours = models.CharField(max_length=200, blank=True, verbose_name="Jam Buka")
@@ -76,6 +81,12 @@ class TourismLocation(models.Model):
     
     # Gambar Utama
     main_image = models.ImageField(upload_to='tourism/locations/', null=True, blank=True, verbose_name="Gambar Utama")
+    featured_image_url = models.CharField(max_length=500, blank=True, editable=False, verbose_name="URL Gambar Unggulan")
+
+    # Agregat rating, dijaga signal TourismRating via TourismRatingService (rekonsiliasi: reconcile_tourism_ratings)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name="Jumlah Nilai Rating")
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Jumlah Rating")
+    avg_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0, editable=False, verbose_name="Rating Rata-rata")
     
     # SEO dan Meta
     meta_title = models.CharField(max_length=60, blank=True, verbose_name="Meta Title")
@@ -93,6 +104,11 @@ class TourismLocation(models.Model):
         verbose_name = "Lokasi Wisata"
         verbose_name_plural = "Lokasi Wisata"
         ordering = ['-created_at']
+        indexes = [
+            # SQLite menulis filter boolean sebagai WHERE "is_active" (bukan =1), jadi status di depan
+            models.Index(fields=['status', 'avg_rating'], name='tourism_loc_status_rating_idx'),
+            models.Index(fields=['status', 'is_active'], name='tourism_loc_status_active_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -100,67 +116,30 @@ class TourismLocation(models.Model):
     def save(self, *args, **kwargs):
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
-            
-    @property
-    def get_featured_image(self):
-        """Return the featured image for this location"""
-        if self.main_image:
-            return self.main_image.url
-        
-        # Try to get a featured image from gallery
-        featured_image = self.gallery.filter(is_active=True, is_featured=True, media_type='image').first()
-        if featured_image:
-            return featured_image.file.url
-        
-        # Otherwise get the first image from gallery
-        first_image = self.gallery.filter(is_active=True, media_type='image').first()
-        if first_image:
-            return first_image.file.url
-        
-        # Return a placeholder if no image is available
-        return '/static/img/placeholder.jpg'
-    
-    @property
-    def location_type_display(self):
-        """Return the display value of location_type"""
-        return dict(self.LOCATION_TYPE_CHOICES).get(self.location_type, self.location_type)
-        
-    @property
-    def average_rating(self):
-        """Calculate the average rating for this location"""
-        from django.db.models import Avg
-        # Get average from TourismReview
-        reviews = self.reviews.filter(is_active=True)
-        if reviews.exists():
-            return reviews.aggregate(Avg('rating'))['rating__avg'] or 0
-        return 0
+        self.geohash = geo.encode(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
         super().save(*args, **kwargs)
+        # URL baru benar setelah super().save(): upload_to diterapkan saat file disimpan
+        image_url = self.main_image.url if self.main_image else ''
+        if image_url != self.featured_image_url:
+            self.featured_image_url = image_url
+            TourismLocation.objects.filter(pk=self.pk).update(featured_image_url=image_url)
 
     @property
     def average_rating(self):
-        ratings = self.ratings.all()
-        if ratings:
-            return sum(r.rating for r in ratings) / len(ratings)
-        return 0
+        """Rata-rata rating tersimpan (lihat TourismRatingService)"""
+        return float(self.avg_rating)
 
     @property
     def total_reviews(self):
-        return self.ratings.count()
-        
+        return self.rating_count
+
     @property
     def get_featured_image(self):
-        if self.main_image:
-            return self.main_image
-        # Try to get featured image from gallery
-        featured_gallery = self.gallery.filter(is_featured=True).first()
-        if featured_gallery and featured_gallery.image:
-            return featured_gallery.image
-        # Get first image from gallery
-        first_gallery = self.gallery.filter(media_type='image').first()
-        if first_gallery and first_gallery.image:
-            return first_gallery.image
-        return None
-        
+        return self.featured_image_url or None
+
     @property
     def location_type_display(self):
         return self.get_location_type_display()
@@ -394,3 +373,32 @@ class TourismFAQ(models.Model):
 
     def __str__(self):
         return f"{self.question[:50]}... - {self.tourism_location.title}"
+
+
+@receiver(pre_save, sender=TourismRating)
+def remember_previous_rating(sender, instance, raw=False, **kwargs):
+    """Simpan (lokasi, nilai) lama sebelum TourismRating diubah"""
+    if raw or instance.pk is None:
+        instance._previous_rating = None
+        return
+    instance._previous_rating = TourismRating.objects.filter(pk=instance.pk).values_list(
+        'tourism_location_id', 'rating'
+    ).first()
+
+
+@receiver(post_save, sender=TourismRating)
+def update_location_rating_on_save(sender, instance, raw=False, **kwargs):
+    """Terapkan selisih rating pada agregat lokasi"""
+    if raw:
+        return
+    from .services import TourismRatingService
+    TourismRatingService.move(
+        getattr(instance, '_previous_rating', None), (instance.tourism_location_id, instance.rating)
+    )
+
+
+@receiver(post_delete, sender=TourismRating)
+def update_location_rating_on_delete(sender, instance, **kwargs):
+    """Keluarkan rating yang dihapus (termasuk cascade user/lokasi) dari agregat lokasi"""
+    from .services import TourismRatingService
+    TourismRatingService.move((instance.tourism_location_id, instance.rating), None)
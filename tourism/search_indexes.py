@@ -0,0 +1,11 @@
+from django.utils.html import strip_tags
+
+from core.search import register
+from .models import TourismLocation
+
+register(
+    TourismLocation, 'tourism_location', 'tourism',
+    title='title',
+    fields=('short_description', lambda location: strip_tags(location.full_description), 'address', 'category__name'),
+    subtitle='location_type',
+)
@@ -0,0 +1,86 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import TourismLocation, TourismRating
+
+RATING_CATEGORIES = ('cleanliness', 'accessibility', 'facilities', 'service', 'value')
+
+
+def average(rating_sum, rating_count):
+    if not rating_count:
+        return Decimal('0')
+    return (Decimal(rating_sum) / rating_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+class TourismRatingService:
+    """Service untuk menjaga agregat rating (rating_sum/rating_count/avg_rating) di TourismLocation"""
+
+    @staticmethod
+    def _apply(location_id, sum_delta, count_delta):
+        """Terapkan selisih pada baris lokasi yang dikunci dalam transaksi yang sedang berjalan"""
+        current = TourismLocation.objects.select_for_update().filter(
+            pk=location_id
+        ).values_list('rating_sum', 'rating_count').first()
+        if current is None:
+            return
+        rating_sum, rating_count = current
+        rating_sum += sum_delta
+        rating_count += count_delta
+        TourismLocation.objects.filter(pk=location_id).update(
+            rating_sum=rating_sum, rating_count=rating_count, avg_rating=average(rating_sum, rating_count),
+        )
+
+    @staticmethod
+    def move(previous, current):
+        """Pindahkan satu rating dari (lokasi, nilai) lama ke yang baru; None = tidak ada
+
+        Dipanggil oleh signal TourismRating sehingga admin, form, dummy data dan cascade ikut terhitung.
+        """
+        if previous == current:
+            return
+        with transaction.atomic():
+            if previous and current and previous[0] == current[0]:
+                TourismRatingService._apply(current[0], current[1] - previous[1], 0)
+                return
+            if previous:
+                TourismRatingService._apply(previous[0], -previous[1], -1)
+            if current:
+                TourismRatingService._apply(current[0], current[1], 1)
+
+    @staticmethod
+    def rate(location, user, rating, **categories):
+        """Simpan rating pengguna (buat/ubah) sekaligus agregat lokasi; return (TourismRating, created)"""
+        categories = {name: value for name, value in categories.items() if name in RATING_CATEGORIES and value}
+        with transaction.atomic():
+            existing = TourismRating.objects.select_for_update().filter(
+                tourism_location=location, user=user
+            ).first()
+            # Agregat lokasi diperbarui oleh signal TourismRating (move)
+            if existing:
+                existing.rating = rating
+                for name, value in categories.items():
+                    setattr(existing, name, value)
+                existing.save()
+                return existing, False
+            return TourismRating.objects.create(tourism_location=location, user=user, rating=rating, **categories), True
+
+    @staticmethod
+    def reconcile(queryset=None):
+        """Hitung ulang agregat dari TourismRating; return jumlah lokasi yang dikoreksi"""
+        queryset = queryset if queryset is not None else TourismLocation.objects.all()
+        totals = {
+            row['tourism_location']: (row['total'], row['count'])
+            for row in TourismRating.objects.filter(tourism_location__in=queryset.values('pk'))
+            .values('tourism_location').annotate(total=Sum('rating'), count=Count('id')).order_by()
+        }
+        changed = []
+        for location in queryset.only('rating_sum', 'rating_count', 'avg_rating').iterator():
+            rating_sum, rating_count = totals.get(location.pk, (0, 0))
+            avg_rating = average(rating_sum, rating_count)
+            if (location.rating_sum, location.rating_count, location.avg_rating) != (rating_sum, rating_count, avg_rating):
+                location.rating_sum, location.rating_count, location.avg_rating = rating_sum, rating_count, avg_rating
+                changed.append(location)
+        TourismLocation.objects.bulk_update(changed, ['rating_sum', 'rating_count', 'avg_rating'], batch_size=500)
+        return len(changed)
@@ -1,3 +1,138 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from . import geo
+from .models import TourismCategory, TourismLocation, TourismRating
+from .services import TourismRatingService
+
+
+def location(slug, **fields):
+    category = TourismCategory.objects.get_or_create(name='Pantai')[0]
+    return TourismLocation.objects.create(
+        title=slug, slug=slug, category=category, short_description='-', full_description='-', address='-',
+        status='published', **fields,
+    )
+
+
+class TourismRatingAggregateTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.first, self.second = User.objects.create_user('a'), User.objects.create_user('b')
+        self.beach, self.river = location('pantai'), location('sungai')
+
+    def assertAggregate(self, place, rating_sum, rating_count, avg_rating):
+        place.refresh_from_db()
+        self.assertEqual((place.rating_sum, place.rating_count, float(place.avg_rating)),
+                         (rating_sum, rating_count, avg_rating))
+
+    def test_service_and_direct_writes_keep_aggregates(self):
+        TourismRatingService.rate(self.beach, self.first, 5)
+        rating = TourismRating.objects.create(tourism_location=self.beach, user=self.second, rating=2)
+        self.assertAggregate(self.beach, 7, 2, 3.5)
+
+        # Edit seperti lewat admin/form, termasuk pindah lokasi
+        rating.rating = 4
+        rating.save()
+        self.assertAggregate(self.beach, 9, 2, 4.5)
+        rating.tourism_location = self.river
+        rating.save()
+        self.assertAggregate(self.beach, 5, 1, 5.0)
+        self.assertAggregate(self.river, 4, 1, 4.0)
+
+        rating.delete()
+        self.assertAggregate(self.river, 0, 0, 0.0)
+        self.first.delete()
+        self.assertAggregate(self.beach, 0, 0, 0.0)
+        self.assertEqual(TourismRatingService.reconcile(), 0)
+
+    def test_rating_filter_uses_index(self):
+        plan = TourismLocation.objects.filter(is_active=True, status='published', avg_rating__gte=4).explain()
+        self.assertIn('tourism_loc_status_rating_idx', plan)
+
+    def test_min_rating_filter_validates_input(self):
+        TourismRatingService.rate(self.beach, self.first, 5)
+        TourismRatingService.rate(self.river, self.first, 3)
+        url = reverse('tourism:tourism_api:destinations')
+
+        response = self.client.get(url, {'min_rating': '4'})
+        self.assertEqual([item['slug'] for item in response.json()['results']], ['pantai'])
+        for value in ('empat', 'nan', '6', '-1'):
+            self.assertEqual(self.client.get(url, {'min_rating': value}).status_code, 400, value)
+
+
+class TourismLocationImageTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def test_featured_image_url_includes_upload_to(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (4, 4)).save(buffer, 'JPEG')
+        with override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL='/media/'):
+            place = location('danau', main_image=SimpleUploadedFile('pic.jpg', buffer.getvalue()))
+
+        self.assertTrue(place.featured_image_url.startswith('/media/tourism/locations/pic'))
+        place.refresh_from_db()
+        self.assertEqual(place.featured_image_url, place.main_image.url)
+
+
+class GeohashTest(SimpleTestCase):
+    def test_encode_known_vector(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(geo.encode(57.64911, 10.40744, 5), 'u4pru')
+        self.assertEqual(geo.encode(None, 10.40744), '')
+
+    def test_cover_never_misses_a_point_inside_the_radius(self):
+        rng = np.random.default_rng(0)
+        for lat, lng, radius_km in [(5.55, 95.32, 0.3), (5.55, 95.32, 5), (-6.2, 106.8, 40), (60.1, 24.9, 12)]:
+            south, west, north, east = geo.radius_bbox(lat, lng, radius_km)
+            prefixes = tuple(geo.cover(south, west, north, east))
+            lats = rng.uniform(south, north, 2000)
+            lngs = rng.uniform(west, east, 2000)
+            inside = geo.haversine_km(lat, lng, lats, lngs) <= radius_km
+            # Termasuk titik tepat di tepi kotak
+            lats = np.concatenate([lats[inside], [south, north, lat, lat]])
+            lngs = np.concatenate([lngs[inside], [lng, lng, west, east]])
+            for point, code in zip(zip(lats, lngs), geo.encode_many(lats, lngs)):
+                self.assertTrue(code.startswith(prefixes), (lat, lng, radius_km, point))
+
+
+class DestinationAreaApiTest(TestCase):
+    def setUp(self):
+        # Berjarak ~0, ~1,1 km, ~2,2 km dan ~111 km ke utara dari titik asal
+        for slug, lat in (('dekat', '5.550000'), ('tengah', '5.560000'), ('jauh', '5.570000'), ('luar', '6.550000')):
+            location(slug, latitude=lat, longitude='95.320000')
+        self.url = reverse('tourism:tourism_api:destinations')
+
+    def slugs(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['slug'] for item in response.json()['results']], response.json()
+
+    def test_near_is_ordered_by_distance(self):
+        slugs, data = self.slugs(near='5.569,95.32', radius_km=5)
+        self.assertEqual(slugs, ['jauh', 'tengah', 'dekat'])
+        distances = [item['distance_km'] for item in data['results']]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_bbox_is_ordered_from_origin(self):
+        slugs, _ = self.slugs(bbox='95.3,5.54,95.34,5.565', near='5.55,95.32')
+        self.assertEqual(slugs, ['dekat', 'tengah'])
+
+    def test_near_is_paginated_after_ordering(self):
+        slugs, data = self.slugs(near='5.55,95.32', radius_km=5, page_size=1, page=2)
+        self.assertEqual(slugs, ['tengah'])
+        self.assertEqual((data['count'], data['num_pages'], data['has_next']), (3, 3, True))
+
+    def test_invalid_area_is_a_bad_request(self):
+        for params in ({'near': 'abc'}, {'near': '95,200'}, {'near': '5.55,95.32', 'radius_km': 'x'},
+                       {'bbox': '1,2,3'}, {'bbox': '95.34,5.54,95.3,5.565'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
@@ -3,7 +3,9 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.core.paginator import Paginator
 from django.contrib import messages
+from django.db import transaction
 from .models import TourismEvent, TourismLocation, TourismCategory, TourismPackage, TourismReview, TourismRating
+from .services import TourismRatingService
 
 # Placeholder functions for other views defined in urls.py
 def tourism_dashboard(request):
@@ -242,17 +244,18 @@ def search_tourism(request):
         locations = locations.filter(location_type=location_type)
     
     if min_rating:
-        # This is a simplified approach - in a real app you might want to use annotations
-        # to filter by average rating more efficiently
-        min_rating = int(min_rating)
-        filtered_locations = []
-        for location in locations:
-            if location.average_rating >= min_rating:
-                filtered_locations.append(location.id)
-        locations = locations.filter(id__in=filtered_locations)
+        try:
+            min_rating = int(min_rating)
+        except ValueError:
+            min_rating = None
+        else:
+            locations = locations.filter(avg_rating__gte=min_rating)
     
     # Order results
-    locations = locations.order_by('-featured', '-created_at')
+    if request.GET.get('sort') == 'rating':
+        locations = locations.order_by('-avg_rating', '-rating_count', '-created_at')
+    else:
+        locations = locations.order_by('-featured', '-created_at')
     
     # Pagination
     paginator = Paginator(locations, 12)  # Show 12 locations per page
@@ -306,35 +309,38 @@ def submit_review(request, location_id):
         return JsonResponse({'status': 'error', 'message': 'Invalid rating value'}, status=400)
     
     # Check if user already reviewed this location
-    existing_review = location.reviews.filter(user=request.user).first()
-    if existing_review:
-        # Update existing review
-        existing_review.title = title
-        existing_review.comment = comment
-        existing_review.rating = rating
-        if visit_date:
-            existing_review.visit_date = visit_date
-        if visit_type:
-            existing_review.visit_type = visit_type
-        existing_review.save()
-        message = 'Review updated successfully'
-    else:
-        # Create new review
-        review_data = {
-            'tourism_location': location,
-            'user': request.user,
-            'title': title,
-            'comment': comment,
-            'rating': rating,
-        }
-        if visit_date:
-            review_data['visit_date'] = visit_date
-        if visit_type:
-            review_data['visit_type'] = visit_type
+    with transaction.atomic():
+        existing_review = location.reviews.filter(user=request.user).first()
+        if existing_review:
+            # Update existing review
+            existing_review.title = title
+            existing_review.comment = comment
+            existing_review.rating = rating
+            if visit_date:
+                existing_review.visit_date = visit_date
+            if visit_type:
+                existing_review.visit_type = visit_type
+            existing_review.save()
+            message = 'Review updated successfully'
+        else:
+            # Create new review
+            review_data = {
+                'tourism_location': location,
+                'user': request.user,
+                'title': title,
+                'comment': comment,
+                'rating': rating,
+            }
+            if visit_date:
+                review_data['visit_date'] = visit_date
+            if visit_type:
+                review_data['visit_type'] = visit_type
+            
+            TourismReview.objects.create(**review_data)
+            message = 'Review submitted successfully'
         
-        from .models import TourismReview
-        review = TourismReview.objects.create(**review_data)
-        message = 'Review submitted successfully'
+        # Bintang pada review juga menjadi rating pengguna untuk lokasi ini
+        TourismRatingService.rate(location, request.user, rating)
     
     return JsonResponse({'status': 'success', 'message': message})
 
@@ -379,45 +385,11 @@ def submit_rating(request, location_id):
     except ValueError:
         return JsonResponse({'status': 'error', 'message': 'Invalid rating value'}, status=400)
     
-    # Check if user already rated this location
-    from .models import TourismRating
-    existing_rating = TourismRating.objects.filter(tourism_location=location, user=request.user).first()
-    
-    if existing_rating:
-        # Update existing rating
-        existing_rating.rating = rating
-        if cleanliness:
-            existing_rating.cleanliness = cleanliness
-        if accessibility:
-            existing_rating.accessibility = accessibility
-        if facilities:
-            existing_rating.facilities = facilities
-        if service:
-            existing_rating.service = service
-        if value:
-            existing_rating.value = value
-        existing_rating.save()
-        message = 'Rating updated successfully'
-    else:
-        # Create new rating
-        rating_data = {
-            'tourism_location': location,
-            'user': request.user,
-            'rating': rating,
-        }
-        if cleanliness:
-            rating_data['cleanliness'] = cleanliness
-        if accessibility:
-            rating_data['accessibility'] = accessibility
-        if facilities:
-            rating_data['facilities'] = facilities
-        if service:
-            rating_data['service'] = service
-        if value:
-            rating_data['value'] = value
-        
-        TourismRating.objects.create(**rating_data)
-        message = 'Rating submitted successfully'
+    _, created = TourismRatingService.rate(
+        location, request.user, rating,
+        cleanliness=cleanliness, accessibility=accessibility, facilities=facilities, service=service, value=value,
+    )
+    message = 'Rating submitted successfully' if created else 'Rating updated successfully'
     
     return JsonResponse({'status': 'success', 'message': message})
 
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('village_profile', '0005_villagevision'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='villagehistory',
+            name='village_pro_is_acti_50e2f9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='villagehistoryphoto',
+            name='village_pro_is_feat_c8a683_idx',
+        ),
+        migrations.AddIndex(
+            model_name='villagehistory',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['year_start', 'period_start'], name='village_hist_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='villagehistoryphoto',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['history'], name='village_photo_featured_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -57,7 +58,10 @@ class VillageHistory(models.Model):
         verbose_name_plural = "Sejarah Desa"
         ordering = ['-is_featured', 'year_start', 'period_start']
         indexes = [
-            models.Index(fields=['is_active', 'is_featured']),
+            models.Index(
+                fields=['year_start', 'period_start'], condition=Q(is_active=True, is_featured=True),
+                name='village_hist_featured_idx',
+            ),
             models.Index(fields=['history_type']),
             models.Index(fields=['year_start']),
         ]
@@ -116,7 +120,7 @@ class VillageHistoryPhoto(models.Model):
         ordering = ['display_order', '-is_featured', 'created_at']
         indexes = [
             models.Index(fields=['history', 'is_active']),
-            models.Index(fields=['is_featured']),
+            models.Index(fields=['history'], condition=Q(is_featured=True), name='village_photo_featured_idx'),
         ]
 
     def __str__(self):